@@ -4,7 +4,7 @@
     "name": "Helpdesk Management",
     "summary": """
         Helpdesk""",
-    "version": "19.0.1.17.0",
+    "version": "19.0.1.21.0",
     "license": "AGPL-3",
     "category": "After-Sales",
     "author": "AdaptiveCity, "
@@ -21,6 +21,7 @@
         "data/helpdesk_data.xml",
         "data/helpdesk_followup_cron.xml",
         "data/helpdesk_followup_kpi_cron.xml",
+        "data/helpdesk_line_cron.xml",
         "security/helpdesk_security.xml",
         "security/ir.model.access.csv",
         "views/res_partner_views.xml",
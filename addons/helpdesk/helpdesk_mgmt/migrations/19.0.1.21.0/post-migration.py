@@ -0,0 +1,15 @@
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    if not version:
+        return
+
+    env = api.Environment(cr, SUPERUSER_ID, {})
+
+    # Open LINE tickets get their conversation, so inbound messages keep
+    # reaching them instead of opening new tickets after the upgrade
+    tickets = env["helpdesk.ticket"].search(
+        [("closed", "=", False), ("x_line_user_id", "!=", False)]
+    )
+    env["helpdesk.line.conversation"]._sync_tickets(tickets)
@@ -17,3 +17,5 @@ from . import mail_activity
 from . import product_product
 from . import helpdesk_followup_kpi_daily
 from . import helpdesk_followup_kpi_summary
+from . import helpdesk_line_outbound_message
+from . import helpdesk_line_conversation
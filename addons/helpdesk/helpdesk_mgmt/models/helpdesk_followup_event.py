@@ -1,6 +1,9 @@
 from datetime import timedelta
 
-from odoo import api, fields, models
+from odoo import api, fields, models, modules
+
+# Events handled (and committed) per chunk by the follow-up crons
+FOLLOWUP_BATCH_SIZE = 200
 
 
 class HelpdeskFollowupEvent(models.Model):
@@ -65,6 +68,18 @@ class HelpdeskFollowupEvent(models.Model):
         )
     ]
 
+    def unlink(self):
+        # The KPI job only sees days of events that still exist: refresh the
+        # days of the removed events now
+        dates = set(
+            self.filtered("followup_created_date").mapped("followup_created_date")
+        )
+        res = super().unlink()
+        if dates:
+            self.flush_model()
+            self.env["helpdesk.followup.kpi.daily"].sudo()._refresh_kpi_dates(dates)
+        return res
+
     @api.depends("followup_created_at")
     def _compute_followup_created_date(self):
         for event in self:
@@ -128,8 +143,42 @@ class HelpdeskFollowupEvent(models.Model):
             message = message.replace("{" + key + "}", str(val or ""))
         return message
 
+    def _split_batches(self, batch_size):
+        for start in range(0, len(self), batch_size):
+            yield self[start : start + batch_size]
+
+    def _commit_batch(self):
+        """Commit a processed batch so progress survives a cron timeout"""
+        if not modules.module.current_test:
+            self.env.cr.commit()
+
+    def _prepare_activity_values(self, activity_type, summary, note, user, deadline):
+        self.ensure_one()
+        return {
+            "res_model_id": self.env["ir.model"]._get_id("helpdesk.ticket"),
+            "res_id": self.ticket_id.id,
+            "activity_type_id": activity_type.id,
+            "summary": summary,
+            "note": note,
+            "automated": True,
+            "user_id": user.id or activity_type.default_user_id.id or self.env.uid,
+            "date_deadline": deadline,
+        }
+
+    def _queue_mails(self, mail_values):
+        """Create outgoing mails in one go; the mail queue cron sends them"""
+        mail_values = [vals for vals in mail_values if vals]
+        if not mail_values:
+            return
+        self.env["mail.mail"].sudo().create(mail_values)
+        mail_cron = self.env.ref(
+            "mail.ir_cron_mail_scheduler_action", raise_if_not_found=False
+        )
+        if mail_cron:
+            mail_cron._trigger()
+
     @api.model
-    def _cron_create_followups(self):
+    def _cron_create_followups(self, batch_size=FOLLOWUP_BATCH_SIZE):
         now = fields.Datetime.now()
         pending_domain = [
             ("state", "=", "pending"),
@@ -143,52 +192,69 @@ class HelpdeskFollowupEvent(models.Model):
             pending_domain.append(
                 ("trigger_at", "<=", now - timedelta(days=min_wait))
             )
-        pending = self.search(pending_domain)
-        for event in pending:
-            policy = event.policy_id
+        pending = self.search(pending_domain, order="id")
+        for batch in pending._split_batches(batch_size):
+            batch._create_followups(now)
+            batch._commit_batch()
+
+    def _create_followups(self, now):
+        """Schedule the follow-up activities of the due events, policy by policy"""
+        today = fields.Date.context_today(self)
+        closed = self.browse()
+        for policy, events in self.grouped("policy_id").items():
             if not policy:
                 continue
-            wait_days = max(policy.wait_days or 0, 0)
-            if event.trigger_at and event.trigger_at > now - timedelta(days=wait_days):
-                continue
-            ticket = event.ticket_id
-            if not ticket or ticket.closed:
-                event.write({"state": "done", "followup_done_at": now})
+            wait_since = now - timedelta(days=max(policy.wait_days or 0, 0))
+            events = events.filtered(
+                lambda e, since=wait_since: not e.trigger_at or e.trigger_at <= since
+            )
+            policy_closed = events.filtered(
+                lambda e: not e.ticket_id or e.ticket_id.closed
+            )
+            closed |= policy_closed
+            events -= policy_closed
+            if not events:
                 continue
             if policy.target_stage_id:
-                ticket.with_context(skip_followup=True).write(
+                events.ticket_id.with_context(skip_followup=True).write(
                     {"stage_id": policy.target_stage_id.id}
                 )
-            assignee = (
-                event.assigned_user_id
-                or policy.default_assignee_user_id
-                or ticket.user_id
-            )
             activity_type = policy.activity_type_id
             if not activity_type:
                 continue
             summary = policy.summary or "Follow-up"
-            note = self._render_template(policy.note_template, ticket, event.trigger_at)
-            due_days = max(policy.due_days or 0, 0)
-            deadline = fields.Date.context_today(ticket) + timedelta(days=due_days)
-            activity = ticket.activity_schedule(
-                activity_type_id=activity_type.id,
-                summary=summary,
-                note=note,
-                user_id=assignee.id if assignee else False,
-                date_deadline=deadline,
-            )
-            event.write(
-                {
-                    "followup_created_at": now,
-                    "followup_activity_id": activity.id,
-                    "assigned_user_id": assignee.id if assignee else False,
-                    "due_date": deadline,
-                }
+            deadline = today + timedelta(days=max(policy.due_days or 0, 0))
+            assignees = [
+                event.assigned_user_id
+                or policy.default_assignee_user_id
+                or event.ticket_id.user_id
+                for event in events
+            ]
+            activities = self.env["mail.activity"].create(
+                [
+                    event._prepare_activity_values(
+                        activity_type,
+                        summary,
+                        self._render_template(
+                            policy.note_template, event.ticket_id, event.trigger_at
+                        ),
+                        assignee,
+                        deadline,
+                    )
+                    for event, assignee in zip(events, assignees, strict=True)
+                ]
             )
+            events.write({"followup_created_at": now, "due_date": deadline})
+            for event, activity, assignee in zip(
+                events, activities, assignees, strict=True
+            ):
+                event.followup_activity_id = activity
+                event.assigned_user_id = assignee
+        if closed:
+            closed.write({"state": "done", "followup_done_at": now})
 
     @api.model
-    def _cron_escalate_overdue(self):
+    def _cron_escalate_overdue(self, batch_size=FOLLOWUP_BATCH_SIZE):
         now = fields.Datetime.now()
         pending_domain = [
             ("state", "=", "pending"),
@@ -205,51 +271,76 @@ class HelpdeskFollowupEvent(models.Model):
             pending_domain.append(
                 ("due_date", "<=", fields.Date.context_today(self) - timedelta(days=min_overdue))
             )
-        pending = self.search(pending_domain)
-        for event in pending:
-            policy = event.policy_id
+        pending = self.search(pending_domain, order="id")
+        for batch in pending._split_batches(batch_size):
+            batch._escalate_overdue(now)
+            batch._commit_batch()
+
+    def _escalate_overdue(self, now):
+        """Schedule escalation activities and queue their emails, policy by policy"""
+        today = fields.Date.context_today(self)
+        mail_values = []
+        notified = self.browse()
+        for policy, events in self.grouped("policy_id").items():
             if not policy or not policy.enable_escalation:
                 continue
-            if event.escalation_activity_id:
-                continue
-            if not event.due_date:
-                continue
-            overdue_days = max(policy.escalation_after_overdue_days or 0, 0)
-            threshold = event.due_date + timedelta(days=overdue_days)
-            if fields.Date.context_today(event) < threshold:
-                continue
-            ticket = event.ticket_id
-            if not ticket or ticket.closed:
-                continue
-            assignee = policy.escalation_user_id or event.assigned_user_id
-            activity_type = policy.escalation_activity_type_id or policy.activity_type_id
-            if not activity_type:
+            overdue = timedelta(days=max(policy.escalation_after_overdue_days or 0, 0))
+            events = events.filtered(
+                lambda e, overdue=overdue: not e.escalation_activity_id
+                and e.due_date
+                and today >= e.due_date + overdue
+                and e.ticket_id
+                and not e.ticket_id.closed
+            )
+            activity_type = (
+                policy.escalation_activity_type_id or policy.activity_type_id
+            )
+            if not events or not activity_type:
                 continue
             summary = policy.escalation_summary or "Escalation"
-            note = self._render_template(policy.escalation_note_template, ticket, event.trigger_at)
-            activity = ticket.activity_schedule(
-                activity_type_id=activity_type.id,
-                summary=summary,
-                note=note,
-                user_id=assignee.id if assignee else False,
-                date_deadline=fields.Date.context_today(ticket),
+            assignees = [
+                policy.escalation_user_id or event.assigned_user_id for event in events
+            ]
+            activities = self.env["mail.activity"].create(
+                [
+                    event._prepare_activity_values(
+                        activity_type,
+                        summary,
+                        self._render_template(
+                            policy.escalation_note_template,
+                            event.ticket_id,
+                            event.trigger_at,
+                        ),
+                        assignee,
+                        today,
+                    )
+                    for event, assignee in zip(events, assignees, strict=True)
+                ]
             )
-            event.write(
-                {
-                    "escalation_created_at": now,
-                    "escalation_activity_id": activity.id,
-                    "escalated_to_user_id": assignee.id if assignee else False,
-                    "state": "escalated",
-                }
-            )
-            if not event.escalation_notified_at:
-                self._send_escalation_email(event, assignee)
-                event.write({"escalation_notified_at": now})
+            for event, activity, assignee in zip(
+                events, activities, assignees, strict=True
+            ):
+                event.escalation_activity_id = activity
+                event.escalated_to_user_id = assignee
+                if not event.escalation_notified_at:
+                    mail_values.append(
+                        self._prepare_escalation_email(event, assignee)
+                    )
+                    notified |= event
+            events.write({"escalation_created_at": now, "state": "escalated"})
+        self._queue_mails(mail_values)
+        if notified:
+            notified.write({"escalation_notified_at": now})
 
     def _send_overdue_email(self, event):
+        mail_values = self._prepare_overdue_email(event)
+        if mail_values:
+            self.env["mail.mail"].sudo().create(mail_values).send()
+
+    def _prepare_overdue_email(self, event):
         ticket = event.ticket_id
         if not ticket:
-            return
+            return None
         policy = event.policy_id
         assignee = (
             event.assigned_user_id
@@ -257,7 +348,7 @@ class HelpdeskFollowupEvent(models.Model):
             or ticket.user_id
         )
         if not assignee or not assignee.email:
-            return
+            return None
         recipient_name = self._get_user_display_name(assignee) or assignee.name
         subject = f"[Overdue Reminder] {ticket.display_name or ticket.name}"
         due_date = event.due_date or ""
@@ -268,20 +359,23 @@ class HelpdeskFollowupEvent(models.Model):
             f"is overdue (due date: <strong>{due_date}</strong>).</p>"
             f"<p><a href=\"{ticket._ticket_url()}\">Open Ticket</a></p>"
         )
-        self.env["mail.mail"].sudo().create(
-            {
-                "subject": subject,
-                "body_html": body,
-                "email_to": assignee.email,
-            }
-        ).send()
+        return {
+            "subject": subject,
+            "body_html": body,
+            "email_to": assignee.email,
+        }
 
     def _send_escalation_email(self, event, assignee):
+        mail_values = self._prepare_escalation_email(event, assignee)
+        if mail_values:
+            self.env["mail.mail"].sudo().create(mail_values).send()
+
+    def _prepare_escalation_email(self, event, assignee):
         ticket = event.ticket_id
         if not ticket:
-            return
+            return None
         if not assignee or not assignee.email:
-            return
+            return None
         ticket_id_label = ticket.number or str(ticket.id)
         ticket_name = ticket.name or ""
         customer_name = ticket.partner_id.name if ticket.partner_id else ""
@@ -319,13 +413,11 @@ class HelpdeskFollowupEvent(models.Model):
             f"กรุณาตรวจสอบและดำเนินการโดยเร็ว</p>"
             f"<p>เปิดเคส: <a href=\"{ticket._ticket_url()}\">{ticket._ticket_url()}</a></p>"
         )
-        self.env["mail.mail"].sudo().create(
-            {
-                "subject": subject,
-                "body_html": body,
-                "email_to": assignee.email,
-            }
-        ).send()
+        return {
+            "subject": subject,
+            "body_html": body,
+            "email_to": assignee.email,
+        }
 
     def _get_user_display_name(self, user):
         if not user:
@@ -354,8 +446,9 @@ class HelpdeskFollowupEvent(models.Model):
             ("overdue_notified_at", "=", False),
             ("due_date", "<", today),
         ]
-        events = self.search(domain)
+        events = self.search(domain, order="id")
         now = fields.Datetime.now()
-        for event in events:
-            self._send_overdue_email(event)
-            event.write({"overdue_notified_at": now})
+        for batch in events._split_batches(FOLLOWUP_BATCH_SIZE):
+            self._queue_mails([self._prepare_overdue_email(event) for event in batch])
+            batch.write({"overdue_notified_at": now})
+            batch._commit_batch()
@@ -1,11 +1,19 @@
-from datetime import date, timedelta
+import copy
+import uuid
+from datetime import timedelta
 
-from dateutil import parser
-
-from odoo import api, fields, models
+from odoo import api, fields, models, tools
 
 DEFAULT_COMPLETION_TARGET = 90.0
 DEFAULT_RESPONSE_SLA_HOURS = 2.0
+KPI_REFRESHED_AT_PARAM = "helpdesk_mgmt.followup_kpi_refreshed_at"
+# Bumped whenever KPI rows are written: key of the cached executive summaries
+KPI_VERSION_PARAM = "helpdesk_mgmt.followup_kpi_version"
+KPI_REFRESH_MARGIN = timedelta(minutes=10)
+KPI_CELL = (
+    "date, COALESCE(team_id, 0), COALESCE(policy_id, 0), "
+    "COALESCE(assigned_user_id, 0)"
+)
 
 
 class HelpdeskFollowupKpiDaily(models.Model):
@@ -74,6 +82,29 @@ class HelpdeskFollowupKpiDaily(models.Model):
             rec.card_response_class = self._response_class(rec.avg_response_time_hours)
             rec.card_escalation_class = self._escalation_class(rec.escalation_count)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self._bump_kpi_version()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._bump_kpi_version()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self._bump_kpi_version()
+        return res
+
+    @api.model
+    def _bump_kpi_version(self):
+        """Invalidate the cached executive summaries"""
+        self.env["ir.config_parameter"].sudo().set_param(
+            KPI_VERSION_PARAM, uuid.uuid4().hex
+        )
+
     @api.model
     def search(self, domain, offset=0, limit=None, order=None):
         if self.env.context.get("skip_kpi_domain"):
@@ -83,143 +114,151 @@ class HelpdeskFollowupKpiDaily(models.Model):
 
     @api.depends_context("kpi_domain")
     def _compute_exec_metrics(self):
-        domain = self.env.context.get("kpi_domain") or []
-        completion_target, response_sla = self._get_kpi_targets()
-        summary = self._get_exec_summary(domain)
-        trend_points, trend_interval = self._get_exec_trends(domain)
-        cs_ranking, escalation_ranking = self._get_exec_rankings(domain)
-        team_rankings = self._get_exec_team_rankings(domain)
-        first_record = self.with_context(skip_kpi_domain=True).search(
-            domain, order="date desc, id desc", limit=1
-        )
-        first_id = first_record.id if first_record else False
-
-        completion_rate = summary["completion_rate"]
-        avg_response = summary["avg_response_time_hours"]
-        completion_delta = completion_rate - completion_target
-        response_delta = avg_response - response_sla
-        completion_delta_display = self._format_delta(
-            completion_delta, suffix="%", precision=1
-        )
-        response_delta_display = self._format_delta(
-            response_delta, suffix="h", precision=2
-        )
-        completion_class = self._completion_class(completion_rate)
-        response_class = self._response_class(avg_response)
-        escalation_class = self._escalation_class(summary["escalation_count"])
-
+        summary = self.get_exec_summary(self.env.context.get("kpi_domain") or [])
         for rec in self:
-            rec.exec_is_header = bool(first_id and rec.id == first_id)
+            rec.exec_is_header = bool(
+                summary["first_id"] and rec.id == summary["first_id"]
+            )
             rec.exec_total_created = summary["created_count"]
             rec.exec_total_done = summary["done_count"]
             rec.exec_total_escalations = summary["escalation_count"]
-            rec.exec_completion_rate = completion_rate
-            rec.exec_avg_response_time_hours = avg_response
-            rec.exec_completion_delta = completion_delta
-            rec.exec_response_delta = response_delta
-            rec.exec_completion_delta_display = completion_delta_display
-            rec.exec_response_delta_display = response_delta_display
-            rec.exec_completion_class = completion_class
-            rec.exec_response_class = response_class
-            rec.exec_escalation_class = escalation_class
-            rec.exec_completion_target = completion_target
-            rec.exec_response_sla_hours = response_sla
-            rec.exec_trend_points = trend_points
-            rec.exec_trend_interval = trend_interval
-            rec.exec_cs_ranking = cs_ranking
-            rec.exec_escalation_ranking = escalation_ranking
-            rec.exec_team_rankings = team_rankings
-
-    def _get_exec_summary(self, domain):
-        stats = self.read_group(
+            rec.exec_completion_rate = summary["completion_rate"]
+            rec.exec_avg_response_time_hours = summary["avg_response_time_hours"]
+            rec.exec_completion_delta = summary["completion_delta"]
+            rec.exec_response_delta = summary["response_delta"]
+            rec.exec_completion_delta_display = summary["completion_delta_display"]
+            rec.exec_response_delta_display = summary["response_delta_display"]
+            rec.exec_completion_class = summary["completion_class"]
+            rec.exec_response_class = summary["response_class"]
+            rec.exec_escalation_class = summary["escalation_class"]
+            rec.exec_completion_target = summary["completion_target"]
+            rec.exec_response_sla_hours = summary["response_sla_hours"]
+            rec.exec_trend_points = summary["trend_points"]
+            rec.exec_trend_interval = summary["trend_interval"]
+            rec.exec_cs_ranking = summary["cs_ranking"]
+            rec.exec_escalation_ranking = summary["escalation_ranking"]
+            rec.exec_team_rankings = summary["team_rankings"]
+
+    @api.model
+    def get_exec_summary(self, domain=None):
+        """Return every executive dashboard metric for domain
+
+        Computed from a single aggregate query and cached per (domain, KPI
+        table version, targets, language); the version changes whenever KPI
+        rows are written, which invalidates all cached summaries.
+        """
+        domain = list(domain or [])
+        version = (
+            self.env["ir.config_parameter"].sudo().get_param(KPI_VERSION_PARAM)
+            or "0"
+        )
+        summary = self._get_exec_summary_cached(
+            repr(domain), version, self._get_kpi_targets(), domain
+        )
+        return copy.deepcopy(summary)
+
+    @tools.ormcache("domain_key", "version", "targets", "self.env.lang")
+    def _get_exec_summary_cached(self, domain_key, version, targets, domain):
+        completion_target, response_sla = targets
+        kpis = self.with_context(skip_kpi_domain=True)
+        groups = kpis._read_group(
             domain,
+            ["date:day", "team_id", "assigned_user_id"],
             [
                 "followup_created_count:sum",
                 "followup_done_count:sum",
                 "escalation_count:sum",
-                "avg_response_time_hours:avg",
+                "avg_response_time_hours:sum",
+                "__count",
             ],
-            [],
-            lazy=False,
-        )
-        row = stats[0] if stats else {}
-        created_count = (
-            row.get("followup_created_count_sum")
-            or row.get("followup_created_count")
-            or 0
         )
-        done_count = (
-            row.get("followup_done_count_sum") or row.get("followup_done_count") or 0
+        # Per-row averages are averaged again, as read_group's avg did
+        cells = [
+            (day, team, user, self._kpi_bucket(*values))
+            for day, team, user, *values in groups
+        ]
+        total = self._merge_buckets(bucket for _d, _t, _u, bucket in cells)
+        summary = self._bucket_stats(total)
+
+        completion_rate = summary["completion_rate"]
+        avg_response = summary["avg_response_time_hours"]
+        completion_delta = completion_rate - completion_target
+        response_delta = avg_response - response_sla
+        summary.update(
+            {
+                "first_id": kpis.search(
+                    domain, order="date desc, id desc", limit=1
+                ).id,
+                "completion_delta": completion_delta,
+                "response_delta": response_delta,
+                "completion_delta_display": self._format_delta(
+                    completion_delta, suffix="%", precision=1
+                ),
+                "response_delta_display": self._format_delta(
+                    response_delta, suffix="h", precision=2
+                ),
+                "completion_class": self._completion_class(completion_rate),
+                "response_class": self._response_class(avg_response),
+                "escalation_class": self._escalation_class(
+                    summary["escalation_count"]
+                ),
+                "completion_target": completion_target,
+                "response_sla_hours": response_sla,
+            }
         )
-        escalation_count = (
-            row.get("escalation_count_sum") or row.get("escalation_count") or 0
+        summary["trend_points"], summary["trend_interval"] = self._exec_trends(cells)
+        summary["cs_ranking"], summary["escalation_ranking"] = self._exec_rankings(
+            cells, completion_target, response_sla
         )
-        avg_response = (
-            row.get("avg_response_time_hours_avg")
-            if row.get("avg_response_time_hours_avg") is not None
-            else row.get("avg_response_time_hours")
+        summary["team_rankings"] = self._exec_team_rankings(
+            cells, completion_target, response_sla
         )
-        completion_rate = (done_count / created_count * 100.0) if created_count else 0.0
+        return summary
+
+    def _kpi_bucket(self, created, done, escalations, response_sum, rows):
+        return [created or 0, done or 0, escalations or 0, response_sum or 0.0, rows]
+
+    def _merge_buckets(self, buckets):
+        total = [0, 0, 0, 0.0, 0]
+        for bucket in buckets:
+            for index, value in enumerate(bucket):
+                total[index] += value
+        return total
+
+    def _bucket_stats(self, bucket):
+        created, done, escalations, response_sum, rows = bucket
         return {
-            "created_count": int(created_count),
-            "done_count": int(done_count),
-            "escalation_count": int(escalation_count),
-            "avg_response_time_hours": avg_response or 0.0,
-            "completion_rate": completion_rate,
+            "created_count": int(created),
+            "done_count": int(done),
+            "escalation_count": int(escalations),
+            "avg_response_time_hours": response_sum / rows if rows else 0.0,
+            "completion_rate": (done / created * 100.0) if created else 0.0,
         }
 
-    def _get_exec_trends(self, domain):
-        first = self.with_context(skip_kpi_domain=True).search(
-            domain, order="date asc", limit=1
-        )
-        last = self.with_context(skip_kpi_domain=True).search(
-            domain, order="date desc", limit=1
-        )
-        if not first or not last:
+    def _exec_trends(self, cells):
+        days = [day for day, _team, _user, _bucket in cells if day]
+        if not days:
             return [], "day"
-        range_days = (last.date - first.date).days + 1
+        range_days = (max(days) - min(days)).days + 1
         interval = "week" if range_days > 60 else "day"
-        groups = self.read_group(
-            domain,
-            [
-                "followup_created_count:sum",
-                "followup_done_count:sum",
-                "escalation_count:sum",
-                "avg_response_time_hours:avg",
-            ],
-            [f"date:{interval}"],
-            lazy=False,
-        )
+        periods = {}
+        for day, _team, _user, bucket in cells:
+            if not day:
+                continue
+            if interval == "week":
+                day -= timedelta(days=day.weekday())
+            periods.setdefault(day, []).append(bucket)
         points = []
-        for g in groups:
-            raw_date = g.get("date") or g.get(f"date:{interval}")
-            if isinstance(raw_date, date):
-                label = fields.Date.to_string(raw_date)
-            else:
-                label = str(raw_date)
-            created = (
-                g.get("followup_created_count_sum")
-                or g.get("followup_created_count")
-                or 0
-            )
-            done = (
-                g.get("followup_done_count_sum") or g.get("followup_done_count") or 0
-            )
-            esc = (
-                g.get("escalation_count_sum") or g.get("escalation_count") or 0
-            )
-            avg_response = (
-                g.get("avg_response_time_hours_avg")
-                if g.get("avg_response_time_hours_avg") is not None
-                else g.get("avg_response_time_hours")
-            )
-            completion = (done / created * 100.0) if created else 0.0
+        for period in sorted(periods):
+            stats = self._bucket_stats(self._merge_buckets(periods[period]))
             points.append(
                 {
-                    "label": label,
-                    "completion_rate": round(completion, 2),
-                    "avg_response_time_hours": round(avg_response or 0.0, 2),
-                    "escalation_count": int(esc),
+                    "label": fields.Date.to_string(period),
+                    "completion_rate": round(stats["completion_rate"], 2),
+                    "avg_response_time_hours": round(
+                        stats["avg_response_time_hours"], 2
+                    ),
+                    "escalation_count": stats["escalation_count"],
                 }
             )
         max_response = max(
@@ -239,136 +278,73 @@ class HelpdeskFollowupKpiDaily(models.Model):
             )
         return points, interval
 
-    def _get_exec_rankings(self, domain):
-        completion_target, response_sla = self._get_kpi_targets()
-        groups = self.read_group(
-            domain,
-            [
-                "followup_created_count:sum",
-                "followup_done_count:sum",
-                "escalation_count:sum",
-                "avg_response_time_hours:avg",
-            ],
-            ["assigned_user_id"],
-            lazy=False,
+    def _exec_user_row(self, user, bucket, completion_target, response_sla):
+        stats = self._bucket_stats(bucket)
+        cs_score, cs_grade = self._compute_cs_score(
+            stats["created_count"],
+            stats["done_count"],
+            stats["avg_response_time_hours"],
+            stats["escalation_count"],
+            completion_target,
+            response_sla,
         )
-        cs_rows = []
-        esc_rows = []
-        for g in groups:
-            user = g.get("assigned_user_id")
-            if not user:
-                continue
-            created = (
-                g.get("followup_created_count_sum")
-                or g.get("followup_created_count")
-                or 0
-            )
-            done = (
-                g.get("followup_done_count_sum") or g.get("followup_done_count") or 0
-            )
-            esc = (
-                g.get("escalation_count_sum") or g.get("escalation_count") or 0
-            )
-            avg_response = (
-                g.get("avg_response_time_hours_avg")
-                if g.get("avg_response_time_hours_avg") is not None
-                else g.get("avg_response_time_hours")
-            )
-            completion = (done / created * 100.0) if created else 0.0
-            cs_score, cs_grade = self._compute_cs_score(
-                created, done, avg_response or 0.0, esc, completion_target, response_sla
+        return {
+            "user": user.display_name,
+            "created": stats["created_count"],
+            "done": stats["done_count"],
+            "completion_rate": round(stats["completion_rate"], 2),
+            "avg_response_time_hours": round(stats["avg_response_time_hours"], 2),
+            "escalations": stats["escalation_count"],
+            "cs_score": round(cs_score, 2),
+            "cs_grade": cs_grade,
+        }
+
+    def _exec_rankings(self, cells, completion_target, response_sla):
+        users = {}
+        for _day, _team, user, bucket in cells:
+            if user:
+                users.setdefault(user, []).append(bucket)
+        cs_rows = [
+            self._exec_user_row(
+                user, self._merge_buckets(buckets), completion_target, response_sla
             )
-            row = {
-                "user": user[1],
-                "created": int(created),
-                "done": int(done),
-                "completion_rate": round(completion, 2),
-                "avg_response_time_hours": round(avg_response or 0.0, 2),
-                "escalations": int(esc),
-                "cs_score": round(cs_score, 2),
-                "cs_grade": cs_grade,
-            }
-            cs_rows.append(row)
-            esc_rows.append(row)
+            for user, buckets in users.items()
+        ]
+        esc_rows = list(cs_rows)
         cs_rows.sort(
             key=lambda r: (-r["completion_rate"], r["avg_response_time_hours"])
         )
         esc_rows.sort(key=lambda r: (-r["escalations"], r["avg_response_time_hours"]))
         return cs_rows[:10], esc_rows[:10]
 
-    def _get_exec_team_rankings(self, domain):
-        completion_target, response_sla = self._get_kpi_targets()
-        groups = self.read_group(
-            domain,
-            [
-                "followup_created_count:sum",
-                "followup_done_count:sum",
-                "escalation_count:sum",
-                "avg_response_time_hours:avg",
-            ],
-            ["team_id", "assigned_user_id"],
-            lazy=False,
-        )
-        teams = {}
-        for g in groups:
-            user = g.get("assigned_user_id")
-            if not user:
-                continue
-            team = g.get("team_id")
-            team_id = team[0] if team else False
-            team_name = team[1] if team else "No Team"
-            team_key = team_id or "none"
-            created = (
-                g.get("followup_created_count_sum")
-                or g.get("followup_created_count")
-                or 0
-            )
-            done = (
-                g.get("followup_done_count_sum") or g.get("followup_done_count") or 0
-            )
-            esc = (
-                g.get("escalation_count_sum") or g.get("escalation_count") or 0
-            )
-            avg_response = (
-                g.get("avg_response_time_hours_avg")
-                if g.get("avg_response_time_hours_avg") is not None
-                else g.get("avg_response_time_hours")
+    def _exec_team_rankings(self, cells, completion_target, response_sla):
+        team_users = {}
+        for _day, team, user, bucket in cells:
+            if user:
+                team_users.setdefault(team, {}).setdefault(user, []).append(bucket)
+        results = []
+        for team, users in team_users.items():
+            rows = [
+                self._exec_user_row(
+                    user, self._merge_buckets(buckets), completion_target, response_sla
+                )
+                for user, buckets in users.items()
+            ]
+            cs_rows = sorted(
+                rows,
+                key=lambda r: (-r["completion_rate"], r["avg_response_time_hours"]),
             )
-            completion = (done / created * 100.0) if created else 0.0
-            cs_score, cs_grade = self._compute_cs_score(
-                created, done, avg_response or 0.0, esc, completion_target, response_sla
+            esc_rows = sorted(
+                rows, key=lambda r: (-r["escalations"], r["avg_response_time_hours"])
             )
-            row = {
-                "user": user[1],
-                "created": int(created),
-                "done": int(done),
-                "completion_rate": round(completion, 2),
-                "avg_response_time_hours": round(avg_response or 0.0, 2),
-                "escalations": int(esc),
-                "cs_score": round(cs_score, 2),
-                "cs_grade": cs_grade,
-            }
-            if team_key not in teams:
-                teams[team_key] = {
-                    "team_id": team_id,
-                    "team_name": team_name,
-                    "cs_rows": [],
-                    "esc_rows": [],
+            results.append(
+                {
+                    "team_id": team.id,
+                    "team_name": team.display_name if team else "No Team",
+                    "cs_rows": cs_rows[:10],
+                    "esc_rows": esc_rows[:10],
                 }
-            teams[team_key]["cs_rows"].append(row)
-            teams[team_key]["esc_rows"].append(row)
-
-        results = []
-        for team in teams.values():
-            team["cs_rows"].sort(
-                key=lambda r: (-r["completion_rate"], r["avg_response_time_hours"])
             )
-            team["esc_rows"].sort(
-                key=lambda r: (-r["escalations"], r["avg_response_time_hours"])
-            )
-            team["cs_rows"] = team["cs_rows"][:10]
-            team["esc_rows"] = team["esc_rows"][:10]
-            results.append(team)
         results.sort(key=lambda t: t["team_name"])
         return results
 
@@ -460,78 +436,109 @@ class HelpdeskFollowupKpiDaily(models.Model):
             response_sla = DEFAULT_RESPONSE_SLA_HOURS
         return completion_target, response_sla
 
+    def init(self):
+        # One row per cell, NULL dimensions included: target of the KPI upsert
+        self.env.cr.execute(
+            f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS helpdesk_followup_kpi_daily_cell_idx
+                ON {self._table} ({KPI_CELL})
+            """
+        )
+
     @api.model
     def _cron_compute_daily_kpis(self):
-        Event = self.env["helpdesk.followup.event"]
-        today = fields.Date.context_today(self)
-        start = today - timedelta(days=90)
-
-        self.search([("date", ">=", start)]).unlink()
+        """Refresh the KPI cells of the days touched by events changed since last run
 
-        domain = [
-            ("followup_created_date", ">=", start),
-            ("followup_created_date", "!=", False),
-        ]
-        groups = Event.read_group(
-            domain,
-            [
-                "id:count",
-                "followup_done_at:count",
-                "escalation_created_at:count",
-                "response_time_hours:avg",
-            ],
-            [
-                "followup_created_date:day",
-                "team_id",
-                "policy_id",
-                "assigned_user_id",
-            ],
-            lazy=False,
-        )
-        for g in groups:
-            raw_date = g.get("followup_created_date") or g.get(
-                "followup_created_date:day"
-            )
-            if not raw_date:
-                continue
-            if isinstance(raw_date, date):
-                date_value = raw_date
-            else:
-                try:
-                    date_value = fields.Date.to_date(raw_date)
-                except Exception:
-                    date_value = parser.parse(str(raw_date)).date()
-            created_count = (
-                g.get("id_count")
-                or g.get("__count")
-                or g.get("id")
-                or 0
-            )
-            done_count = (
-                g.get("followup_done_at_count")
-                or g.get("followup_done_at")
-                or 0
-            )
-            escalation_count = (
-                g.get("escalation_created_at_count")
-                or g.get("escalation_created_at")
-                or 0
-            )
-            avg_response = (
-                g.get("response_time_hours_avg")
-                if g.get("response_time_hours_avg") is not None
-                else g.get("response_time_hours")
+        The touched days are recomputed with a single upsert and their
+        vanished cells deleted, all in the cron transaction, so dashboards
+        keep the previous figures until it commits. The first run rebuilds
+        the last 90 days.
+        """
+        icp = self.env["ir.config_parameter"].sudo()
+        now = fields.Datetime.now()
+        last_run = fields.Datetime.to_datetime(icp.get_param(KPI_REFRESHED_AT_PARAM))
+        self.env["helpdesk.followup.event"].flush_model()
+        self.env["helpdesk.ticket"].flush_model(["write_date"])
+        self.flush_model()
+        cr = self.env.cr
+        if last_run:
+            # Margin for events written by transactions still running at last run
+            cr.execute(
+                """
+                SELECT DISTINCT e.followup_created_date
+                  FROM helpdesk_followup_event e
+                  JOIN helpdesk_ticket t ON t.id = e.ticket_id
+                 WHERE e.followup_created_date IS NOT NULL
+                   AND (e.write_date >= %(since)s OR t.write_date >= %(since)s)
+                """,
+                {"since": last_run - KPI_REFRESH_MARGIN},
             )
-            self.create(
-                {
-                    "date": date_value,
-                    "team_id": g.get("team_id") and g["team_id"][0],
-                    "policy_id": g.get("policy_id") and g["policy_id"][0],
-                    "assigned_user_id": g.get("assigned_user_id")
-                    and g["assigned_user_id"][0],
-                    "followup_created_count": int(created_count),
-                    "followup_done_count": int(done_count),
-                    "escalation_count": int(escalation_count),
-                    "avg_response_time_hours": avg_response or 0.0,
-                }
+            dates = [row[0] for row in cr.fetchall()]
+        else:
+            start = fields.Date.context_today(self) - timedelta(days=90)
+            dates = [start + timedelta(days=n) for n in range(91)]
+        if dates:
+            self._refresh_kpi_dates(dates)
+        icp.set_param(KPI_REFRESHED_AT_PARAM, fields.Datetime.to_string(now))
+        return len(dates)
+
+    def _refresh_kpi_dates(self, dates):
+        cr = self.env.cr
+        now = fields.Datetime.now()
+        cr.execute(
+            f"""
+            INSERT INTO {self._table} AS k (
+                date, team_id, policy_id, assigned_user_id,
+                followup_created_count, followup_done_count, escalation_count,
+                avg_response_time_hours, completion_rate,
+                create_uid, create_date, write_uid, write_date
             )
+            SELECT
+                e.followup_created_date,
+                e.team_id,
+                e.policy_id,
+                e.assigned_user_id,
+                COUNT(*),
+                COUNT(e.followup_done_at),
+                COUNT(e.escalation_created_at),
+                AVG(COALESCE(e.response_time_hours, 0)),
+                COUNT(e.followup_done_at) * 100.0 / COUNT(*),
+                %(uid)s, %(now)s, %(uid)s, %(now)s
+            FROM helpdesk_followup_event e
+            WHERE e.followup_created_date = ANY(%(dates)s)
+            GROUP BY e.followup_created_date, e.team_id, e.policy_id,
+                     e.assigned_user_id
+            ON CONFLICT ({KPI_CELL}) DO UPDATE
+               SET followup_created_count = EXCLUDED.followup_created_count,
+                   followup_done_count = EXCLUDED.followup_done_count,
+                   escalation_count = EXCLUDED.escalation_count,
+                   avg_response_time_hours = EXCLUDED.avg_response_time_hours,
+                   completion_rate = EXCLUDED.completion_rate,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+             WHERE (k.followup_created_count, k.followup_done_count,
+                    k.escalation_count, k.avg_response_time_hours)
+                   IS DISTINCT FROM
+                   (EXCLUDED.followup_created_count, EXCLUDED.followup_done_count,
+                    EXCLUDED.escalation_count, EXCLUDED.avg_response_time_hours)
+            """,
+            {"dates": list(dates), "uid": self.env.uid, "now": now},
+        )
+        # Cells whose events moved to another team / policy / user
+        cr.execute(
+            f"""
+            DELETE FROM {self._table} k
+             WHERE k.date = ANY(%(dates)s)
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM helpdesk_followup_event e
+                    WHERE e.followup_created_date = k.date
+                      AND e.team_id IS NOT DISTINCT FROM k.team_id
+                      AND e.policy_id IS NOT DISTINCT FROM k.policy_id
+                      AND e.assigned_user_id IS NOT DISTINCT FROM k.assigned_user_id
+               )
+            """,
+            {"dates": list(dates)},
+        )
+        self.invalidate_model()
+        self._bump_kpi_version()
@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.osv import expression
+
+CONVERSATION_WINDOW_PARAM = "helpdesk_mgmt.lineoa_conversation_window_hours"
+CONVERSATION_WINDOW_HOURS = 24
+
+
+class HelpdeskLineConversation(models.Model):
+    """Open LINE conversation: the ticket new messages of a LINE user go to
+
+    One row per (LINE user, LINE OA channel, team), kept by the ticket create
+    and write hooks while the ticket is open, so inbound messages are routed
+    with one lookup on conversation_key. Rows idle for longer than the
+    conversation window are ignored and purged by a cron.
+    """
+
+    _name = "helpdesk.line.conversation"
+    _description = "Helpdesk LINE Open Conversation"
+    _order = "last_message_at desc, id desc"
+
+    line_user_id = fields.Char(string="LINE User ID", required=True)
+    lineoa_channel_id = fields.Many2one(
+        comodel_name="helpdesk.lineoa.channel",
+        string="LINE OA Channel",
+        ondelete="cascade",
+    )
+    team_id = fields.Many2one(comodel_name="helpdesk.ticket.team", ondelete="cascade")
+    ticket_id = fields.Many2one(
+        comodel_name="helpdesk.ticket", required=True, index=True, ondelete="cascade"
+    )
+    conversation_key = fields.Char(
+        compute="_compute_conversation_key",
+        store=True,
+        precompute=True,
+    )
+    last_message_at = fields.Datetime(default=fields.Datetime.now, index=True)
+
+    _conversation_key_uniq = models.UniqueIndex(
+        "(conversation_key)",
+        "There is already an open conversation for this LINE user and team.",
+    )
+
+    @api.model
+    def _make_key(self, line_user_id, channel_id, team_id):
+        return f"{line_user_id}:{channel_id or 0}:{team_id or 0}"
+
+    @api.depends("line_user_id", "lineoa_channel_id", "team_id")
+    def _compute_conversation_key(self):
+        for conversation in self:
+            conversation.conversation_key = self._make_key(
+                conversation.line_user_id,
+                conversation.lineoa_channel_id.id,
+                conversation.team_id.id,
+            )
+
+    @api.model
+    def _window(self, channel):
+        """Idle time after which the next message starts a new ticket"""
+        hours = channel.conversation_window_hours or int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(CONVERSATION_WINDOW_PARAM, CONVERSATION_WINDOW_HOURS)
+        )
+        return timedelta(hours=hours)
+
+    @api.model
+    def _find_open(self, line_user_id, channel, team_id):
+        """Open conversation of the LINE user on channel and team, if any"""
+        if not line_user_id:
+            return self.browse()
+        key = self._make_key(line_user_id, channel.id, team_id)
+        since = fields.Datetime.now() - self._window(channel)
+        return self.search(
+            [("conversation_key", "=", key), ("last_message_at", ">=", since)],
+            limit=1,
+        )
+
+    @api.model
+    def _sync_tickets(self, tickets):
+        """Point the conversations of tickets at them while they are open
+
+        Conversations of closed, archived or re-keyed tickets are removed; an
+        open ticket takes over the conversation of its key.
+        """
+        targets = {}
+        for ticket in tickets.sorted("id"):
+            if ticket.active and ticket.x_line_user_id and not ticket.closed:
+                key = self._make_key(
+                    ticket.x_line_user_id,
+                    ticket.x_line_channel_id.id,
+                    ticket.team_id.id,
+                )
+                targets[key] = ticket
+        current = self.search([("ticket_id", "in", tickets.ids)])
+        current.filtered(
+            lambda c: targets.get(c.conversation_key) != c.ticket_id
+        ).unlink()
+        if not targets:
+            return
+        existing = {
+            conversation.conversation_key: conversation
+            for conversation in self.search(
+                [("conversation_key", "in", list(targets))]
+            )
+        }
+        now = fields.Datetime.now()
+        vals_list = []
+        for key, ticket in targets.items():
+            conversation = existing.get(key)
+            if not conversation:
+                vals_list.append(
+                    {
+                        "line_user_id": ticket.x_line_user_id,
+                        "lineoa_channel_id": ticket.x_line_channel_id.id,
+                        "team_id": ticket.team_id.id,
+                        "ticket_id": ticket.id,
+                        "last_message_at": now,
+                    }
+                )
+            elif conversation.ticket_id != ticket:
+                conversation.write({"ticket_id": ticket.id, "last_message_at": now})
+        self.create(vals_list)
+
+    @api.model
+    def _cron_expire_conversations(self):
+        """Drop the conversations idle for longer than their window"""
+        now = fields.Datetime.now()
+        channels = self.env["helpdesk.lineoa.channel"].with_context(
+            active_test=False
+        )
+        domain = expression.OR(
+            [
+                [
+                    ("lineoa_channel_id", "=", channel.id),
+                    ("last_message_at", "<", now - self._window(channel)),
+                ]
+                for channel in [channels] + list(channels.search([]))
+            ]
+        )
+        expired = self.search(domain)
+        expired.unlink()
+        return len(expired)
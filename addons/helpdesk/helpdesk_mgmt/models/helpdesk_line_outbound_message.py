@@ -0,0 +1,232 @@
+import logging
+import threading
+from datetime import timedelta
+
+import requests
+
+from odoo import api, fields, models, modules
+
+_logger = logging.getLogger(__name__)
+
+LINE_API_URL = "https://api.line.me"
+LINE_API_URL_PARAM = "helpdesk_mgmt.lineoa_api_url"
+LINE_API_TIMEOUT = 10
+# LINE accepts at most 500 recipients per multicast request
+MULTICAST_MAX_RECIPIENTS = 500
+# Queued messages sent per worker run
+OUTBOUND_BATCH_SIZE = 500
+OUTBOUND_MAX_ATTEMPTS = 6
+# Retry n waits OUTBOUND_RETRY_DELAY * 2 ** (n - 1), at most OUTBOUND_RETRY_MAX_DELAY
+OUTBOUND_RETRY_DELAY = timedelta(minutes=1)
+OUTBOUND_RETRY_MAX_DELAY = timedelta(hours=1)
+
+_line_session_local = threading.local()
+
+
+def line_session():
+    """HTTP session of the current worker thread
+
+    Keeps the connections to the LINE API alive between requests and cron runs
+    instead of opening a new TLS connection per message.
+    """
+    session = getattr(_line_session_local, "session", None)
+    if session is None:
+        session = _line_session_local.session = requests.Session()
+    return session
+
+
+class HelpdeskLineOutboundMessage(models.Model):
+    _name = "helpdesk.line.outbound.message"
+    _description = "Helpdesk LINE Outbound Message"
+    _order = "id desc"
+
+    ticket_id = fields.Many2one(
+        comodel_name="helpdesk.ticket", required=True, index=True, ondelete="cascade"
+    )
+    stage_id = fields.Many2one(comodel_name="helpdesk.ticket.stage")
+    lineoa_channel_id = fields.Many2one(
+        comodel_name="helpdesk.lineoa.channel", string="LINE OA Channel"
+    )
+    line_user_id = fields.Char(string="LINE User ID", required=True)
+    message_text = fields.Text(required=True)
+    state = fields.Selection(
+        selection=[
+            ("queued", "Queued"),
+            ("sent", "Sent"),
+            ("failed", "Failed"),
+        ],
+        default="queued",
+        required=True,
+        index=True,
+    )
+    attempt_count = fields.Integer(readonly=True)
+    next_attempt_at = fields.Datetime(default=fields.Datetime.now, index=True)
+    sent_at = fields.Datetime(readonly=True)
+    last_error = fields.Char(readonly=True)
+
+    @api.model
+    def _enqueue(self, vals_list):
+        """Queue LINE messages and wake up the sender"""
+        messages = self.create(vals_list)
+        tickets = messages.ticket_id.with_context(skip_stage_notify=True)
+        tickets.write({"x_line_delivery_state": "queued"})
+        for stage, stage_messages in messages.grouped("stage_id").items():
+            stage_messages.ticket_id.with_context(skip_stage_notify=True).write(
+                {"x_last_notified_stage_id_line": stage.id}
+            )
+        self.env.ref("helpdesk_mgmt.ir_cron_helpdesk_line_outbound")._trigger()
+        return messages
+
+    def _access_token(self):
+        self.ensure_one()
+        if self.lineoa_channel_id.channel_access_token:
+            return self.lineoa_channel_id.channel_access_token
+        return (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("helpdesk_mgmt.lineoa_channel_access_token")
+            or ""
+        )
+
+    @api.model
+    def _line_api_url(self):
+        icp = self.env["ir.config_parameter"].sudo()
+        return (icp.get_param(LINE_API_URL_PARAM) or LINE_API_URL).rstrip("/")
+
+    @api.model
+    def _post_line_api(self, path, access_token, payload):
+        """POST to the LINE messaging API
+
+        Returns (status, error, retry_after); status is None when the request
+        did not get an answer.
+        """
+        try:
+            response = line_session().post(
+                f"{self._line_api_url()}{path}",
+                headers={"Authorization": f"Bearer {access_token}"},
+                json=payload,
+                timeout=LINE_API_TIMEOUT,
+            )
+        except requests.RequestException as exc:
+            return None, str(exc)[:200], None
+        if response.status_code < 300:
+            return response.status_code, None, None
+        retry_after = response.headers.get("Retry-After")
+        return (
+            response.status_code,
+            f"HTTP {response.status_code}: {response.text[:200]}",
+            int(retry_after) if retry_after and retry_after.isdigit() else None,
+        )
+
+    def _send_group(self, access_token, message_text):
+        """Send messages sharing token and text, one multicast per 500 recipients
+
+        Returns [(messages, status, error, retry_after)].
+        """
+        recipients = list(dict.fromkeys(self.mapped("line_user_id")))
+        messages = [{"type": "text", "text": message_text}]
+        outcomes = []
+        for start in range(0, len(recipients), MULTICAST_MAX_RECIPIENTS):
+            chunk = recipients[start : start + MULTICAST_MAX_RECIPIENTS]
+            if len(chunk) == 1:
+                path, payload = "/v2/bot/message/push", {"to": chunk[0]}
+            else:
+                path, payload = "/v2/bot/message/multicast", {"to": chunk}
+            payload["messages"] = messages
+            status, error, retry_after = self._post_line_api(
+                path, access_token, payload
+            )
+            chunk_messages = self.filtered(lambda m, c=set(chunk): m.line_user_id in c)
+            outcomes.append((chunk_messages, status, error, retry_after))
+        return outcomes
+
+    def _retry_delay(self, retry_after):
+        self.ensure_one()
+        delay = min(
+            OUTBOUND_RETRY_DELAY * 2 ** (self.attempt_count - 1),
+            OUTBOUND_RETRY_MAX_DELAY,
+        )
+        if retry_after:
+            delay = max(delay, timedelta(seconds=retry_after))
+        return delay
+
+    def _record_outcome(self, status, error, retry_after, now):
+        """Mark the messages sent, schedule a retry or give up"""
+        for attempt_count, messages in self.grouped("attempt_count").items():
+            messages.write({"attempt_count": attempt_count + 1})
+        if not error:
+            self.write({"state": "sent", "sent_at": now, "last_error": False})
+            return
+        retryable = status is None or status == 429 or status >= 500
+        failed = self.filtered(
+            lambda m: not retryable or m.attempt_count >= OUTBOUND_MAX_ATTEMPTS
+        )
+        failed.write({"state": "failed", "last_error": error})
+        for message in self - failed:
+            message.write(
+                {
+                    "next_attempt_at": now + message._retry_delay(retry_after),
+                    "last_error": error,
+                }
+            )
+        if failed:
+            _logger.warning(
+                "LINE delivery failed for %s message(s): %s", len(failed), error
+            )
+
+    def _update_ticket_delivery(self, now):
+        """Reflect the outcome of the latest message of each ticket on it"""
+        done = self.filtered(lambda m: m.state != "queued")
+        for ticket, messages in done.grouped("ticket_id").items():
+            latest = messages.sorted("id")[-1]
+            if ticket.x_line_outbound_message_ids[:1] != latest:
+                continue
+            vals = {"x_line_delivery_state": latest.state}
+            if latest.state == "sent":
+                vals["x_line_delivered_at"] = now
+            elif ticket.x_last_notified_stage_id_line == latest.stage_id:
+                # Let the next move to this stage notify the customer again
+                vals["x_last_notified_stage_id_line"] = False
+            ticket.with_context(skip_stage_notify=True).write(vals)
+            if latest.state == "failed":
+                ticket._post_system_note("LINE notification failed to send.")
+
+    def _commit_batch(self):
+        """Commit delivered messages so they are not sent twice after a crash"""
+        if not modules.module.current_test:
+            self.env.cr.commit()
+
+    @api.model
+    def _cron_send_queued(self, batch_size=OUTBOUND_BATCH_SIZE):
+        """Send the due queued messages, grouped by access token and text"""
+        now = fields.Datetime.now()
+        messages = self.search(
+            [("state", "=", "queued"), ("next_attempt_at", "<=", now)],
+            order="next_attempt_at, id",
+            limit=batch_size,
+        )
+        groups = messages.grouped(lambda m: (m._access_token(), m.message_text))
+        for (access_token, message_text), group in groups.items():
+            if not access_token:
+                group.write(
+                    {
+                        "state": "failed",
+                        "attempt_count": 1,
+                        "last_error": "Access token missing.",
+                    }
+                )
+            else:
+                for outcome in group._send_group(access_token, message_text):
+                    outcome[0]._record_outcome(*outcome[1:], now)
+            group._update_ticket_delivery(now)
+            group._commit_batch()
+        cron = self.env.ref("helpdesk_mgmt.ir_cron_helpdesk_line_outbound")
+        if len(messages) == batch_size:
+            cron._trigger()
+        else:
+            retry = self.search(
+                [("state", "=", "queued")], order="next_attempt_at", limit=1
+            )
+            if retry.next_attempt_at:
+                cron._trigger(at=retry.next_attempt_at)
+        return len(messages)
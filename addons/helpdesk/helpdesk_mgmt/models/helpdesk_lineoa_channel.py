@@ -10,6 +10,13 @@ class HelpdeskLineOAChannel(models.Model):
     active = fields.Boolean(default=True)
     channel_secret = fields.Char(string="Channel Secret", required=True)
     channel_access_token = fields.Char(string="Channel Access Token")
+    bot_user_id = fields.Char(
+        string="Bot User ID",
+        index=True,
+        copy=False,
+        help="Destination of the webhook requests sent to this channel. Learned "
+        "from the first verified request when empty.",
+    )
     helpdesk_team_id = fields.Many2one(
         comodel_name="helpdesk.ticket.team",
         string="Helpdesk Team",
@@ -27,3 +34,12 @@ class HelpdeskLineOAChannel(models.Model):
         string="Match Mode",
         default="by_phone_or_email_in_message",
     )
+    conversation_window_hours = fields.Integer(
+        string="Conversation Window (hours)",
+        help="Messages received within this idle time are added to the open "
+        "ticket of the LINE user. Leave empty to use the general setting.",
+    )
+
+    _bot_user_uniq = models.UniqueIndex(
+        "(bot_user_id)", "Another LINE OA channel already uses this bot user ID."
+    )
@@ -1,8 +1,8 @@
 import logging
-
-import requests
+from datetime import timedelta
 
 from odoo import api, fields, models, tools
+from odoo.osv import expression
 from odoo.tools import html2plaintext
 from odoo.exceptions import AccessError
 
@@ -154,19 +154,26 @@ class HelpdeskTicket(models.Model):
             vals["name"] = self._format_ticket_name(product, short_description)
         return super().create(vals_list)
 
-    @api.depends("create_date")
+    # SLA clock: stage transitions store deadlines, status is "deadline <= now"
+    SLA_WARNING_RATIO = 0.7
+    NO_UPDATE_HOURS = 48.0
+    # Fields keying a ticket's open LINE conversation or closing it
+    LINE_CONVERSATION_FIELDS = {
+        "stage_id",
+        "team_id",
+        "active",
+        "x_line_user_id",
+        "x_line_channel_id",
+    }
+
     def _compute_total_days(self):
         now = fields.Datetime.now()
         for ticket in self:
             if ticket.create_date:
-                start = fields.Datetime.context_timestamp(ticket, ticket.create_date)
-                end = fields.Datetime.context_timestamp(ticket, now)
-                delta = end - start
-                ticket.x_total_days = max(0, delta.days)
+                ticket.x_total_days = max(0, (now - ticket.create_date).days)
             else:
                 ticket.x_total_days = 0
 
-    @api.depends("x_stage_entered_at", "last_stage_update", "create_date")
     def _compute_stage_hours(self):
         now = fields.Datetime.now()
         for ticket in self:
@@ -176,27 +183,60 @@ class HelpdeskTicket(models.Model):
                 or ticket.create_date
             )
             if entered_at:
-                start = fields.Datetime.context_timestamp(ticket, entered_at)
-                end = fields.Datetime.context_timestamp(ticket, now)
-                delta = end - start
+                delta = now - entered_at
                 ticket.x_stage_hours = max(0.0, delta.total_seconds() / 3600.0)
             else:
                 ticket.x_stage_hours = 0.0
 
-    @api.depends("x_stage_hours", "stage_id.x_sla_hours")
-    def _compute_sla_status(self):
+    @api.depends(
+        "x_stage_entered_at", "last_stage_update", "create_date", "stage_id.x_sla_hours"
+    )
+    def _compute_sla_deadlines(self):
         for ticket in self:
             sla_hours = ticket.stage_id.x_sla_hours or 0.0
-            if sla_hours <= 0:
-                ticket.x_sla_status = "safe"
+            entered_at = (
+                ticket.x_stage_entered_at
+                or ticket.last_stage_update
+                or ticket.create_date
+            )
+            if sla_hours <= 0 or not entered_at:
+                ticket.x_sla_warning_at = False
+                ticket.x_sla_deadline_at = False
                 continue
-            ratio = ticket.x_stage_hours / sla_hours
-            if ratio < 0.7:
-                ticket.x_sla_status = "safe"
-            elif ratio < 1:
+            ticket.x_sla_warning_at = entered_at + timedelta(
+                hours=sla_hours * self.SLA_WARNING_RATIO
+            )
+            ticket.x_sla_deadline_at = entered_at + timedelta(hours=sla_hours)
+
+    def _compute_sla_status(self):
+        now = fields.Datetime.now()
+        for ticket in self:
+            if ticket.x_sla_deadline_at and ticket.x_sla_deadline_at <= now:
+                ticket.x_sla_status = "danger"
+            elif ticket.x_sla_warning_at and ticket.x_sla_warning_at <= now:
                 ticket.x_sla_status = "warning"
             else:
-                ticket.x_sla_status = "danger"
+                ticket.x_sla_status = "safe"
+
+    def _search_sla_status(self, operator, value):
+        if operator not in ("=", "!=", "in", "not in"):
+            return NotImplemented
+        statuses = {value} if isinstance(value, str) or not value else set(value)
+        if operator in ("!=", "not in"):
+            statuses = {"safe", "warning", "danger"} - statuses
+        now = fields.Datetime.now()
+        domains = []
+        if "safe" in statuses:
+            domains.append(
+                ["|", ("x_sla_warning_at", "=", False), ("x_sla_warning_at", ">", now)]
+            )
+        if "warning" in statuses:
+            domains.append(
+                [("x_sla_warning_at", "<=", now), ("x_sla_deadline_at", ">", now)]
+            )
+        if "danger" in statuses:
+            domains.append([("x_sla_deadline_at", "<=", now)])
+        return expression.OR(domains) if domains else expression.FALSE_DOMAIN
 
     @api.depends("partner_id", "partner_id.phone")
     def _compute_contact_phone(self):
@@ -209,17 +249,34 @@ class HelpdeskTicket(models.Model):
                 ticket.x_contact_phone = False
 
     @api.depends("x_last_update_at", "create_date")
+    def _compute_no_update_deadline(self):
+        for ticket in self:
+            last = ticket.x_last_update_at or ticket.create_date
+            ticket.x_no_update_deadline_at = (
+                last + timedelta(hours=self.NO_UPDATE_HOURS) if last else False
+            )
+
     def _compute_no_update_warning(self):
         now = fields.Datetime.now()
         for ticket in self:
-            last = ticket.x_last_update_at or ticket.create_date
-            if last:
-                start = fields.Datetime.context_timestamp(ticket, last)
-                end = fields.Datetime.context_timestamp(ticket, now)
-                hours = max(0.0, (end - start).total_seconds() / 3600.0)
-                ticket.x_no_update_warning = hours >= 48.0
-            else:
-                ticket.x_no_update_warning = False
+            deadline = ticket.x_no_update_deadline_at
+            ticket.x_no_update_warning = bool(deadline and deadline <= now)
+
+    def _search_no_update_warning(self, operator, value):
+        if operator not in ("=", "!=", "in", "not in"):
+            return NotImplemented
+        if operator in ("in", "not in"):
+            value = True in value
+            operator = "=" if operator == "in" else "!="
+        positive = bool(value) == (operator == "=")
+        now = fields.Datetime.now()
+        if positive:
+            return [("x_no_update_deadline_at", "<=", now)]
+        return [
+            "|",
+            ("x_no_update_deadline_at", "=", False),
+            ("x_no_update_deadline_at", ">", now),
+        ]
 
     number = fields.Char(string="Ticket number", default="/", readonly=True)
     name = fields.Char(string="Title", required=True)
@@ -257,11 +314,23 @@ class HelpdeskTicket(models.Model):
         index=True,
         domain="['|',('team_ids', '=', team_id),('team_ids','=',False)]",
     )
-    x_total_days = fields.Integer(
-        string="Total Days", compute="_compute_total_days", store=True
-    )
+    x_total_days = fields.Integer(string="Total Days", compute="_compute_total_days")
     x_stage_entered_at = fields.Datetime(string="Stage Entered At", store=True)
     x_stage_hours = fields.Float(string="Stage Hours", compute="_compute_stage_hours")
+    x_sla_warning_at = fields.Datetime(
+        string="SLA Warning At",
+        compute="_compute_sla_deadlines",
+        store=True,
+        index=True,
+        help="Moment the ticket reaches 70% of its stage SLA hours.",
+    )
+    x_sla_deadline_at = fields.Datetime(
+        string="SLA Deadline",
+        compute="_compute_sla_deadlines",
+        store=True,
+        index=True,
+        help="Moment the ticket breaches its stage SLA hours.",
+    )
     x_sla_status = fields.Selection(
         selection=[
             ("safe", "Safe"),
@@ -270,9 +339,18 @@ class HelpdeskTicket(models.Model):
         ],
         string="SLA Status",
         compute="_compute_sla_status",
+        search="_search_sla_status",
+    )
+    x_no_update_deadline_at = fields.Datetime(
+        string="No Update Deadline",
+        compute="_compute_no_update_deadline",
+        store=True,
+        index=True,
     )
     x_no_update_warning = fields.Boolean(
-        string="No Update > 48h", compute="_compute_no_update_warning"
+        string="No Update > 48h",
+        compute="_compute_no_update_warning",
+        search="_search_no_update_warning",
     )
     x_last_update_at = fields.Datetime(string="Last Update At", copy=False)
     x_last_notified_stage_id_email = fields.Many2one(
@@ -281,6 +359,25 @@ class HelpdeskTicket(models.Model):
     x_last_notified_stage_id_line = fields.Many2one(
         comodel_name="helpdesk.ticket.stage", string="Last Notified Stage (LINE)"
     )
+    x_line_delivery_state = fields.Selection(
+        selection=[
+            ("queued", "Queued"),
+            ("sent", "Sent"),
+            ("failed", "Failed"),
+        ],
+        string="LINE Delivery",
+        readonly=True,
+        copy=False,
+    )
+    x_line_delivered_at = fields.Datetime(
+        string="LINE Delivered At", readonly=True, copy=False
+    )
+    x_line_outbound_message_ids = fields.One2many(
+        comodel_name="helpdesk.line.outbound.message",
+        inverse_name="ticket_id",
+        string="LINE Messages",
+        readonly=True,
+    )
     partner_id = fields.Many2one(comodel_name="res.partner", string="Contact")
     x_contact_email = fields.Char(
         string="Contact Email", related="partner_id.email", store=True, readonly=True
@@ -526,6 +623,9 @@ class HelpdeskTicket(models.Model):
             records.with_context(
                 skip_assignment_email=True, skip_assignment_sync=True
             )._sync_assigned_users()
+        line_tickets = records.filtered("x_line_user_id")
+        if line_tickets:
+            self.env["helpdesk.line.conversation"].sudo()._sync_tickets(line_tickets)
         return records
 
     def copy(self, default=None):
@@ -584,6 +684,8 @@ class HelpdeskTicket(models.Model):
             self._handle_stage_change_notifications(old_stage_ids)
         if stage_changed and not self.env.context.get("skip_followup"):
             self._handle_followup_policies(old_stage_ids)
+        if self.LINE_CONVERSATION_FIELDS.intersection(vals):
+            self.env["helpdesk.line.conversation"].sudo()._sync_tickets(self)
         return res
 
     def message_post(self, **kwargs):
@@ -668,12 +770,15 @@ class HelpdeskTicket(models.Model):
             ).send_mail(ticket.id, force_send=True, email_values=email_values, raise_exception=False)
 
     def _handle_stage_change_notifications(self, old_stage_ids):
+        line_messages = []
         for ticket in self:
             if not ticket.stage_id:
                 continue
             if old_stage_ids.get(ticket.id) == ticket.stage_id.id:
                 continue
-            ticket._notify_customer_stage_change()
+            line_messages += ticket._notify_customer_stage_change()
+        if line_messages:
+            self.env["helpdesk.line.outbound.message"].sudo()._enqueue(line_messages)
 
     def _handle_followup_policies(self, old_stage_ids):
         Policy = self.env["helpdesk.followup.policy"].sudo()
@@ -714,13 +819,17 @@ class HelpdeskTicket(models.Model):
                 )
 
     def _notify_customer_stage_change(self):
+        """Send the stage email; return the LINE messages to queue"""
         stage = self.stage_id
         if not stage:
-            return
+            return []
         if stage.x_notify_customer_email and self._helpdesk_email_enabled():
             self._send_stage_email(stage)
         if stage.x_notify_customer_line and self._lineoa_enabled():
-            self._send_stage_line_message(stage)
+            line_message = self._prepare_stage_line_message(stage)
+            if line_message:
+                return [line_message]
+        return []
 
     def _helpdesk_email_enabled(self):
         return bool(
@@ -804,50 +913,34 @@ class HelpdeskTicket(models.Model):
             message = message.replace("{" + key + "}", str(val or ""))
         return message
 
-    def _send_stage_line_message(self, stage):
+    def _prepare_stage_line_message(self, stage):
+        """Values of the queued LINE message announcing stage, if it can be sent
+
+        Messages are delivered by the helpdesk.line.outbound.message worker so
+        stage changes never wait on the LINE API.
+        """
         if self.x_last_notified_stage_id_line == stage:
-            return
+            return False
         partner = self.partner_id
         line_user_id = self._lineoa_user_id()
         if not partner or not line_user_id:
             self._post_system_note("LINE notification skipped: LINE user ID missing.")
-            return
+            return False
         if not stage.x_line_message_template:
             self._post_system_note("LINE notification skipped: no LINE template set.")
-            return
-        access_token = self._lineoa_access_token()
-        if not access_token:
+            return False
+        if not self._lineoa_access_token():
             self._post_system_note("LINE notification skipped: access token missing.")
-            return
-        message_text = self._render_line_message(stage.x_line_message_template, stage)
-        try:
-            response = requests.post(
-                "https://api.line.me/v2/bot/message/push",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "to": line_user_id,
-                    "messages": [{"type": "text", "text": message_text}],
-                },
-                timeout=5,
-            )
-            if response.status_code >= 300:
-                _logger.warning(
-                    "LINE push failed for ticket %s: status=%s",
-                    self.id,
-                    response.status_code,
-                )
-                self._post_system_note("LINE notification failed to send.")
-                return
-        except Exception as exc:
-            _logger.warning("Failed to push LINE message for ticket %s: %s", self.id, exc)
-            self._post_system_note("LINE notification failed to send.")
-            return
-        self.with_context(skip_stage_notify=True).write(
-            {"x_last_notified_stage_id_line": stage.id}
-        )
+            return False
+        return {
+            "ticket_id": self.id,
+            "stage_id": stage.id,
+            "lineoa_channel_id": self.x_line_channel_id.id,
+            "line_user_id": line_user_id,
+            "message_text": self._render_line_message(
+                stage.x_line_message_template, stage
+            ),
+        }
 
     # ---------------------------------------------------
     # Mail gateway
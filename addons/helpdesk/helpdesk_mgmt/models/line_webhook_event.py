@@ -1,4 +1,26 @@
-from odoo import fields, models
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from odoo import api, fields, models
+from odoo.osv import expression
+
+from .helpdesk_line_outbound_message import line_session
+
+_logger = logging.getLogger(__name__)
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"\+?\d[\d\-\s]{6,}\d")
+# Webhook events processed per worker run
+WEBHOOK_BATCH_SIZE = 200
+WEBHOOK_MAX_ATTEMPTS = 5
+# Retry n waits WEBHOOK_RETRY_DELAY * 2 ** (n - 1)
+WEBHOOK_RETRY_DELAY = timedelta(minutes=1)
+# LINE profiles stored on partners are refetched after this delay
+PROFILE_CACHE_TTL = timedelta(days=7)
 
 
 class LineWebhookEvent(models.Model):
@@ -7,6 +29,8 @@ class LineWebhookEvent(models.Model):
     _order = "received_at desc, id desc"
 
     received_at = fields.Datetime(default=fields.Datetime.now, required=True)
+    webhook_event_id = fields.Char(string="Webhook Event ID", readonly=True)
+    event_type = fields.Char(readonly=True)
     line_user_id = fields.Char(string="LINE User ID")
     message_text = fields.Text(string="Message Text")
     lineoa_channel_id = fields.Many2one(
@@ -21,5 +45,358 @@ class LineWebhookEvent(models.Model):
     created_ticket_id = fields.Many2one(
         comodel_name="helpdesk.ticket", string="Created Ticket"
     )
-    processed = fields.Boolean(default=False)
+    processed = fields.Boolean(default=False, index=True)
+    attempt_count = fields.Integer(readonly=True)
+    # Cleared once the event is processed or given up on
+    next_attempt_at = fields.Datetime(default=fields.Datetime.now, index=True)
+    error_message = fields.Char(readonly=True)
     payload_snippet = fields.Text(string="Payload Snippet")
+    event_payload = fields.Text(readonly=True)
+
+    _webhook_event_uniq = models.UniqueIndex(
+        "(webhook_event_id)", "This LINE webhook event was already received."
+    )
+
+    @api.model
+    def _enqueue_webhook_events(self, events, channel=None):
+        """Store the events of a verified webhook request for the worker
+
+        Events redelivered by LINE (same webhookEventId) are stored once.
+        """
+        event_ids = [event.get("webhookEventId") for event in events]
+        received = set(
+            self.search(
+                [("webhook_event_id", "in", [eid for eid in event_ids if eid])]
+            ).mapped("webhook_event_id")
+        )
+        now = fields.Datetime.now()
+        vals_list = []
+        for event_id, event in zip(event_ids, events):
+            if event_id and event_id in received:
+                continue
+            received.add(event_id)
+            message = event.get("message") or {}
+            payload = json.dumps(event, ensure_ascii=False)
+            vals_list.append(
+                {
+                    "received_at": now,
+                    "webhook_event_id": event_id or False,
+                    "event_type": event.get("type"),
+                    "lineoa_channel_id": channel.id if channel else False,
+                    "line_user_id": (event.get("source") or {}).get("userId"),
+                    "message_text": message.get("text")
+                    if message.get("type") == "text"
+                    else False,
+                    "processed": False,
+                    "payload_snippet": payload[:1000],
+                    "event_payload": payload,
+                }
+            )
+        records = self.create(vals_list)
+        if records:
+            self.env.ref("helpdesk_mgmt.ir_cron_helpdesk_line_webhook")._trigger()
+        return records
+
+    @api.model
+    def _cron_process_events(self, batch_size=WEBHOOK_BATCH_SIZE):
+        """Process the due webhook events, oldest first
+
+        An event that fails stays unprocessed and is retried with an
+        exponential delay; after WEBHOOK_MAX_ATTEMPTS it is given up on and
+        keeps its last error.
+        """
+        now = fields.Datetime.now()
+        events = self.search(
+            [
+                ("processed", "=", False),
+                ("event_payload", "!=", False),
+                ("next_attempt_at", "<=", now),
+            ],
+            order="id",
+            limit=batch_size,
+        )
+        profiles = {}
+        for event in events:
+            attempt_count = event.attempt_count + 1
+            try:
+                with self.env.cr.savepoint():
+                    event._process_event(profiles)
+            except Exception as exc:
+                gave_up = attempt_count >= WEBHOOK_MAX_ATTEMPTS
+                _logger.exception(
+                    "Failed to process LINE webhook event %s (attempt %s%s)",
+                    event.id,
+                    attempt_count,
+                    ", giving up" if gave_up else "",
+                )
+                event.write(
+                    {
+                        "attempt_count": attempt_count,
+                        "next_attempt_at": False
+                        if gave_up
+                        else now + WEBHOOK_RETRY_DELAY * 2 ** (attempt_count - 1),
+                        "error_message": str(exc)[:200],
+                    }
+                )
+            else:
+                event.write(
+                    {
+                        "attempt_count": attempt_count,
+                        "next_attempt_at": False,
+                        "error_message": False,
+                    }
+                )
+        cron = self.env.ref("helpdesk_mgmt.ir_cron_helpdesk_line_webhook")
+        if len(events) == batch_size:
+            cron._trigger()
+        else:
+            retry = self.search(
+                [("processed", "=", False), ("next_attempt_at", "!=", False)],
+                order="next_attempt_at",
+                limit=1,
+            )
+            if retry:
+                cron._trigger(at=retry.next_attempt_at)
+        return len(events)
+
+    def _process_event(self, profiles):
+        self.ensure_one()
+        event = json.loads(self.event_payload)
+        message = event.get("message") or {}
+        if event.get("type") != "message" or message.get("type") != "text":
+            self.processed = True
+            return
+
+        icp = self.env["ir.config_parameter"].sudo()
+        channel = self.lineoa_channel_id
+        line_user_id = self.line_user_id
+        message_text = self.message_text or ""
+        timestamp_ms = event.get("timestamp")
+        timestamp = None
+        if timestamp_ms:
+            timestamp = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+        match_mode = channel.match_mode or icp.get_param(
+            "helpdesk_mgmt.lineoa_match_mode", "by_phone_or_email_in_message"
+        )
+        partner, matched_partner, created_partner, conflict = self._map_partner(
+            line_user_id,
+            message_text,
+            self._line_profile_values(line_user_id, profiles),
+            match_mode,
+        )
+
+        created_ticket = None
+        create_ticket = (
+            channel.create_ticket
+            if channel
+            else icp.get_param("helpdesk_mgmt.lineoa_create_ticket", "True") == "True"
+        )
+        if create_ticket:
+            created_ticket = self._create_or_update_ticket(
+                partner, line_user_id, message_text, timestamp
+            )
+
+        self.write(
+            {
+                "matched_partner_id": matched_partner.id if matched_partner else False,
+                "created_partner_id": created_partner.id if created_partner else False,
+                "created_ticket_id": created_ticket.id if created_ticket else False,
+                "processed": True,
+            }
+        )
+
+        if conflict and matched_partner:
+            matched_partner.message_post(
+                body="LINE user ID mismatch detected for this contact.",
+                subtype_xmlid="mail.mt_note",
+            )
+
+    def _line_profile_values(self, line_user_id, profiles):
+        """Partner values of the LINE profile of line_user_id
+
+        The display name is only fetched from LINE when no partner got it
+        within PROFILE_CACHE_TTL, and once per user in a worker run. Returns
+        an empty dict when the partner already holds a fresh profile.
+        """
+        if not line_user_id:
+            return {}
+        if line_user_id in profiles:
+            return profiles[line_user_id]
+        vals = {}
+        fresh = self.env["res.partner"].sudo().search_count(
+            [
+                ("x_line_user_id", "=", line_user_id),
+                (
+                    "x_line_profile_fetched_at",
+                    ">=",
+                    fields.Datetime.now() - PROFILE_CACHE_TTL,
+                ),
+            ],
+            limit=1,
+        )
+        access_token = self._access_token()
+        if not fresh and access_token:
+            display_name = self._fetch_line_profile(line_user_id, access_token)
+            if display_name:
+                vals = {
+                    "x_line_display_name": display_name,
+                    "x_line_profile_fetched_at": fields.Datetime.now(),
+                }
+        profiles[line_user_id] = vals
+        return vals
+
+    def _access_token(self):
+        self.ensure_one()
+        if self.lineoa_channel_id:
+            return self.lineoa_channel_id.channel_access_token or ""
+        return (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("helpdesk_mgmt.lineoa_channel_access_token")
+            or ""
+        )
+
+    def _fetch_line_profile(self, line_user_id, access_token):
+        api_url = self.env["helpdesk.line.outbound.message"]._line_api_url()
+        try:
+            response = line_session().get(
+                f"{api_url}/v2/bot/profile/{line_user_id}",
+                headers={"Authorization": f"Bearer {access_token}"},
+                timeout=3,
+            )
+            if response.status_code >= 300:
+                return None
+            data = response.json()
+            return data.get("displayName")
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _map_partner(self, line_user_id, message_text, profile_vals, match_mode):
+        Partner = self.env["res.partner"].sudo()
+
+        conflict = False
+        matched_partner = None
+        created_partner = None
+
+        partner = False
+        if line_user_id:
+            partner = Partner.search([("x_line_user_id", "=", line_user_id)], limit=1)
+
+        if not partner and match_mode == "by_phone_or_email_in_message":
+            email = self._extract_email(message_text)
+            phone_variants = self._extract_phone_variants(message_text)
+            domain = []
+            if email:
+                domain = expression.OR([domain, [("email", "=ilike", email)]])
+            if phone_variants:
+                phone_domain = []
+                for variant in phone_variants:
+                    phone_domain = expression.OR(
+                        [
+                            phone_domain,
+                            [
+                                "|",
+                                ("phone", "ilike", variant),
+                                ("mobile", "ilike", variant),
+                            ],
+                        ]
+                    )
+                domain = expression.OR([domain, phone_domain])
+            if domain:
+                partner = Partner.search(domain, limit=1)
+
+        if partner:
+            matched_partner = partner
+            vals = dict(profile_vals, x_line_last_seen=fields.Datetime.now())
+            if line_user_id:
+                if not partner.x_line_user_id or partner.x_line_user_id == line_user_id:
+                    vals["x_line_user_id"] = line_user_id
+                else:
+                    conflict = True
+            partner.write(vals)
+            return partner, matched_partner, created_partner, conflict
+
+        display_name = profile_vals.get("x_line_display_name")
+        vals = dict(
+            profile_vals,
+            name=display_name or "LINE Customer",
+            x_line_user_id=line_user_id,
+            x_line_last_seen=fields.Datetime.now(),
+        )
+        created_partner = Partner.create(vals)
+        return created_partner, matched_partner, created_partner, conflict
+
+    def _create_or_update_ticket(self, partner, line_user_id, message_text, timestamp):
+        self.ensure_one()
+        env = self.env
+        icp = env["ir.config_parameter"].sudo()
+        Ticket = env["helpdesk.ticket"].sudo()
+        channel = self.lineoa_channel_id
+
+        team_id = channel.helpdesk_team_id.id or icp.get_param(
+            "helpdesk_mgmt.lineoa_helpdesk_team_id"
+        )
+        stage_id = channel.default_stage_id.id or icp.get_param(
+            "helpdesk_mgmt.lineoa_default_stage_id"
+        )
+        team_id = int(team_id) if team_id else False
+        stage_id = int(stage_id) if stage_id else False
+
+        conversation = env["helpdesk.line.conversation"].sudo()._find_open(
+            line_user_id, channel, team_id
+        )
+        if conversation:
+            conversation.last_message_at = fields.Datetime.now()
+            existing = conversation.ticket_id.sudo()
+            existing.message_post(
+                body=f"New LINE message received:\n{message_text}",
+                subtype_xmlid="mail.mt_note",
+            )
+            return existing
+
+        if not stage_id and team_id:
+            team = env["helpdesk.ticket.team"].browse(team_id)
+            stage_id = team._get_applicable_stages()[:1].id
+
+        ticket_channel = env.ref("helpdesk_mgmt.helpdesk_ticket_channel_other", False)
+        if not ticket_channel:
+            ticket_channel = env["helpdesk.ticket.channel"].search([], limit=1)
+
+        ts_text = timestamp.isoformat() if timestamp else ""
+        description = (
+            f"LINE message:\n{message_text}\n\n"
+            f"LINE userId: {line_user_id}\n"
+            f"Timestamp: {ts_text}"
+        )
+        vals = {
+            "name": f"LINE: {message_text[:60]}",
+            "description": description,
+            "partner_id": partner.id,
+            "team_id": team_id,
+            "stage_id": stage_id,
+            "channel_id": ticket_channel.id,
+            "purchase_order_number": env._("N/A"),
+            "x_line_channel_id": channel.id,
+            "x_line_user_id": line_user_id,
+        }
+        return Ticket.create(vals)
+
+    def _extract_email(self, text):
+        match = EMAIL_RE.search(text or "")
+        return match.group(0) if match else None
+
+    def _extract_phone_variants(self, text):
+        match = PHONE_RE.search(text or "")
+        if not match:
+            return []
+        raw = match.group(0)
+        digits = re.sub(r"\D", "", raw)
+        if not digits:
+            return []
+        variants = {digits}
+        if digits.startswith("66") and len(digits) > 2:
+            variants.add("0" + digits[2:])
+        if digits.startswith("0") and len(digits) > 1:
+            variants.add("66" + digits[1:])
+        return list(variants)
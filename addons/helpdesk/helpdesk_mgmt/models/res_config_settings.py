@@ -84,6 +84,11 @@ class ResConfigSettings(models.TransientModel):
         config_parameter="helpdesk_mgmt.lineoa_match_mode",
         default="by_phone_or_email_in_message",
     )
+    lineoa_conversation_window_hours = fields.Integer(
+        string="LINE Conversation Window (hours)",
+        config_parameter="helpdesk_mgmt.lineoa_conversation_window_hours",
+        default=24,
+    )
     helpdesk_email_enabled = fields.Boolean(
         string="Enable Customer Email",
         config_parameter="helpdesk_mgmt.helpdesk_email_enabled",
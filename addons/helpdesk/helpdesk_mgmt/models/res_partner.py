@@ -7,6 +7,7 @@ class ResPartner(models.Model):
     x_line_user_id = fields.Char(string="LINE User ID", index=True)
     x_line_display_name = fields.Char(string="LINE Display Name")
     x_line_last_seen = fields.Datetime(string="LINE Last Seen")
+    x_line_profile_fetched_at = fields.Datetime(string="LINE Profile Fetched At")
 
     helpdesk_ticket_ids = fields.One2many(
         comodel_name="helpdesk.ticket",
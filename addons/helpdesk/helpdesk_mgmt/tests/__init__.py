@@ -5,3 +5,5 @@ from . import test_helpdesk_fetchmail
 from . import test_res_partner
 from . import test_helpdesk_category_hierarchy
 from . import test_js
+from . import test_helpdesk_followup
+from . import test_helpdesk_line
@@ -0,0 +1,72 @@
+"""Local stand-in for the LINE messaging API
+
+Records the requests it receives and answers them with the queued status codes
+(200 once the queue is empty), so the outbound queue and profile lookups can be
+exercised without reaching api.line.me. Can also be run standalone and set as the
+helpdesk_mgmt.lineoa_api_url system parameter of a staging database:
+
+    python3 line_api_stub.py --port 8766
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LineApiStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, body, result):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, body))
+            status = server.statuses.pop(0) if server.statuses else 200
+        payload = json.dumps(result if status < 300 else {"message": "stub error"})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload.encode("utf-8"))
+
+    def do_GET(self):
+        # Only /v2/bot/profile/<userId> is served
+        user_id = self.path.rsplit("/", 1)[-1]
+        self._answer({}, {"userId": user_id, "displayName": f"Stub {user_id}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self._answer(json.loads(self.rfile.read(length) or b"{}"), {})
+
+
+class LineApiStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0):
+        super().__init__(("127.0.0.1", port), LineApiStubHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.statuses = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    stub = LineApiStub(parser.parse_args().port)
+    print(f"LINE API stub listening on {stub.url}")
+    stub.serve_forever()
@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+from odoo import fields
+
+from .common import TestHelpdeskTicketBase
+
+
+class TestHelpdeskFollowup(TestHelpdeskTicketBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Event = cls.env["helpdesk.followup.event"]
+        cls.Kpi = cls.env["helpdesk.followup.kpi.daily"]
+        cls.policy = cls.env["helpdesk.followup.policy"].create(
+            {
+                "name": "Follow-up",
+                "trigger_stage_id": cls.new_stage.id,
+                "activity_type_id": cls.env.ref("mail.mail_activity_data_todo").id,
+                "wait_days": 0,
+                "due_days": 1,
+            }
+        )
+
+    def _create_event(self, ticket, **vals):
+        now = fields.Datetime.now()
+        return self.Event.create(
+            dict(
+                {
+                    "ticket_id": ticket.id,
+                    "policy_id": self.policy.id,
+                    "trigger_at": now,
+                    "followup_created_at": now,
+                    "assigned_user_id": self.user.id,
+                    "state": "done",
+                },
+                **vals,
+            )
+        )
+
+    def _kpi_cells(self):
+        return {
+            (kpi.team_id, kpi.assigned_user_id): (
+                kpi.followup_created_count,
+                kpi.followup_done_count,
+            )
+            for kpi in self.Kpi.search([("policy_id", "=", self.policy.id)])
+        }
+
+    def test_kpi_daily_incremental(self):
+        event_a = self._create_event(self.ticket_a_unassigned)
+        self._create_event(
+            self.ticket_a_user_own, followup_done_at=fields.Datetime.now()
+        )
+        self._create_event(self.ticket_b_unassigned)
+        self.Kpi._cron_compute_daily_kpis()
+        self.assertEqual(
+            self._kpi_cells(),
+            {
+                (self.team_a, self.user): (2, 1),
+                (self.team_b, self.user): (1, 0),
+            },
+        )
+        # Moving an event to another user recomputes both cells of its day
+        event_a.assigned_user_id = self.user_own
+        self.Kpi._cron_compute_daily_kpis()
+        self.assertEqual(
+            self._kpi_cells(),
+            {
+                (self.team_a, self.user): (1, 1),
+                (self.team_a, self.user_own): (1, 0),
+                (self.team_b, self.user): (1, 0),
+            },
+        )
+        kpi = self.Kpi.search(
+            [
+                ("policy_id", "=", self.policy.id),
+                ("team_id", "=", self.team_a.id),
+                ("assigned_user_id", "=", self.user.id),
+            ]
+        )
+        self.assertEqual(kpi.completion_rate, 100.0)
+
+    def test_kpi_daily_event_unlink(self):
+        event_a = self._create_event(self.ticket_a_unassigned)
+        event_b = self._create_event(self.ticket_b_unassigned)
+        self.Kpi._cron_compute_daily_kpis()
+        event_a.unlink()
+        # The day of the removed event is recomputed without waiting for the job
+        self.assertEqual(self._kpi_cells(), {(self.team_b, self.user): (1, 0)})
+        event_b.unlink()
+        self.assertEqual(self._kpi_cells(), {})
+
+    def test_kpi_exec_summary(self):
+        self._create_event(
+            self.ticket_a_unassigned, followup_done_at=fields.Datetime.now()
+        )
+        self.Kpi._cron_compute_daily_kpis()
+        domain = [("policy_id", "=", self.policy.id)]
+        summary = self.Kpi.get_exec_summary(domain)
+        self.assertEqual(summary["created_count"], 1)
+        self.assertEqual(summary["completion_rate"], 100.0)
+        self.assertEqual(summary["cs_ranking"][0]["user"], self.user.display_name)
+        self.assertEqual(summary["team_rankings"][0]["team_id"], self.team_a.id)
+        # The KPI job invalidates cached summaries
+        self._create_event(self.ticket_b_unassigned)
+        self.Kpi._cron_compute_daily_kpis()
+        summary = self.Kpi.get_exec_summary(domain)
+        self.assertEqual(summary["created_count"], 2)
+        self.assertEqual(summary["completion_rate"], 50.0)
+        kpis = self.Kpi.search(domain)
+        self.assertEqual(kpis[0].exec_total_created, 2)
+        # So do direct edits of KPI rows
+        kpis.write({"followup_created_count": 0})
+        self.assertEqual(self.Kpi.get_exec_summary(domain)["created_count"], 0)
+
+    def test_followup_crons_batched(self):
+        self.user.email = "helpdesk-user@example.com"
+        self.policy.write(
+            {
+                "enable_escalation": True,
+                "escalation_after_overdue_days": 0,
+                "escalation_user_id": self.user.id,
+            }
+        )
+        past = fields.Datetime.now() - timedelta(days=1)
+        events = self.Event.browse()
+        for ticket in (self.ticket_a_unassigned, self.ticket_b_unassigned):
+            events |= self.Event.create(
+                {
+                    "ticket_id": ticket.id,
+                    "policy_id": self.policy.id,
+                    "trigger_at": past,
+                }
+            )
+        self.Event._cron_create_followups(batch_size=1)
+        self.assertTrue(all(events.mapped("followup_created_at")))
+        self.assertEqual(
+            set(events.followup_activity_id.mapped("res_id")), set(events.ticket_id.ids)
+        )
+        events.write({"due_date": fields.Date.today() - timedelta(days=1)})
+        escalation_mails = [("subject", "like", "[Escalation]")]
+        mails_before = self.env["mail.mail"].search_count(escalation_mails)
+        self.Event._cron_escalate_overdue(batch_size=1)
+        self.assertEqual(set(events.mapped("state")), {"escalated"})
+        self.assertTrue(all(events.mapped("escalation_notified_at")))
+        self.assertEqual(events.escalated_to_user_id, self.user)
+        self.assertEqual(
+            self.env["mail.mail"].search_count(escalation_mails), mails_before + 2
+        )
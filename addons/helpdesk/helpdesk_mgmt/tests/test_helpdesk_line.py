@@ -0,0 +1,206 @@
+from datetime import timedelta
+
+from odoo import fields
+
+from odoo.addons.helpdesk_mgmt.models.line_webhook_event import WEBHOOK_MAX_ATTEMPTS
+
+from .common import TestHelpdeskTicketBase
+from .line_api_stub import LineApiStub
+
+
+class TestHelpdeskLine(TestHelpdeskTicketBase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.stub = LineApiStub().start()
+        cls.addClassCleanup(cls.stub.stop)
+        icp = cls.env["ir.config_parameter"].sudo()
+        icp.set_param("helpdesk_mgmt.lineoa_enabled", "True")
+        icp.set_param("helpdesk_mgmt.lineoa_channel_access_token", "stub-token")
+        icp.set_param("helpdesk_mgmt.lineoa_api_url", cls.stub.url)
+        cls.Outbound = cls.env["helpdesk.line.outbound.message"]
+        cls.line_stage = cls.env["helpdesk.ticket.stage"].create(
+            {
+                "name": "Waiting on LINE",
+                "x_notify_customer_line": True,
+                "x_line_message_template": "Your ticket is now {stage_name}",
+            }
+        )
+        cls.line_tickets = cls.ticket_a_unassigned | cls.ticket_b_unassigned
+        for ticket in cls.line_tickets:
+            ticket.partner_id = cls.env["res.partner"].create(
+                {"name": f"LINE {ticket.id}", "x_line_user_id": f"U{ticket.id}"}
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.stub.requests.clear()
+        self.stub.statuses.clear()
+
+    def test_stage_change_queues_line_message(self):
+        self.line_tickets.write({"stage_id": self.line_stage.id})
+        messages = self.line_tickets.x_line_outbound_message_ids
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(set(messages.mapped("state")), {"queued"})
+        self.assertEqual(
+            set(self.line_tickets.mapped("x_line_delivery_state")), {"queued"}
+        )
+        self.assertFalse(self.stub.requests, "Stage changes must not call LINE")
+        self.Outbound._cron_send_queued()
+        # Both customers share the text: one multicast request
+        self.assertEqual(len(self.stub.requests), 1)
+        path, body = self.stub.requests[0]
+        self.assertEqual(path, "/v2/bot/message/multicast")
+        self.assertEqual(
+            set(body["to"]), set(self.line_tickets.partner_id.mapped("x_line_user_id"))
+        )
+        self.assertEqual(
+            body["messages"][0]["text"], "Your ticket is now Waiting on LINE"
+        )
+        self.assertEqual(set(messages.mapped("state")), {"sent"})
+        self.assertEqual(
+            set(self.line_tickets.mapped("x_line_delivery_state")), {"sent"}
+        )
+        self.assertTrue(all(self.line_tickets.mapped("x_line_delivered_at")))
+
+    def test_line_message_retry(self):
+        ticket = self.ticket_a_unassigned
+        ticket.stage_id = self.line_stage
+        message = ticket.x_line_outbound_message_ids
+        self.stub.statuses.append(503)
+        self.Outbound._cron_send_queued()
+        self.assertEqual(message.state, "queued")
+        self.assertEqual(message.attempt_count, 1)
+        self.assertGreater(message.next_attempt_at, fields.Datetime.now())
+        self.assertEqual(ticket.x_line_delivery_state, "queued")
+        message.next_attempt_at = fields.Datetime.now() - timedelta(seconds=1)
+        self.Outbound._cron_send_queued()
+        self.assertEqual(len(self.stub.requests), 2)
+        self.assertEqual(self.stub.requests[-1][0], "/v2/bot/message/push")
+        self.assertEqual(message.state, "sent")
+        self.assertEqual(message.attempt_count, 2)
+        self.assertEqual(ticket.x_line_delivery_state, "sent")
+
+    def test_line_message_rejected(self):
+        ticket = self.ticket_b_unassigned
+        ticket.stage_id = self.line_stage
+        self.stub.statuses.append(400)
+        self.Outbound._cron_send_queued()
+        message = ticket.x_line_outbound_message_ids
+        self.assertEqual(message.state, "failed")
+        self.assertEqual(ticket.x_line_delivery_state, "failed")
+        # A later move back to the stage notifies the customer again
+        self.assertFalse(ticket.x_last_notified_stage_id_line)
+
+    def _webhook_event(self, event_id, text, user_id="Uwebhook"):
+        return {
+            "type": "message",
+            "webhookEventId": event_id,
+            "timestamp": 1700000000000,
+            "source": {"type": "user", "userId": user_id},
+            "message": {"type": "text", "id": event_id, "text": text},
+        }
+
+    def test_webhook_events_processed_by_worker(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "helpdesk_mgmt.lineoa_helpdesk_team_id", self.team_a.id
+        )
+        Event = self.env["x_line_webhook_event"]
+        first = self._webhook_event("E1", "My printer is broken")
+        events = Event._enqueue_webhook_events(
+            [first, self._webhook_event("E2", "It still does not print")]
+        )
+        # LINE redelivering an event does not store it twice
+        Event._enqueue_webhook_events([first])
+        self.assertEqual(
+            Event.search_count([("webhook_event_id", "in", ["E1", "E2"])]), 2
+        )
+        self.assertFalse(any(events.mapped("processed")))
+        self.assertFalse(self.stub.requests, "Events are not processed on receipt")
+        Event._cron_process_events()
+        self.assertTrue(all(events.mapped("processed")))
+        ticket = events[0].created_ticket_id
+        self.assertTrue(ticket)
+        self.assertEqual(events[1].created_ticket_id, ticket)
+        self.assertEqual(ticket.team_id, self.team_a)
+        self.assertEqual(ticket.partner_id.x_line_display_name, "Stub Uwebhook")
+        # The profile is fetched once and then served from the partner
+        Event._enqueue_webhook_events([self._webhook_event("E3", "Any news?")])
+        Event._cron_process_events()
+        profile_requests = [
+            path for path, _body in self.stub.requests if "/profile/" in path
+        ]
+        self.assertEqual(profile_requests, ["/v2/bot/profile/Uwebhook"])
+
+    def test_webhook_event_retry(self):
+        icp = self.env["ir.config_parameter"].sudo()
+        # A team that does not exist makes ticket creation fail
+        icp.set_param("helpdesk_mgmt.lineoa_helpdesk_team_id", 999999)
+        Event = self.env["x_line_webhook_event"]
+        event = Event._enqueue_webhook_events([self._webhook_event("R1", "Help")])
+        logger = "odoo.addons.helpdesk_mgmt.models.line_webhook_event"
+        with self.assertLogs(logger, level="ERROR"):
+            Event._cron_process_events()
+        self.assertFalse(event.processed)
+        self.assertEqual(event.attempt_count, 1)
+        self.assertTrue(event.error_message)
+        self.assertGreater(event.next_attempt_at, fields.Datetime.now())
+        # Not due yet
+        Event._cron_process_events()
+        self.assertEqual(event.attempt_count, 1)
+        icp.set_param("helpdesk_mgmt.lineoa_helpdesk_team_id", self.team_a.id)
+        event.next_attempt_at = fields.Datetime.now() - timedelta(seconds=1)
+        Event._cron_process_events()
+        self.assertTrue(event.processed)
+        self.assertEqual(event.attempt_count, 2)
+        self.assertFalse(event.error_message)
+        self.assertEqual(event.created_ticket_id.team_id, self.team_a)
+
+    def test_webhook_event_gives_up(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "helpdesk_mgmt.lineoa_helpdesk_team_id", 999999
+        )
+        Event = self.env["x_line_webhook_event"]
+        event = Event._enqueue_webhook_events([self._webhook_event("G1", "Help")])
+        event.attempt_count = WEBHOOK_MAX_ATTEMPTS - 1
+        logger = "odoo.addons.helpdesk_mgmt.models.line_webhook_event"
+        with self.assertLogs(logger, level="ERROR"):
+            Event._cron_process_events()
+        self.assertFalse(event.processed)
+        self.assertEqual(event.attempt_count, WEBHOOK_MAX_ATTEMPTS)
+        self.assertFalse(event.next_attempt_at)
+        self.assertTrue(event.error_message)
+
+    def test_open_conversation_routing(self):
+        icp = self.env["ir.config_parameter"].sudo()
+        icp.set_param("helpdesk_mgmt.lineoa_helpdesk_team_id", self.team_a.id)
+        icp.set_param("helpdesk_mgmt.lineoa_conversation_window_hours", 2)
+        Event = self.env["x_line_webhook_event"]
+        Conversation = self.env["helpdesk.line.conversation"]
+
+        def receive(event_id, text):
+            event = Event._enqueue_webhook_events(
+                [self._webhook_event(event_id, text, user_id="Uconv")]
+            )
+            Event._cron_process_events()
+            return event.created_ticket_id
+
+        ticket = receive("C1", "Hello")
+        conversation = Conversation.search([("line_user_id", "=", "Uconv")])
+        self.assertEqual(conversation.ticket_id, ticket)
+        self.assertEqual(conversation.team_id, self.team_a)
+        self.assertEqual(receive("C2", "Still there?"), ticket)
+        # Closing the ticket ends the conversation
+        ticket.stage_id = self.stage_closed
+        self.assertFalse(conversation.exists())
+        second_ticket = receive("C3", "New problem")
+        self.assertNotEqual(second_ticket, ticket)
+        # An idle conversation starts a new ticket, which takes it over
+        conversation = Conversation.search([("ticket_id", "=", second_ticket.id)])
+        conversation.last_message_at = fields.Datetime.now() - timedelta(hours=3)
+        third_ticket = receive("C4", "Another one")
+        self.assertNotEqual(third_ticket, second_ticket)
+        self.assertEqual(conversation.ticket_id, third_ticket)
+        conversation.last_message_at = fields.Datetime.now() - timedelta(hours=3)
+        Conversation._cron_expire_conversations()
+        self.assertFalse(conversation.exists())
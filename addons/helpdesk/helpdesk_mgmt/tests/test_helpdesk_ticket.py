@@ -1,5 +1,7 @@
 import time
+from datetime import timedelta
 
+from odoo import fields
 from odoo.tests import Form
 
 from .common import TestHelpdeskTicketBase
@@ -96,6 +98,40 @@ class TestHelpdeskTicket(TestHelpdeskTicketBase):
             "Helpdesk Ticket: An assigned ticket " "should contain a assigned_date.",
         )
 
+    def test_helpdesk_ticket_sla_clock(self):
+        self.ticket.stage_id.x_sla_hours = 10.0
+        now = fields.Datetime.now()
+        Ticket = self.env["helpdesk.ticket"]
+        self.ticket.x_stage_entered_at = now - timedelta(hours=1)
+        self.assertEqual(
+            self.ticket.x_sla_deadline_at,
+            self.ticket.x_stage_entered_at + timedelta(hours=10),
+        )
+        self.assertEqual(self.ticket.x_sla_status, "safe")
+        self.ticket.x_stage_entered_at = now - timedelta(hours=8)
+        self.assertEqual(self.ticket.x_sla_status, "warning")
+        self.assertIn(self.ticket, Ticket.search([("x_sla_status", "=", "warning")]))
+        self.ticket.x_stage_entered_at = now - timedelta(hours=11)
+        self.assertEqual(self.ticket.x_sla_status, "danger")
+        self.assertIn(self.ticket, Ticket.search([("x_sla_status", "=", "danger")]))
+        self.assertNotIn(
+            self.ticket, Ticket.search([("x_sla_status", "!=", "danger")])
+        )
+        # Changing stage restarts the clock
+        self.ticket.write({"stage_id": self.stage_closed.id})
+        self.assertEqual(self.ticket.x_sla_status, "safe")
+        self.assertIn(self.ticket, Ticket.search([("x_sla_status", "=", "safe")]))
+
+    def test_helpdesk_ticket_no_update_warning(self):
+        Ticket = self.env["helpdesk.ticket"]
+        self.assertFalse(self.ticket.x_no_update_warning)
+        self.ticket.x_last_update_at = fields.Datetime.now() - timedelta(hours=49)
+        self.assertTrue(self.ticket.x_no_update_warning)
+        self.assertIn(self.ticket, Ticket.search([("x_no_update_warning", "=", True)]))
+        self.assertNotIn(
+            self.ticket, Ticket.search([("x_no_update_warning", "=", False)])
+        )
+
     def test_helpdesk_ticket_number(self):
         self.assertNotEqual(
             self.ticket.number,
@@ -7,9 +7,10 @@
     "website": "https://github.com/OCA/helpdesk",
     "license": "AGPL-3",
     "category": "After-Sales",
-    "version": "18.0.2.1.0",
+    "version": "18.0.2.4.0",
     "depends": ["base", "helpdesk_mgmt", "resource"],
     "data": [
+        "data/helpdesk_sla_cron.xml",
         "security/helpdesk_sla_security.xml",
         "views/helpdesk_sla_report.xml",
         "views/helpdesk_ticket_sla.xml",
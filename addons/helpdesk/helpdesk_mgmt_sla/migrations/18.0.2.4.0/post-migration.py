@@ -0,0 +1,7 @@
+from openupgradelib import openupgrade
+
+
+@openupgrade.migrate()
+def migrate(env, version):
+    # Fill the SLA report table for all the existing ticket SLAs
+    env["helpdesk.sla.report"]._cron_refresh_report()
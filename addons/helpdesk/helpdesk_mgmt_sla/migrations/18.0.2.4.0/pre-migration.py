@@ -0,0 +1,7 @@
+from openupgradelib import openupgrade
+
+
+@openupgrade.migrate()
+def migrate(env, version):
+    # helpdesk.sla.report used to be a SQL view, it is now a table
+    openupgrade.logged_query(env.cr, "DROP VIEW IF EXISTS helpdesk_sla_report")
@@ -1,63 +1,156 @@
 # Copyright 2025 Dixmit
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import fields, models
+from odoo import api, fields, models
+
+REFRESHED_AT_PARAM = "helpdesk_mgmt_sla.sla_report_refreshed_at"
 
 
 class HelpdeskSlaReport(models.Model):
+    """SLA fact table, one row per ticket SLA
+
+    Rows are upserted from the ticket / ticket SLA write hooks and by a
+    periodic catch-up, so pivots and graphs read plain indexed columns
+    instead of joining tickets and evaluating NOW() on every request.
+    """
+
     _name = "helpdesk.sla.report"
     _description = "Helpdesk SLA Report"
-    _auto = False
+    _order = "date desc, id desc"
 
-    ticket_id = fields.Many2one("helpdesk.ticket", readonly=True)
+    ticket_sla_id = fields.Many2one(
+        "helpdesk.ticket.sla", required=True, readonly=True, ondelete="cascade"
+    )
+    ticket_id = fields.Many2one("helpdesk.ticket", readonly=True, index=True)
+    sla_id = fields.Many2one("helpdesk.sla", string="SLA", readonly=True)
     name = fields.Char(readonly=True)
-    date = fields.Datetime(readonly=True)
+    date = fields.Datetime(readonly=True, index=True)
     team_id = fields.Many2one("helpdesk.ticket.team", readonly=True)
-    partner_id = fields.Many2one(
-        "res.partner", related="ticket_id.partner_id", readonly=True
-    )
+    partner_id = fields.Many2one("res.partner", readonly=True)
     state = fields.Selection(
         [
             ("on_going", "Ongoing"),
             ("expired", "Expired"),
             ("accomplished", "Accomplished"),
         ],
+        readonly=True,
+    )
+    deadline = fields.Datetime(readonly=True)
+    breach_minutes = fields.Float(
+        readonly=True,
+        help="Minutes past the deadline: until the ticket was closed, or until "
+        "the last refresh while it is still open.",
     )
-    active = fields.Boolean()
+    active = fields.Boolean(readonly=True)
 
-    def _where_sla(self):
-        return "1=1"
+    # Conflict target of the _refresh_rows upsert
+    _ticket_sla_uniq = models.UniqueIndex(
+        "(ticket_sla_id)", "There is already a report row for this ticket SLA."
+    )
+
+    @api.model
+    def _refresh_rows(self, where, params):
+        """Upsert the rows of the ticket SLAs matching where (hts: SLA, ht: ticket)
 
-    def _from_sla(self):
-        return """
-        helpdesk_ticket ht
-        JOIN helpdesk_ticket_sla hts ON hts.ticket_id = ht.id
+        Only rows whose values changed are written. Returns the number of
+        rows inserted or updated.
         """
+        self.env["helpdesk.ticket.sla"].flush_model()
+        self.env["helpdesk.ticket"].flush_model()
+        self.flush_model()
+        now = fields.Datetime.now()
+        self.env.cr.execute(
+            f"""
+            INSERT INTO helpdesk_sla_report AS r (
+                ticket_sla_id, ticket_id, sla_id, name, date, team_id, partner_id,
+                state, deadline, breach_minutes, active,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT
+                hts.id,
+                ht.id,
+                hts.sla_id,
+                ht.name,
+                ht.create_date,
+                ht.team_id,
+                ht.partner_id,
+                CASE
+                    WHEN hts.state = 'accomplished' THEN 'accomplished'
+                    WHEN hts.state = 'expired' THEN 'expired'
+                    ELSE 'on_going'
+                END,
+                hts.deadline,
+                CASE
+                    WHEN hts.state = 'expired' AND hts.deadline IS NOT NULL
+                    THEN GREATEST(
+                        0,
+                        EXTRACT(
+                            EPOCH FROM COALESCE(ht.closed_date, %(now)s) - hts.deadline
+                        ) / 60
+                    )
+                    ELSE 0
+                END,
+                ht.active,
+                %(uid)s, %(now)s, %(uid)s, %(now)s
+            FROM helpdesk_ticket_sla hts
+            JOIN helpdesk_ticket ht ON ht.id = hts.ticket_id
+            WHERE {where}
+            ON CONFLICT (ticket_sla_id) DO UPDATE
+               SET ticket_id = EXCLUDED.ticket_id,
+                   sla_id = EXCLUDED.sla_id,
+                   name = EXCLUDED.name,
+                   date = EXCLUDED.date,
+                   team_id = EXCLUDED.team_id,
+                   partner_id = EXCLUDED.partner_id,
+                   state = EXCLUDED.state,
+                   deadline = EXCLUDED.deadline,
+                   breach_minutes = EXCLUDED.breach_minutes,
+                   active = EXCLUDED.active,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+             WHERE (r.ticket_id, r.sla_id, r.name, r.date, r.team_id, r.partner_id,
+                    r.state, r.deadline, r.breach_minutes, r.active)
+                   IS DISTINCT FROM
+                   (EXCLUDED.ticket_id, EXCLUDED.sla_id, EXCLUDED.name,
+                    EXCLUDED.date, EXCLUDED.team_id, EXCLUDED.partner_id,
+                    EXCLUDED.state, EXCLUDED.deadline, EXCLUDED.breach_minutes,
+                    EXCLUDED.active)
+            """,
+            dict(params, now=now, uid=self.env.uid),
+        )
+        count = self.env.cr.rowcount
+        self.invalidate_model()
+        return count
 
-    def _select_sla(self):
-        return """
-            hts.id as id,
-            hts.ticket_id as ticket_id,
-            ht.name as name,
-            ht.create_date as date,
-            ht.team_id as team_id,
-            ht.active as active,
-            CASE
-                WHEN hts.state = 'accomplished' THEN 'accomplished'
-                WHEN hts.state = 'expired' OR
-                    (hts.state = 'in_progress' and hts.deadline < NOW())
-                    THEN 'expired'
-                ELSE 'on_going'
-            END as state
-            """
+    @api.model
+    def _refresh_ticket_slas(self, ticket_slas):
+        """Write hook entry point: refresh the rows of the given ticket SLAs"""
+        if not ticket_slas.ids:
+            return 0
+        return self._refresh_rows("hts.id IN %(ids)s", {"ids": tuple(ticket_slas.ids)})
 
-    def _query(self):
-        return f"""
-            SELECT {self._select_sla()}
-            FROM {self._from_sla()}
-            WHERE {self._where_sla()}
-        """
+    @api.model
+    def _cron_refresh_report(self):
+        """Catch up on changes the write hooks did not see
 
-    @property
-    def _table_query(self):
-        return self._query()
+        Refreshes rows missing from the table, rows whose ticket or SLA was
+        written since the previous run, and breaches of open tickets, whose
+        breach minutes keep growing.
+        """
+        icp = self.env["ir.config_parameter"].sudo()
+        now = fields.Datetime.now()
+        last_run = fields.Datetime.to_datetime(icp.get_param(REFRESHED_AT_PARAM))
+        if last_run:
+            where = """
+                NOT EXISTS (
+                    SELECT 1 FROM helpdesk_sla_report r WHERE r.ticket_sla_id = hts.id
+                )
+                OR hts.write_date >= %(since)s
+                OR ht.write_date >= %(since)s
+                OR (hts.state = 'expired' AND ht.closed_date IS NULL)
+            """
+        else:
+            where = "TRUE"
+        count = self._refresh_rows(where, {"since": last_run})
+        icp.set_param(REFRESHED_AT_PARAM, fields.Datetime.to_string(now))
+        return count
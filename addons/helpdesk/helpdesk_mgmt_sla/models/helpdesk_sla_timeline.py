@@ -0,0 +1,128 @@
+# Copyright 2025 Dixmit
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from pytz import utc
+
+
+class SlaTimeline:
+    """Working intervals of one resource calendar over a UTC date range
+
+    The intervals (leaves included) are fetched once for the whole range and
+    kept with their cumulative working hours, so deadlines and consumed hours
+    of any number of ticket SLAs sharing the calendar are resolved by bisecting
+    the timeline instead of calling plan_hours / get_work_hours_count per row.
+    The range grows on demand when a deadline falls beyond it.
+
+    All datetimes are naive UTC, as stored by the ORM.
+    """
+
+    # Same search horizon as resource.calendar.plan_hours (100 x 14 days)
+    EXTEND_STEP = timedelta(days=14)
+    MAX_HORIZON = timedelta(days=1400)
+
+    def __init__(self, calendar):
+        self.calendar = calendar
+        self.range_start = None
+        self.range_end = None
+        self._intervals = []  # sorted (start, stop)
+        self._starts = []
+        self._stops = []
+        self._cumulative = [0.0]  # hours worked before each interval
+
+    def cover(self, start, end):
+        """Make sure the timeline contains the working intervals of [start, end)"""
+        if self.range_start is None:
+            self._intervals = self._fetch(start, end)
+            self.range_start, self.range_end = start, end
+        elif start < self.range_start or end > self.range_end:
+            if start < self.range_start:
+                self._intervals = self._fetch(start, self.range_start) + self._intervals
+                self.range_start = start
+            if end > self.range_end:
+                self._intervals += self._fetch(self.range_end, end)
+                self.range_end = end
+        else:
+            return
+        self._index()
+
+    def _fetch(self, start, end):
+        if start >= end:
+            return []
+        intervals = self.calendar._work_intervals_batch(
+            start.replace(tzinfo=utc), end.replace(tzinfo=utc)
+        )[False]
+        return [
+            (
+                interval_start.astimezone(utc).replace(tzinfo=None),
+                interval_stop.astimezone(utc).replace(tzinfo=None),
+            )
+            for interval_start, interval_stop, _meta in intervals
+        ]
+
+    def _index(self):
+        self._starts = [start for start, _stop in self._intervals]
+        self._stops = [stop for _start, stop in self._intervals]
+        cumulative = [0.0]
+        for start, stop in self._intervals:
+            cumulative.append(cumulative[-1] + (stop - start).total_seconds() / 3600)
+        self._cumulative = cumulative
+
+    def _worked_until(self, moment):
+        """Working hours between the start of the timeline and moment"""
+        index = bisect_right(self._stops, moment)
+        hours = self._cumulative[index]
+        if index < len(self._starts) and self._starts[index] < moment:
+            hours += (moment - self._starts[index]).total_seconds() / 3600
+        return hours
+
+    def work_hours(self, start, end):
+        """Equivalent of calendar.get_work_hours_count(start, end, compute_leaves)"""
+        if not start or not end or end <= start:
+            return 0.0
+        self.cover(start, end)
+        return self._worked_until(end) - self._worked_until(start)
+
+    def plan(self, start, hours):
+        """Equivalent of calendar.plan_hours(hours, start, compute_leaves)
+
+        Negative hours plan backwards from start, as for an SLA whose consumed
+        time exceeds its hours. Returns False when no deadline is found within
+        the search horizon.
+        """
+        if hours < 0:
+            return self._plan_backwards(start, -hours)
+        horizon = start + self.MAX_HORIZON
+        self.cover(start, start + self.EXTEND_STEP)
+        while True:
+            first = bisect_right(self._stops, start)
+            target = self._worked_until(start) + hours
+            index = bisect_left(self._cumulative, target, lo=first + 1) - 1
+            if first < len(self._intervals) and index < len(self._intervals):
+                return self._starts[index] + timedelta(
+                    hours=target - self._cumulative[index]
+                )
+            if self.range_end >= horizon:
+                return False
+            # Double the remaining window until the deadline fits in it
+            step = max(self.EXTEND_STEP, self.range_end - start)
+            self.cover(self.range_start, min(horizon, self.range_end + step))
+
+    def _plan_backwards(self, end, hours):
+        """Latest moment before end with the given working hours until end"""
+        horizon = end - self.MAX_HORIZON
+        self.cover(end - self.EXTEND_STEP, end)
+        while True:
+            target = self._worked_until(end) - hours
+            if target >= 0:
+                index = bisect_right(self._cumulative, target) - 1
+                return self._starts[index] + timedelta(
+                    hours=target - self._cumulative[index]
+                )
+            if self.range_start <= horizon:
+                return False
+            # Double the covered window until the start fits in it
+            step = max(self.EXTEND_STEP, end - self.range_start)
+            self.cover(max(horizon, self.range_start - step), self.range_end)
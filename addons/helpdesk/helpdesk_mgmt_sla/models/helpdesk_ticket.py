@@ -4,6 +4,9 @@
 from odoo import api, fields, models
 from odoo.tools.safe_eval import safe_eval
 
+# Ticket fields copied into helpdesk.sla.report
+SLA_REPORT_TICKET_FIELDS = {"name", "team_id", "partner_id", "active", "closed_date"}
+
 
 class HelpdeskTicket(models.Model):
     _inherit = "helpdesk.ticket"
@@ -81,13 +84,15 @@ class HelpdeskTicket(models.Model):
         return slas
 
     def set_sla(self):
+        self.ticket_sla_ids.unlink()
+        vals_list = []
         for ticket in self:
-            ticket.ticket_sla_ids.unlink()
             if ticket.team_id.use_sla:
-                for sla in ticket._get_sla():
-                    self.env["helpdesk.ticket.sla"].create(
-                        {"ticket_id": ticket.id, "sla_id": sla.id}
-                    )
+                vals_list += [
+                    {"ticket_id": ticket.id, "sla_id": sla.id}
+                    for sla in ticket._get_sla()
+                ]
+        self.env["helpdesk.ticket.sla"].create(vals_list)
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -98,8 +103,9 @@ class HelpdeskTicket(models.Model):
     def write(self, vals):
         result = super().write(vals)
         if "stage_id" in vals:
-            for ticket_sla in self.ticket_sla_ids:
-                ticket_sla._stage_recompute()
+            self.ticket_sla_ids._stage_recompute()
+        elif SLA_REPORT_TICKET_FIELDS.intersection(vals):
+            self.env["helpdesk.sla.report"]._refresh_ticket_slas(self.ticket_sla_ids)
         return result
 
     def refresh_sla(self):
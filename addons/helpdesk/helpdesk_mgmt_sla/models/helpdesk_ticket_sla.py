@@ -1,9 +1,13 @@
 # Copyright 2025 Dixmit
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from datetime import timedelta
+
 from odoo import api, fields, models
 from odoo.exceptions import UserError
 
+from .helpdesk_sla_timeline import SlaTimeline
+
 
 class HelpdeskTicketSla(models.Model):
     _name = "helpdesk.ticket.sla"
@@ -13,7 +17,7 @@ class HelpdeskTicketSla(models.Model):
     sla_id = fields.Many2one("helpdesk.sla", required=True, ondelete="restrict")
     name = fields.Char(related="sla_id.name")
     color = fields.Integer(compute="_compute_color")
-    deadline = fields.Datetime(compute="_compute_deadline", store=True)
+    deadline = fields.Datetime(compute="_compute_deadline", store=True, index=True)
     hours = fields.Float(compute="_compute_sla_data", store=True)
     expected_stage_id = fields.Many2one(
         "helpdesk.ticket.stage", compute="_compute_sla_data", store=True
@@ -30,7 +34,12 @@ class HelpdeskTicketSla(models.Model):
         default="accomplished",
         compute="_compute_sla_data",
         store=True,
+        index=True,
+    )
+    breach_date = fields.Datetime(
+        string="Breached on", compute="_compute_breach_date", store=True
     )
+    # Searching relies on the stored state, kept up to date by the breach sweeper
     expired = fields.Boolean(compute="_compute_expired", search="_search_expired")
 
     @api.depends("state", "deadline")
@@ -45,20 +54,45 @@ class HelpdeskTicketSla(models.Model):
         if operator not in ["=", "!="]:
             raise UserError(self.env._("Operator is not valid"))
         if (operator == "=" and value) or (operator == "!=" and not value):
-            return [
-                "|",
-                ("state", "=", "expired"),
-                "&",
-                ("state", "=", "in_progress"),
-                ("deadline", "<", fields.Datetime.now()),
-            ]
-        return [
-            "|",
-            ("state", "not in", ["expired", "in_progress"]),
-            "&",
-            ("state", "=", "in_progress"),
-            ("deadline", ">=", fields.Datetime.now()),
-        ]
+            return [("state", "=", "expired")]
+        return [("state", "!=", "expired")]
+
+    @api.depends("state", "deadline")
+    def _compute_breach_date(self):
+        for record in self:
+            record.breach_date = record.state == "expired" and record.deadline
+
+    @api.model
+    def _cron_sweep_breaches(self, batch_size=1000):
+        """Expire in-progress SLAs whose deadline has passed
+
+        Runs over the (state, deadline) indexes in batches and retriggers
+        itself while breached rows remain, so filters and reports reading the
+        stored state lag the clock by at most the cron interval.
+        """
+        breached = self.search(
+            [("state", "=", "in_progress"), ("deadline", "<=", fields.Datetime.now())],
+            order="deadline",
+            limit=batch_size,
+        )
+        if not breached:
+            return 0
+        breached.write({"state": "expired"})
+        breached._log_breach_events()
+        if len(breached) == batch_size:
+            self.env.ref(
+                "helpdesk_mgmt_sla.ir_cron_helpdesk_sla_breach_sweeper"
+            )._trigger()
+        return len(breached)
+
+    def _log_breach_events(self):
+        bodies = {
+            ticket.id: self.env._(
+                "SLA expired: %(slas)s", slas=", ".join(records.mapped("name"))
+            )
+            for ticket, records in self.grouped("ticket_id").items()
+        }
+        self.ticket_id._message_log_batch(bodies)
 
     @api.depends("state", "deadline")
     def _compute_color(self):
@@ -97,50 +131,104 @@ class HelpdeskTicketSla(models.Model):
                 and record.ticket_id.create_date
             )
 
+    def _get_sla_timelines(self, ranges):
+        """Return {calendar: SlaTimeline} covering the given {calendar: (start, end)}"""
+        timelines = {}
+        for calendar, (start, end) in ranges.items():
+            if calendar:
+                timelines[calendar] = SlaTimeline(calendar)
+                timelines[calendar].cover(start, end)
+        return timelines
+
     @api.depends("hours", "consumed_time", "ticket_id", "last_state_date", "state")
     def _compute_deadline(self):
+        to_plan = []
+        ranges = {}
         for record in self:
             if record.state in ["accomplished", "expired"] and record.deadline:
                 # We want to keep the deadline in the past if the SLA is exceeded
                 # If it is not defined, it will be recomputed for history
                 continue
+            date = record.last_state_date or record.ticket_id.create_date
+            if not date:
+                record.deadline = False
+                continue
+            calendar = record.ticket_id.team_id.resource_calendar_id
+            to_plan.append((record, calendar, date))
+            start, end = ranges.get(calendar, (date, date))
+            ranges[calendar] = (min(start, date), max(end, date))
+        # One interval timeline per calendar for all the rows, extended on demand
+        timelines = self._get_sla_timelines(
+            {
+                calendar: (start, end + SlaTimeline.EXTEND_STEP)
+                for calendar, (start, end) in ranges.items()
+            }
+        )
+        for record, calendar, date in to_plan:
+            hours = record.hours - record.consumed_time
+            if calendar:
+                record.deadline = timelines[calendar].plan(date, hours)
             else:
-                date = record.last_state_date or record.ticket_id.create_date
-                date = record.ticket_id.team_id.resource_calendar_id.plan_hours(
-                    record.hours - record.consumed_time, date, compute_leaves=True
-                )
-                record.deadline = date
+                record.deadline = date + timedelta(hours=hours)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["helpdesk.sla.report"]._refresh_ticket_slas(records)
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        if not self.env.context.get("skip_sla_report"):
+            self.env["helpdesk.sla.report"]._refresh_ticket_slas(self)
+        return result
 
     def _stage_recompute(self):
-        self.ensure_one()
         now = fields.Datetime.now()
-        if self.state == "expired":
-            return
-        deadline = self.deadline
-        if self.state == "in_progress":
-            calendar = self.ticket_id.team_id.resource_calendar_id
-            self.consumed_time += calendar.get_work_hours_count(
-                self.last_state_date, now, compute_leaves=True
-            )
-        if (
-            self.state == "accomplished"
-            and self.ticket_id.stage_id.sequence < self.expected_stage_id.sequence
-        ):
-            self.state = "in_progress"
-        elif (
-            self.state in ["in_progress", "on_hold"]
-            and (not deadline or deadline >= now)
-            and self.ticket_id.stage_id.sequence >= self.expected_stage_id.sequence
-        ):
-            self.state = "accomplished"
-        elif self.state == "in_progress" and deadline and deadline <= now:
-            self.state = "expired"
-        if self.state in ["in_progress", "on_hold"]:
-            if self.ticket_id.stage_id in self.sla_id.ignore_stage_ids:
-                self.state = "on_hold"
-            else:
-                self.state = "in_progress"
-        self.last_state_date = now
+        ranges = {}
+        for record in self:
+            if record.state == "in_progress" and record.last_state_date:
+                calendar = record.ticket_id.team_id.resource_calendar_id
+                start, _end = ranges.get(calendar, (record.last_state_date, now))
+                ranges[calendar] = (min(start, record.last_state_date), now)
+        timelines = self._get_sla_timelines(ranges)
+        # Field assignments below are written row by row: refresh the report once
+        for record in self.with_context(skip_sla_report=True):
+            if record.state == "expired":
+                continue
+            deadline = record.deadline
+            if record.state == "in_progress":
+                calendar = record.ticket_id.team_id.resource_calendar_id
+                if calendar and record.last_state_date:
+                    record.consumed_time += timelines[calendar].work_hours(
+                        record.last_state_date, now
+                    )
+                elif record.last_state_date:
+                    record.consumed_time += max(
+                        0.0, (now - record.last_state_date).total_seconds() / 3600
+                    )
+            if (
+                record.state == "accomplished"
+                and record.ticket_id.stage_id.sequence
+                < record.expected_stage_id.sequence
+            ):
+                record.state = "in_progress"
+            elif (
+                record.state in ["in_progress", "on_hold"]
+                and (not deadline or deadline >= now)
+                and record.ticket_id.stage_id.sequence
+                >= record.expected_stage_id.sequence
+            ):
+                record.state = "accomplished"
+            elif record.state == "in_progress" and deadline and deadline <= now:
+                record.state = "expired"
+            if record.state in ["in_progress", "on_hold"]:
+                if record.ticket_id.stage_id in record.sla_id.ignore_stage_ids:
+                    record.state = "on_hold"
+                else:
+                    record.state = "in_progress"
+            record.last_state_date = now
+        self.env["helpdesk.sla.report"]._refresh_ticket_slas(self)
 
     def _check_access(self, operation: str) -> tuple | None:
         result = super()._check_access(operation)
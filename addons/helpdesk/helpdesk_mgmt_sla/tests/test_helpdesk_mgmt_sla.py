@@ -267,6 +267,8 @@ class TestHelpdeskMgmtSla(CommonHelpdeskMgmtSla):
         with freeze_time(fields.Datetime.now() + timedelta(hours=3)):
             self.assertTrue(ticket1.sla_expired)
             self.assertTrue(ticket1.ticket_sla_ids.expired)
+            # Searches read the stored state, set by the breach sweeper
+            self.env["helpdesk.ticket.sla"]._cron_sweep_breaches()
             self.assertEqual(
                 ticket1,
                 self.env["helpdesk.ticket"].search(
@@ -300,6 +302,38 @@ class TestHelpdeskMgmtSla(CommonHelpdeskMgmtSla):
             ticket1.invalidate_recordset()
             self.assertEqual(ticket1.ticket_sla_ids.state, "expired")
 
+    def test_breach_sweeper(self):
+        """
+        Test the sweeper expires in-progress SLAs past their deadline
+        """
+        ticket1 = self.get_ticket(self.team1)
+        ticket_sla = ticket1.ticket_sla_ids
+        self.env["helpdesk.ticket.sla"]._cron_sweep_breaches()
+        self.assertEqual(ticket_sla.state, "in_progress")
+        self.assertFalse(ticket_sla.breach_date)
+        with freeze_time(fields.Datetime.now() + timedelta(hours=3)):
+            self.assertFalse(
+                self.env["helpdesk.ticket"].search(
+                    [("sla_expired", "=", True), ("id", "=", ticket1.id)]
+                )
+            )
+            self.assertTrue(self.env["helpdesk.ticket.sla"]._cron_sweep_breaches())
+        self.assertEqual(ticket_sla.state, "expired")
+        self.assertEqual(ticket_sla.breach_date, ticket_sla.deadline)
+        self.assertEqual(
+            ticket1,
+            self.env["helpdesk.ticket"].search(
+                [("sla_expired", "=", True), ("id", "=", ticket1.id)]
+            ),
+        )
+        self.assertIn("SLA expired", ticket1.message_ids[0].body)
+        self.assertEqual(
+            self.env["helpdesk.sla.report"]
+            .search([("ticket_id", "=", ticket1.id)], limit=1)
+            .state,
+            "expired",
+        )
+
     def test_report(self):
         """
         Test SLA report generation and SQL queue
@@ -311,6 +345,55 @@ class TestHelpdeskMgmtSla(CommonHelpdeskMgmtSla):
             "on_going",
         )
 
+    def test_report_refresh(self):
+        """
+        Test the SLA report table follows ticket and SLA changes
+        """
+        report = self.env["helpdesk.sla.report"].search(
+            [("ticket_id", "=", self.ticket1.id)]
+        )
+        self.assertEqual(report.ticket_sla_id, self.ticket1.ticket_sla_ids)
+        self.assertEqual(report.team_id, self.team1)
+        partner = self.env["res.partner"].create({"name": "SLA Customer"})
+        self.ticket1.partner_id = partner
+        self.assertEqual(report.partner_id, partner)
+        with freeze_time(fields.Datetime.now() + timedelta(hours=3)):
+            self.env["helpdesk.ticket.sla"]._cron_sweep_breaches()
+            self.assertEqual(report.state, "expired")
+            self.assertAlmostEqual(report.breach_minutes, 60, delta=1)
+        with freeze_time(fields.Datetime.now() + timedelta(hours=4)):
+            self.env["helpdesk.sla.report"]._cron_refresh_report()
+            self.assertAlmostEqual(report.breach_minutes, 120, delta=1)
+        self.ticket1.ticket_sla_ids.unlink()
+        self.assertFalse(report.exists())
+
+    def test_report_upsert_unique_index(self):
+        """
+        The report upsert has a unique index on ticket_sla_id to conflict on
+        """
+        self.env.cr.execute(
+            """
+            SELECT indexdef
+              FROM pg_indexes
+             WHERE tablename = 'helpdesk_sla_report'
+               AND indexdef LIKE 'CREATE UNIQUE INDEX%%(ticket_sla_id)'
+            """
+        )
+        self.assertTrue(self.env.cr.fetchall())
+        Report = self.env["helpdesk.sla.report"]
+        ticket_slas = self.ticket1.ticket_sla_ids
+        # Existing rows are updated in place, unchanged ones are not rewritten
+        self.assertEqual(Report._refresh_ticket_slas(ticket_slas), 0)
+        self.ticket1.name = "Renamed for the SLA report"
+        self.assertEqual(
+            Report.search([("ticket_sla_id", "in", ticket_slas.ids)]).name,
+            "Renamed for the SLA report",
+        )
+        self.assertEqual(
+            Report.search_count([("ticket_sla_id", "in", ticket_slas.ids)]),
+            len(ticket_slas),
+        )
+
     def test_refresh_sla(self):
         # Test deletion of no longer applicable SLAs
         self.assertTrue(self.ticket1.sla_fits)
@@ -352,3 +435,49 @@ class TestHelpdeskMgmtSla(CommonHelpdeskMgmtSla):
     def test_failed_query(self):
         with self.assertRaises(UserError):
             self.env["helpdesk.ticket.sla"].search([("expired", ">", True)])
+
+    def test_batched_deadlines_match_calendar(self):
+        """
+        Deadlines and consumed hours resolved on the shared calendar timeline
+        are the ones resource.calendar computes row by row
+        """
+        calendar = self.env.company.resource_calendar_id
+        self.team1.resource_calendar_id = calendar
+        self.sla.hours = 30
+        tickets = self.env["helpdesk.ticket"]
+        for _i in range(10):
+            tickets |= self.get_ticket(self.team1)
+        base = fields.Datetime.now()
+        for index, ticket_sla in enumerate(tickets.ticket_sla_ids):
+            ticket_sla.last_state_date = base + timedelta(hours=7 * index)
+        for ticket_sla in tickets.ticket_sla_ids:
+            expected = calendar.plan_hours(
+                30, ticket_sla.last_state_date, compute_leaves=True
+            )
+            self.assertEqual(ticket_sla.deadline, expected)
+        now = fields.Datetime.now() + timedelta(days=5)
+        with freeze_time(now):
+            started = {sla: sla.last_state_date for sla in tickets.ticket_sla_ids}
+            tickets.write({"stage_id": self.stage1_1.id})
+        for ticket_sla, start in started.items():
+            self.assertAlmostEqual(
+                ticket_sla.consumed_time,
+                calendar.get_work_hours_count(start, now, compute_leaves=True),
+                places=4,
+            )
+
+    def test_exceeded_sla_deadline_planned_backwards(self):
+        """
+        An SLA that consumed more than its hours gets a deadline in the past,
+        the one resource.calendar plans backwards from its last state date
+        """
+        calendar = self.env.company.resource_calendar_id
+        self.team1.resource_calendar_id = calendar
+        self.sla.hours = 4
+        ticket_sla = self.get_ticket(self.team1).ticket_sla_ids
+        start = ticket_sla.last_state_date
+        ticket_sla.consumed_time = 20
+        expected = calendar.plan_hours(-16, start, compute_leaves=True)
+        self.assertTrue(expected)
+        self.assertLess(expected, start)
+        self.assertEqual(ticket_sla.deadline, expected)
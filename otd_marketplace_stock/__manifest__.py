@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'OTD Marketplace Stock',
-    'version': '19.0.1.0.0',
+    'version': '19.0.1.1.0',
     'summary': 'Central stock & marketplace integrations (Shopee, Lazada, TikTok)',
     'category': 'Inventory/Sales',
     'author': 'OTD',
@@ -29,6 +29,7 @@
         'views/order_views.xml',
         'views/sync_rule_views.xml',
         'views/job_queue_views.xml',
+        'views/api_trace_views.xml',
         'views/pull_orders_wizard_views.xml',
         'views/dashboard_views.xml',
         'views/enable_track_inventory_wizard_views.xml',
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Merge duplicate (shop_id, external_sku) bindings before the unique index is built
+
+The former Python constraint searched active bindings only, so an archived and
+an active binding could share a SKU (action_create_bindings_from_orders created
+such pairs). Per SKU the active, most recently written binding is kept; order
+lines and chatter of the others are moved onto it before they are deleted.
+"""
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        CREATE TEMPORARY TABLE marketplace_binding_merge ON COMMIT DROP AS
+        SELECT id AS old_id, keep_id
+          FROM (
+                SELECT id,
+                       FIRST_VALUE(id) OVER (
+                           PARTITION BY shop_id, external_sku
+                           ORDER BY active DESC NULLS LAST, write_date DESC NULLS LAST, id DESC
+                       ) AS keep_id
+                  FROM marketplace_product_binding
+               ) ranked
+         WHERE id != keep_id
+    """)
+    cr.execute('SELECT COUNT(*) FROM marketplace_binding_merge')
+    duplicates = cr.fetchone()[0]
+    if not duplicates:
+        return
+    cr.execute("""
+        UPDATE marketplace_order_line line
+           SET product_binding_id = m.keep_id
+          FROM marketplace_binding_merge m
+         WHERE line.product_binding_id = m.old_id
+    """)
+    cr.execute("""
+        UPDATE mail_message msg
+           SET res_id = m.keep_id
+          FROM marketplace_binding_merge m
+         WHERE msg.model = 'marketplace.product.binding'
+           AND msg.res_id = m.old_id
+    """)
+    cr.execute("""
+        DELETE FROM mail_followers f
+         USING marketplace_binding_merge m
+         WHERE f.res_model = 'marketplace.product.binding'
+           AND f.res_id = m.old_id
+    """)
+    cr.execute("""
+        DELETE FROM mail_activity a
+         USING marketplace_binding_merge m
+         WHERE a.res_model = 'marketplace.product.binding'
+           AND a.res_id = m.old_id
+    """)
+    cr.execute("""
+        DELETE FROM marketplace_product_binding b
+         USING marketplace_binding_merge m
+         WHERE b.id = m.old_id
+    """)
+    _logger.info('Merged %s duplicate (shop, external SKU) marketplace bindings', duplicates)
@@ -3,11 +3,15 @@
 from . import marketplace_channel
 from . import marketplace_account
 from . import marketplace_shop
+from . import marketplace_shop_job_status
 from . import marketplace_product_binding
 from . import marketplace_order
 from . import sync_rule
 from . import job_queue
+from . import marketplace_job_event
 from . import stock_sync
+from . import api_trace
+from . import job_logging
 from . import adapters
 from . import shopee_adapter
 from . import lazada_adapter
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from odoo import models, fields
 from odoo.exceptions import UserError
 import requests
@@ -10,6 +11,11 @@ from datetime import datetime, timedelta
 import json
 import hmac
 import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from .api_trace import ApiStats, ApiTraceSpan, TRACE_SINKS
+from .token_manager import TokenManager
 
 _logger = logging.getLogger(__name__)
 
@@ -17,13 +23,52 @@ _logger = logging.getLogger(__name__)
 class MarketplaceAdapter(ABC):
     """Abstract base class for marketplace adapters"""
     
+    # Adapters raise ValueError('<Channel> API error (<code>): <message>') for API errors
+    API_ERROR_CODE_RE = re.compile(r'API error \(([^)]*)\)')
+    # API error codes refusing a call for the whole account rather than for its
+    # items: throttled calls are retried after a backoff, auth errors fail as is
+    THROTTLE_ERROR_CODES = frozenset()
+    AUTH_ERROR_CODES = frozenset()
+    THROTTLE_BACKOFF_SECONDS = 5
+    
     def __init__(self, account, shop=None):
         self.account = account
         self.shop = shop
         self.env = account.env
+        # Plain copies for API tracing, which also runs on worker threads
+        self.channel = account.channel
+        self.shop_id = shop.id if shop else False
         self.base_url = self._get_base_url()
         self.timeout = 30
         self.max_retries = 3
+        self._trace_sinks, self._trace_sample_rate = self._build_trace_sinks()
+        # Observed API behaviour, read by the adaptive push scheduler
+        self.api_stats = ApiStats()
+        # Optional concurrency override for adapters that push items in parallel
+        self.max_workers = None
+        # Token resolved before worker threads start, see _pinned_access_token()
+        self._pinned_token = None
+    
+    def _build_trace_sinks(self):
+        """Instantiate the trace sinks configured on the account"""
+        sink_name = getattr(self.account, 'api_trace_sink', None) or 'none'
+        sink_class = TRACE_SINKS.get(sink_name)
+        if not sink_class:
+            return [], 0.0
+        sample_rate = self.account.api_trace_sample_rate
+        return [sink_class(self.account)], min(1.0, max(0.0, sample_rate or 0.0))
+    
+    def _trace(self, method, endpoint):
+        """Return a span timing one API request (no-op when tracing is disabled)"""
+        return ApiTraceSpan(
+            self._trace_sinks,
+            self._trace_sample_rate,
+            self.channel,
+            self.shop_id,
+            method,
+            endpoint,
+            stats=self.api_stats,
+        )
     
     @abstractmethod
     def _get_base_url(self):
@@ -63,13 +108,96 @@ class MarketplaceAdapter(ABC):
         """Update inventory on marketplace
         
         Args:
-            items: list of tuples (external_sku, quantity)
+            items: list of tuples (external_sku, quantity) or dicts with
+                   'sku'/'external_sku', 'quantity' and optional 'external_product_id'
         
         Returns:
             dict with results per item
         """
         pass
     
+    def _inventory_pairs(self, items):
+        """Normalize update_inventory items to (external_sku, quantity) tuples
+        
+        push_stock jobs send dicts, older callers send tuples. Items without SKU
+        or quantity are dropped; a SKU given twice keeps its last quantity.
+        """
+        pairs = {}
+        for item in items:
+            if isinstance(item, (tuple, list)):
+                sku, qty = item[0], item[1]
+            else:
+                sku = item.get('external_sku') or item.get('sku')
+                qty = item.get('quantity')
+            if not sku or qty is None:
+                continue
+            pairs[sku] = max(0, int(qty))
+        return list(pairs.items())
+    
+    def _push_inventory_chunks(self, pairs, chunk_size, default_workers, push_chunk):
+        """Split (sku, qty) pairs at chunk_size and run push_chunk over them concurrently
+        
+        Concurrency is max_workers (set by the adaptive push scheduler) or
+        default_workers. push_chunk(chunk) must return {sku: result}.
+        
+        Returns:
+            (results, chunk count, workers used)
+        """
+        chunks = [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+        workers = min(self.max_workers or default_workers, len(chunks))
+        
+        results = {}
+        if workers <= 1:
+            for chunk in chunks:
+                results.update(push_chunk(chunk))
+        else:
+            with self._pinned_access_token(), ThreadPoolExecutor(max_workers=workers) as executor:
+                for chunk_results in executor.map(push_chunk, chunks):
+                    results.update(chunk_results)
+        return results, len(chunks), workers
+    
+    @contextmanager
+    def _pinned_access_token(self):
+        """Resolve the access token once and serve it to worker threads
+        
+        TokenManager reads the account through the job's cursor on a cache
+        miss, which worker threads must never do.
+        """
+        self._pinned_token = self._get_access_token()
+        try:
+            yield self._pinned_token
+        finally:
+            self._pinned_token = None
+    
+    def _api_error_code(self, error):
+        """Code of an API error raised by _make_request, None for other errors"""
+        match = self.API_ERROR_CODE_RE.search(str(error))
+        return match.group(1) if match else None
+    
+    def _is_item_error(self, error):
+        """Whether an API error may come from the items of the call
+        
+        Only those are worth bisecting a chunk for; throttling, auth and
+        malformed responses would fail every half the same way.
+        """
+        code = self._api_error_code(error)
+        return bool(code) and code not in self.THROTTLE_ERROR_CODES | self.AUTH_ERROR_CODES
+    
+    def _call_with_throttle_backoff(self, call, *args, **kwargs):
+        """Run call, backing off and retrying while the API answers with a throttle code"""
+        for attempt in range(self.max_retries):
+            try:
+                return call(*args, **kwargs)
+            except ValueError as e:
+                if self._api_error_code(e) not in self.THROTTLE_ERROR_CODES:
+                    raise
+                self.api_stats.add(throttled=1)
+                if attempt == self.max_retries - 1:
+                    raise
+                wait_time = self.THROTTLE_BACKOFF_SECONDS * 2 ** attempt
+                _logger.warning('API call throttled, retrying in %ss: %s', wait_time, e)
+                time.sleep(wait_time)
+    
     @abstractmethod
     def verify_webhook(self, headers, body):
         """Verify webhook signature"""
@@ -81,9 +209,10 @@ class MarketplaceAdapter(ABC):
         pass
     
     def _get_access_token(self):
-        """Get valid access token (refresh if needed)"""
-        self.account._check_token_expiry()
-        return self.account.access_token
+        """Get valid access token (cached; refreshed ahead of expiry by cron_refresh_tokens)"""
+        if self._pinned_token:
+            return self._pinned_token
+        return TokenManager(self.env).get_token(self.account)
     
     def _make_request(self, method, endpoint, params=None, data=None, headers=None):
         """Make API request with retry and rate limiting"""
@@ -99,35 +228,38 @@ class MarketplaceAdapter(ABC):
         
         headers.setdefault('Content-Type', 'application/json')
         
-        for attempt in range(self.max_retries):
-            try:
-                response = requests.request(
-                    method=method,
-                    url=url,
-                    params=params,
-                    json=data,
-                    headers=headers,
-                    timeout=self.timeout,
-                )
-                
-                # Handle rate limiting
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 60))
-                    _logger.warning(f'Rate limited, waiting {retry_after} seconds')
-                    time.sleep(retry_after)
-                    continue
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                if attempt == self.max_retries - 1:
-                    raise
-                wait_time = 2 ** attempt
-                _logger.warning(f'Request failed, retrying in {wait_time}s: {e}')
-                time.sleep(wait_time)
-        
-        raise Exception('Request failed after retries')
+        with self._trace(method, endpoint) as span:
+            for attempt in range(self.max_retries):
+                span.retries = attempt
+                try:
+                    response = requests.request(
+                        method=method,
+                        url=url,
+                        params=params,
+                        json=data,
+                        headers=headers,
+                        timeout=self.timeout,
+                    )
+                    span.record_response(response)
+                    
+                    # Handle rate limiting
+                    if response.status_code == 429:
+                        retry_after = int(response.headers.get('Retry-After', 60))
+                        _logger.warning(f'Rate limited, waiting {retry_after} seconds')
+                        time.sleep(retry_after)
+                        continue
+                    
+                    response.raise_for_status()
+                    return response.json()
+                    
+                except requests.exceptions.RequestException as e:
+                    if attempt == self.max_retries - 1:
+                        raise
+                    wait_time = 2 ** attempt
+                    _logger.warning(f'Request failed, retrying in {wait_time}s: {e}')
+                    time.sleep(wait_time)
+            
+            raise Exception('Request failed after retries')
 
 
 class MarketplaceAdapters(models.Model):
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from collections import deque
+from datetime import timedelta
+import logging
+import random
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# In-memory ring buffers keyed by (dbname, account_id)
+RING_BUFFER_SIZE = 500
+_ring_buffers = {}
+_ring_lock = threading.Lock()
+
+
+class ApiTraceSink:
+    """Base class for API trace sinks"""
+
+    def __init__(self, account):
+        self.account_id = account.id
+        self.dbname = account.env.cr.dbname
+
+    def emit(self, trace):
+        """Record a finished trace (dict)"""
+        raise NotImplementedError
+
+
+class LogTraceSink(ApiTraceSink):
+    """Write one INFO line per traced request to the server log"""
+
+    def emit(self, trace):
+        _logger.info(
+            'API %s %s %s -> %s (%s bytes) in %.1f ms, retries=%s%s',
+            trace['channel'], trace['method'], trace['endpoint'],
+            trace['status_code'], trace['response_bytes'], trace['duration_ms'],
+            trace['retries'], f", error={trace['error']}" if trace['error'] else '',
+        )
+
+
+class MemoryTraceSink(ApiTraceSink):
+    """Keep the most recent traces per account in a process-local ring buffer"""
+
+    def emit(self, trace):
+        key = (self.dbname, self.account_id)
+        with _ring_lock:
+            buffer = _ring_buffers.get(key)
+            if buffer is None:
+                buffer = _ring_buffers[key] = deque(maxlen=RING_BUFFER_SIZE)
+            buffer.append(trace)
+
+
+class DatabaseTraceSink(ApiTraceSink):
+    """Persist traces to marketplace.api.trace
+
+    Uses a dedicated cursor so traces survive job rollbacks and can be emitted
+    from worker threads (e.g. concurrent WooCommerce stock updates).
+    """
+
+    def __init__(self, account):
+        super().__init__(account)
+        self.registry = account.env.registry
+
+    def emit(self, trace):
+        try:
+            with self.registry.cursor() as cr:
+                cr.execute("""
+                    INSERT INTO marketplace_api_trace (
+                        account_id, shop_id, channel, method, endpoint, status_code,
+                        response_bytes, duration_ms, retries, error, create_date, write_date
+                    ) VALUES (
+                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                        NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+                    )
+                """, (
+                    self.account_id, trace['shop_id'] or None, trace['channel'], trace['method'],
+                    trace['endpoint'][:255], trace['status_code'] or None, trace['response_bytes'],
+                    trace['duration_ms'], trace['retries'], trace['error'] or None,
+                ))
+        except Exception as e:
+            _logger.debug('Failed to persist API trace for account %s: %s', self.account_id, e)
+
+
+TRACE_SINKS = {
+    'log': LogTraceSink,
+    'memory': MemoryTraceSink,
+    'database': DatabaseTraceSink,
+}
+
+
+def register_trace_sink(name, sink_class):
+    """Register an additional trace sink class under name"""
+    TRACE_SINKS[name] = sink_class
+
+
+def get_recent_traces(dbname, account_id):
+    """Return a copy of the in-memory traces for an account (oldest first)"""
+    with _ring_lock:
+        return list(_ring_buffers.get((dbname, account_id), ()))
+
+
+class ApiStats(dict):
+    """API counters of one adapter (requests/throttled/calls/latency_ms)
+
+    Adapters push items from worker threads, so counters are only updated
+    through add(), which holds a lock. Read like a plain dict.
+    """
+
+    def __init__(self):
+        super().__init__(requests=0, throttled=0, calls=0, latency_ms=0.0)
+        self._lock = threading.Lock()
+
+    def add(self, **amounts):
+        with self._lock:
+            for key, amount in amounts.items():
+                self[key] += amount
+
+
+class ApiTraceSpan:
+    """Context manager timing one logical API request (including retries)
+
+    Usage inside an adapter's _make_request::
+
+        with self._trace(method, endpoint) as span:
+            for attempt in range(self.max_retries):
+                span.retries = attempt
+                response = requests.get(...)
+                span.record_response(response)
+    """
+
+    __slots__ = ('sinks', 'stats', 'channel', 'shop_id', 'method', 'endpoint', 'status_code',
+                 'response_bytes', 'retries', 'sampled', '_started')
+
+    def __init__(self, sinks, sample_rate, channel, shop_id, method, endpoint, stats=None):
+        self.sinks = sinks
+        # Optional ApiStats counters kept by the adapter
+        self.stats = stats
+        self.channel = channel
+        self.shop_id = shop_id
+        self.method = (method or '').upper()
+        self.endpoint = endpoint or ''
+        self.status_code = None
+        self.response_bytes = 0
+        self.retries = 0
+        self.sampled = bool(sinks) and (sample_rate >= 1.0 or random.random() < sample_rate)
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def record_response(self, response):
+        """Capture status and size of the last HTTP response"""
+        if response is None:
+            return
+        if self.stats is not None:
+            self.stats.add(requests=1, throttled=int(response.status_code == 429))
+        if not self.sinks:
+            return
+        self.status_code = response.status_code
+        try:
+            self.response_bytes = len(response.content or b'')
+        except Exception:
+            self.response_bytes = 0
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.stats is not None:
+            self.stats.add(calls=1, latency_ms=(time.monotonic() - self._started) * 1000.0)
+        if not self.sinks:
+            return False
+        # Failed calls are always traced, successful ones only when sampled
+        if not (self.sampled or exc is not None):
+            return False
+        if exc is not None and self.status_code is None:
+            response = getattr(exc, 'response', None)
+            if response is not None:
+                self.record_response(response)
+        trace = {
+            'channel': self.channel,
+            'shop_id': self.shop_id,
+            'method': self.method,
+            'endpoint': self.endpoint,
+            'status_code': self.status_code,
+            'response_bytes': self.response_bytes,
+            'duration_ms': (time.monotonic() - self._started) * 1000.0,
+            'retries': self.retries,
+            'error': str(exc)[:500] if exc is not None else '',
+            'timestamp': time.time(),
+        }
+        for sink in self.sinks:
+            try:
+                sink.emit(trace)
+            except Exception as e:
+                _logger.debug('API trace sink %s failed: %s', type(sink).__name__, e)
+        return False
+
+
+class MarketplaceApiTrace(models.Model):
+    _name = 'marketplace.api.trace'
+    _description = 'Marketplace API Trace'
+    _order = 'id desc'
+
+    account_id = fields.Many2one('marketplace.account', string='Account', ondelete='cascade', index=True)
+    shop_id = fields.Many2one('marketplace.shop', string='Shop', ondelete='set null')
+    channel = fields.Char(string='Channel', index=True)
+    method = fields.Char(string='Method')
+    endpoint = fields.Char(string='Endpoint', index=True)
+    status_code = fields.Integer(string='HTTP Status')
+    response_bytes = fields.Integer(string='Response Bytes')
+    duration_ms = fields.Float(string='Duration (ms)', digits=(12, 1), aggregator='sum')
+    retries = fields.Integer(string='Retries')
+    error = fields.Text(string='Error')
+
+    @api.model
+    def get_endpoint_summary(self, account_id=None, hours=24):
+        """Return per-endpoint call counts and wall time, slowest first"""
+        domain = [('create_date', '>=', fields.Datetime.now() - timedelta(hours=hours))]
+        if account_id:
+            domain.append(('account_id', '=', account_id))
+        groups = self._read_group(
+            domain, ['channel', 'endpoint'],
+            ['__count', 'duration_ms:sum', 'duration_ms:max', 'retries:sum'],
+        )
+        summary = [{
+            'channel': channel,
+            'endpoint': endpoint,
+            'calls': count,
+            'total_ms': total_ms or 0.0,
+            'max_ms': max_ms or 0.0,
+            'retries': retries or 0,
+        } for channel, endpoint, count, total_ms, max_ms, retries in groups]
+        return sorted(summary, key=lambda row: row['total_ms'], reverse=True)
+
+    @api.autovacuum
+    def _gc_old_traces(self):
+        """Delete traces older than marketplace.api_trace.retention_days (default 7)"""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'marketplace.api_trace.retention_days', 7) or 7)
+        self.env.cr.execute(
+            "DELETE FROM marketplace_api_trace WHERE create_date < NOW() AT TIME ZONE 'UTC' - %s * INTERVAL '1 day'",
+            (days,)
+        )
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Account-level verbosity for job logging
+#   summary: one summary line per job, warnings/errors rate-limited
+#   normal:  also per-batch/per-page progress lines (rate-limited)
+#   debug:   everything, no rate limiting
+JOB_LOG_VERBOSITY = [
+    ('summary', 'Summary (one line per job)'),
+    ('normal', 'Normal'),
+    ('debug', 'Debug (verbose)'),
+]
+_VERBOSITY_RANK = {'summary': 0, 'normal': 1, 'debug': 2}
+
+# Rate limiting of repeated messages (same logger + template)
+RATE_LIMIT_WINDOW_SECONDS = 60
+RATE_LIMIT_BURST = 5
+
+_local = threading.local()
+
+
+class JobLog:
+    """Per-job structured log context
+
+    Collects counters while a job runs, forwards hot-path messages according to
+    the account verbosity (with lazy %-formatting and rate limiting of repeated
+    templates) and emits a single summary line when the job finishes.
+
+    Usage::
+
+        with JobLog(job) as log:
+            log.incr('orders', len(orders))
+            job_log(_logger, logging.DEBUG, 'Fetched page %s', page)
+    """
+
+    def __init__(self, job, verbosity=None):
+        self.job_id = job.id
+        self.job_type = job.job_type
+        self.account_id = job.account_id.id if job.account_id else False
+        self.shop_id = job.shop_id.id if job.shop_id else False
+        if verbosity is None:
+            verbosity = (job.account_id.job_log_verbosity if job.account_id else None) or 'summary'
+        self.verbosity = _VERBOSITY_RANK.get(verbosity, 0)
+        self.counters = {}
+        self.suppressed = 0
+        self._seen = {}
+        self._started = None
+        self._previous = None
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        self._previous = getattr(_local, 'job_log', None)
+        _local.job_log = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _local.job_log = self._previous
+        return False
+
+    def incr(self, key, value=1):
+        """Add value to a named counter reported in the job summary"""
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, key, value):
+        """Set a named value reported in the job summary"""
+        self.counters[key] = value
+
+    def _allowed(self, level):
+        if level >= logging.WARNING:
+            return True
+        if level >= logging.INFO:
+            return self.verbosity >= 1
+        return self.verbosity >= 2
+
+    def log(self, logger, level, msg, *args):
+        """Forward a message if allowed by verbosity and the rate limiter"""
+        if not self._allowed(level):
+            # Still honour an explicitly enabled DEBUG logger (e.g. --log-handler)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(msg, *args)
+            return
+        if self.verbosity < 2:
+            key = (logger.name, msg)
+            now = time.monotonic()
+            window_start, count = self._seen.get(key, (now, 0))
+            if now - window_start > RATE_LIMIT_WINDOW_SECONDS:
+                window_start, count = now, 0
+            count += 1
+            self._seen[key] = (window_start, count)
+            if count > RATE_LIMIT_BURST:
+                self.suppressed += 1
+                return
+        logger.log(level, msg, *args)
+
+    def summary_line(self, state):
+        """Build the %-format string and args for the job summary line"""
+        duration = time.monotonic() - self._started if self._started else 0.0
+        parts = ' '.join(f'{key}={value}' for key, value in sorted(self.counters.items()))
+        return (
+            'job=%s type=%s account=%s shop=%s state=%s duration=%.1fs suppressed=%s %s',
+            (self.job_id, self.job_type, self.account_id or '-', self.shop_id or '-',
+             state, duration, self.suppressed, parts),
+        )
+
+    def emit_summary(self, state, logger=None):
+        """Emit the single per-job summary line"""
+        msg, args = self.summary_line(state)
+        level = logging.INFO if state == 'done' else logging.WARNING
+        (logger or _logger).log(level, msg, *args)
+
+
+def current_job_log():
+    """Return the JobLog active in this thread, if any"""
+    return getattr(_local, 'job_log', None)
+
+
+def job_log(logger, level, msg, *args):
+    """Log a hot-path message through the active JobLog
+
+    Outside a job (e.g. a button click) the message is passed to logger
+    unchanged, so DEBUG/INFO lines stay lazy and respect the logger level.
+    """
+    log = getattr(_local, 'job_log', None)
+    if log is not None:
+        log.log(logger, level, msg, *args)
+    elif logger.isEnabledFor(level):
+        logger.log(level, msg, *args)
+
+
+def job_count(key, value=1):
+    """Increment a summary counter on the active JobLog (no-op outside jobs)"""
+    log = getattr(_local, 'job_log', None)
+    if log is not None:
+        log.incr(key, value)
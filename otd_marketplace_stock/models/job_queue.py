@@ -13,6 +13,7 @@ _logger = logging.getLogger(__name__)
 
 # Import StockSyncService for calculating available quantity
 from ..models.stock_sync import StockSyncService
+from .job_logging import JobLog, job_log, job_count
 
 
 class MarketplaceJob(models.Model):
@@ -35,6 +36,8 @@ class MarketplaceJob(models.Model):
         ('lazada_push_stock', 'Lazada: Sync Stock'),
         ('lazada_backfill_orders', 'Lazada: Backfill Orders'),
         ('woocommerce_backfill_orders', 'WooCommerce: Backfill Orders'),
+        ('apply_inventory', 'Apply Inventory Adjustments'),
+        ('fix_track_inventory', 'Fix Track Inventory'),
         ('webhook', 'Process Webhook'),
     ], string='Job Type', required=True, index=True)
     
@@ -54,7 +57,7 @@ class MarketplaceJob(models.Model):
         ('done', 'Done'),
         ('failed', 'Failed'),
         ('dead', 'Dead Letter'),
-    ], string='State', default='pending', index=True, tracking=True)
+    ], string='State', default='pending', index=True)
     
     priority = fields.Selection([
         ('high', 'High'),
@@ -85,6 +88,21 @@ class MarketplaceJob(models.Model):
     # Relations
     account_id = fields.Many2one('marketplace.account', string='Account', ondelete='cascade', index=True)
     shop_id = fields.Many2one('marketplace.shop', string='Shop', ondelete='cascade', index=True)
+    # State transitions (lean event log instead of chatter)
+    event_ids = fields.One2many('marketplace.job.event', 'job_id', string='Events', readonly=True)
+
+    # Range scans for the retention purge (only done jobs are ever purged)
+    _done_completed_at_idx = models.Index("(completed_at) WHERE state = 'done'")
+
+    # Push scheduling (chosen by AdaptivePushScheduler) and observed API behaviour
+    push_batch_size = fields.Integer(string='Push Batch Size', readonly=True)
+    push_workers = fields.Integer(string='Push Workers', readonly=True, help='Concurrent API workers (0 = adapter default)')
+    push_spacing_seconds = fields.Integer(string='Batch Spacing (s)', readonly=True)
+    push_plan_reason = fields.Char(string='Push Plan', readonly=True)
+    api_request_count = fields.Integer(string='API Requests', readonly=True)
+    api_throttled_count = fields.Integer(string='API 429 Responses', readonly=True)
+    api_latency_ms = fields.Float(string='Avg API Latency (ms)', readonly=True, digits=(10, 1))
+    push_failed_shop_count = fields.Integer(string='Failed Shop Pushes', readonly=True)
 
     @api.depends('started_at', 'completed_at')
     def _compute_duration_seconds(self):
@@ -130,13 +148,20 @@ class MarketplaceJob(models.Model):
             jobs_to_fix.write({'next_run_at': now})
             _logger.warning(f'Fixed {len(jobs_to_fix)} jobs with missing next_run_at')
         
+        self.env['marketplace.shop.job.status']._upsert_from_jobs(jobs)
         return jobs
 
+    # Fields mirrored into marketplace.shop.job.status (shop dashboard cards)
+    _SHOP_STATUS_FIELDS = {'state', 'result', 'last_error', 'started_at', 'completed_at', 'shop_id', 'job_type'}
+
     def write(self, vals):
         """Ensure payload is JSON string when writing"""
         if 'payload' in vals and isinstance(vals['payload'], dict):
             vals['payload'] = json.dumps(vals['payload'], ensure_ascii=False)
-        return super().write(vals)
+        res = super().write(vals)
+        if self._SHOP_STATUS_FIELDS.intersection(vals):
+            self.env['marketplace.shop.job.status']._upsert_from_jobs(self)
+        return res
 
     def _update_progress(self, processed, total):
         """Update job progress
@@ -317,6 +342,8 @@ class MarketplaceJob(models.Model):
                 result = self._execute_lazada_backfill_orders()
             elif self.job_type == 'woocommerce_backfill_orders':
                 result = self._execute_woocommerce_backfill_orders()
+            elif self.job_type in ('apply_inventory', 'fix_track_inventory'):
+                result = self._execute_inventory_maintenance()
             elif self.job_type == 'webhook':
                 result = self._execute_webhook()
             else:
@@ -331,77 +358,83 @@ class MarketplaceJob(models.Model):
         """Execute job with retry logic"""
         self.ensure_one()
         
-        try:
-            # Initialize job state
-            self.write({
-                'state': 'in_progress',
-                'started_at': fields.Datetime.now(),
-                'progress': 0.0,
-                'total_items': 0,
-                'processed_items': 0,
-            })
-            self.env.cr.commit()
-            
-            # Execute job
-            result = self._execute()
-            
-            # Success
-            self.write({
-                'state': 'done',
-                'completed_at': fields.Datetime.now(),
-                'result': json.dumps(result, ensure_ascii=False) if result else '',
-                'last_error': False,
-                'progress': 100.0,  # Mark as 100% complete
-            })
-            # Commit transaction to ensure state is saved to database
-            # This prevents jobs from getting stuck in 'in_progress' state
-            self.env.cr.commit()
-            
-            # Post success message (wrapped in try-except to prevent errors)
+        # Hot paths log through job_log(); one summary line is emitted per job
+        with JobLog(self) as job_log_ctx:
             try:
-                self.message_post(body=f'Job completed successfully: {self.name}')
-            except Exception as msg_error:
-                _logger.warning(f'Failed to post success message for job {self.id}: {msg_error}')
-            
-            return result
-            
-        except Exception as e:
-            error_msg = str(e)
-            _logger.error(f'Job {self.id} ({self.name}) failed: {error_msg}', exc_info=True)
-            
-            # Check if we should retry
-            if self.retries < self.max_retries:
-                # Retry with exponential backoff
-                backoff_minutes = 2 ** self.retries  # 2, 4, 8 minutes
+                # Initialize job state
                 self.write({
-                    'state': 'pending',
-                    'next_run_at': fields.Datetime.now() + timedelta(minutes=backoff_minutes),
-                    'last_error': error_msg,
-                    'retries': self.retries + 1,
+                    'state': 'in_progress',
+                    'started_at': fields.Datetime.now(),
+                    'progress': 0.0,
+                    'total_items': 0,
+                    'processed_items': 0,
                 })
-                # Commit transaction to ensure state is saved
+                self.env['marketplace.job.event']._append(self, 'started')
                 self.env.cr.commit()
-                
-                _logger.warning(f'Job {self.id} will retry in {backoff_minutes} minutes (attempt {self.retries + 1}/{self.max_retries})')
-            else:
-                # Move to dead letter
+            
+                # Execute job
+                result = self._execute()
+            
+                # Success
                 self.write({
-                    'state': 'dead',
+                    'state': 'done',
                     'completed_at': fields.Datetime.now(),
-                    'last_error': error_msg,
+                    'result': json.dumps(result, ensure_ascii=False) if result else '',
+                    'last_error': False,
+                    'progress': 100.0,  # Mark as 100% complete
                 })
-                # Commit transaction to ensure state is saved
+                # Success goes to the event log only (no chatter: highest-volume records)
+                self.env['marketplace.job.event']._append(
+                    self, 'done', result.get('message') if isinstance(result, dict) else None,
+                )
+                # Commit transaction to ensure state is saved to database
+                # This prevents jobs from getting stuck in 'in_progress' state
                 self.env.cr.commit()
+                job_log_ctx.emit_summary('done')
+            
+                return result
+            
+            except Exception as e:
+                error_msg = str(e)
+                _logger.error(f'Job {self.id} ({self.name}) failed: {error_msg}', exc_info=True)
+            
+                # Check if we should retry
+                if self.retries < self.max_retries:
+                    # Retry with exponential backoff
+                    backoff_minutes = 2 ** self.retries  # 2, 4, 8 minutes
+                    self.write({
+                        'state': 'pending',
+                        'next_run_at': fields.Datetime.now() + timedelta(minutes=backoff_minutes),
+                        'last_error': error_msg,
+                        'retries': self.retries + 1,
+                    })
+                    self.env['marketplace.job.event']._append(self, 'retry', error_msg)
+                    # Commit transaction to ensure state is saved
+                    self.env.cr.commit()
                 
-                _logger.error(f'Job {self.id} moved to dead letter after {self.max_retries} retries')
+                    _logger.warning('Job %s will retry in %s minutes (attempt %s/%s)', self.id, backoff_minutes, self.retries, self.max_retries)
+                    job_log_ctx.emit_summary('retry')
+                else:
+                    # Move to dead letter
+                    self.write({
+                        'state': 'dead',
+                        'completed_at': fields.Datetime.now(),
+                        'last_error': error_msg,
+                    })
+                    self.env['marketplace.job.event']._append(self, 'dead', error_msg)
+                    # Commit transaction to ensure state is saved
+                    self.env.cr.commit()
                 
-                # Post error message (wrapped in try-except to prevent errors)
-                try:
-                    self.message_post(body=f'Job failed after {self.max_retries} retries: {error_msg}')
-                except Exception as msg_error:
-                    _logger.warning(f'Failed to post error message for job {self.id}: {msg_error}')
+                    _logger.error('Job %s moved to dead letter after %s retries', self.id, self.max_retries)
+                    job_log_ctx.emit_summary('dead')
+                
+                    # Dead letters need a human: keep them in chatter
+                    try:
+                        self.message_post(body=f'Job failed after {self.max_retries} retries: {error_msg}')
+                    except Exception as msg_error:
+                        _logger.warning(f'Failed to post error message for job {self.id}: {msg_error}')
             
-            raise
+                raise
 
     @api.model
     def cron_run_jobs(self, job_ids=None):
@@ -417,7 +450,7 @@ class MarketplaceJob(models.Model):
         if not jobs:
             return
         
-        _logger.warning(f'🔄 Processing {len(jobs)} jobs')
+        _logger.info('🔄 Processing %s jobs', len(jobs))
         
         # Double-check max_concurrent_jobs constraint before executing
         # This prevents race conditions where multiple cron processes might select the same jobs
@@ -439,7 +472,7 @@ class MarketplaceJob(models.Model):
                 
                 # Check if executing this job would exceed limit
                 if account_execution_counts[account_id] >= max_concurrent:
-                    _logger.warning(f'⏸️  Skipping job #{job.id} ({job.name}) for account {job.account_id.name} - max concurrent reached ({account_execution_counts[account_id]}/{max_concurrent})')
+                    _logger.info('⏸️  Skipping job #%s (%s) for account %s - max concurrent reached (%s/%s)', job.id, job.name, job.account_id.name, account_execution_counts[account_id], max_concurrent)
                     continue
                 
                 account_execution_counts[account_id] += 1
@@ -447,7 +480,7 @@ class MarketplaceJob(models.Model):
             jobs_to_execute |= job
         
         if jobs_to_execute:
-            _logger.warning(f'✅ Executing {len(jobs_to_execute)} jobs (skipped {len(jobs) - len(jobs_to_execute)} due to max_concurrent limit)')
+            _logger.info('✅ Executing %s jobs (skipped %s due to max_concurrent limit)', len(jobs_to_execute), len(jobs) - len(jobs_to_execute))
         
         # Execute jobs
         for job in jobs_to_execute:
@@ -539,7 +572,8 @@ class MarketplaceJob(models.Model):
         #   and for safely persisting `raw_payload` using json.dumps. Pre‑parsing here can introduce
         #   non‑serializable objects (e.g., datetime) which caused "Object of type datetime is not JSON serializable".
         # - Therefore DO NOT change this to map/parse here. Keep it as RAW payloads.
-        if account.channel == 'shopee':
+        # TikTok uses the same list + batched detail pipeline (RAW payloads as well).
+        if account.channel in ('shopee', 'tiktok'):
             detailed_payloads = adapter.fetch_orders_list_with_details(
                 since=date_from,
                 until=date_to,
@@ -552,10 +586,7 @@ class MarketplaceJob(models.Model):
         else:
             # Debug visibility for non-Shopee channels (e.g., Lazada/TikTok)
             if account.channel == 'lazada':
-                _logger.warning(
-                    "🛰️  Lazada pull window: %s .. %s (shop=%s, account=%s)",
-                    date_from, date_to, self.shop_id.name, account.name
-                )
+                job_log(_logger, logging.INFO, '🛰️  Lazada pull window: %s .. %s (shop=%s, account=%s)', date_from, date_to, self.shop_id.name, account.name)
             # Lazada: ใช้ updated window เป็นค่าเริ่มต้นเพื่อกันออเดอร์ที่ถูกแก้ไขภายหลัง
             if account.channel == 'lazada':
                 orders = adapter.fetch_orders(since=date_from, until=date_to, time_field='updated')
@@ -568,10 +599,7 @@ class MarketplaceJob(models.Model):
                         sample_ids.append(
                             o.get('order_id') or o.get('OrderId') or o.get('order_number') or o.get('OrderNumber')
                         )
-                    _logger.warning(
-                        "📦 Lazada pull result: count=%s sample_ids=%s",
-                        len(orders or []), sample_ids
-                    )
+                    job_log(_logger, logging.DEBUG, '📦 Lazada pull result: count=%s sample_ids=%s', len(orders or []), sample_ids)
                 except Exception:
                     pass
         
@@ -581,7 +609,7 @@ class MarketplaceJob(models.Model):
             if not shop.last_order_sync_at:
                 date_from = fields.Datetime.now() - timedelta(days=30)
                 # LOCKED: Same rule as above (see note) — keep RAW payloads for Shopee.
-                if account.channel == 'shopee':
+                if account.channel in ('shopee', 'tiktok'):
                     detailed_payloads = adapter.fetch_orders_list_with_details(
                         since=date_from,
                         until=date_to,
@@ -606,6 +634,7 @@ class MarketplaceJob(models.Model):
         
         # Initialize progress tracking
         total_orders = len(orders)
+        job_count('orders_fetched', total_orders)
         if total_orders > 0:
             self.write({
                 'total_items': total_orders,
@@ -748,19 +777,25 @@ class MarketplaceJob(models.Model):
         total_processed = 0
         total_updated = 0
         total_errors = 0
+        failed_shops = 0
+        api_stats = {'requests': 0, 'throttled': 0, 'calls': 0, 'latency_ms': 0.0}
+        # Get stock sync service (quantities of all bindings in one grouped quant query)
+        stock_sync = StockSyncService(self.env)
+        available_qtys = stock_sync.calculate_available_qtys(bindings)
         
-        for shop_id, bindings in shop_bindings.items():
+        for shop_id, shop_binding_list in shop_bindings.items():
             shop = self.env['marketplace.shop'].browse(shop_id)
             shop_adapter = shop.account_id._get_adapter(shop=shop)
+            # Concurrency chosen by the adaptive push scheduler (None = adapter default)
+            shop_adapter.max_workers = payload.get('workers') or None
             
             # Prepare items to push (with external_product_id if available)
             items_to_push = []
-            # Get stock sync service
-            stock_sync = StockSyncService(self.env)
+            # Bindings actually pushed, aligned with items_to_push
+            pushed_bindings = []
             
-            for binding in bindings:
-                # Use stock_sync service to calculate available quantity
-                available_qty = stock_sync.calculate_available_qty(binding)
+            for binding in shop_binding_list:
+                available_qty = available_qtys.get(binding.id)
                 
                 item = {
                     'sku': binding.external_sku or binding.product_id.default_code,
@@ -773,6 +808,7 @@ class MarketplaceJob(models.Model):
                 
                 if item['quantity'] is not None:
                     items_to_push.append(item)
+                    pushed_bindings.append(binding)
             
             if not items_to_push:
                 continue
@@ -796,7 +832,7 @@ class MarketplaceJob(models.Model):
                 # Update external_product_id for bindings that were pushed successfully
                 # This caches the product ID for future pushes
                 bindings_to_update = []
-                for binding, item in zip(bindings, items_to_push):
+                for binding, item in zip(pushed_bindings, items_to_push):
                     sku = item.get('sku') or item.get('external_sku')
                     item_result = inventory_results.get(sku) if isinstance(inventory_results, dict) else None
                     
@@ -828,7 +864,10 @@ class MarketplaceJob(models.Model):
             except Exception as e:
                 _logger.error(f'Failed to push stock for shop {shop.name}: {e}', exc_info=True)
                 total_errors += len(items_to_push)
+                failed_shops += 1
             
+            for key in api_stats:
+                api_stats[key] += shop_adapter.api_stats[key]
             total_processed += len(items_to_push)
             # Update progress (cumulative across all shops)
             if total_bindings_to_push > 0:
@@ -838,7 +877,20 @@ class MarketplaceJob(models.Model):
         duration_seconds = (fields.Datetime.now() - self.started_at).total_seconds() if self.started_at else 0
         products_per_second = total_processed / duration_seconds if duration_seconds > 0 else 0
         
-        _logger.info(f'📊 Push Stock Performance: {total_processed} products in {duration_seconds:.2f}s ({products_per_second:.2f} products/sec)')
+        avg_latency_ms = api_stats['latency_ms'] / api_stats['calls'] if api_stats['calls'] else 0.0
+        
+        # Report observed API behaviour on the job for the adaptive push scheduler
+        self.write({
+            'api_request_count': api_stats['requests'],
+            'api_throttled_count': api_stats['throttled'],
+            'api_latency_ms': avg_latency_ms,
+            'push_failed_shop_count': failed_shops,
+        })
+        
+        job_count('products_pushed', total_processed)
+        job_count('api_requests', api_stats['requests'])
+        job_count('api_429', api_stats['throttled'])
+        job_log(_logger, logging.INFO, '📊 Push Stock Performance: %s products in %.2fs (%.2f products/sec)', total_processed, duration_seconds, products_per_second)
         
         return {
             'message': f'Pushed stock for {total_processed} products',
@@ -847,6 +899,11 @@ class MarketplaceJob(models.Model):
             'count': total_processed,
             'duration_seconds': duration_seconds,
             'products_per_second': products_per_second,
+            'api_requests': api_stats['requests'],
+            'api_throttled': api_stats['throttled'],
+            'api_latency_ms': round(avg_latency_ms, 1),
+            'batch_size': payload.get('batch_size'),
+            'workers': payload.get('workers'),
         }
     # LOCKED-REGION: สามารถดึงสต็อกจาก Zortout อัตโนมัติ ได้แล้ว ห้ามแก้ตรรกะนี้
     def _execute_sync_stock_from_zortout(self):
@@ -949,7 +1006,7 @@ class MarketplaceJob(models.Model):
                 try:
                     qty = float(raw_qty or 0.0)
                 except (TypeError, ValueError):
-                    _logger.warning(f'⚠️ Invalid quantity "{raw_qty}" for SKU {sku}, skipping')
+                    job_log(_logger, logging.WARNING, '⚠️ Invalid quantity "%s" for SKU %s, skipping', raw_qty, sku)
                     processed_count += 1
                     skipped_count += 1
                     continue
@@ -1023,10 +1080,7 @@ class MarketplaceJob(models.Model):
                                 template.write({'image_1920': base64.b64encode(image_response.content)})
                                 images_downloaded += 1
                             except Exception as image_err:
-                                _logger.warning(
-                                    'Failed to download image for SKU %s from %s: %s',
-                                    sku, image_url, image_err
-                                )
+                                job_log(_logger, logging.WARNING, 'Failed to download image for SKU %s from %s: %s', sku, image_url, image_err)
                     except Exception as create_err:
                         self.env.cr.rollback()
                         _logger.error(
@@ -1051,10 +1105,7 @@ class MarketplaceJob(models.Model):
                             template_to_write.write(update_vals)
                             odoo_product.invalidate_recordset(['type', 'tracking', 'is_storable'])
                         except Exception as write_err:
-                            _logger.warning(
-                                'Failed to update template %s (%s) with values %s: %s',
-                                template.display_name, sku, update_vals, write_err
-                            )
+                            job_log(_logger, logging.WARNING, 'Failed to update template %s (%s) with values %s: %s', template.display_name, sku, update_vals, write_err)
                     if account.company_id:
                         try:
                             company_ctx_template = template.with_company(account.company_id.id)
@@ -1069,10 +1120,7 @@ class MarketplaceJob(models.Model):
                                     'supplier_taxes_id': [(6, 0, purchase_tax.ids)],
                                 })
                         except Exception as tax_err:
-                            _logger.warning(
-                                'Failed to update taxes for product %s (%s): %s',
-                                template.display_name, sku, tax_err
-                            )
+                            job_log(_logger, logging.WARNING, 'Failed to update taxes for product %s (%s): %s', template.display_name, sku, tax_err)
                 
                 # Determine difference from current available quantity
                 available_qty = quant_model._get_available_quantity(
@@ -1181,6 +1229,7 @@ class MarketplaceJob(models.Model):
                 'status': 'success',
                 'created': result.get('created', 0),
                 'updated': result.get('updated', 0),
+                'unchanged': result.get('unchanged', 0),
                 'skipped': result.get('skipped', 0),
                 'not_found': result.get('not_found', 0),
             }
@@ -1231,6 +1280,19 @@ class MarketplaceJob(models.Model):
             )
             raise
 
+    def _execute_inventory_maintenance(self):
+        """Execute apply_inventory / fix_track_inventory jobs (batched, with progress)"""
+        self.ensure_one()
+        account = self.account_id
+        if not account:
+            raise ValueError(f'Account is required for {self.job_type} job')
+        
+        payload = json.loads(self.payload) if self.payload else {}
+        batch_size = max(1, int(payload.get('batch_size') or 500))
+        if self.job_type == 'apply_inventory':
+            return account.sudo()._apply_inventory_batched(job=self, batch_size=batch_size)
+        return account.sudo()._fix_track_inventory_batched(job=self, batch_size=batch_size)
+
     def _execute_webhook(self):
         """Execute webhook job (placeholder)"""
         self.ensure_one()
@@ -1320,6 +1382,7 @@ class MarketplaceJob(models.Model):
             'retries': 0,
             'last_error': False,
         })
+        self.env['marketplace.job.event']._append(self, 'requeued', f'Retried by {self.env.user.name}')
         
         return {
             'type': 'ir.actions.client',
@@ -1341,6 +1404,8 @@ class MarketplaceJob(models.Model):
             'state': 'dead',
             'completed_at': fields.Datetime.now(),
         })
+        self.env['marketplace.job.event']._append(self, 'dead', f'Moved to dead letter by {self.env.user.name}')
+        self.message_post(body=f'Job moved to dead letter manually by {self.env.user.name}')
         
         return {
             'type': 'ir.actions.client',
@@ -1383,6 +1448,8 @@ class MarketplaceJob(models.Model):
             'processed_items': 0,
             'total_items': 0,
         })
+        for job in stuck_jobs:
+            self.env['marketplace.job.event']._append(job, 'requeued', 'Reset after being stuck in progress')
         
         return {
             'type': 'ir.actions.client',
@@ -1451,23 +1518,11 @@ class MarketplaceJob(models.Model):
         Returns:
             dict with cleanup result
         """
-        now = fields.Datetime.now()
-        cutoff_date = now - timedelta(days=days)
-        
-        # Build domain
-        domain = [
-            ('state', '=', 'done'),
-            ('completed_at', '!=', False),
-            ('completed_at', '<', cutoff_date),
-        ]
-        
-        if job_types:
-            domain.append(('job_type', 'in', job_types))
-        
-        # Find old done jobs
-        old_jobs = self.env['marketplace.job'].search(domain, order='completed_at asc')
+        cutoff_date = fields.Datetime.now() - timedelta(days=days)
+        job_types_deleted = self._purge_done_jobs(cutoff_date, job_types=job_types, keep_count=keep_count)
+        deleted_count = sum(job_types_deleted.values())
         
-        if not old_jobs:
+        if not deleted_count:
             return {
                 'type': 'ir.actions.client',
                 'tag': 'display_notification',
@@ -1478,43 +1533,6 @@ class MarketplaceJob(models.Model):
                 }
             }
         
-        # If keep_count is specified, keep the most recent N jobs per job_type
-        if keep_count and keep_count > 0:
-            # Group by job_type
-            jobs_by_type = {}
-            for job in old_jobs:
-                job_type = job.job_type
-                if job_type not in jobs_by_type:
-                    jobs_by_type[job_type] = []
-                jobs_by_type[job_type].append(job)
-            
-            # Keep only the most recent jobs per type
-            jobs_to_delete = []
-            for job_type, jobs in jobs_by_type.items():
-                # Sort by completed_at desc
-                jobs_sorted = sorted(jobs, key=lambda j: j.completed_at or j.create_date, reverse=True)
-                # Keep the most recent N jobs
-                to_keep = jobs_sorted[:keep_count]
-                # Delete the rest
-                to_delete = jobs_sorted[keep_count:]
-                jobs_to_delete.extend(to_delete)
-            
-            old_jobs = jobs_to_delete
-        
-        # Delete jobs
-        deleted_count = len(old_jobs)
-        job_types_deleted = {}
-        for job in old_jobs:
-            job_type = job.job_type
-            job_types_deleted[job_type] = job_types_deleted.get(job_type, 0) + 1
-        
-        # Delete in batches to avoid timeout
-        batch_size = 100
-        for i in range(0, len(old_jobs), batch_size):
-            batch = old_jobs[i:i + batch_size]
-            batch.unlink()
-            self.env.cr.commit()
-        
         # Build summary message
         summary = f'Deleted {deleted_count} old done job(s)'
         if job_types_deleted:
@@ -1531,6 +1549,99 @@ class MarketplaceJob(models.Model):
             }
         }
     
+    # Rows deleted per statement by the retention purge (each chunk is committed)
+    _PURGE_CHUNK_SIZE = 5000
+
+    @api.model
+    def _purge_job_chatter(self, job_ids):
+        """Delete chatter rows of purged jobs in bulk (no per-record unlink cascade)"""
+        self.env.cr.execute(
+            "DELETE FROM mail_message WHERE model = 'marketplace.job' AND res_id = ANY(%s)", (job_ids,)
+        )
+        self.env.cr.execute(
+            "DELETE FROM mail_followers WHERE res_model = 'marketplace.job' AND res_id = ANY(%s)", (job_ids,)
+        )
+        self.env.cr.execute(
+            "DELETE FROM mail_activity WHERE res_model = 'marketplace.job' AND res_id = ANY(%s)", (job_ids,)
+        )
+
+    @api.model
+    def _purge_done_jobs(self, cutoff, account_id=None, job_types=None, keep_count=None, chunk_size=None):
+        """Delete done jobs completed before cutoff with chunked SQL
+        
+        Jobs are deleted in bounded chunks (committed one by one) through the
+        partial index on completed_at, and their chatter is removed with a few
+        set-based statements instead of unlink() cascading per job.
+        
+        Args:
+            cutoff: delete jobs completed before this datetime
+            account_id: restrict to one account (None = all accounts)
+            job_types: list of job types to purge (None = all types)
+            keep_count: keep the N most recent of these old jobs per job type
+            chunk_size: rows per DELETE statement
+        
+        Returns:
+            dict {job_type: deleted_count}
+        """
+        chunk_size = chunk_size or self._PURGE_CHUNK_SIZE
+        where = "state = 'done' AND completed_at < %s"
+        params = [cutoff]
+        if account_id:
+            where += ' AND account_id = %s'
+            params.append(account_id)
+        if job_types:
+            where += ' AND job_type = ANY(%s)'
+            params.append([job_type.strip() for job_type in job_types if job_type.strip()])
+        self.flush_model()
+        
+        # One scope per job type when keeping the N most recent jobs: only rows
+        # older than the N-th most recent one of that type are deleted
+        scopes = [('', [])]
+        if keep_count and keep_count > 0:
+            self.env.cr.execute(f"""
+                SELECT job_type, completed_at, id FROM (
+                    SELECT job_type, completed_at, id,
+                           row_number() OVER (PARTITION BY job_type ORDER BY completed_at DESC, id DESC) AS rn
+                      FROM marketplace_job
+                     WHERE {where}
+                ) ranked
+                 WHERE rn = %s
+            """, params + [keep_count])
+            scopes = [
+                (' AND job_type = %s AND (completed_at, id) < (%s, %s)', [job_type, completed_at, job_id])
+                for job_type, completed_at, job_id in self.env.cr.fetchall()
+            ]
+        
+        deleted = {}
+        for scope_where, scope_params in scopes:
+            while True:
+                self.env.cr.execute(f"""
+                    WITH doomed AS (
+                        SELECT id FROM marketplace_job
+                         WHERE {where}{scope_where}
+                      ORDER BY completed_at
+                         LIMIT %s
+                    )
+                    DELETE FROM marketplace_job j
+                     USING doomed
+                     WHERE j.id = doomed.id
+                 RETURNING j.id, j.job_type
+                """, params + scope_params + [chunk_size])
+                rows = self.env.cr.fetchall()
+                if not rows:
+                    break
+                self._purge_job_chatter([job_id for job_id, __ in rows])
+                for __, job_type in rows:
+                    deleted[job_type] = deleted.get(job_type, 0) + 1
+                self.env.cr.commit()
+                if len(rows) < chunk_size:
+                    break
+        
+        if deleted:
+            self.invalidate_model()
+            self.env['marketplace.shop.job.status'].invalidate_model(['job_id'])
+        return deleted
+
     @api.model
     def cron_cleanup_old_done_jobs(self):
         """Cron method to cleanup old done jobs automatically"""
@@ -1547,48 +1658,16 @@ class MarketplaceJob(models.Model):
                 job_types = account.job_cleanup_job_types.split(',') if account.job_cleanup_job_types else None
                 keep_count = account.job_cleanup_keep_count if account.job_cleanup_keep_count > 0 else None
                 
-                # Get jobs for this account
-                domain = [
-                    ('state', '=', 'done'),
-                    ('account_id', '=', account.id),
-                    ('completed_at', '!=', False),
-                    ('completed_at', '<', fields.Datetime.now() - timedelta(days=days)),
-                ]
-                
-                if job_types:
-                    domain.append(('job_type', 'in', job_types))
-                
-                old_jobs = self.search(domain, order='completed_at asc')
-                
-                if keep_count and keep_count > 0:
-                    # Group by job_type and keep only the most recent N jobs
-                    jobs_by_type = {}
-                    for job in old_jobs:
-                        job_type = job.job_type
-                        if job_type not in jobs_by_type:
-                            jobs_by_type[job_type] = []
-                        jobs_by_type[job_type].append(job)
-                    
-                    jobs_to_delete = []
-                    for job_type, jobs in jobs_by_type.items():
-                        jobs_sorted = sorted(jobs, key=lambda j: j.completed_at, reverse=True)
-                        to_delete = jobs_sorted[keep_count:]
-                        jobs_to_delete.extend(to_delete)
-                    
-                    old_jobs = jobs_to_delete
-                
-                # Delete jobs in batches
-                if old_jobs:
-                    batch_size = 100
-                    for i in range(0, len(old_jobs), batch_size):
-                        batch = old_jobs[i:i + batch_size]
-                        batch.unlink()
-                        self.env.cr.commit()
-                    
-                    total_deleted += len(old_jobs)
-                    _logger.info(f'Cleaned up {len(old_jobs)} old done jobs for account {account.name}')
+                cutoff_date = fields.Datetime.now() - timedelta(days=days)
+                deleted = sum(self._purge_done_jobs(
+                    cutoff_date, account_id=account.id, job_types=job_types, keep_count=keep_count,
+                ).values())
+                if deleted:
+                    total_deleted += deleted
+                    _logger.info(f'Cleaned up {deleted} old done jobs for account {account.name}')
             
             except Exception as e:
+                self.env.cr.rollback()
                 _logger.error(f'Failed to cleanup old jobs for account {account.name}: {e}', exc_info=True)
         
         if total_deleted > 0:
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from .adapters import MarketplaceAdapter
+from .job_logging import job_log
 from odoo import fields
 from datetime import datetime, timedelta, timezone
 import base64
@@ -18,6 +19,15 @@ _logger = logging.getLogger(__name__)
 class LazadaAdapter(MarketplaceAdapter):
     """Lazada marketplace adapter"""
 
+    # Max SKUs per /product/stock/sellable/update call
+    STOCK_UPDATE_MAX_SKUS = 50
+    # Concurrent stock update calls when the push scheduler sets no limit
+    STOCK_UPDATE_WORKERS = 3
+    THROTTLE_ERROR_CODES = frozenset({'ApiCallLimit', 'AppCallLimit', 'SellerCallLimit'})
+    AUTH_ERROR_CODES = frozenset({
+        'IllegalAccessToken', 'MissingAccessToken', 'IncompleteSignature', 'InsufficientPermission',
+    })
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
@@ -40,6 +50,12 @@ class LazadaAdapter(MarketplaceAdapter):
             'https://auth.lazada.com/rest'
         ).rstrip('/')
 
+    def _credentials(self):
+        """(app_key, app_secret), read once so worker threads never touch the ORM"""
+        if not hasattr(self, '_app_credentials'):
+            self._app_credentials = (self.account.client_id, self.account.client_secret or '')
+        return self._app_credentials
+
     def _sign_params(self, api_path, params):
         """Generate Lazada signature for given API path and parameters"""
         prepared = {
@@ -50,7 +66,7 @@ class LazadaAdapter(MarketplaceAdapter):
         sorted_items = sorted(prepared.items(), key=lambda item: item[0])
         sign_base = api_path + ''.join(f"{key}{value}" for key, value in sorted_items)
         signature = hmac.new(
-            (self.account.client_secret or '').encode('utf-8'),
+            self._credentials()[1].encode('utf-8'),
             sign_base.encode('utf-8'),
             hashlib.sha256
         ).hexdigest().upper()
@@ -69,12 +85,12 @@ class LazadaAdapter(MarketplaceAdapter):
         """Signed request to Lazada REST API"""
         method = (method or 'GET').upper()
         api_path = endpoint if endpoint.startswith('/') else '/' + endpoint
-        base_url = self._get_base_url().rstrip('/')
+        base_url = self.base_url.rstrip('/')
         url = f"{base_url}{api_path}"
 
         access_token = self._get_access_token() if include_access_token else None
         request_params = {
-            'app_key': self.account.client_id,
+            'app_key': self._credentials()[0],
             'sign_method': 'sha256',
             'timestamp': str(int(time.time() * 1000)),
         }
@@ -101,25 +117,27 @@ class LazadaAdapter(MarketplaceAdapter):
             }
             headers['Content-Type'] = 'application/x-www-form-urlencoded'
 
-        response = requests.request(
-            method,
-            url,
-            params=request_params,
-            data=request_data,
-            files=files,
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
-        try:
-            result = response.json()
-        except ValueError:
-            raise ValueError(f'Lazada API returned non-JSON response: {response.text[:200]}')
+        with self._trace(method, api_path) as span:
+            response = requests.request(
+                method,
+                url,
+                params=request_params,
+                data=request_data,
+                files=files,
+                timeout=self.timeout,
+            )
+            span.record_response(response)
+            response.raise_for_status()
+            try:
+                result = response.json()
+            except ValueError:
+                raise ValueError(f'Lazada API returned non-JSON response: {response.text[:200]}')
 
-        if isinstance(result, dict):
-            code = result.get('code')
-            if code and str(code) not in ['0', '200', 'SUCCESS']:
-                message = result.get('message') or result.get('detail') or result.get('msg') or 'Unknown error'
-                raise ValueError(f'Lazada API error ({code}): {message}')
+            if isinstance(result, dict):
+                code = result.get('code')
+                if code and str(code) not in ['0', '200', 'SUCCESS']:
+                    message = result.get('message') or result.get('detail') or result.get('msg') or 'Unknown error'
+                    raise ValueError(f'Lazada API error ({code}): {message}')
 
         return result
     # END-LOCKED
@@ -504,14 +522,14 @@ class LazadaAdapter(MarketplaceAdapter):
             # Log a small sample of order ids for traceability
             try:
                 sample_ids = [o.get('order_id') or o.get('OrderId') or o.get('order_number') or o.get('OrderNumber') for o in orders][:5]
-                _logger.warning("🔎 Lazada fetch_orders(%s): sample order_ids (offset %s): %s", time_field, offset, sample_ids)
+                job_log(_logger, logging.DEBUG, '🔎 Lazada fetch_orders(%s): sample order_ids (offset %s): %s', time_field, offset, sample_ids)
             except Exception:
                 pass
             if len(orders) < params['limit']:
                 break
             offset += len(orders)
 
-        _logger.warning("✅ Lazada fetch_orders(%s): total orders fetched=%s", time_field, len(all_orders))
+        job_log(_logger, logging.INFO, '✅ Lazada fetch_orders(%s): total orders fetched=%s', time_field, len(all_orders))
 
         # Fallback: ถ้าใช้ created แล้วไม่พบข้อมูล ให้ลองดึงด้วย updated ภายใน window เดียวกัน
         if not all_orders and fallback_to_updated and time_field == "created":
@@ -521,58 +539,130 @@ class LazadaAdapter(MarketplaceAdapter):
         return all_orders
 
     def update_inventory(self, items):
+        """Push sellable stock in chunks, retrying only the SKUs that failed
+
+        Items are split at STOCK_UPDATE_MAX_SKUS (Lazada's per-call cap) and the
+        chunks are sent concurrently on up to max_workers threads (set by the
+        adaptive push scheduler, STOCK_UPDATE_WORKERS otherwise). Per-SKU
+        results of each call are parsed; SKUs reported as failed are resent
+        on their own, and a chunk rejected as a whole for its SKUs is bisected
+        until the offending SKU is isolated. Throttled chunks are retried whole
+        after a backoff; auth errors fail the chunk. A single SKU still rejected by the sellable
+        endpoint is tried once on the legacy /product/update_quantity endpoint.
+
+        Args:
+            items: list of tuples (external_sku, quantity) or push_stock dicts
+
+        Returns:
+            dict {sku: {'success': bool, 'error': str}}
+        """
         if not self.shop:
             raise ValueError('Shop is required for updating inventory')
 
-        payload_items = []
-        for sku, qty in items:
-            payload_items.append({
-                'seller_sku': sku,
-                'quantity': int(qty),
-            })
+        pairs = self._inventory_pairs(items)
+        if not pairs:
+            return {}
 
-        payload_json = json.dumps(payload_items, ensure_ascii=False)
-        data = {'payload': payload_json}
+        # Credentials are read before worker threads sign requests
+        self._credentials()
+        results, chunk_count, workers = self._push_inventory_chunks(
+            pairs, self.STOCK_UPDATE_MAX_SKUS, self.STOCK_UPDATE_WORKERS, self._push_stock_chunk,
+        )
 
+        failed = sum(1 for result in results.values() if not result['success'])
+        job_log(
+            _logger, logging.INFO,
+            'Lazada stock push: %s SKUs in %s chunks (%s workers), %s failed',
+            len(pairs), chunk_count, workers, failed,
+        )
+        return results
+
+    def _push_stock_chunk(self, chunk, retry_failed=True):
+        """Push one chunk of (sku, qty); returns {sku: result}"""
         try:
-            response = self._make_request(
-                'POST',
-                '/product/stock/sellable/update',
-                data=data,
-            )
-        except Exception as primary_error:
-            _logger.warning('Sellable stock update failed (%s). Falling back to legacy endpoint.', primary_error)
-            legacy_data = {
-                'Skus': json.dumps([
-                    {'SellerSku': sku, 'Quantity': int(qty)}
-                    for sku, qty in items
-                ], ensure_ascii=False, separators=(',', ':')),
-            }
-            response = self._make_request(
-                'POST',
-                '/product/update_quantity',
-                data=legacy_data,
-            )
+            response = self._call_with_throttle_backoff(self._send_sellable_stock, chunk)
+        except ValueError as api_error:
+            if not self._is_item_error(api_error):
+                # Still throttled, auth or malformed response: splitting the
+                # chunk would only spend more calls of the rate budget
+                return {sku: {'success': False, 'error': str(api_error)} for sku, _qty in chunk}
+            # Lazada rejected the whole call: bisect to isolate the bad SKU(s)
+            if len(chunk) > 1:
+                middle = len(chunk) // 2
+                results = self._push_stock_chunk(chunk[:middle], retry_failed)
+                results.update(self._push_stock_chunk(chunk[middle:], retry_failed))
+                return results
+            return self._push_stock_legacy(chunk, api_error)
+        except Exception as e:
+            return {sku: {'success': False, 'error': str(e)} for sku, _qty in chunk}
+
+        results = self._parse_stock_results(chunk, response)
+        failed = [(sku, qty) for sku, qty in chunk if not results[sku]['success']]
+        if failed and retry_failed:
+            # Partial failure: resend only the failed SKUs, once
+            _logger.info('Retrying %s of %s Lazada SKUs that failed', len(failed), len(chunk))
+            results.update(self._push_stock_chunk(failed, retry_failed=False))
+        return results
 
-        results = {}
-        data_section = response.get('data') or {}
-        detail = data_section.get('detail')
+    def _send_sellable_stock(self, chunk):
+        """One /product/stock/sellable/update call, retrying transport errors with backoff"""
+        data = {
+            'payload': json.dumps([
+                {'seller_sku': sku, 'quantity': qty}
+                for sku, qty in chunk
+            ], ensure_ascii=False),
+        }
+        for attempt in range(self.max_retries):
+            try:
+                return self._make_request('POST', '/product/stock/sellable/update', data=data)
+            except requests.exceptions.RequestException as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                wait_time = 2 ** attempt
+                _logger.warning('Lazada stock update failed, retrying in %ss: %s', wait_time, e)
+                time.sleep(wait_time)
+
+    def _push_stock_legacy(self, chunk, primary_error):
+        """Fallback for SKUs the sellable endpoint rejects"""
+        _logger.warning('Sellable stock update failed (%s). Falling back to legacy endpoint.', primary_error)
+        legacy_data = {
+            'Skus': json.dumps([
+                {'SellerSku': sku, 'Quantity': qty}
+                for sku, qty in chunk
+            ], ensure_ascii=False, separators=(',', ':')),
+        }
+        try:
+            response = self._make_request('POST', '/product/update_quantity', data=legacy_data)
+        except Exception as e:
+            return {sku: {'success': False, 'error': f'{primary_error}; legacy: {e}'} for sku, _qty in chunk}
+        return self._parse_stock_results(chunk, response)
+
+    def _parse_stock_results(self, chunk, response):
+        """Map a stock update response to {sku: result}
+
+        The call succeeded (non-error code), so SKUs not listed as failed in
+        the response detail are successful.
+        """
+        results = {sku: {'success': True, 'error': ''} for sku, _qty in chunk}
+        data_section = (response or {}).get('data') or {}
+        detail = data_section.get('detail') if isinstance(data_section, dict) else None
 
         if isinstance(detail, list):
             for item in detail:
                 sku = item.get('seller_sku') or item.get('SellerSku') or ''
-                results[sku] = {
-                    'success': bool(item.get('success')),
-                    'error': item.get('message') or item.get('error', ''),
-                }
-        else:
+                if sku in results:
+                    results[sku] = {
+                        'success': bool(item.get('success')),
+                        'error': item.get('message') or item.get('error', ''),
+                    }
+        elif isinstance(data_section, dict):
             for item in data_section.get('skus', []):
                 sku = item.get('SellerSku', '')
-                results[sku] = {
-                    'success': item.get('Success', False),
-                    'error': item.get('Message', ''),
-                }
-
+                if sku in results:
+                    results[sku] = {
+                        'success': item.get('Success', False),
+                        'error': item.get('Message', ''),
+                    }
         return results
 
     def verify_webhook(self, headers, body):
@@ -4,6 +4,11 @@ from odoo import models, fields, api
 from odoo.exceptions import UserError, ValidationError
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from .job_logging import JOB_LOG_VERBOSITY, job_log
+from .push_scheduler import AdaptivePushScheduler
+from .zortout_catalog_import import ZortoutCatalogImport
+from .woocommerce_catalog_sync import WooCommerceCatalogSync
+from .token_manager import TokenManager, TOKEN_REFRESH_CHANNELS, invalidate_cached_token
 import logging
 import json
 import csv
@@ -49,6 +54,10 @@ class MarketplaceAccount(models.Model):
         help='WooCommerce Consumer Key (ck_...) - Required for WooCommerce authentication',
         tracking=True
     )
+    woocommerce_products_synced_at = fields.Datetime(
+        string='Products Synced Until',
+        help='Start time of the last complete WooCommerce product sync. Incremental (scheduled) syncs only list products modified since then; the Sync Products button always re-reads the whole catalog.'
+    )
     
     # Shop relationship
     shop_ids = fields.One2many(
@@ -96,6 +105,23 @@ class MarketplaceAccount(models.Model):
         help='Number of products to push per batch. Larger batches may cause timeouts. Recommended: 20-50 products per batch. Set to 0 to disable batching (push all at once).',
         tracking=True
     )
+    push_adaptive_enabled = fields.Boolean(
+        string='Adaptive Push Scheduling', default=False,
+        help='Tune push batch size, concurrency and spacing between batch jobs from the latency and HTTP 429 rate observed on recent push jobs, within the bounds below. When disabled, Push Stock Batch Size is used as-is with a fixed 5 second spacing.',
+        tracking=True
+    )
+    push_batch_size_min = fields.Integer(
+        string='Min Push Batch Size', default=10,
+        help='Smallest batch the adaptive scheduler may choose when the marketplace is throttling (HTTP 429) or slow.',
+    )
+    push_batch_size_max = fields.Integer(
+        string='Max Push Batch Size', default=100,
+        help='Largest batch the adaptive scheduler may grow to (at most 200).',
+    )
+    push_max_workers = fields.Integer(
+        string='Max Push Workers', default=5,
+        help='Upper bound on concurrent API requests per push job for adapters that push in parallel (e.g. WooCommerce).',
+    )
     stock_sync_batch_size = fields.Integer(
         string='Stock Sync Batch Size', default=500,
         help='Number of products to sync per batch when syncing stock from Zortout. Larger batches may cause timeouts. Recommended: 300-500 products per batch. Set to 0 to disable batching (sync all at once).',
@@ -124,6 +150,26 @@ class MarketplaceAccount(models.Model):
         tracking=True
     )
     
+    # Job logging
+    job_log_verbosity = fields.Selection(
+        JOB_LOG_VERBOSITY, string='Job Log Verbosity', default='summary', required=True,
+        help='Summary: one log line per job (recommended for production). Normal: also per-page/per-batch progress. Debug: every request and order, without rate limiting.'
+    )
+    
+    # API tracing (see models/api_trace.py)
+    api_trace_sink = fields.Selection([
+        ('none', 'Disabled'),
+        ('log', 'Server Log'),
+        ('memory', 'In-Memory Ring Buffer'),
+        ('database', 'Database Table'),
+    ], string='API Trace Sink', default='none', required=True,
+        help='Where to record per-request API traces (endpoint, status, duration, response size, retries). Failed requests are always traced when a sink is set.'
+    )
+    api_trace_sample_rate = fields.Float(
+        string='API Trace Sample Rate', default=1.0,
+        help='Fraction of successful API requests to trace (0.0 - 1.0). Failed requests are always traced.'
+    )
+    
     # Export data for skipped/not found products
     sync_export_data = fields.Text(
         string='Sync Export Data',
@@ -153,6 +199,21 @@ class MarketplaceAccount(models.Model):
             if record.push_stock_batch_size > 200:
                 raise ValidationError('Push Stock Batch Size should not exceed 200 to avoid timeouts.')
     
+    @api.constrains('push_adaptive_enabled', 'push_batch_size_min', 'push_batch_size_max', 'push_max_workers')
+    def _check_push_adaptive_bounds(self):
+        """Validate adaptive push scheduling bounds"""
+        for record in self:
+            if not record.push_adaptive_enabled:
+                continue
+            if record.push_batch_size_min < 1:
+                raise ValidationError('Min Push Batch Size must be at least 1.')
+            if record.push_batch_size_max < record.push_batch_size_min:
+                raise ValidationError('Max Push Batch Size must be greater than or equal to Min Push Batch Size.')
+            if record.push_batch_size_max > 200:
+                raise ValidationError('Max Push Batch Size should not exceed 200 to avoid timeouts.')
+            if not 1 <= record.push_max_workers <= 10:
+                raise ValidationError('Max Push Workers must be between 1 and 10.')
+    
     @api.constrains('stock_sync_batch_size')
     def _check_stock_sync_batch_size(self):
         """Validate stock sync batch size"""
@@ -183,6 +244,19 @@ class MarketplaceAccount(models.Model):
             if record.job_cleanup_keep_count < 0:
                 raise ValidationError('Keep Recent Jobs Count must be 0 (no limit) or greater.')
     
+    @api.constrains('api_trace_sample_rate')
+    def _check_api_trace_sample_rate(self):
+        """Validate API trace sample rate"""
+        for record in self:
+            if not 0.0 <= record.api_trace_sample_rate <= 1.0:
+                raise ValidationError('API Trace Sample Rate must be between 0.0 and 1.0.')
+    
+    def get_api_trace_buffer(self):
+        """Return recent in-memory API traces for this account (this worker process only)"""
+        self.ensure_one()
+        from .api_trace import get_recent_traces
+        return get_recent_traces(self.env.cr.dbname, self.id)
+    
     @api.model
     def cron_auto_sync_stock_from_zortout(self):
         """Cron method to auto sync stock from Zortout based on stock_sync_interval_minutes"""
@@ -363,8 +437,9 @@ class MarketplaceAccount(models.Model):
                 for shop_id, binding_ids in shop_bindings.items():
                     shop = self.env['marketplace.shop'].browse(shop_id)
                     
-                    # Check batch size from account settings
-                    batch_size = account.push_stock_batch_size or 0  # 0 = no batching
+                    # Batch size / spacing / concurrency from the account's (adaptive) push plan
+                    push_plan = AdaptivePushScheduler(account).plan()
+                    batch_size = push_plan.batch_size  # 0 = no batching
                     total_bindings = len(binding_ids)
                     
                     if batch_size > 0 and total_bindings > batch_size:
@@ -380,12 +455,13 @@ class MarketplaceAccount(models.Model):
                             end_idx = min(start_idx + batch_size, total_bindings)
                             batch_binding_ids = binding_ids[start_idx:end_idx]
                             
-                            # Stagger jobs: each batch starts 5 seconds after previous
-                            batch_next_run = current_time + timedelta(seconds=batch_idx * 5)
+                            # Stagger jobs by the spacing chosen in the push plan
+                            batch_next_run = current_time + timedelta(seconds=batch_idx * push_plan.spacing_seconds)
                             
                             self.env['marketplace.job'].sudo().create({
                                 'name': f'Push Stock to {account.channel.upper()} - {shop.name} (Auto Batch {batch_idx + 1}/{batch_count})',
                                 'job_type': 'push_stock',
+                                **push_plan.job_vals(),
                                 'account_id': account.id,
                                 'shop_id': shop_id,
                                 'priority': 'medium',  # Stock push is medium priority
@@ -393,6 +469,7 @@ class MarketplaceAccount(models.Model):
                                     'binding_ids': batch_binding_ids,
                                     'batch_index': batch_idx,
                                     'batch_total': batch_count,
+                                    **push_plan.payload(),
                                 },
                                 'state': 'pending',
                                 'next_run_at': batch_next_run,
@@ -403,11 +480,13 @@ class MarketplaceAccount(models.Model):
                         self.env['marketplace.job'].sudo().create({
                             'name': f'Push Stock to {account.channel.upper()} - {shop.name} (Auto)',
                             'job_type': 'push_stock',
+                            **push_plan.job_vals(),
                             'account_id': account.id,
                             'shop_id': shop_id,
                             'priority': 'medium',  # Stock push is medium priority
                             'payload': {
                                 'binding_ids': binding_ids,
+                                **push_plan.payload(),
                             },
                             'state': 'pending',
                             'next_run_at': fields.Datetime.now(),
@@ -827,16 +906,8 @@ class MarketplaceAccount(models.Model):
         if not self.refresh_token:
             raise UserError('No refresh token available')
         
-        adapter = self._get_adapter()
         try:
-            token_data = adapter.refresh_access_token()
-            self.write({
-                'access_token': token_data.get('access_token'),
-                'refresh_token': token_data.get('refresh_token', self.refresh_token),
-                'access_token_expire_at': fields.Datetime.now() + timedelta(
-                    seconds=token_data.get('expires_in', 3600)
-                ),
-            })
+            TokenManager(self.env).refresh(self, force=True)
             self.message_post(body='Access token refreshed successfully')
             return {
                 'type': 'ir.actions.client',
@@ -855,17 +926,34 @@ class MarketplaceAccount(models.Model):
     def _check_token_expiry(self):
         """Check and refresh token if expired"""
         self.ensure_one()
-        if not self.access_token_expire_at:
-            return False
-        
-        if fields.Datetime.now() >= self.access_token_expire_at - timedelta(minutes=5):
+        previous_token = self.access_token
+        return TokenManager(self.env).get_token(self) != previous_token
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'access_token', 'refresh_token', 'access_token_expire_at'}.intersection(vals):
+            invalidate_cached_token(self.env.cr.dbname, self.ids)
+        return res
+
+    @api.model
+    def cron_refresh_tokens(self):
+        """Refresh Shopee/Lazada/TikTok access tokens ahead of expiry
+
+        Runs in the background so jobs never pay for a token refresh; see
+        TokenManager for locking and caching.
+        """
+        manager = TokenManager(self.env)
+        accounts = self.search([
+            ('channel', 'in', list(TOKEN_REFRESH_CHANNELS)),
+            ('refresh_token', '!=', False),
+            ('access_token_expire_at', '!=', False),
+            ('access_token_expire_at', '<', fields.Datetime.now() + manager.REFRESH_AHEAD),
+        ])
+        for account in accounts:
             try:
-                self.action_refresh_token()
-                return True
+                manager.refresh(account, margin=manager.REFRESH_AHEAD)
             except Exception as e:
-                _logger.warning(f'Token refresh failed: {e}')
-                return False
-        return False
+                _logger.warning(f'Background token refresh failed for account {account.name} (ID: {account.id}): {e}')
 
     @api.constrains('client_id', 'client_secret')
     def _check_credentials(self):
@@ -1130,9 +1218,10 @@ class MarketplaceAccount(models.Model):
         filters = payload.get('filters') or {}
         page = payload.get('page') or 1
         limit = payload.get('limit') or 500
-        commit_interval = payload.get('commit_interval') or 50
-        if commit_interval < 1:
-            commit_interval = 25
+        # Rows per grouped create/write batch (each batch is committed)
+        import_batch_size = payload.get('import_batch_size') or payload.get('commit_interval') or 200
+        if import_batch_size < 1:
+            import_batch_size = 200
 
         shop = self._get_or_create_zortout_shop()
         if not shop:
@@ -1159,38 +1248,6 @@ class MarketplaceAccount(models.Model):
         if job:
             job._update_progress(0, total_products if total_products else 1)
 
-        def to_float(value):
-            try:
-                if value in (None, '', False):
-                    return 0.0
-                return float(value)
-            except (TypeError, ValueError):
-                return 0.0
-
-        def get_uom(unit_name):
-            if not unit_name:
-                return default_uom
-            uom = self.env['uom.uom'].search([
-                ('name', '=', unit_name)
-            ], limit=1)
-            if not uom:
-                uom = self.env['uom.uom'].search([
-                    ('name', 'ilike', unit_name)
-                ], limit=1)
-            return uom or default_uom
-
-        def get_category(category_name):
-            if not category_name:
-                return default_categ
-            category = self.env['product.category'].search([
-                ('name', '=', category_name)
-            ], limit=1)
-            if not category:
-                category = self.env['product.category'].create({
-                    'name': category_name,
-                })
-            return category
-
         image_cache = {}
         image_session = None
         image_timeout = payload.get('image_timeout') or 12
@@ -1287,28 +1344,14 @@ class MarketplaceAccount(models.Model):
             self.env.cr.commit()
             jobs.clear()
 
-        default_uom = self.env.ref('uom.product_uom_unit', raise_if_not_found=False)
-        if not default_uom:
-            default_uom = self.env['uom.uom'].search([], limit=1)
-
-        default_categ = self.env.ref('product.product_category_all', raise_if_not_found=False)
-
-        # Determine purchase UoM field name (Odoo 19 uses purchase_uom_id)
-        if 'purchase_uom_id' in self.env['product.template']._fields:
-            purchase_uom_field = 'purchase_uom_id'
-        elif 'uom_po_id' in self.env['product.template']._fields:
-            purchase_uom_field = 'uom_po_id'
-        else:
-            purchase_uom_field = None
-
         product_model = self.env['product.product'].with_context(active_test=False)
-        binding_model = self.env['marketplace.product.binding'].with_context(active_test=False)
 
         stats = {
             'total_products': total_products,
             'processed_products': 0,
             'created_products': 0,
             'updated_products': 0,
+            'unchanged_products': 0,
             'bindings_created': 0,
             'bindings_updated': 0,
             'skipped_products': 0,
@@ -1318,200 +1361,42 @@ class MarketplaceAccount(models.Model):
         skipped_details = []
         error_details = []
 
-        type_mapping = {
-            0: ('consu', True, True),     # Goods / stockable (treated as consumable in Odoo 19)
-            1: ('service', True, False),  # Service
-            2: ('consu', True, True),     # Consumable
-        }
-
-        image_jobs = []
+        def checkpoint(processed):
+            if job:
+                job._update_progress(processed, total_products if total_products else 1)
+            self.env.cr.commit()
 
-        for index, product_data in enumerate(products, start=1):
-            stats['processed_products'] += 1
-            sku = (product_data.get('sku') or '').strip()
+        # Set-based import: preload SKU/barcode/UoM/category/binding maps, then grouped create/write
+        importer = ZortoutCatalogImport(
+            self, shop, stats, skipped_details, error_details,
+            update_images_only=update_images_only,
+            batch_size=import_batch_size,
+        )
+        product_ids = importer.run(products, checkpoint=checkpoint)
 
-            if not sku:
-                stats['skipped_products'] += 1
-                skipped_details.append({
-                    'product_id': product_data.get('id'),
-                    'name': product_data.get('name'),
-                    'reason': 'Missing SKU',
-                })
-                continue
+        # Update images if requested
+        image_jobs = []
+        if not skip_images:
+            for product_data in products:
+                sku = (product_data.get('sku') or '').strip()
+                product_id = product_ids.get(sku)
+                if not product_id:
+                    continue
+                image_urls = product_data.get('imageList') or []
+                if not image_urls and product_data.get('imagepath'):
+                    image_urls = [product_data.get('imagepath')]
 
-            try:
-                # Find existing Odoo product by SKU (company-specific first)
-                product = product_model.search([
-                    ('default_code', '=', sku),
-                    ('company_id', '=', self.company_id.id),
-                ], limit=1)
-
-                if not product:
-                    product = product_model.search([
-                        ('default_code', '=', sku),
-                        ('company_id', '=', False),
-                    ], limit=1)
-
-                if not product and update_images_only:
-                    stats['skipped_products'] += 1
-                    skipped_details.append({
-                        'product_id': product_data.get('id'),
-                        'name': product_data.get('name'),
+                if image_urls:
+                    image_jobs.append({
+                        'product_id': product_id,
                         'sku': sku,
-                        'reason': 'Product not found in Odoo (images-only mode)',
+                        'source_product_id': product_data.get('id'),
+                        'source_product_name': product_data.get('name'),
+                        'image_urls': image_urls,
                     })
-                    continue
-
-                product_type_value, sale_ok, purchase_ok = type_mapping.get(
-                    product_data.get('producttype'),
-                    type_mapping[0]
-                )
-                price = to_float(product_data.get('sellprice'))
-                cost = to_float(product_data.get('purchaseprice'))
-                category = get_category(product_data.get('category'))
-                uom = get_uom(product_data.get('unittext'))
-                product_active = bool(product_data.get('active', True))
-
-                raw_barcode = (product_data.get('barcode') or '').strip()
-
-                if not product:
-                    # Create product template and variant
-                    template_vals = {
-                        'name': product_data.get('name') or sku,
-                        'type': product_type_value,
-                        'sale_ok': sale_ok,
-                        'purchase_ok': purchase_ok,
-                        'list_price': price,
-                        'standard_price': cost,
-                        'company_id': self.company_id.id,
-                        'uom_id': uom.id if uom else False,
-                        'categ_id': category.id if category else False,
-                        'description_sale': product_data.get('description') or False,
-                        'active': product_active,
-                    }
-                    if purchase_uom_field:
-                        template_vals[purchase_uom_field] = uom.id if uom else False
-                    template = self.env['product.template'].sudo().create(template_vals)
-                    product = template.product_variant_id
-                    product_write_vals = {
-                        'default_code': sku,
-                    }
-                    barcode_value = False
-                    if raw_barcode:
-                        conflict = product_model.search([
-                            ('barcode', '=', raw_barcode),
-                        ], limit=1)
-                        if conflict:
-                            _logger.info(
-                                'Skipping barcode %s for SKU %s because it is already used by %s',
-                                raw_barcode, sku, conflict.display_name
-                            )
-                        else:
-                            barcode_value = raw_barcode
-                    if barcode_value:
-                        product_write_vals['barcode'] = barcode_value
-                    product.sudo().write(product_write_vals)
-                    stats['created_products'] += 1
-                    _logger.info(f'✅ Created product {product.name} (SKU: {sku}) from Zortout')
-                else:
-                    if not update_images_only:
-                        barcode_value = False
-                        if raw_barcode:
-                            if product.barcode == raw_barcode:
-                                barcode_value = raw_barcode
-                            else:
-                                conflict = product_model.search([
-                                    ('barcode', '=', raw_barcode),
-                                    ('id', '!=', product.id),
-                                ], limit=1)
-                                if conflict:
-                                    _logger.info(
-                                        'Skipping barcode update for SKU %s because barcode %s is already used by %s',
-                                        sku, raw_barcode, conflict.display_name
-                                    )
-                                else:
-                                    barcode_value = raw_barcode
-
-                        product.sudo().write({
-                            'name': product_data.get('name') or sku,
-                            'default_code': sku,
-                            **({'barcode': barcode_value} if barcode_value else {}),
-                        })
-                        template_updates = {
-                            'name': product_data.get('name') or sku,
-                            'list_price': price,
-                            'sale_ok': sale_ok,
-                            'purchase_ok': purchase_ok,
-                            'type': product_type_value,
-                            'active': product_active,
-                        }
-                        if cost:
-                            template_updates['standard_price'] = cost
-                        if category:
-                            template_updates['categ_id'] = category.id
-                        if product_data.get('description'):
-                            template_updates['description_sale'] = product_data.get('description')
-                        if purchase_uom_field:
-                            template_updates[purchase_uom_field] = uom.id if uom else False
-                        product.product_tmpl_id.sudo().write(template_updates)
-                        stats['updated_products'] += 1
-
-                # Update images if requested
-                if not skip_images:
-                    image_urls = product_data.get('imageList') or []
-                    if not image_urls and product_data.get('imagepath'):
-                        image_urls = [product_data.get('imagepath')]
-
-                    if image_urls:
-                        image_jobs.append({
-                            'product_id': product.id,
-                            'sku': sku,
-                            'source_product_id': product_data.get('id'),
-                            'source_product_name': product_data.get('name'),
-                            'image_urls': image_urls,
-                        })
-
-                    if len(image_jobs) >= image_batch_size:
-                        process_image_batch(image_jobs)
-
-                if not update_images_only:
-                    external_product_id = product_data.get('variationid') or product_data.get('id')
-                    binding_vals = {
-                        'external_sku': sku,
-                        'external_product_id': str(external_product_id) if external_product_id else False,
-                        'active': product_active,
-                    }
-
-                    binding = binding_model.search([
-                        ('external_sku', '=', sku),
-                        ('shop_id', '=', shop.id),
-                    ], limit=1)
 
-                    if binding:
-                        binding.sudo().write(binding_vals)
-                        stats['bindings_updated'] += 1
-                    else:
-                        binding_vals.update({
-                            'product_id': product.id,
-                            'shop_id': shop.id,
-                        })
-                        binding_model.sudo().create(binding_vals)
-                        stats['bindings_created'] += 1
-
-                if index % commit_interval == 0:
-                    if job:
-                        job._update_progress(index, total_products if total_products else 1)
-                    self.env.cr.commit()
-
-            except Exception as error:
-                stats['errors'] += 1
-                error_details.append({
-                    'product_id': product_data.get('id'),
-                    'name': product_data.get('name'),
-                    'sku': sku,
-                    'error': str(error),
-                })
-                _logger.error(f'❌ Failed to process Zortout product {sku}: {error}', exc_info=True)
+                if len(image_jobs) >= image_batch_size:
+                    process_image_batch(image_jobs)
 
         # Flush remaining image downloads
         if image_jobs:
@@ -1550,6 +1435,7 @@ class MarketplaceAccount(models.Model):
             f'- Processed: {stats["processed_products"]}<br/>'
             f'- Created: {stats["created_products"]}<br/>'
             f'- Updated: {stats["updated_products"]}<br/>'
+            f'- Unchanged: {stats["unchanged_products"]}<br/>'
             f'- Bindings created: {stats["bindings_created"]}<br/>'
             f'- Bindings updated: {stats["bindings_updated"]}<br/>'
             f'- Images updated: {stats["images_updated"]}<br/>'
@@ -1695,205 +1581,206 @@ class MarketplaceAccount(models.Model):
             }
         }
     
-    def action_apply_inventory_all_products(self):
-        """Apply inventory adjustment for all products with inventory_quantity != 0"""
+    def _enqueue_inventory_job(self, job_type, name, batch_size):
+        """Queue a batched inventory maintenance job (one pending/running job per type and account)"""
         self.ensure_one()
         
         if self.channel != 'zortout':
             raise UserError('This action is only available for Zortout accounts')
         
-        _logger.warning(f'🔧 Applying inventory adjustment for all products...')
-        
-        # Find all quants with inventory_quantity != 0
-        quants = self.env['stock.quant'].sudo().search([
-            ('inventory_quantity', '!=', 0),
-        ])
-        
-        total_count = len(quants)
-        _logger.warning(f'📦 Found {total_count} quants with inventory_quantity != 0')
-        
-        if total_count == 0:
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'No Action Needed',
-                    'message': 'No quants found with inventory_quantity != 0. All inventory adjustments have been applied.',
-                    'type': 'info',
-                    'sticky': True,
-                }
-            }
-        
-        # Apply inventory adjustment
-        updated_count = 0
-        skipped_count = 0
-        errors = []
-        
-        for idx, quant in enumerate(quants, 1):
-            try:
-                quant.action_apply_inventory()
-                updated_count += 1
-                
-                # Commit every 100 products
-                if updated_count % 100 == 0:
-                    self.env.cr.commit()
-                    _logger.warning(f'📊 Progress: {updated_count}/{total_count} quants updated')
-                
-            except Exception as e:
-                skipped_count += 1
-                error_msg = f"Quant {quant.product_id.default_code or quant.product_id.name}: {str(e)}"
-                errors.append(error_msg)
-                _logger.error(error_msg, exc_info=True)
-        
-        # Final commit
-        self.env.cr.commit()
-        
-        _logger.warning(f'✅ Inventory adjustment completed: {updated_count} updated, {skipped_count} skipped')
-        
-        # Prepare result message
-        message_parts = []
-        message_parts.append(f'<b>Inventory Adjustment Completed:</b><br/>')
-        message_parts.append(f'✅ Updated: {updated_count} quants<br/>')
-        message_parts.append(f'📦 Total quants found: {total_count}<br/>')
-        if skipped_count > 0:
-            message_parts.append(f'⚠️ Skipped: {skipped_count} quants<br/>')
-        message_parts.append(f'<br/><b>💡 Next Steps:</b><br/>')
-        message_parts.append(f'1. Refresh the product page (F5)<br/>')
-        message_parts.append(f'2. Check Quantity On Hand in products<br/>')
-        if errors:
-            message_parts.append(f'<br/><b>Errors ({min(len(errors), 10)} of {len(errors)}):</b><br/>')
-            for error in errors[:10]:
-                message_parts.append(f'• {error}<br/>')
-        
-        message = ''.join(message_parts)
+        job = self.env['marketplace.job'].search([
+            ('account_id', '=', self.id),
+            ('job_type', '=', job_type),
+            ('state', 'in', ['pending', 'in_progress']),
+        ], limit=1)
+        if job:
+            title = 'Job Already Queued'
+            message = f'"{job.name}" is already queued (Job ID: {job.id}). Please wait for it to complete.'
+            notification_type = 'info'
+        else:
+            job = self.env['marketplace.job'].create({
+                'name': f'{name} - {self.name}',
+                'job_type': job_type,
+                'account_id': self.id,
+                'priority': 'low',
+                'payload': {
+                    'trigger_uid': self.env.uid,
+                    'batch_size': batch_size,
+                },
+                'state': 'pending',
+                'next_run_at': fields.Datetime.now(),
+            })
+            title = 'Job Created'
+            message = f'"{job.name}" will run in the background. Progress is shown on the job (Marketplace > Jobs).'
+            notification_type = 'success'
         
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
-                'title': 'Inventory Adjustment Completed',
+                'title': title,
                 'message': message,
-                'type': 'success' if skipped_count == 0 else 'warning',
-                'sticky': True,
+                'type': notification_type,
+                'sticky': False,
             }
         }
     
+    def action_apply_inventory_all_products(self):
+        """Apply inventory adjustment for all products with inventory_quantity != 0 (background job)"""
+        return self._enqueue_inventory_job('apply_inventory', 'Apply Inventory Adjustments', 500)
+    
     def action_fix_track_inventory_all_products(self):
-        """Quick fix: Enable Track Inventory checkbox for all Zortout products"""
-        self.ensure_one()
-        
-        if self.channel != 'zortout':
-            raise UserError('This action is only available for Zortout accounts')
-        
-        _logger.warning(f'🔧 Quick fix: Enabling Track Inventory checkbox for all Zortout products...')
-        
-        # Find all products with SKU (likely from Zortout) that are Goods type
-        # Update products that don't have tracking='lot' OR is_storable=False
-        domain = [
-            ('type', '=', 'consu'),  # Goods type
-            ('default_code', '!=', False),  # Has SKU
+        """Quick fix: Enable Track Inventory checkbox for all Zortout products (background job)"""
+        return self._enqueue_inventory_job('fix_track_inventory', 'Fix Track Inventory', 1000)
+    
+    def _post_inventory_job_summary(self, title, updated_count, total_count, skipped_count, errors, unit):
+        """Post the result of a batched inventory job on the account"""
+        message_parts = [
+            f'<b>{title}:</b><br/>',
+            f'✅ Updated: {updated_count} {unit}<br/>',
+            f'📦 Total {unit} found: {total_count}<br/>',
         ]
+        if skipped_count > 0:
+            message_parts.append(f'⚠️ Skipped: {skipped_count} {unit}<br/>')
+        if errors:
+            message_parts.append(f'<br/><b>Errors ({min(len(errors), 10)} of {len(errors)}):</b><br/>')
+            for error in errors[:10]:
+                message_parts.append(f'• {error}<br/>')
+        self.message_post(body=''.join(message_parts), subtype_xmlid='mail.mt_note')
+    
+    def _apply_inventory_batched(self, job=None, batch_size=500):
+        """Apply pending inventory counts (inventory_quantity != 0) chunk by chunk
         
-        all_products = self.env['product.template'].sudo().search(domain)
-        
-        # Filter products that need fixing (tracking != 'none' OR is_storable=False)
-        products = all_products.filtered(lambda p: p.tracking != 'none' or not p.is_storable)
-        total_count = len(products)
-        
-        _logger.warning(f'📦 Found {total_count} products that need fixing')
-        _logger.warning(f'   - Products with tracking != none: {len(all_products.filtered(lambda p: p.tracking != "none"))}')
-        _logger.warning(f'   - Products with is_storable=False: {len(all_products.filtered(lambda p: not p.is_storable))}')
-        
-        if total_count == 0:
-            # Check if all products already have tracking='none' AND is_storable=True
-            all_count = len(all_products)
-            none_count = len(all_products.filtered(lambda p: p.tracking == 'none'))
-            storable_count = len(all_products.filtered(lambda p: p.is_storable))
-            
-            return {
-                'type': 'ir.actions.client',
-                'tag': 'display_notification',
-                'params': {
-                    'title': 'Already Fixed',
-                    'message': f'All products already have tracking=\'none\' (By Quantity) and is_storable=True.<br/>Total products: {all_count}<br/>With tracking=\'none\' (By Quantity): {none_count}<br/>With is_storable=True: {storable_count}<br/><br/>💡 If checkbox still not checked in UI, try:<br/>1. Refresh the page (F5)<br/>2. Logout and login again<br/>3. Clear browser cache',
-                    'type': 'info',
-                    'sticky': True,
-                }
-            }
+        Each chunk of quants is applied with one action_apply_inventory() call in
+        a savepoint and committed; a failing chunk is replayed quant by quant.
+        """
+        self.ensure_one()
+        quant_model = self.env['stock.quant'].sudo()
+        quant_ids = quant_model.search([('inventory_quantity', '!=', 0)], order='id').ids
+        total_count = len(quant_ids)
+        _logger.warning(f'📦 Found {total_count} quants with inventory_quantity != 0')
         
-        # Update all products to tracking='none' (By Quantity)
         updated_count = 0
         skipped_count = 0
         errors = []
         
-        for idx, product in enumerate(products, 1):
+        def quant_label(quant):
+            return quant.product_id.default_code or quant.product_id.name
+        
+        for start in range(0, total_count, batch_size):
+            quants = quant_model.browse(quant_ids[start:start + batch_size]).exists()
+            # Tracked products without a lot need the interactive confirmation wizard
+            needs_lot = quants.filtered(lambda q: q.product_id.tracking != 'none' and not q.lot_id)
+            for quant in needs_lot:
+                errors.append(f'Quant {quant_label(quant)}: tracked product without lot/serial number')
+            skipped_count += len(needs_lot)
+            quants -= needs_lot
+            
             try:
-                # Force update tracking to 'none' (By Quantity) AND is_storable=True to enable checkbox
-                # In Odoo 19, tracking='none' with is_storable=True shows "Track Inventory? By Quantity"
-                # BUT: checkbox visibility is controlled by 'is_storable' field
-                # - If is_storable=False, checkbox will be HIDDEN (invisible="not is_storable")
-                # - We need to set is_storable=True to show the checkbox
-                update_vals = {}
-                
-                if product.tracking != 'none':
-                    update_vals['tracking'] = 'none'  # "By Quantity"
-                
-                if not product.is_storable:
-                    update_vals['is_storable'] = True  # Show Track Inventory checkbox in UI
-                
-                # Also ensure type is 'consu' (Goods)
-                if product.type != 'consu':
-                    update_vals['type'] = 'consu'
-                
-                if update_vals:
-                    product.write(update_vals)
-                    _logger.warning(f'✅ Updated product {product.default_code}: {update_vals}')
-                
-                updated_count += 1
-                
-                # Commit every 100 products to avoid long transaction
-                if updated_count % 100 == 0:
-                    self.env.cr.commit()
-                    _logger.warning(f'📊 Progress: {updated_count}/{total_count} products updated')
-                
+                with self.env.cr.savepoint():
+                    quants.action_apply_inventory()
+                updated_count += len(quants)
             except Exception as e:
-                skipped_count += 1
-                error_msg = f"Product {product.default_code or product.name}: {str(e)}"
-                errors.append(error_msg)
-                _logger.error(error_msg, exc_info=True)
+                _logger.warning(f'⚠️ Applying {len(quants)} quants failed ({e}), retrying one by one')
+                for quant in quants:
+                    try:
+                        with self.env.cr.savepoint():
+                            quant.action_apply_inventory()
+                        updated_count += 1
+                    except Exception as quant_error:
+                        skipped_count += 1
+                        error_msg = f'Quant {quant_label(quant)}: {quant_error}'
+                        errors.append(error_msg)
+                        _logger.error(error_msg)
+            
+            processed = min(start + batch_size, total_count)
+            if job:
+                job._update_progress(processed, total_count)
+            self.env.cr.commit()
+            job_log(_logger, logging.INFO, '📊 Progress: %s/%s quants processed', processed, total_count)
         
-        # Final commit
-        self.env.cr.commit()
+        _logger.warning(f'✅ Inventory adjustment completed: {updated_count} updated, {skipped_count} skipped')
+        if total_count:
+            self._post_inventory_job_summary(
+                'Inventory Adjustment Completed', updated_count, total_count, skipped_count, errors, 'quants',
+            )
+        return {
+            'message': f'Applied inventory for {updated_count} of {total_count} quants',
+            'count': updated_count,
+            'skipped': skipped_count,
+            'errors_detail': errors[:50],
+        }
+    
+    def _fix_track_inventory_batched(self, job=None, batch_size=1000):
+        """Set tracking='none' / is_storable=True on Zortout goods with grouped writes
         
-        _logger.warning(f'✅ Quick fix completed: {updated_count} updated, {skipped_count} skipped')
+        Products needing the same change are written together, batch_size
+        templates per write() in a savepoint; a failing batch is replayed
+        product by product.
+        """
+        self.ensure_one()
+        template_model = self.env['product.template'].sudo()
+        # Products with SKU (likely from Zortout) that are Goods type
+        rows = template_model.search_read([
+            ('type', '=', 'consu'),
+            ('default_code', '!=', False),
+        ], ['tracking', 'is_storable', 'default_code', 'name'])
+        
+        # In Odoo 19, tracking='none' with is_storable=True shows "Track Inventory? By Quantity";
+        # the checkbox is hidden while is_storable=False
+        groups = {}
+        for row in rows:
+            update_vals = {}
+            if row['tracking'] != 'none':
+                update_vals['tracking'] = 'none'  # "By Quantity"
+            if not row['is_storable']:
+                update_vals['is_storable'] = True  # Show Track Inventory checkbox in UI
+            if update_vals:
+                groups.setdefault(tuple(sorted(update_vals.items())), []).append(row)
+        total_count = sum(len(group_rows) for group_rows in groups.values())
+        _logger.warning(f'📦 Found {total_count} products that need fixing (of {len(rows)} goods with SKU)')
         
-        # Prepare result message
-        message_parts = []
-        message_parts.append(f'<b>Quick Fix Completed:</b><br/>')
-        message_parts.append(f'✅ Updated: {updated_count} products<br/>')
-        message_parts.append(f'📦 Total products found: {total_count}<br/>')
-        if skipped_count > 0:
-            message_parts.append(f'⚠️ Skipped: {skipped_count} products<br/>')
-        message_parts.append(f'<br/><b>💡 Next Steps:</b><br/>')
-        message_parts.append(f'1. Refresh the product page (F5)<br/>')
-        message_parts.append(f'2. If checkbox still not checked, logout and login again<br/>')
-        message_parts.append(f'3. Clear browser cache if needed<br/>')
-        if errors:
-            message_parts.append(f'<br/><b>Errors ({min(len(errors), 10)} of {len(errors)}):</b><br/>')
-            for error in errors[:10]:
-                message_parts.append(f'• {error}<br/>')
+        updated_count = 0
+        skipped_count = 0
+        errors = []
+        processed = 0
         
-        message = ''.join(message_parts)
+        for vals_key, group_rows in groups.items():
+            update_vals = dict(vals_key)
+            for start in range(0, len(group_rows), batch_size):
+                batch = group_rows[start:start + batch_size]
+                try:
+                    with self.env.cr.savepoint():
+                        template_model.browse([row['id'] for row in batch]).write(update_vals)
+                    updated_count += len(batch)
+                except Exception as e:
+                    _logger.warning(f'⚠️ Updating {len(batch)} products failed ({e}), retrying one by one')
+                    for row in batch:
+                        try:
+                            with self.env.cr.savepoint():
+                                template_model.browse(row['id']).write(update_vals)
+                            updated_count += 1
+                        except Exception as product_error:
+                            skipped_count += 1
+                            error_msg = f"Product {row['default_code'] or row['name']}: {product_error}"
+                            errors.append(error_msg)
+                            _logger.error(error_msg)
+                
+                processed += len(batch)
+                if job:
+                    job._update_progress(processed, total_count)
+                self.env.cr.commit()
         
+        _logger.warning(f'✅ Quick fix completed: {updated_count} updated, {skipped_count} skipped')
+        if total_count:
+            self._post_inventory_job_summary(
+                'Quick Fix Completed', updated_count, total_count, skipped_count, errors, 'products',
+            )
         return {
-            'type': 'ir.actions.client',
-            'tag': 'display_notification',
-            'params': {
-                'title': 'Quick Fix Completed',
-                'message': message,
-                'type': 'success' if skipped_count == 0 else 'warning',
-                'sticky': True,
-            }
+            'message': f'Enabled Track Inventory for {updated_count} of {total_count} products',
+            'count': updated_count,
+            'skipped': skipped_count,
+            'errors_detail': errors[:50],
         }
     
     def action_sync_stock_from_zortout(self):
@@ -2365,7 +2252,8 @@ Please check:
                 continue
             
             binding_ids = bindings.ids
-            batch_size = self.push_stock_batch_size or 0  # 0 = no batching
+            push_plan = AdaptivePushScheduler(self).plan()
+            batch_size = push_plan.batch_size  # 0 = no batching
             current_time = fields.Datetime.now()
             
             # If batch_size is 0 or bindings <= batch_size, create single job
@@ -2373,11 +2261,13 @@ Please check:
                 job = self.env['marketplace.job'].create({
                     'name': f'Push Stock to WooCommerce - {shop.name}',
                     'job_type': 'push_stock',
+                    **push_plan.job_vals(),
                     'account_id': self.id,
                     'shop_id': shop_id,
                     'priority': 'medium',
                     'payload': {
                         'binding_ids': binding_ids,
+                        **push_plan.payload(),
                     },
                     'state': 'pending',
                     'next_run_at': current_time,
@@ -2393,12 +2283,13 @@ Please check:
                     end_idx = min(start_idx + batch_size, total_bindings)
                     batch_binding_ids = binding_ids[start_idx:end_idx]
                     
-                    # Stagger jobs: each batch starts 5 seconds after previous
-                    batch_next_run = current_time + timedelta(seconds=batch_idx * 5)
+                    # Stagger jobs by the spacing chosen in the push plan
+                    batch_next_run = current_time + timedelta(seconds=batch_idx * push_plan.spacing_seconds)
                     
                     job = self.env['marketplace.job'].create({
                         'name': f'Push Stock to WooCommerce - {shop.name} (Batch {batch_idx + 1}/{batch_count})',
                         'job_type': 'push_stock',
+                        **push_plan.job_vals(),
                         'account_id': self.id,
                         'shop_id': shop_id,
                         'priority': 'medium',
@@ -2406,7 +2297,7 @@ Please check:
                             'binding_ids': batch_binding_ids,
                             'batch_index': batch_idx,
                             'batch_total': batch_count,
-                            'batch_size': batch_size,
+                            **push_plan.payload(),
                         },
                         'state': 'pending',
                         'next_run_at': batch_next_run,
@@ -2597,84 +2488,103 @@ Please check:
         skipped_count = 0
         errors = []
         
-        # Get all shops for this account
-        for shop in self.shop_ids.filtered('active'):
-            # Get all marketplace orders for this shop
-            orders = self.env['marketplace.order'].search([
-                ('shop_id', '=', shop.id),
-            ])
-            
-            # Collect unique SKUs from order lines
-            skus_to_bind = set()
-            for order in orders:
-                for line in order.order_line_ids:
-                    if line.external_sku:
-                        # Check if binding already exists
-                        existing = self.env['marketplace.product.binding'].search([
-                            ('external_sku', '=', line.external_sku),
-                            ('shop_id', '=', shop.id),
-                            ('active', '=', True),
-                        ], limit=1)
-                        
-                        if not existing:
-                            skus_to_bind.add(line.external_sku)
-            
-            _logger.warning(f'📦 Found {len(skus_to_bind)} unique SKUs without bindings for shop {shop.name}')
-            
-            # Create bindings for each SKU
-            for sku in skus_to_bind:
-                try:
-                    # Find product by SKU (default_code)
-                    # First try with company filter
-                    product = self.env['product.product'].search([
-                        ('default_code', '=', sku),
-                        ('company_id', '=', self.company_id.id),
-                    ], limit=1)
-                    
-                    if not product:
-                        # Try without company filter (for shared products)
-                        product = self.env['product.product'].search([
-                            ('default_code', '=', sku),
-                            ('company_id', '=', False),
-                        ], limit=1)
-                    
-                    if not product:
-                        # Try searching without company filter at all
-                        product = self.env['product.product'].search([
-                            ('default_code', '=', sku),
-                        ], limit=1)
-                    
-                    if product:
-                        # Check if binding already exists (race condition check)
-                        existing = self.env['marketplace.product.binding'].search([
-                            ('external_sku', '=', sku),
-                            ('shop_id', '=', shop.id),
-                        ], limit=1)
-                        
-                        if existing:
-                            skipped_count += 1
-                            continue
-                        
-                        # Create binding
-                        binding = self.env['marketplace.product.binding'].create({
-                            'product_id': product.id,
-                            'shop_id': shop.id,
-                            'external_sku': sku,
-                            'active': True,
-                        })
-                        created_count += 1
-                        _logger.warning(f'✅ Created binding: {sku} -> {product.name}')
-                    else:
+        shops = self.shop_ids.filtered('active')
+        
+        # Distinct (shop, SKU) pairs from order lines that have no binding yet (one aggregate).
+        # Archived bindings count as existing: the SKU is unique per shop, so they are left archived.
+        self.env['marketplace.order.line'].flush_model(['external_sku', 'order_id'])
+        self.env['marketplace.order'].flush_model(['shop_id'])
+        self.env['marketplace.product.binding'].flush_model(['external_sku', 'shop_id'])
+        self.env.cr.execute("""
+            SELECT o.shop_id, l.external_sku
+              FROM marketplace_order_line l
+              JOIN marketplace_order o ON o.id = l.order_id
+             WHERE o.shop_id = ANY(%s)
+               AND COALESCE(l.external_sku, '') != ''
+               AND NOT EXISTS (
+                   SELECT 1 FROM marketplace_product_binding b
+                    WHERE b.shop_id = o.shop_id
+                      AND b.external_sku = l.external_sku
+               )
+          GROUP BY o.shop_id, l.external_sku
+        """, (shops.ids,))
+        pairs = self.env.cr.fetchall()
+        skus = list({sku for __, sku in pairs})
+        _logger.warning(f'📦 Found {len(skus)} unique SKUs without bindings in {len(pairs)} shop/SKU pairs')
+        
+        # Resolve every SKU in one query, keeping the old matching order:
+        # company product, then shared product, then any product of an allowed company
+        product_by_sku = {}
+        if skus:
+            self.env['product.product'].flush_model(['default_code', 'active', 'product_tmpl_id'])
+            self.env['product.template'].flush_model(['company_id'])
+            self.env.cr.execute("""
+                SELECT DISTINCT ON (p.default_code) p.default_code, p.id, t.company_id
+                  FROM product_product p
+                  JOIN product_template t ON t.id = p.product_tmpl_id
+                 WHERE p.default_code = ANY(%s)
+                   AND p.active
+                   AND (t.company_id IS NULL OR t.company_id = ANY(%s))
+              ORDER BY p.default_code,
+                       CASE WHEN t.company_id = %s THEN 0 WHEN t.company_id IS NULL THEN 1 ELSE 2 END,
+                       p.id
+            """, (skus, self.env.companies.ids, self.company_id.id))
+            product_by_sku = {sku: (product_id, company_id) for sku, product_id, company_id in self.env.cr.fetchall()}
+        
+        shop_company = {shop.id: shop.company_id.id for shop in shops}
+        vals_list = []
+        for shop_id, sku in pairs:
+            product_id, product_company_id = product_by_sku.get(sku, (None, None))
+            if not product_id:
+                skipped_count += 1
+                errors.append(f'SKU {sku}: Product not found in Odoo')
+                continue
+            if product_company_id and shop_company[shop_id] and product_company_id != shop_company[shop_id]:
+                skipped_count += 1
+                errors.append(f'SKU {sku}: Product and Shop must belong to the same company')
+                continue
+            vals_list.append({
+                'product_id': product_id,
+                'shop_id': shop_id,
+                'external_sku': sku,
+                'active': True,
+            })
+        
+        # Insert all missing bindings in one batch; replay one by one only if the batch fails
+        binding_model = self.env['marketplace.product.binding'].with_context(tracking_disable=True)
+        bindings = binding_model
+        if vals_list:
+            try:
+                with self.env.cr.savepoint():
+                    bindings = binding_model.create(vals_list)
+            except Exception as e:
+                _logger.warning(f'⚠️ Batch binding creation failed ({e}), retrying one by one')
+                for vals in vals_list:
+                    try:
+                        with self.env.cr.savepoint():
+                            bindings |= binding_model.create(vals)
+                    except Exception as row_error:
                         skipped_count += 1
-                        error_msg = f'SKU {sku}: Product not found in Odoo'
+                        error_msg = f'SKU {vals["external_sku"]}: {row_error}'
                         errors.append(error_msg)
-                        _logger.warning(f'⚠️  {error_msg}')
-                
-                except Exception as e:
-                    skipped_count += 1
-                    error_msg = f'SKU {sku}: {str(e)}'
-                    errors.append(error_msg)
-                    _logger.error(error_msg, exc_info=True)
+                        _logger.error(error_msg)
+        created_count = len(bindings)
+        
+        # Link the historic order lines to their new bindings in one statement
+        if bindings:
+            self.env.cr.execute("""
+                UPDATE marketplace_order_line l
+                   SET product_binding_id = b.id
+                  FROM marketplace_order o, marketplace_product_binding b
+                 WHERE l.order_id = o.id
+                   AND b.shop_id = o.shop_id
+                   AND b.external_sku = l.external_sku
+                   AND b.id = ANY(%s)
+                   AND l.product_binding_id IS NULL
+            """, (bindings.ids,))
+            self.env['marketplace.order.line'].invalidate_model(['product_binding_id'])
+        
+        _logger.warning(f'✅ Created {created_count} bindings from orders for account {self.name} ({skipped_count} skipped)')
         
         # Prepare result message
         message_parts = []
@@ -2767,6 +2677,13 @@ Please check:
     
     def action_sync_products_from_woocommerce_sync(self, job=None):
         """Internal method: Sync products from WooCommerce (called by background job)
+        
+        Streams product pages into bindings (see WooCommerceCatalogSync). The
+        whole catalog is re-read, so SKUs whose Odoo product was created since
+        the last sync get bound; unchanged bindings are not rewritten. Scheduled
+        runs may queue the job with {'incremental': True} to only list products
+        modified since the last complete sync.
+        
         Args:
             job: Optional marketplace.job record for progress tracking
         """
@@ -2785,459 +2702,74 @@ Please check:
         if not self.client_id or not self.woocommerce_consumer_key or not self.client_secret:
             raise ValueError('Please configure Store URL, Consumer Key, and Consumer Secret first')
         
-        adapter = self._get_adapter(shop=None)
-        _logger.warning(f'🔄 Syncing products from WooCommerce for account {self.id}: {self.name}')
-        
-        # Fetch all products from WooCommerce
-        all_products = []
-        page = 1
-        per_page = 100
-        
-        # Initialize progress tracking
-        if job:
-            job.write({
-                'total_items': 0,  # Will be updated after fetching
-                'processed_items': 0,
-                'progress': 0.0,
-            })
-            self.env.cr.commit()
-        else:
+        if not job:
             # Fallback: search for in_progress job
             job = self.env['marketplace.job'].search([
                 ('account_id', '=', self.id),
                 ('job_type', '=', 'sync_products_from_woocommerce'),
                 ('state', '=', 'in_progress'),
             ], limit=1, order='create_date desc')
-            if job:
-                job.write({
-                    'total_items': 0,  # Will be updated after fetching
-                    'processed_items': 0,
-                    'progress': 0.0,
-                })
-                self.env.cr.commit()
-        
-        while True:
-            try:
-                products = adapter._make_request('GET', 'products', params={
-                    'per_page': per_page,
-                    'page': page,
-                })
-                
-                if not products:
-                    break
-                
-                all_products.extend(products)
-                _logger.warning(f'📦 Fetched page {page}: {len(products)} products')
-                
-                # Check if we got less than per_page (last page)
-                if len(products) < per_page:
-                    break
-                
-                page += 1
-                
-            except Exception as e:
-                _logger.error(f'Error fetching products page {page}: {e}')
-                break
-        
-        _logger.warning(f'✅ Total products fetched from WooCommerce: {len(all_products)}')
-        
-        # Map products by SKU and create bindings
-        created_count = 0
-        updated_count = 0
-        skipped_count = 0
-        not_found_count = 0
-        variations_created = 0
-        variations_updated = 0
-        variations_not_found = 0
-        errors = []
+        if job:
+            job.write({
+                'total_items': 0,  # Unknown until the listing is streamed
+                'processed_items': 0,
+                'progress': 0.0,
+            })
+            self.env.cr.commit()
         
-        # Store skipped/not found products for export
-        skipped_products = []  # List of dicts with product details
-        not_found_products = []  # List of dicts with product details
-        variations_not_found_list = []  # List of dicts with variation details
+        payload = job._get_payload_dict() if job else {}
+        full_sync = not payload.get('incremental') or not self.woocommerce_products_synced_at
+        # Small overlap so a product saved while the previous sync ran is not missed
+        modified_after = None if full_sync else self.woocommerce_products_synced_at - timedelta(minutes=5)
+        started_at = fields.Datetime.now()
         
         # Get shop (use first shop)
         shop = self.shop_ids[0]
+        adapter = self._get_adapter(shop=None)
+        _logger.warning(
+            f'🔄 Syncing products from WooCommerce for account {self.id}: {self.name} '
+            f'({"full" if full_sync else f"modified after {modified_after}"})'
+        )
         
-        # Step 1: Collect all SKUs (from simple products and variations)
-        all_skus = []
-        simple_products_data = []  # (wc_product, wc_sku, wc_product_id)
-        variable_products_data = []  # (wc_product_id, variations)
-        
-        for wc_product in all_products:
-            wc_product_id = str(wc_product.get('id', ''))
-            wc_product_type = wc_product.get('type', 'simple')
-            
-            if wc_product_type == 'variable':
-                # Will handle variations separately
-                variable_products_data.append((wc_product_id, wc_product))
-            else:
-                wc_sku = wc_product.get('sku', '').strip()
-                if wc_sku:
-                    all_skus.append(wc_sku)
-                    simple_products_data.append((wc_product, wc_sku, wc_product_id))
-        
-        # Step 2: Fetch variations for all variable products (optimized: concurrent requests)
-        all_variations_data = []  # (wc_product_id, variation)
-        total_variable_products = len(variable_products_data)
-        
-        if total_variable_products > 0:
-            _logger.warning(f'📦 Fetching variations for {total_variable_products} variable products (concurrent)...')
-            
-            # Use concurrent requests to speed up variation fetching
-            import concurrent.futures
-            import threading
-            import requests
-            from requests.auth import HTTPBasicAuth
-            
-            # Create a thread-safe function to fetch variations
-            # Each thread needs its own adapter instance or we need to make requests directly
-            def fetch_variations(wc_product_id):
-                """Fetch variations for a single product (thread-safe)"""
-                try:
-                    # Make request directly (thread-safe) instead of using adapter
-                    # adapter.base_url already includes wp-json/wc/v3/
-                    url = f"{adapter.base_url}products/{wc_product_id}/variations"
-                    
-                    # Get credentials (same logic as adapter._get_auth)
-                    account = adapter.account
-                    consumer_key = account.woocommerce_consumer_key
-                    if not consumer_key:
-                        # Fallback to system parameter
-                        consumer_key = account.env['ir.config_parameter'].sudo().get_param(
-                            'marketplace.woocommerce.consumer_key'
-                        )
-                    if not consumer_key:
-                        # Last fallback: use client_secret
-                        consumer_key = account.client_secret
-                    
-                    consumer_secret = account.client_secret  # Consumer Secret is stored in client_secret field
-                    
-                    if not consumer_secret:
-                        return (wc_product_id, [], 'Consumer Secret is required')
-                    
-                    auth = HTTPBasicAuth(consumer_key, consumer_secret)
-                    params = {'per_page': 100}
-                    
-                    response = requests.get(url, auth=auth, params=params, timeout=30)
-                    response.raise_for_status()
-                    variations = response.json()
-                    
-                    return (wc_product_id, variations, None)
-                except Exception as e:
-                    return (wc_product_id, [], str(e))
-            
-            # Fetch variations concurrently (max 10 concurrent requests to avoid rate limiting)
-            max_workers = min(10, total_variable_products)
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks
-                future_to_product = {
-                    executor.submit(fetch_variations, wc_product_id): wc_product_id
-                    for wc_product_id, _ in variable_products_data
-                }
-                
-                # Process completed tasks
-                completed = 0
-                for future in concurrent.futures.as_completed(future_to_product):
-                    completed += 1
-                    wc_product_id, variations, error = future.result()
-                    
-                    if error:
-                        error_msg = f"Error fetching variations for product {wc_product_id}: {error}"
-                        errors.append(error_msg)
-                        _logger.error(error_msg)
-                    else:
-                        for variation in variations:
-                            var_sku = variation.get('sku', '').strip()
-                            if var_sku:
-                                all_skus.append(var_sku)
-                                all_variations_data.append((wc_product_id, variation))
-                    
-                    # Log progress every 10 products
-                    if completed % 10 == 0 or completed == total_variable_products:
-                        _logger.info(f'📦 Fetched variations: {completed}/{total_variable_products} products ({len(all_variations_data)} variations so far)')
-            
-            _logger.warning(f'✅ Completed fetching variations: {len(all_variations_data)} variations from {completed} products')
-        
-        _logger.warning(f'📦 Processing {len(simple_products_data)} simple products and {len(all_variations_data)} variations')
-        
-        # Step 3: Bulk search all Odoo products by SKU (1 query instead of N queries)
-        odoo_products_by_sku = {}
-        if all_skus:
-            # Search with company filter first
-            products_with_company = self.env['product.product'].search([
-                ('default_code', 'in', all_skus),
-                ('company_id', '=', self.company_id.id),
-            ])
-            for product in products_with_company:
-                if product.default_code:
-                    odoo_products_by_sku[product.default_code] = product
-            
-            # Search shared products (company_id = False) for SKUs not found
-            found_skus = set(odoo_products_by_sku.keys())
-            missing_skus = [sku for sku in all_skus if sku not in found_skus]
-            if missing_skus:
-                products_shared = self.env['product.product'].search([
-                    ('default_code', 'in', missing_skus),
-                    ('company_id', '=', False),
-                ])
-                for product in products_shared:
-                    if product.default_code:
-                        odoo_products_by_sku[product.default_code] = product
-        
-        # Step 4: Bulk search all existing bindings (1 query instead of N queries)
-        existing_bindings_map = {}  # (product_id, shop_id) -> binding
-        if odoo_products_by_sku:
-            product_ids = [p.id for p in odoo_products_by_sku.values()]
-            existing_bindings = self.env['marketplace.product.binding'].search([
-                ('product_id', 'in', product_ids),
-                ('shop_id', '=', shop.id),
-            ])
-            for binding in existing_bindings:
-                key = (binding.product_id.id, binding.shop_id.id)
-                existing_bindings_map[key] = binding
-        
-        # Step 5: Prepare bulk create/update operations
-        bindings_to_create = []
-        bindings_to_update = []
-        batch_size = 200  # Increased batch size for better performance (was 100)
-        
-        # Process simple products
-        for wc_product, wc_sku, wc_product_id in simple_products_data:
-            try:
-                odoo_product = odoo_products_by_sku.get(wc_sku)
-                if not odoo_product:
-                    not_found_count += 1
-                    _logger.warning(f'⚠️ Product with SKU {wc_sku} not found in Odoo')
-                    # Store for export
-                    not_found_products.append({
-                        'product_id': wc_product_id,
-                        'name': wc_product.get('name', ''),
-                        'sku': wc_sku,
-                        'type': wc_product.get('type', 'simple'),
-                        'reason': 'SKU not found in Odoo',
-                    })
-                    continue
-                
-                key = (odoo_product.id, shop.id)
-                existing_binding = existing_bindings_map.get(key)
-                
-                if existing_binding:
-                    bindings_to_update.append((existing_binding, {
-                        'external_sku': wc_sku,
-                        'external_product_id': wc_product_id,
-                        'active': True,
-                    }))
-                else:
-                    bindings_to_create.append({
-                        'product_id': odoo_product.id,
-                        'shop_id': shop.id,
-                        'external_sku': wc_sku,
-                        'external_product_id': wc_product_id,
-                        'active': True,
-                    })
-            except Exception as e:
-                error_msg = f"Error processing product {wc_product.get('name', 'Unknown')} (SKU: {wc_sku}): {str(e)}"
-                errors.append(error_msg)
-                _logger.error(error_msg, exc_info=True)
-        
-        # Process variations
-        for wc_product_id, variation in all_variations_data:
-            try:
-                var_sku = variation.get('sku', '').strip()
-                var_id = str(variation.get('id', ''))
-                
-                if not var_sku:
-                    continue
-                
-                odoo_product = odoo_products_by_sku.get(var_sku)
-                if not odoo_product:
-                    variations_not_found += 1
-                    _logger.warning(f'⚠️ Variation with SKU {var_sku} not found in Odoo')
-                    # Store for export
-                    variations_not_found_list.append({
-                        'parent_product_id': wc_product_id,
-                        'variation_id': var_id,
-                        'name': variation.get('name', ''),
-                        'sku': var_sku,
-                        'reason': 'SKU not found in Odoo',
-                    })
-                    continue
-                
-                external_product_id = f"{wc_product_id}:{var_id}"
-                key = (odoo_product.id, shop.id)
-                existing_binding = existing_bindings_map.get(key)
-                
-                if existing_binding:
-                    bindings_to_update.append((existing_binding, {
-                        'external_sku': var_sku,
-                        'external_product_id': external_product_id,
-                        'active': True,
-                    }))
-                else:
-                    bindings_to_create.append({
-                        'product_id': odoo_product.id,
-                        'shop_id': shop.id,
-                        'external_sku': var_sku,
-                        'external_product_id': external_product_id,
-                        'active': True,
-                    })
-            except Exception as e:
-                error_msg = f"Error processing variation {variation.get('id', 'Unknown')} (SKU: {variation.get('sku', 'N/A')}): {str(e)}"
-                errors.append(error_msg)
-                _logger.error(error_msg, exc_info=True)
-        
-        # Step 6: Bulk update existing bindings (optimized: use recordset.write() for better performance)
-        if bindings_to_update:
-            # Group bindings by update values to minimize write operations
-            update_groups = {}  # tuple(vals) -> list of bindings
-            
-            for binding, vals in bindings_to_update:
-                # Create a key from sorted vals items for grouping
-                vals_key = tuple(sorted(vals.items()))
-                if vals_key not in update_groups:
-                    update_groups[vals_key] = []
-                update_groups[vals_key].append(binding)
-            
-            # Update bindings in groups using recordset.write() (faster than individual writes)
-            total_updated = 0
-            for vals_key, bindings in update_groups.items():
-                try:
-                    # Convert tuple back to dict
-                    vals = dict(vals_key)
-                    # Create recordset from list of bindings and write once
-                    binding_recordset = self.env['marketplace.product.binding'].browse([b.id for b in bindings])
-                    binding_recordset.write(vals)
-                    
-                    # Count updates (check if variation by external_product_id format)
-                    # Check external_product_id from vals instead of refreshing (faster)
-                    is_variation = vals.get('external_product_id', '').find(':') != -1 if vals.get('external_product_id') else False
-                    for binding in bindings:
-                        if is_variation:
-                            variations_updated += 1
-                        else:
-                            updated_count += 1
-                        total_updated += 1
-                except Exception as e:
-                    _logger.error(f'Failed to update {len(bindings)} bindings: {e}', exc_info=True)
-            
-            # Commit after all updates (single commit instead of per-binding)
-            self.env.cr.commit()
-            _logger.warning(f'✅ Updated {total_updated} bindings in {len(update_groups)} groups')
-        
-        # Step 7: Bulk create new bindings (in batches)
-        if bindings_to_create:
-            for batch_start in range(0, len(bindings_to_create), batch_size):
-                batch = bindings_to_create[batch_start:batch_start + batch_size]
-                try:
-                    new_bindings = self.env['marketplace.product.binding'].create(batch)
-                    for binding in new_bindings:
-                        if binding.external_product_id and ':' in binding.external_product_id:
-                            variations_created += 1
-                        else:
-                            created_count += 1
-                    
-                    # Commit after each batch
-                    self.env.cr.commit()
-                    _logger.warning(f'✅ Created batch {batch_start // batch_size + 1}: {len(batch)} bindings')
-                except Exception as e:
-                    _logger.error(f'Failed to create batch of bindings: {e}', exc_info=True)
-                    error_count = len(batch)
-                    errors.append(f'Failed to create {error_count} bindings in batch')
-        
-        # Count skipped (variable parent products and products without SKU)
-        # Track which variable products have variations that were successfully synced
-        # Check after bindings are created/updated to see which variations actually have bindings
-        variable_products_with_synced_variations = set()
-        
-        # After processing variations, check which variable products have successfully synced variations
-        # A variation is considered synced if:
-        # 1. It has a matching Odoo product (found in odoo_products_by_sku)
-        # 2. It was added to bindings_to_create or bindings_to_update (or already exists)
-        for wc_product_id, variation in all_variations_data:
-            var_sku = variation.get('sku', '').strip()
-            if var_sku:
-                # Check if this variation has matching Odoo product
-                odoo_product = odoo_products_by_sku.get(var_sku)
-                if odoo_product:
-                    # Check if binding exists, will be created, or will be updated
-                    key = (odoo_product.id, shop.id)
-                    
-                    # Check 1: Existing binding (will be updated)
-                    if key in existing_bindings_map:
-                        variable_products_with_synced_variations.add(wc_product_id)
-                        continue
-                    
-                    # Check 2: Will be created
-                    for binding_data in bindings_to_create:
-                        if binding_data.get('product_id') == odoo_product.id and binding_data.get('shop_id') == shop.id:
-                            variable_products_with_synced_variations.add(wc_product_id)
-                            break
-                    
-                    # Check 3: Will be updated (check bindings_to_update)
-                    if wc_product_id not in variable_products_with_synced_variations:
-                        for binding, vals in bindings_to_update:
-                            if binding.product_id.id == odoo_product.id and binding.shop_id.id == shop.id:
-                                variable_products_with_synced_variations.add(wc_product_id)
-                                break
+        sync = WooCommerceCatalogSync(self, shop, adapter, job=job)
+        stats = sync.run(modified_after=modified_after)
+        errors = sync.errors
         
-        skipped_count = 0
+        if sync.complete:
+            self.write({'woocommerce_products_synced_at': started_at})
         
-        # Store skipped products (variable parents and products without SKU)
-        for wc_product in all_products:
-            wc_product_id = str(wc_product.get('id', ''))
-            wc_product_type = wc_product.get('type', 'simple')
-            wc_sku = wc_product.get('sku', '').strip()
-            
-            # Variable parent products (no SKU at parent level)
-            if wc_product_type == 'variable':
-                # Only mark as skipped if no variations were successfully synced
-                if wc_product_id not in variable_products_with_synced_variations:
-                    skipped_count += 1
-                    skipped_products.append({
-                        'product_id': wc_product_id,
-                        'name': wc_product.get('name', ''),
-                        'sku': '',
-                        'type': 'variable',
-                        'reason': 'Variable parent product (no SKU at parent level, and no variations synced)',
-                    })
-                # If variations were synced, don't mark parent as skipped
-                # (this is expected behavior - parent doesn't need SKU, variations do)
-            # Simple products without SKU
-            elif not wc_sku:
-                skipped_count += 1
-                skipped_products.append({
-                    'product_id': wc_product_id,
-                    'name': wc_product.get('name', ''),
-                    'sku': '',
-                    'type': 'simple',
-                    'reason': 'No SKU',
-                })
+        created_count = stats['created']
+        updated_count = stats['updated']
+        variations_created = stats['variations_created']
+        variations_updated = stats['variations_updated']
+        skipped_count = stats['skipped']
+        not_found_count = stats['not_found']
+        variations_not_found = stats['variations_not_found']
+        unchanged_count = stats['unchanged'] + stats['variations_unchanged']
         
         # Prepare summary message (use plain text for better compatibility)
         summary_lines = []
-        summary_lines.append('Product Sync Summary:')
+        summary_lines.append('Product Sync Summary:' if full_sync else f'Product Sync Summary (modified since {modified_after}):')
         summary_lines.append('')
         summary_lines.append(f'✅ Created: {created_count} bindings (simple products)')
         summary_lines.append(f'🔄 Updated: {updated_count} bindings (simple products)')
         summary_lines.append(f'📦 Variations Created: {variations_created} bindings')
         summary_lines.append(f'🔄 Variations Updated: {variations_updated} bindings')
-        # Calculate total variable parents
-        total_variable_parents = len(variable_products_data)
-        synced_variable_parents = len(variable_products_with_synced_variations)
-        
+        summary_lines.append(f'⏸️ Unchanged: {unchanged_count} bindings')
+        total_variable_parents = stats['variable_products']
         if total_variable_parents > 0:
+            synced_variable_parents = total_variable_parents - len([p for p in sync.skipped_products if p['type'] == 'variable'])
             summary_lines.append(f'📦 Variable Products: {total_variable_parents} parents ({synced_variable_parents} with synced variations)')
             if skipped_count > 0:
-                summary_lines.append(f'⏭️ Skipped: {skipped_count} products (no SKU or variable parent with no synced variations)')
+                summary_lines.append(f'⏭️ Skipped: {skipped_count} products (no SKU, duplicate SKU or variable parent with no synced variations)')
         else:
-            summary_lines.append(f'⏭️ Skipped: {skipped_count} products (no SKU)')
+            summary_lines.append(f'⏭️ Skipped: {skipped_count} products (no SKU or duplicate SKU)')
         summary_lines.append(f'⚠️ Not Found: {not_found_count} products (SKU not found in Odoo)')
         summary_lines.append(f'⚠️ Variations Not Found: {variations_not_found} variations (SKU not found in Odoo)')
         summary_lines.append(f'❌ Errors: {len(errors)}')
         summary_lines.append('')
-        summary_lines.append(f'Total Products in WooCommerce: {len(all_products)}')
-        summary_lines.append(f'Total Bindings: {created_count + updated_count + variations_created + variations_updated}')
+        summary_lines.append(f'Total Products in WooCommerce: {stats["products"]}' if full_sync else f'Modified Products in WooCommerce: {stats["products"]}')
+        summary_lines.append(f'Total Bindings: {created_count + updated_count + variations_created + variations_updated + unchanged_count}')
         
         if errors:
             summary_lines.append('')
@@ -3249,38 +2781,34 @@ Please check:
         
         summary = '\n'.join(summary_lines)
         
-        # Store export data for CSV download
-        export_data = {
-            'skipped_products': skipped_products,
-            'not_found_products': not_found_products,
-            'variations_not_found': variations_not_found_list,
-            'sync_date': fields.Datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'account_name': self.name,
-        }
-        self.write({'sync_export_data': json.dumps(export_data, ensure_ascii=False)})
-        
-        # Post message with download link if there are skipped/not found products
-        message_body = f'Product sync completed: {created_count + variations_created} created, {updated_count + variations_updated} updated, {not_found_count + variations_not_found} not found (including {variations_created + variations_updated} variations)'
-        
-        if skipped_count > 0 or not_found_count > 0 or variations_not_found > 0:
-            # Add download button/link to message
-            # Use direct method call via button in form view
-            message_body += f'<br/><br/>📥 <strong>Download Report:</strong> ใช้ปุ่ม "Download Skipped Products Report" ในหน้า Account หรือคลิกที่ <a href="#" onclick="window.location.href=\'/web#id={self.id}&model=marketplace.account&action=otd_marketplace_stock.action_download_skipped_products\'">ลิงก์นี้</a>'
+        changed_count = created_count + updated_count + variations_created + variations_updated
+        has_report = skipped_count > 0 or not_found_count > 0 or variations_not_found > 0
+        
+        # Store export data for CSV download (an incremental sync only replaces it when it has something to report)
+        if full_sync or has_report:
+            export_data = {
+                'skipped_products': sync.skipped_products,
+                'not_found_products': sync.not_found_products,
+                'variations_not_found': sync.variations_not_found,
+                'sync_date': fields.Datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'account_name': self.name,
+            }
+            self.write({'sync_export_data': json.dumps(export_data, ensure_ascii=False)})
         
-        self.message_post(body=message_body)
+        # Post message only when the sync changed or found something
+        if changed_count or has_report or errors:
+            message_body = f'Product sync completed: {created_count + variations_created} created, {updated_count + variations_updated} updated, {not_found_count + variations_not_found} not found (including {variations_created + variations_updated} variations)'
+            
+            if has_report:
+                # Add download button/link to message
+                # Use direct method call via button in form view
+                message_body += f'<br/><br/>📥 <strong>Download Report:</strong> ใช้ปุ่ม "Download Skipped Products Report" ในหน้า Account หรือคลิกที่ <a href="#" onclick="window.location.href=\'/web#id={self.id}&model=marketplace.account&action=otd_marketplace_stock.action_download_skipped_products\'">ลิงก์นี้</a>'
+            
+            self.message_post(body=message_body)
         
         # Update job progress to 100%
-        # Use the job parameter if provided, otherwise search for it
-        if not job:
-            job = self.env['marketplace.job'].search([
-                ('account_id', '=', self.id),
-                ('job_type', '=', 'sync_products_from_woocommerce'),
-                ('state', '=', 'in_progress'),
-            ], limit=1, order='create_date desc')
-        
         if job:
-            total_processed = created_count + updated_count + variations_created + variations_updated
-            job._update_progress(total_processed, max(total_processed, 1))
+            job._update_progress(sync.processed, max(sync.processed, 1))
         
         _logger.warning(f'✅ Product sync completed: {summary}')
         
@@ -3289,6 +2817,7 @@ Please check:
             'summary': summary,
             'created': created_count + variations_created,
             'updated': updated_count + variations_updated,
+            'unchanged': unchanged_count,
             'skipped': skipped_count,
             'not_found': not_found_count + variations_not_found,
             'errors': errors,
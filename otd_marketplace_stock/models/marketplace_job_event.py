@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+JOB_EVENT_SELECTION = [
+    ('started', 'Started'),
+    ('done', 'Done'),
+    ('retry', 'Retry Scheduled'),
+    ('dead', 'Dead Letter'),
+    ('requeued', 'Requeued'),
+]
+
+
+class MarketplaceJobEvent(models.Model):
+    """Append-only log of marketplace job state transitions
+
+    Replaces chatter on the job success path: one narrow row per transition,
+    inserted with plain SQL in the job's own transaction, no followers,
+    notifications or mail.message. Chatter is only used for dead-letter jobs
+    that need a human. Rows go away with their job (ON DELETE CASCADE).
+    """
+    _name = 'marketplace.job.event'
+    _description = 'Marketplace Job Event'
+    _order = 'id desc'
+    _log_access = False
+
+    job_id = fields.Many2one('marketplace.job', string='Job', required=True, ondelete='cascade', index=True, readonly=True)
+    job_type = fields.Char(string='Job Type', readonly=True)
+    account_id = fields.Many2one('marketplace.account', string='Account', ondelete='cascade', index=True, readonly=True)
+    shop_id = fields.Many2one('marketplace.shop', string='Shop', ondelete='cascade', readonly=True)
+    event = fields.Selection(JOB_EVENT_SELECTION, string='Event', required=True, readonly=True)
+    date = fields.Datetime(string='Date', required=True, readonly=True)
+    retries = fields.Integer(string='Retries', readonly=True)
+    processed_items = fields.Integer(string='Processed Items', readonly=True)
+    duration_seconds = fields.Float(string='Duration (seconds)', readonly=True)
+    message = fields.Text(string='Message', readonly=True)
+
+    @api.model
+    def _append(self, job, event, message=None):
+        """Insert one event row for job (no ORM create overhead)"""
+        self.env.cr.execute("""
+            INSERT INTO marketplace_job_event
+                (job_id, job_type, account_id, shop_id, event, date, retries,
+                 processed_items, duration_seconds, message)
+            VALUES (%s, %s, %s, %s, %s, NOW() AT TIME ZONE 'UTC', %s, %s, %s, %s)
+        """, (
+            job.id, job.job_type, job.account_id.id or None, job.shop_id.id or None, event,
+            job.retries or 0, job.processed_items or 0, job.duration_seconds or 0.0,
+            (message or '')[:2000] or None,
+        ))
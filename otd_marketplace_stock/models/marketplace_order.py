@@ -10,6 +10,8 @@ except ImportError:
 import logging
 import json
 
+from .job_logging import job_log, job_count
+
 _logger = logging.getLogger(__name__)
 
 
@@ -145,9 +147,9 @@ class MarketplaceOrder(models.Model):
                 })
             
             # Sync to sale order
-            _logger.warning(f'🔍 create_from_payload: Syncing order {order.name} to sale order')
+            job_log(_logger, logging.DEBUG, '🔍 create_from_payload: Syncing order %s to sale order', order.name)
             order._sync_to_sale_order()
-            _logger.warning(f'✅ create_from_payload: Successfully synced order {order.name} to sale order')
+            job_log(_logger, logging.DEBUG, '✅ create_from_payload: Successfully synced order %s to sale order', order.name)
             
             return order
             
@@ -299,12 +301,12 @@ class MarketplaceOrder(models.Model):
         
         # Sync newly created orders using bulk operations
         if all_new_orders:
-            _logger.warning(f'🔍 create_from_payloads_bulk: Syncing {len(all_new_orders)} new orders to sale orders')
+            job_log(_logger, logging.INFO, '🔍 create_from_payloads_bulk: Syncing %s new orders to sale orders', len(all_new_orders))
             try:
                 # Convert list to recordset before calling bulk sync
                 new_orders_recordset = self.browse([order.id for order in all_new_orders])
                 self._sync_orders_to_sale_orders_bulk(new_orders_recordset)
-                _logger.warning(f'✅ create_from_payloads_bulk: Successfully synced {len(all_new_orders)} orders to sale orders')
+                job_log(_logger, logging.INFO, '✅ create_from_payloads_bulk: Successfully synced %s orders to sale orders', len(all_new_orders))
             except Exception as e:
                 _logger.error(f'Failed to bulk sync new orders: {e}', exc_info=True)
                 # Fallback to individual sync in batches
@@ -329,20 +331,20 @@ class MarketplaceOrder(models.Model):
         """Sync marketplace order to Odoo sale order"""
         for order in self:
             if order.state in ('cancelled', 'returned'):
-                _logger.warning(f'🔍 _sync_to_sale_order: Skipping order {order.name} (state: {order.state})')
+                job_log(_logger, logging.DEBUG, '🔍 _sync_to_sale_order: Skipping order %s (state: %s)', order.name, order.state)
                 continue
             
-            _logger.warning(f'🔍 _sync_to_sale_order: Processing order {order.name} (sale_order_id: {order.sale_order_id.id if order.sale_order_id else None})')
+            job_log(_logger, logging.DEBUG, '🔍 _sync_to_sale_order: Processing order %s (sale_order_id: %s)', order.name, order.sale_order_id.id if order.sale_order_id else None)
             try:
                 if order.sale_order_id:
                     # Update existing
-                    _logger.warning(f'🔍 _sync_to_sale_order: Updating existing sale order {order.sale_order_id.name}')
+                    job_log(_logger, logging.DEBUG, '🔍 _sync_to_sale_order: Updating existing sale order %s', order.sale_order_id.name)
                     order._update_sale_order()
                 else:
                     # Create new
-                    _logger.warning(f'🔍 _sync_to_sale_order: Creating new sale order for {order.name}')
+                    job_log(_logger, logging.DEBUG, '🔍 _sync_to_sale_order: Creating new sale order for %s', order.name)
                     sale_order = order._create_sale_order()
-                    _logger.warning(f'✅ _sync_to_sale_order: Successfully created sale order {sale_order.name} for marketplace order {order.name}')
+                    job_log(_logger, logging.DEBUG, '✅ _sync_to_sale_order: Successfully created sale order %s for marketplace order %s', sale_order.name, order.name)
                 
                 order.write({
                     'state': 'synced',
@@ -364,18 +366,18 @@ class MarketplaceOrder(models.Model):
             orders: list of marketplace.order records
         """
         if not orders:
-            _logger.warning('🔍 _sync_orders_to_sale_orders_bulk: No orders provided')
+            job_log(_logger, logging.DEBUG, '🔍 _sync_orders_to_sale_orders_bulk: No orders provided')
             return
         
-        _logger.warning(f'🔍 _sync_orders_to_sale_orders_bulk: Processing {len(orders)} orders')
+        job_log(_logger, logging.DEBUG, '🔍 _sync_orders_to_sale_orders_bulk: Processing %s orders', len(orders))
         
         # Filter out cancelled/returned orders
         orders_to_sync = orders.filtered(lambda o: o.state not in ('cancelled', 'returned'))
         if not orders_to_sync:
-            _logger.warning(f'🔍 _sync_orders_to_sale_orders_bulk: No orders to sync after filtering (all cancelled/returned)')
+            job_log(_logger, logging.DEBUG, '🔍 _sync_orders_to_sale_orders_bulk: No orders to sync after filtering (all cancelled/returned)')
             return
         
-        _logger.warning(f'🔍 _sync_orders_to_sale_orders_bulk: {len(orders_to_sync)} orders to sync after filtering')
+        job_log(_logger, logging.DEBUG, '🔍 _sync_orders_to_sale_orders_bulk: %s orders to sync after filtering', len(orders_to_sync))
         
         # Step 1: Bulk lookup/create partners (optimized)
         partner_map = self._bulk_get_or_create_partners(orders_to_sync)
@@ -388,7 +390,7 @@ class MarketplaceOrder(models.Model):
         orders_to_update = orders_to_sync.filtered(lambda o: o.sale_order_id)
         relinked_orders = self.env['marketplace.order']
         
-        _logger.warning(f'🔍 _sync_orders_to_sale_orders_bulk: {len(orders_to_create)} orders to create, {len(orders_to_update)} orders to update')
+        job_log(_logger, logging.INFO, '🔍 _sync_orders_to_sale_orders_bulk: %s orders to create, %s orders to update', len(orders_to_create), len(orders_to_update))
         
         # Step 4: Bulk update existing sale orders
         if orders_to_update:
@@ -413,7 +415,7 @@ class MarketplaceOrder(models.Model):
             for order in orders_to_create:
                 partner = partner_map.get(order.id)
                 if not partner:
-                    _logger.warning(f'No partner found for order {order.name}, skipping')
+                    job_log(_logger, logging.WARNING, 'No partner found for order %s, skipping', order.name)
                     continue
                 
                 # Guard against duplicate sale orders (e.g., when sync retried)
@@ -466,13 +468,13 @@ class MarketplaceOrder(models.Model):
                 
                 # Prepare order lines
                 line_vals_list = []
-                _logger.warning(f'🔍 _sync_orders_to_sale_orders_bulk: Order {order.name} has {len(order.order_line_ids)} marketplace lines before creating sale order')
+                job_log(_logger, logging.DEBUG, '🔍 _sync_orders_to_sale_orders_bulk: Order %s has %s marketplace lines before creating sale order', order.name, len(order.order_line_ids))
                 for line in order.order_line_ids:
                     # Get product from binding or ensure it exists
                     target_company_id = company_id or self.env.company.id
                     product = line._ensure_product_for_company(target_company_id)
                     if not product:
-                        _logger.warning(f'No product found for SKU {line.external_sku} in order {order.name}, skipping line')
+                        job_log(_logger, logging.WARNING, 'No product found for SKU %s in order %s, skipping line', line.external_sku, order.name)
                         continue
                     
                     line_vals_list.append({
@@ -490,10 +492,11 @@ class MarketplaceOrder(models.Model):
             
             # Bulk create sale orders
             if sale_order_vals_list:
-                _logger.warning(f'🔍 _sync_orders_to_sale_orders_bulk: Creating {len(sale_order_vals_list)} sale orders')
+                job_log(_logger, logging.DEBUG, '🔍 _sync_orders_to_sale_orders_bulk: Creating %s sale orders', len(sale_order_vals_list))
                 try:
                     sale_orders = self.env['sale.order'].create(sale_order_vals_list)
-                    _logger.warning(f'✅ _sync_orders_to_sale_orders_bulk: Successfully created {len(sale_orders)} sale orders')
+                    job_log(_logger, logging.INFO, '✅ _sync_orders_to_sale_orders_bulk: Successfully created %s sale orders', len(sale_orders))
+                    job_count('sale_orders_created', len(sale_orders))
                     
                     # Ensure name is set correctly (in case sequence overrides it)
                     for sale_order, order in zip(sale_orders, orders_ready_to_create):
@@ -519,7 +522,7 @@ class MarketplaceOrder(models.Model):
                     
                     # Log sale order lines after creation
                     for sale_order in sale_orders:
-                        _logger.warning(f'✅ _sync_orders_to_sale_orders_bulk: Sale order {sale_order.name} created with {len(sale_order.order_line)} lines')
+                        job_log(_logger, logging.DEBUG, '✅ _sync_orders_to_sale_orders_bulk: Sale order %s created with %s lines', sale_order.name, len(sale_order.order_line))
                     
                     # Auto confirm if enabled
                     account = orders_to_create[0].account_id if orders_to_create else None
@@ -733,7 +736,7 @@ class MarketplaceOrder(models.Model):
         }
         
         # Log marketplace order lines before creating sale order
-        _logger.warning(f'🔍 _create_sale_order: order {self.name} has {len(self.order_line_ids)} marketplace lines before create')
+        job_log(_logger, logging.DEBUG, '🔍 _create_sale_order: order %s has %s marketplace lines before create', self.name, len(self.order_line_ids))
         
         # Create sale order with explicit name to prevent sequence override
         sale_order = self.env['sale.order'].with_context(default_name=order_name).create(order_vals)
@@ -747,7 +750,7 @@ class MarketplaceOrder(models.Model):
             line._create_sale_order_line(sale_order)
         
         # Log sale order lines after creation
-        _logger.warning(f'✅ _create_sale_order: sale order {sale_order.name} created with {len(sale_order.order_line)} lines')
+        job_log(_logger, logging.DEBUG, '✅ _create_sale_order: sale order %s created with %s lines', sale_order.name, len(sale_order.order_line))
         
         # Link to marketplace order (bidirectional)
         self.sale_order_id = sale_order.id
@@ -75,6 +75,12 @@ class MarketplaceProductBinding(models.Model):
         string='Display Name', compute='_compute_display_name', store=True
     )
 
+    # Upsert key of the WooCommerce catalog sync (INSERT .. ON CONFLICT)
+    _unique_shop_external_sku = models.UniqueIndex(
+        '(shop_id, external_sku)',
+        'SKU already exists for this shop!',
+    )
+
     @api.depends('product_id', 'shop_id', 'external_sku')
     def _compute_display_name(self):
         for binding in self:
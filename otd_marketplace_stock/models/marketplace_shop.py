@@ -3,7 +3,6 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 import logging
-import json
 
 _logger = logging.getLogger(__name__)
 
@@ -44,6 +43,16 @@ class MarketplaceShop(models.Model):
         'stock.warehouse', string='Warehouse',
         help='Warehouse to use for orders from this shop'
     )
+    stock_location_ids = fields.Many2many(
+        'stock.location', 'marketplace_shop_stock_location_rel', 'shop_id', 'location_id',
+        string='Stock Locations', domain=[('usage', '=', 'internal')],
+        help='Locations whose stock (including sub-locations) is summed for stock push. '
+             'Empty = the account Stock Location, else the stock location of the shop warehouse.'
+    )
+    push_subtract_reserved = fields.Boolean(
+        string='Subtract Reserved Quantity', default=False,
+        help='Push on-hand quantity minus the quantity already reserved for transfers in these locations'
+    )
     team_id = fields.Many2one(
         'crm.team', string='Sales Team',
         help='Sales team for orders from this shop'
@@ -168,55 +177,43 @@ class MarketplaceShop(models.Model):
 
     @api.depends('account_id')
     def _compute_order_count(self):
+        counts = {}
+        if self.ids:
+            counts = {
+                shop.id: count
+                for shop, count in self.env['marketplace.order']._read_group(
+                    [('shop_id', 'in', self.ids)], ['shop_id'], ['__count'],
+                )
+            }
         for shop in self:
-            shop.order_count = self.env['marketplace.order'].search_count([
-                ('shop_id', '=', shop.id)
-            ])
+            shop.order_count = counts.get(shop.id, 0)
 
     @api.depends('account_id')
     def _compute_binding_count(self):
+        counts = {}
+        if self.ids:
+            counts = {
+                shop.id: count
+                for shop, count in self.env['marketplace.product.binding']._read_group(
+                    [('shop_id', 'in', self.ids)], ['shop_id'], ['__count'],
+                )
+            }
         for shop in self:
-            shop.binding_count = self.env['marketplace.product.binding'].search_count([
-                ('shop_id', '=', shop.id)
-            ])
+            shop.binding_count = counts.get(shop.id, 0)
     
     def _compute_lazada_sync_status(self):
-        """Compute last Lazada job status/messages for dashboard cards"""
-        job_model = self.env['marketplace.job'].sudo()
-        
-        def extract_message(job_record):
-            message = job_record.last_error or ''
-            if not message and job_record.result:
-                try:
-                    result_payload = job_record.result
-                    if isinstance(result_payload, str):
-                        result_payload = json.loads(result_payload)
-                    if isinstance(result_payload, dict):
-                        message = result_payload.get('message', '')
-                        if not message:
-                            # try standard keys
-                            message = result_payload.get('status') or ''
-                    else:
-                        message = str(job_record.result)
-                except (ValueError, TypeError, json.JSONDecodeError):
-                    message = job_record.result if isinstance(job_record.result, str) else ''
-            return message
+        """Compute last Lazada job status/messages for dashboard cards
+
+        Reads marketplace.shop.job.status (latest job per shop/job_type) for
+        all shops in one query instead of searching jobs per shop and type.
+        """
+        status_map = self.env['marketplace.shop.job.status'].get_status_map(self.ids) if self.ids else {}
 
         def get_job_data(shop_id, job_type):
-            job = job_model.search([
-                ('shop_id', '=', shop_id),
-                ('job_type', '=', job_type),
-            ], limit=1, order='id desc')
-            if job:
-                status = job.state or 'pending'
-                when = job.completed_at or job.started_at or job.create_date
-                message = extract_message(job)
-            else:
-                job = False
-                status = 'never'
-                when = False
-                message = ''
-            return job, status, when, message
+            row = status_map.get((shop_id, job_type))
+            if row:
+                return row.job_id, row.state, row.date, row.message or ''
+            return False, 'never', False, ''
         
         for shop in self:
             if shop.channel == 'woocommerce':
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+import logging
+import json
+
+_logger = logging.getLogger(__name__)
+
+JOB_STATUS_SELECTION = [
+    ('never', 'Never'),
+    ('pending', 'Pending'),
+    ('in_progress', 'In Progress'),
+    ('done', 'Done'),
+    ('failed', 'Failed'),
+    ('dead', 'Dead Letter'),
+]
+
+
+def extract_job_message(job):
+    """Return last_error or the 'message' of a job's JSON result"""
+    message = job.last_error or ''
+    if not message and job.result:
+        try:
+            result_payload = job.result
+            if isinstance(result_payload, str):
+                result_payload = json.loads(result_payload)
+            if isinstance(result_payload, dict):
+                message = result_payload.get('message', '') or result_payload.get('status') or ''
+            else:
+                message = str(job.result)
+        except (ValueError, TypeError, json.JSONDecodeError):
+            message = job.result if isinstance(job.result, str) else ''
+    return message
+
+
+class MarketplaceShopJobStatus(models.Model):
+    """Latest job per (shop, job_type)
+
+    Maintained by marketplace.job on create and on state/result changes so
+    shop dashboards can read every card's status in a single query instead of
+    searching marketplace.job per shop and job type.
+    """
+    _name = 'marketplace.shop.job.status'
+    _description = 'Marketplace Shop Latest Job Status'
+    _order = 'shop_id, job_type'
+
+    shop_id = fields.Many2one('marketplace.shop', string='Shop', required=True, ondelete='cascade', index=True)
+    job_type = fields.Char(string='Job Type', required=True)
+    job_id = fields.Many2one('marketplace.job', string='Job', ondelete='set null')
+    state = fields.Selection(JOB_STATUS_SELECTION, string='Status', default='never', required=True)
+    date = fields.Datetime(string='Date')
+    message = fields.Text(string='Message')
+
+    _unique_shop_job_type = models.UniqueIndex(
+        '(shop_id, job_type)',
+        'Only one status row per shop and job type is allowed!',
+    )
+
+    def init(self):
+        """Backfill from existing jobs (install/upgrade)"""
+        self.env.cr.execute("""
+            SELECT DISTINCT ON (j.shop_id, j.job_type) j.id
+              FROM marketplace_job j
+             WHERE j.shop_id IS NOT NULL
+               AND NOT EXISTS (
+                   SELECT 1 FROM marketplace_shop_job_status s
+                    WHERE s.shop_id = j.shop_id AND s.job_type = j.job_type
+               )
+          ORDER BY j.shop_id, j.job_type, j.id DESC
+        """)
+        job_ids = [row[0] for row in self.env.cr.fetchall()]
+        if job_ids:
+            self._upsert_from_jobs(self.env['marketplace.job'].browse(job_ids))
+            _logger.info('Backfilled %s marketplace shop job status rows', len(job_ids))
+
+    @api.model
+    def _upsert_from_jobs(self, jobs):
+        """Record jobs as the latest of their (shop, job_type) unless a newer job is already stored"""
+        for job in jobs:
+            if not job.shop_id or not job.job_type:
+                continue
+            self.env.cr.execute("""
+                INSERT INTO marketplace_shop_job_status
+                    (shop_id, job_type, job_id, state, date, message,
+                     create_uid, create_date, write_uid, write_date)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC')
+                ON CONFLICT (shop_id, job_type) DO UPDATE
+                   SET job_id = EXCLUDED.job_id,
+                       state = EXCLUDED.state,
+                       date = EXCLUDED.date,
+                       message = EXCLUDED.message,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+                 WHERE marketplace_shop_job_status.job_id IS NULL
+                    OR marketplace_shop_job_status.job_id <= EXCLUDED.job_id
+            """, (
+                job.shop_id.id, job.job_type, job.id, job.state or 'pending',
+                job.completed_at or job.started_at or job.create_date,
+                extract_job_message(job) or None, self.env.uid, self.env.uid,
+            ))
+        self.invalidate_model(['job_id', 'state', 'date', 'message'])
+
+    @api.model
+    def get_status_map(self, shop_ids):
+        """Return {(shop_id, job_type): status record} for shop_ids in one query"""
+        rows = self.sudo().search([('shop_id', 'in', list(shop_ids))])
+        return {(row.shop_id.id, row.job_type): row for row in rows}
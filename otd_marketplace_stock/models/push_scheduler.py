@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class PushPlan:
+    """Batch size, concurrency and spacing chosen for one round of push_stock jobs"""
+
+    __slots__ = ('batch_size', 'workers', 'spacing_seconds', 'reason')
+
+    def __init__(self, batch_size, workers, spacing_seconds, reason=''):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.spacing_seconds = spacing_seconds
+        self.reason = reason
+
+    def payload(self):
+        """Keys merged into the push_stock job payload"""
+        return {
+            'batch_size': self.batch_size,
+            'workers': self.workers,
+            'spacing_seconds': self.spacing_seconds,
+        }
+
+    def job_vals(self):
+        """Values reported on the push_stock job"""
+        return {
+            'push_batch_size': self.batch_size,
+            'push_workers': self.workers or 0,
+            'push_spacing_seconds': self.spacing_seconds,
+            'push_plan_reason': self.reason,
+        }
+
+
+class AdaptivePushScheduler:
+    """Tune push batch size, concurrency and spacing per account
+
+    Additive-increase / multiplicative-decrease over the API behaviour recorded
+    on the account's recent push_stock jobs (429 rate, average latency and
+    throughput), kept within the bounds configured on the account. Recent
+    failures (jobs that failed, were retried or could not push a shop) also
+    back off. With adaptive scheduling disabled it returns the static
+    push_stock_batch_size.
+    """
+
+    # Number of recent push jobs to learn from
+    HISTORY_SIZE = 10
+    HISTORY_HOURS = 24
+    # Back off when more than this share of requests were throttled
+    THROTTLE_BACKOFF_RATE = 0.05
+    # Only grow when latency is below this
+    TARGET_LATENCY_MS = 1500.0
+    # Keep each batch job under this wall time
+    TARGET_JOB_SECONDS = 120.0
+    DEFAULT_SPACING_SECONDS = 5
+    MAX_SPACING_SECONDS = 120
+
+    def __init__(self, account):
+        self.account = account
+        self.env = account.env
+
+    def _static_plan(self, reason='static'):
+        return PushPlan(self.account.push_stock_batch_size or 0, None, self.DEFAULT_SPACING_SECONDS, reason)
+
+    def _recent_jobs(self):
+        # Failed and dead jobs roll back their API counters: they are kept for their state
+        return self.env['marketplace.job'].sudo().search_read([
+            ('account_id', '=', self.account.id),
+            ('job_type', '=', 'push_stock'),
+            ('state', 'in', ['done', 'failed', 'dead']),
+            ('completed_at', '>=', fields.Datetime.now() - timedelta(hours=self.HISTORY_HOURS)),
+        ], [
+            'push_batch_size', 'push_workers', 'push_spacing_seconds', 'api_request_count',
+            'api_throttled_count', 'api_latency_ms', 'processed_items', 'duration_seconds', 'state',
+            'retries', 'push_failed_shop_count',
+        ], order='completed_at desc', limit=self.HISTORY_SIZE)
+
+    @staticmethod
+    def _job_failed(job):
+        return job['state'] != 'done' or job['retries'] > 0 or job['push_failed_shop_count'] > 0
+
+    def plan(self):
+        """Return the PushPlan for the next round of push_stock jobs"""
+        account = self.account
+        if not account.push_adaptive_enabled:
+            return self._static_plan()
+
+        min_batch = max(1, account.push_batch_size_min or 1)
+        max_batch = max(min_batch, account.push_batch_size_max or min_batch)
+        max_workers = max(1, account.push_max_workers or 1)
+
+        history = self._recent_jobs()
+        if not history:
+            batch = min(max(account.push_stock_batch_size or min_batch, min_batch), max_batch)
+            return PushPlan(batch, min(2, max_workers), self.DEFAULT_SPACING_SECONDS, 'no history: starting point')
+
+        last = history[0]
+        batch = last['push_batch_size'] or account.push_stock_batch_size or min_batch
+        workers = last['push_workers'] or 1
+        spacing = last['push_spacing_seconds'] if last['push_spacing_seconds'] is not None else self.DEFAULT_SPACING_SECONDS
+
+        requests = sum(job['api_request_count'] for job in history)
+        throttled = sum(job['api_throttled_count'] for job in history)
+        throttle_rate = throttled / requests if requests else 0.0
+        avg_latency = sum(job['api_latency_ms'] * job['api_request_count'] for job in history) / requests if requests else 0.0
+        failed = any(self._job_failed(job) for job in history[:3])
+        # Throughput of completed jobs only: a failed run says nothing about speed
+        done = [job for job in history if job['state'] == 'done']
+        items = sum(job['processed_items'] for job in done)
+        seconds = sum(job['duration_seconds'] for job in done)
+        items_per_second = items / seconds if seconds else 0.0
+
+        if throttle_rate > self.THROTTLE_BACKOFF_RATE or failed:
+            batch = batch // 2
+            workers = workers - 1
+            spacing = max(spacing * 2, self.DEFAULT_SPACING_SECONDS)
+            reason = f'back off: 429 rate {throttle_rate:.1%}' + (', recent failures' if failed else '')
+        elif throttle_rate == 0 and avg_latency < self.TARGET_LATENCY_MS:
+            batch = batch + max(5, batch // 4)
+            workers = workers + 1
+            spacing = spacing // 2
+            reason = f'grow: no 429s, avg latency {avg_latency:.0f} ms'
+        else:
+            reason = f'hold: 429 rate {throttle_rate:.1%}, avg latency {avg_latency:.0f} ms'
+
+        # Keep a single batch job within the target wall time at the observed throughput
+        if items_per_second > 0:
+            batch = min(batch, int(items_per_second * self.TARGET_JOB_SECONDS) or min_batch)
+
+        plan = PushPlan(
+            min(max(batch, min_batch), max_batch),
+            min(max(workers, 1), max_workers),
+            min(max(spacing, 0), self.MAX_SPACING_SECONDS),
+            reason,
+        )
+        _logger.info(
+            'Adaptive push plan for account %s: batch=%s workers=%s spacing=%ss (%s)',
+            account.id, plan.batch_size, plan.workers, plan.spacing_seconds, reason,
+        )
+        return plan
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from .adapters import MarketplaceAdapter
+from .job_logging import job_log
 from odoo import fields
 from datetime import datetime, timedelta
 import logging
@@ -96,49 +97,51 @@ class ShopeeAdapter(MarketplaceAdapter):
         headers['Shopee-Signature'] = signature
         headers.setdefault('Content-Type', 'application/json')
         
-        for attempt in range(self.max_retries):
-            try:
-                if method.upper() == 'GET':
-                    response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
-                else:
-                    # POST request: params go in query string, data goes in body
-                    response = requests.post(url, params=params, json=data, headers=headers, timeout=self.timeout)
+        with self._trace(method, endpoint) as span:
+            for attempt in range(self.max_retries):
+                span.retries = attempt
+                try:
+                    if method.upper() == 'GET':
+                        response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
+                    else:
+                        # POST request: params go in query string, data goes in body
+                        response = requests.post(url, params=params, json=data, headers=headers, timeout=self.timeout)
                 
-                # Handle rate limiting
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 60))
-                    _logger.warning(f'Rate limited, waiting {retry_after} seconds')
-                    time.sleep(retry_after)
-                    continue
+                    # Handle rate limiting
+                    if response.status_code == 429:
+                        retry_after = int(response.headers.get('Retry-After', 60))
+                        _logger.warning(f'Rate limited, waiting {retry_after} seconds')
+                        time.sleep(retry_after)
+                        continue
                 
-                response.raise_for_status()
-                result = response.json()
+                    response.raise_for_status()
+                    result = response.json()
                 
-                _logger.warning(f'🔍 Shopee API Response - Status: {response.status_code}, Keys: {list(result.keys()) if isinstance(result, dict) else "not a dict"}')
+                    job_log(_logger, logging.DEBUG, '🔍 Shopee API Response - Status: %s, Keys: %s', response.status_code, list(result.keys()) if isinstance(result, dict) else "not a dict")
                 
-                # Shopee wraps response in 'response' key
-                if 'response' in result:
-                    response_data = result['response']
-                    _logger.warning(f'🔍 Shopee API Response Data - Keys: {list(response_data.keys()) if isinstance(response_data, dict) else "not a dict"}')
-                    return response_data
-                _logger.warning(f'🔍 Shopee API Response - No "response" key, returning result directly')
-                return result
+                    # Shopee wraps response in 'response' key
+                    if 'response' in result:
+                        response_data = result['response']
+                        job_log(_logger, logging.DEBUG, '🔍 Shopee API Response Data - Keys: %s', list(response_data.keys()) if isinstance(response_data, dict) else "not a dict")
+                        return response_data
+                    job_log(_logger, logging.DEBUG, '🔍 Shopee API Response - No "response" key, returning result directly')
+                    return result
                 
-            except requests.exceptions.RequestException as e:
-                if attempt == self.max_retries - 1:
-                    _logger.error(f'Shopee API request failed: {e}')
-                    if hasattr(e, 'response') and e.response is not None:
-                        try:
-                            error_detail = e.response.json()
-                            _logger.error(f'Error response: {error_detail}')
-                        except:
-                            _logger.error(f'Error response text: {e.response.text}')
-                    raise
-                wait_time = 2 ** attempt
-                _logger.warning(f'Request failed, retrying in {wait_time}s: {e}')
-                time.sleep(wait_time)
-        
-        raise Exception('Request failed after retries')
+                except requests.exceptions.RequestException as e:
+                    if attempt == self.max_retries - 1:
+                        _logger.error(f'Shopee API request failed: {e}')
+                        if hasattr(e, 'response') and e.response is not None:
+                            try:
+                                error_detail = e.response.json()
+                                _logger.error(f'Error response: {error_detail}')
+                            except:
+                                _logger.error(f'Error response text: {e.response.text}')
+                        raise
+                    wait_time = 2 ** attempt
+                    _logger.warning(f'Request failed, retrying in {wait_time}s: {e}')
+                    time.sleep(wait_time)
+        
+            raise Exception('Request failed after retries')
     
     # LOCKED: Shopee OAuth authorization URL generation - ห้ามแก้ไข signature format หรือ param structure
     def get_authorize_url(self):
@@ -171,11 +174,8 @@ class ShopeeAdapter(MarketplaceAdapter):
         base_string = f"{partner_id}{path}{timestamp}"
         client_secret = (self.account.client_secret or '').strip()
         
-        # Debug logging (using warning level to ensure visibility)
-        _logger.warning(f"🔍 Shopee OAuth Debug - Partner ID: {partner_id}")
-        _logger.warning(f"🔍 Shopee OAuth Debug - Client Secret length: {len(client_secret)}")
-        _logger.warning(f"🔍 Shopee OAuth Debug - Client Secret preview: {client_secret[:10]}...{client_secret[-10:] if len(client_secret) > 20 else ''}")
-        _logger.warning(f"🔍 Shopee OAuth Debug - Base string: {base_string}")
+        job_log(_logger, logging.DEBUG, '🔍 Shopee OAuth - Partner ID: %s, Client Secret set: %s', partner_id, bool(client_secret))
+        job_log(_logger, logging.DEBUG, '🔍 Shopee OAuth - Base string: %s', base_string)
         
         if not client_secret:
             _logger.error("❌ Shopee OAuth: Client Secret is empty! Please set Partner Key in Account settings.")
@@ -188,8 +188,7 @@ class ShopeeAdapter(MarketplaceAdapter):
             hashlib.sha256
         ).hexdigest()
         
-        _logger.warning(f"🔍 Shopee OAuth Debug - Calculated Signature: {signature}")
-        _logger.warning(f"🔍 Shopee OAuth Debug - Redirect URI: {redirect_uri}")
+        job_log(_logger, logging.DEBUG, '🔍 Shopee OAuth - Redirect URI: %s', redirect_uri)
         
         # Add signature to params
         params_dict['sign'] = signature
@@ -203,7 +202,7 @@ class ShopeeAdapter(MarketplaceAdapter):
         else:
             domain = base_url.rstrip('/')
         
-        _logger.warning(f"🔍 Shopee OAuth Debug - Using domain: {domain}")
+        job_log(_logger, logging.DEBUG, '🔍 Shopee OAuth - Using domain: %s', domain)
         
         # Build final URL
         auth_url = f"{domain}{path}"
@@ -280,32 +279,25 @@ class ShopeeAdapter(MarketplaceAdapter):
             'Content-Type': 'application/json',
         }
         
-        _logger.error(f'🔍 Shopee Token Exchange - Base URL: {self.base_url}')
-        _logger.error(f'🔍 Shopee Token Exchange - Partner ID: {partner_id}, Shop ID: {int(shop_id)}, Code: {code[:20]}...')
-        _logger.error(f'🔍 Shopee Token Exchange - Full API Path: {full_api_path}')
-        _logger.error(f'🔍 Shopee Token Exchange - Base String: {base_string}')
-        _logger.error(f'🔍 Shopee Token Exchange - Signature: {sign}')
-        _logger.error(f'🔍 Shopee Token Exchange - URL: {url}')
-        _logger.error(f'🔍 Shopee Token Exchange - Query Params: {query_params}')
-        _logger.error(f'🔍 Shopee Token Exchange - Body: {body}')
+        # The code and the response carry credentials: only their shape is logged
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Token Exchange - Partner ID: %s, Shop ID: %s', partner_id, shop_id)
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Token Exchange - Full API Path: %s', full_api_path)
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Token Exchange - Base String: %s', base_string)
         
         # Make request - POST with business params in body
         try:
             response = requests.post(url, json=body, headers=headers, timeout=30)
-            _logger.error(f'🔍 Shopee Token Exchange - Response Status: {response.status_code}')
-            _logger.error(f'🔍 Shopee Token Exchange - Response Headers: {dict(response.headers)}')
-            _logger.error(f'🔍 Shopee Token Exchange - Response Text: {response.text[:1000]}')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Token Exchange - Response Status: %s', response.status_code)
             
             response.raise_for_status()
             result = response.json()
             
-            _logger.error(f'🔍 Shopee Token Exchange - Response JSON Keys: {list(result.keys()) if isinstance(result, dict) else "not a dict"}')
-            _logger.error(f'🔍 Shopee Token Exchange - Response JSON: {result}')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Token Exchange - Response JSON Keys: %s', list(result.keys()) if isinstance(result, dict) else 'not a dict')
             
             # Shopee wraps response in 'response' key
             if 'response' in result:
                 response_data = result['response']
-                _logger.error(f'🔍 Shopee Token Exchange - Response Data Keys: {list(response_data.keys()) if isinstance(response_data, dict) else "not a dict"}')
+                job_log(_logger, logging.DEBUG, '🔍 Shopee Token Exchange - Response Data Keys: %s', list(response_data.keys()) if isinstance(response_data, dict) else 'not a dict')
             else:
                 response_data = result
             
@@ -324,13 +316,7 @@ class ShopeeAdapter(MarketplaceAdapter):
         # Use response_data for further processing
         response = response_data
         
-        _logger.error(f'🔍 Shopee Token Exchange - Response Type: {type(response)}')
-        _logger.error(f'🔍 Shopee Token Exchange - Response Keys: {list(response.keys()) if isinstance(response, dict) else "not a dict"}')
-        _logger.error(f'🔍 Shopee Token Exchange - Response: access_token={bool(response.get("access_token"))}, refresh_token={bool(response.get("refresh_token"))}')
-        
-        # Log full response for debugging (first 1000 chars)
-        response_str = str(response)
-        _logger.error(f'🔍 Shopee Token Exchange - Response Full: {response_str}')
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Token Exchange - Response: access_token=%s, refresh_token=%s', bool(response.get('access_token')), bool(response.get('refresh_token')))
         
         # Try different possible key names for tokens
         access_token = response.get('access_token') or response.get('accessToken') or response.get('access_token')
@@ -340,13 +326,12 @@ class ShopeeAdapter(MarketplaceAdapter):
         if not access_token and not refresh_token:
             error_msg = response.get('error') or response.get('message') or 'Unknown error'
             error_description = response.get('error_description') or response.get('msg') or ''
+            # No token in the response: safe to log it in full
+            response_str = str(response)
             _logger.error(f'❌ Shopee Token Exchange - No tokens in response. Error: {error_msg}, Description: {error_description}')
             _logger.error(f'❌ Shopee Token Exchange - Full Response: {response_str}')
             raise ValueError(f'No tokens received from Shopee API. Error: {error_msg}, Description: {error_description}, Response: {response_str}')
         
-        _logger.error(f'🔍 Shopee Token Exchange - Access Token (after key check): {bool(access_token)}')
-        _logger.error(f'🔍 Shopee Token Exchange - Refresh Token (after key check): {bool(refresh_token)}')
-        
         token_result = {
             'access_token': access_token,
             'refresh_token': refresh_token,
@@ -354,11 +339,7 @@ class ShopeeAdapter(MarketplaceAdapter):
             'shop_id': response.get('shop_id') or response.get('shopId') or response.get('shop_id') or shop_id,
         }
         
-        _logger.error(f'🔍 Shopee Token Exchange - Token Result: access_token={bool(token_result.get("access_token"))}, refresh_token={bool(token_result.get("refresh_token"))}, shop_id={token_result.get("shop_id")}')
-        if token_result.get('access_token'):
-            _logger.error(f'🔍 Shopee Token Exchange - Access Token Value: {token_result.get("access_token")[:50]}...')
-        if token_result.get('refresh_token'):
-            _logger.error(f'🔍 Shopee Token Exchange - Refresh Token Value: {token_result.get("refresh_token")[:50]}...')
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Token Exchange - Token Result: access_token=%s, refresh_token=%s, shop_id=%s', bool(access_token), bool(refresh_token), token_result['shop_id'])
         
         return token_result
     
@@ -492,20 +473,16 @@ class ShopeeAdapter(MarketplaceAdapter):
             'Content-Type': 'application/json',
         }
         
-        _logger.warning(f'🔍 Shopee Refresh Token - Base URL: {self.base_url}')
-        _logger.warning(f'🔍 Shopee Refresh Token - Partner ID: {partner_id}, Shop ID: {shop_id}')
-        _logger.warning(f'🔍 Shopee Refresh Token - Full API Path: {full_api_path}')
-        _logger.warning(f'🔍 Shopee Refresh Token - Base String: {base_string}')
-        _logger.warning(f'🔍 Shopee Refresh Token - Signature: {sign}')
-        _logger.warning(f'🔍 Shopee Refresh Token - URL: {url}')
-        _logger.warning(f'🔍 Shopee Refresh Token - Body: {body}')
+        # The body and the response carry tokens: only their shape is logged
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Refresh Token - Partner ID: %s, Shop ID: %s', partner_id, shop_id)
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Refresh Token - Full API Path: %s', full_api_path)
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Refresh Token - Base String: %s', base_string)
         
         # LOCKED: Make request directly (bypasses _make_request to prevent recursion)
         # POST with business params in body - tested and verified
         try:
             response = requests.post(url, json=body, headers=headers, timeout=30)
-            _logger.warning(f'🔍 Shopee Refresh Token - Response Status: {response.status_code}')
-            _logger.warning(f'🔍 Shopee Refresh Token - Response Text: {response.text[:500]}')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Refresh Token - Response Status: %s', response.status_code)
             
             response.raise_for_status()
             result = response.json()
@@ -516,7 +493,7 @@ class ShopeeAdapter(MarketplaceAdapter):
             else:
                 response_data = result
             
-            _logger.warning(f'🔍 Shopee Refresh Token - Response Data: {response_data}')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Refresh Token - Response Keys: %s', list(response_data.keys()) if isinstance(response_data, dict) else 'not a dict')
             
         except requests.exceptions.RequestException as e:
             error_detail = ''
@@ -565,9 +542,9 @@ class ShopeeAdapter(MarketplaceAdapter):
         elif isinstance(until, str):
             until = datetime.fromisoformat(until)
         
-        _logger.warning(f'🔍 Shopee Fetch Orders - Shop ID: {self.shop.external_shop_id}')
-        _logger.warning(f'🔍 Shopee Fetch Orders - Time Range: {since} to {until}')
-        _logger.warning(f'🔍 Shopee Fetch Orders - Since timestamp: {int(since.timestamp())}, Until timestamp: {int(until.timestamp())}')
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Shop ID: %s', self.shop.external_shop_id)
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Time Range: %s to %s', since, until)
+        job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Since timestamp: %s, Until timestamp: %s', int(since.timestamp()), int(until.timestamp()))
         
         # LOCKED: Shopee API v2 /order/get_order_list - GET request with ALL parameters in query string
         # According to Shopee API v2 documentation:
@@ -629,10 +606,10 @@ class ShopeeAdapter(MarketplaceAdapter):
             if cursor:
                 query_params['cursor'] = cursor
             
-            _logger.warning(f'🔍 Shopee Fetch Orders - Calling API: GET /order/get_order_list')
-            _logger.warning(f'🔍 Shopee Fetch Orders - Query Params: partner_id={partner_id}, shop_id={shop_id}, timestamp={timestamp}, time_from={query_params["time_from"]}, time_to={query_params["time_to"]}, cursor={query_params.get("cursor", "")}')
-            _logger.warning(f'🔍 Shopee Fetch Orders - Signature Base String: {base_string}')
-            _logger.warning(f'🔍 Shopee Fetch Orders - Signature: {signature}')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Calling API: GET /order/get_order_list')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Query Params: partner_id=%s, shop_id=%s, timestamp=%s, time_from=%s, time_to=%s, cursor=%s', partner_id, shop_id, timestamp, query_params["time_from"], query_params["time_to"], query_params.get("cursor", ""))
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Signature Base String: %s', base_string)
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Signature: %s', signature)
             
             # LOCKED: Use GET request with all parameters in query string - tested and verified
             # Note: We bypass _make_request to avoid duplicate signature generation
@@ -648,8 +625,10 @@ class ShopeeAdapter(MarketplaceAdapter):
             
             # LOCKED: Make GET request directly - tested and verified
             try:
-                response_obj = requests.get(full_url, headers=headers, timeout=self.timeout)
-                response_obj.raise_for_status()
+                with self._trace('GET', endpoint) as span:
+                    response_obj = requests.get(full_url, headers=headers, timeout=self.timeout)
+                    span.record_response(response_obj)
+                    response_obj.raise_for_status()
                 result = response_obj.json()
                 
                 # LOCKED: Shopee wraps response in 'response' key (tested and verified)
@@ -670,7 +649,7 @@ class ShopeeAdapter(MarketplaceAdapter):
                         _logger.error(f'Error response text: {e.response.text}')
                 raise
             
-            _logger.warning(f'🔍 Shopee Fetch Orders - API Response: {type(response)}, keys: {list(response.keys()) if isinstance(response, dict) else "not a dict"}')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - API Response: %s, keys: %s', type(response), list(response.keys()) if isinstance(response, dict) else "not a dict")
             
             # LOCKED: Check for errors in response - tested and verified
             if isinstance(response, dict) and 'error' in response:
@@ -685,11 +664,11 @@ class ShopeeAdapter(MarketplaceAdapter):
             # LOCKED: Parse order_list from response - tested and verified
             # Response structure: {'more': bool, 'next_cursor': str, 'order_list': [...]}
             orders = response.get('order_list', [])
-            _logger.warning(f'🔍 Shopee Fetch Orders - Orders in response: {len(orders)}')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Orders in response: %s', len(orders))
             
             # Extract order_sn from order_list for detail fetching
             order_sn_list = [o.get('order_sn') for o in orders if o.get('order_sn')]
-            _logger.warning(f'🔍 Shopee Fetch Orders - Extracted {len(order_sn_list)} order_sn from list response')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Extracted %s order_sn from list response', len(order_sn_list))
             
             # Fetch detailed order information using /order/get_order_detail
             if order_sn_list:
@@ -697,7 +676,7 @@ class ShopeeAdapter(MarketplaceAdapter):
                 batch_size = 50
                 for batch_start in range(0, len(order_sn_list), batch_size):
                     batch = order_sn_list[batch_start:batch_start + batch_size]
-                    _logger.warning(f'🔍 Shopee Fetch Orders - Fetching details for batch {batch_start // batch_size + 1} ({len(batch)} orders)')
+                    job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Fetching details for batch %s (%s orders)', batch_start // batch_size + 1, len(batch))
                     
                     try:
                         # Prepare detail request payload
@@ -731,7 +710,7 @@ class ShopeeAdapter(MarketplaceAdapter):
                         
                         # Extract detailed orders from response
                         detail_orders = detail_response.get('order_list', [])
-                        _logger.warning(f'🔍 Shopee Fetch Orders - Got {len(detail_orders)} detailed orders from batch')
+                        job_log(_logger, logging.DEBUG, '🔍 Shopee Fetch Orders - Got %s detailed orders from batch', len(detail_orders))
                         
                         all_orders.extend(detail_orders)
                         
@@ -745,14 +724,14 @@ class ShopeeAdapter(MarketplaceAdapter):
             if not cursor or len(orders) == 0:
                 break
         
-        _logger.warning(f'🔍 Shopee Fetch Orders - Total detailed orders fetched: {len(all_orders)}')
+        job_log(_logger, logging.INFO, '🔍 Shopee Fetch Orders - Total detailed orders fetched: %s', len(all_orders))
         return all_orders
     
     def update_inventory(self, items):
         """Update inventory on Shopee
         
         Args:
-            items: list of tuples (external_sku, quantity)
+            items: list of tuples (external_sku, quantity) or push_stock dicts
         
         Returns:
             dict with results
@@ -762,7 +741,7 @@ class ShopeeAdapter(MarketplaceAdapter):
         
         # Shopee batch update
         item_list = []
-        for sku, qty in items:
+        for sku, qty in self._inventory_pairs(items):
             item_list.append({
                 'seller_sku': sku,
                 'available_stock': int(qty),
@@ -892,15 +871,15 @@ class ShopeeAdapter(MarketplaceAdapter):
                 else:
                     # Invalid timestamp (0 or negative)
                     order_date = fields.Datetime.now()
-                    _logger.warning(f'Shopee order {order_sn}: create_time is invalid ({create_ts}), using current time as order_date')
+                    job_log(_logger, logging.WARNING, 'Shopee order %s: create_time is invalid (%s), using current time as order_date', order_sn, create_ts)
             except (ValueError, TypeError, OSError) as e:
                 # Invalid timestamp format or out of range
                 order_date = fields.Datetime.now()
-                _logger.warning(f'Shopee order {order_sn}: create_time conversion failed ({create_ts}): {e}, using current time as order_date')
+                job_log(_logger, logging.WARNING, 'Shopee order %s: create_time conversion failed (%s): %s, using current time as order_date', order_sn, create_ts, e)
         else:
             # Missing create_time
             order_date = fields.Datetime.now()
-            _logger.warning(f'Shopee order {order_sn}: create_time is missing, using current time as order_date')
+            job_log(_logger, logging.WARNING, 'Shopee order %s: create_time is missing, using current time as order_date', order_sn)
         
         # Parse total amount
         # Try total_amount first, then check amount_detail if needed
@@ -918,10 +897,10 @@ class ShopeeAdapter(MarketplaceAdapter):
             # But check if it's reasonable first (if > 1000000, likely in cents)
             if amount_total > 1000000:
                 amount_total = amount_total / 100.0
-                _logger.warning(f'Shopee order {order_sn}: total_amount seems in cents ({total_amount}), divided by 100: {amount_total}')
+                job_log(_logger, logging.WARNING, 'Shopee order %s: total_amount seems in cents (%s), divided by 100: %s', order_sn, total_amount, amount_total)
         except (ValueError, TypeError):
             amount_total = 0.0
-            _logger.warning(f'Shopee order {order_sn}: Failed to parse total_amount ({total_amount}), using 0.0')
+            job_log(_logger, logging.WARNING, 'Shopee order %s: Failed to parse total_amount (%s), using 0.0', order_sn, total_amount)
         
         # Determine currency – Shopee usually sends 'currency' at order level
         # Fallback and normalization: force THB if missing or not THB
@@ -931,9 +910,7 @@ class ShopeeAdapter(MarketplaceAdapter):
         )
         currency_code = (currency_code or 'THB').upper()
         if currency_code != 'THB':
-            _logger.warning(
-                f'Shopee order {order_sn}: currency in payload is {currency_code}, forcing THB'
-            )
+            job_log(_logger, logging.WARNING, 'Shopee order %s: currency in payload is %s, forcing THB', order_sn, currency_code)
             currency_code = 'THB'
         currency = self.env['res.currency'].sudo().search([('name', '=', currency_code)], limit=1)
         currency_id = currency.id if currency else (self.env.company.currency_id.id if self.env.company and self.env.company.currency_id else False)
@@ -1018,9 +995,11 @@ class ShopeeAdapter(MarketplaceAdapter):
             
             try:
                 headers = {'Content-Type': 'application/json'}
-                _logger.warning(f'🔍 Shopee _get_order_detail_by_sn_list: GET {full_url}')
-                response_obj = requests.get(full_url, headers=headers, timeout=self.timeout)
-                response_obj.raise_for_status()
+                job_log(_logger, logging.DEBUG, '🔍 Shopee _get_order_detail_by_sn_list: GET %s', full_url)
+                with self._trace('GET', endpoint) as span:
+                    response_obj = requests.get(full_url, headers=headers, timeout=self.timeout)
+                    span.record_response(response_obj)
+                    response_obj.raise_for_status()
                 result = response_obj.json()
                 
                 if isinstance(result, dict) and 'response' in result:
@@ -1039,14 +1018,9 @@ class ShopeeAdapter(MarketplaceAdapter):
                 if isinstance(response_data, dict):
                     details = response_data.get('order_list', []) or []
                     if not details:
-                        _logger.warning(
-                            f'🔍 Shopee _get_order_detail_by_sn_list: Empty order_list for batch, '
-                            f'keys={list(response_data.keys())}'
-                        )
+                        job_log(_logger, logging.DEBUG, '🔍 Shopee _get_order_detail_by_sn_list: Empty order_list for batch, keys=%s', list(response_data.keys()))
                 
-                _logger.warning(
-                    f'🔍 Shopee _get_order_detail_by_sn_list: requested {len(batch)} orders, got {len(details)} details'
-                )
+                job_log(_logger, logging.DEBUG, '🔍 Shopee _get_order_detail_by_sn_list: requested %s orders, got %s details', len(batch), len(details))
                 all_details.extend(details)
             except Exception as e:
                 _logger.error(f'❌ Shopee _get_order_detail_by_sn_list - Failed to fetch batch: {e}', exc_info=True)
@@ -1134,16 +1108,15 @@ class ShopeeAdapter(MarketplaceAdapter):
             query_string = urllib.parse.urlencode(query_params)
             full_url = f"{url}?{query_string}"
             
-            _logger.warning(
-                f'🔍 Shopee fetch_orders_list_with_details: '
-                f'GET {endpoint} shop_id={shop_id} time_from={query_params["time_from"]} time_to={query_params["time_to"]} cursor={query_params.get("cursor","")}'
-            )
-            _logger.warning(f'🔍 Signature base: {base_string}')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee fetch_orders_list_with_details: GET %s shop_id=%s time_from=%s time_to=%s cursor=%s', endpoint, shop_id, query_params["time_from"], query_params["time_to"], query_params.get("cursor",""))
+            job_log(_logger, logging.DEBUG, '🔍 Signature base: %s', base_string)
             
             try:
                 headers = {'Content-Type': 'application/json'}
-                response_obj = requests.get(full_url, headers=headers, timeout=self.timeout)
-                response_obj.raise_for_status()
+                with self._trace('GET', endpoint) as span:
+                    response_obj = requests.get(full_url, headers=headers, timeout=self.timeout)
+                    span.record_response(response_obj)
+                    response_obj.raise_for_status()
                 raw = response_obj.json()
                 response = raw.get('response', raw) if isinstance(raw, dict) else raw
             except Exception as e:
@@ -1161,7 +1134,7 @@ class ShopeeAdapter(MarketplaceAdapter):
             order_list = (response or {}).get('order_list', []) if isinstance(response, dict) else []
             extracted = [o.get('order_sn') for o in order_list if isinstance(o, dict) and o.get('order_sn')]
             all_order_sns.extend(extracted)
-            _logger.warning(f'🔍 Shopee fetch_orders_list_with_details: got {len(extracted)} order_sn (total {len(all_order_sns)})')
+            job_log(_logger, logging.DEBUG, '🔍 Shopee fetch_orders_list_with_details: got %s order_sn (total %s)', len(extracted), len(all_order_sns))
             
             more = bool((response or {}).get('more')) if isinstance(response, dict) else False
             cursor = (response or {}).get('next_cursor') if isinstance(response, dict) else ''
@@ -1172,10 +1145,10 @@ class ShopeeAdapter(MarketplaceAdapter):
             batch_size = 50
             for i in range(0, len(all_order_sns), batch_size):
                 batch = all_order_sns[i:i + batch_size]
-                _logger.warning(f'🔍 Shopee fetch_orders_list_with_details: fetching details for batch of {len(batch)}')
+                job_log(_logger, logging.DEBUG, '🔍 Shopee fetch_orders_list_with_details: fetching details for batch of %s', len(batch))
                 try:
                     details = self._get_order_detail_by_sn_list(batch) or []
-                    _logger.warning(f'🔍 Shopee fetch_orders_list_with_details: got {len(details)} detailed orders')
+                    job_log(_logger, logging.DEBUG, '🔍 Shopee fetch_orders_list_with_details: got %s detailed orders', len(details))
                     detailed_orders.extend(details)
                 except Exception as e:
                     _logger.error(f'❌ Shopee fetch_orders_list_with_details - detail fetch failed: {e}', exc_info=True)
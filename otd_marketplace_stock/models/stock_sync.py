@@ -7,6 +7,8 @@ import logging
 import json
 from ast import literal_eval
 
+from .push_scheduler import AdaptivePushScheduler
+
 _logger = logging.getLogger(__name__)
 
 
@@ -34,10 +36,19 @@ def _load_job_payload(payload):
 
 
 class StockSyncService:
-    """Service for calculating stock quantities for marketplace push"""
+    """Service for calculating stock quantities for marketplace push
+
+    Quantities for a whole batch of bindings are read with one grouped
+    stock_quant query over every location involved (shop location sets,
+    account or warehouse stock locations), so pushing from several warehouses
+    costs no more queries than pushing from one.
+    """
     
     def __init__(self, env):
         self.env = env
+        self._rules = None
+        self._shop_locations = {}  # shop id -> tuple of location ids
+        self._fallback_locations = {}  # company id -> stock.location
     
     def calculate_available_qty(self, binding):
         """
@@ -45,31 +56,108 @@ class StockSyncService:
         
         Returns: int or None (None if exclude_push or error)
         """
-        if binding.exclude_push or not binding.active:
-            return None
+        return self.calculate_available_qtys(binding).get(binding.id)
+    
+    def calculate_available_qtys(self, bindings):
+        """
+        Calculate available quantities for a batch of bindings
         
-        product = binding.product_id
-        shop = binding.shop_id
-        account = shop.account_id
+        Returns: dict {binding_id: int or None}
+        """
+        result = {}
+        pending = self.env['marketplace.product.binding']
+        for binding in bindings:
+            if binding.exclude_push or not binding.active:
+                result[binding.id] = None
+                continue
+            if not self._get_location_ids(binding.shop_id):
+                _logger.warning(f'No stock location found for binding {binding.id}')
+                result[binding.id] = None
+                continue
+            pending |= binding
+        
+        if not pending:
+            return result
         
-        # Get stock location
-        location = account.stock_location_id or shop.warehouse_id.lot_stock_id
-        if not location:
+        location_ids = set()
+        for shop in pending.shop_id:
+            location_ids.update(self._get_location_ids(shop))
+        stock = self._read_stock(pending.product_id.ids, location_ids)
+        
+        if self._rules is None:
+            self._rules = self.env['marketplace.sync.rule'].search([
+                ('active', '=', True),
+            ], order='priority desc')
+        
+        for binding in pending:
+            shop = binding.shop_id
+            qty_available = 0.0
+            for location_id in self._get_location_ids(shop):
+                quantity, reserved = stock.get((binding.product_id.id, location_id), (0.0, 0.0))
+                qty_available += quantity - reserved if shop.push_subtract_reserved else quantity
+            result[binding.id] = self._apply_rules(binding, qty_available)
+        return result
+    
+    def _get_location_ids(self, shop):
+        """Stock locations of a shop, without locations nested in another one of the set"""
+        if shop.id in self._shop_locations:
+            return self._shop_locations[shop.id]
+        
+        account = shop.account_id
+        locations = shop.stock_location_ids or account.stock_location_id or shop.warehouse_id.lot_stock_id
+        if not locations:
             # Try to find any internal location for company
-            location = self.env['stock.location'].search([
-                ('usage', '=', 'internal'),
-                ('company_id', '=', shop.company_id.id),
-            ], limit=1)
+            company_id = shop.company_id.id
+            if company_id not in self._fallback_locations:
+                self._fallback_locations[company_id] = self.env['stock.location'].search([
+                    ('usage', '=', 'internal'),
+                    ('company_id', '=', company_id),
+                ], limit=1)
+            locations = self._fallback_locations[company_id]
         
-        if not location:
-            _logger.warning(f'No stock location found for binding {binding.id}')
-            return None
+        # Quants are summed per selected location including its sub-locations:
+        # a location under another selected one would be counted twice
+        paths = {location.id: location.parent_path or '' for location in locations}
+        location_ids = tuple(sorted(
+            location_id for location_id, path in paths.items()
+            if not any(
+                other_id != location_id and other_path and path.startswith(other_path)
+                for other_id, other_path in paths.items()
+            )
+        ))
+        self._shop_locations[shop.id] = location_ids
+        return location_ids
+    
+    def _read_stock(self, product_ids, location_ids):
+        """Return {(product_id, location_id): (quantity, reserved_quantity)}
         
-        # Get available quantity
-        qty_available = product.with_context(location=location.id).qty_available
+        One grouped query for all products and locations; each location
+        includes the quants of its sub-locations (like qty_available).
+        """
+        if not product_ids or not location_ids:
+            return {}
+        self.env['stock.quant'].flush_model(['product_id', 'location_id', 'quantity', 'reserved_quantity'])
+        self.env['stock.location'].flush_model(['parent_path'])
+        self.env.cr.execute("""
+            SELECT q.product_id, sel.id, SUM(q.quantity), SUM(q.reserved_quantity)
+              FROM stock_location sel
+              JOIN stock_location l ON l.parent_path LIKE sel.parent_path || '%%'
+              JOIN stock_quant q ON q.location_id = l.id
+             WHERE sel.id = ANY(%s)
+               AND q.product_id = ANY(%s)
+          GROUP BY q.product_id, sel.id
+        """, (list(location_ids), list(product_ids)))
+        return {
+            (product_id, location_id): (quantity or 0.0, reserved or 0.0)
+            for product_id, location_id, quantity, reserved in self.env.cr.fetchall()
+        }
+    
+    def _apply_rules(self, binding, qty_available):
+        """Apply buffer, minimum and rounding (binding override > sync rule > account)"""
+        account = binding.shop_id.account_id
         
         # Get sync rule
-        rule = self.env['marketplace.sync.rule'].get_rule_for_binding(binding)
+        rule = self.env['marketplace.sync.rule'].get_rule_for_binding(binding, rules=self._rules)
         
         # Apply buffer
         if binding.buffer_qty_override is not False and binding.buffer_qty_override is not None:
@@ -156,8 +244,9 @@ class StockMove(models.Model):
             if not account.sync_enabled:
                 continue
             
-            # Check batch size from account settings
-            batch_size = account.push_stock_batch_size or 0  # 0 = no batching
+            # Batch size / spacing / concurrency from the account's (adaptive) push plan
+            push_plan = AdaptivePushScheduler(account).plan()
+            batch_size = push_plan.batch_size  # 0 = no batching
             
             # Check for recent job (debounce within 10 minutes) first
             recent_job = self.env['marketplace.job'].search([
@@ -190,17 +279,18 @@ class StockMove(models.Model):
                         end_idx = min(start_idx + batch_size, total_bindings)
                         batch_binding_ids = merged_binding_ids[start_idx:end_idx]
                         
-                        batch_next_run = current_time + timedelta(seconds=batch_idx * 5)
+                        batch_next_run = current_time + timedelta(seconds=batch_idx * push_plan.spacing_seconds)
                         
                         batch_payload = {
                             'binding_ids': batch_binding_ids,
                             'batch_index': batch_idx,
                             'batch_total': batch_count,
-                            'batch_size': batch_size,
+                            **push_plan.payload(),
                         }
                         self.env['marketplace.job'].sudo().create({
                             'name': f'Push stock for shop {shop.name} (Batch {batch_idx + 1}/{batch_count})',
                             'job_type': 'push_stock',
+                            **push_plan.job_vals(),
                             'shop_id': shop_id,
                             'account_id': account.id,
                             'priority': 'medium',
@@ -210,17 +300,19 @@ class StockMove(models.Model):
                 else:
                     # Update existing job (bindings still within batch_size or batching disabled)
                     recent_job.write({
-                        'payload': json.dumps({'binding_ids': merged_binding_ids}, ensure_ascii=False),
+                        'payload': json.dumps({'binding_ids': merged_binding_ids, **push_plan.payload()}, ensure_ascii=False),
+                        **push_plan.job_vals(),
                         'next_run_at': current_time,
                     })
             else:
                 # No recent job - create new job(s)
                 if batch_size == 0 or len(binding_ids) <= batch_size:
                     # Create single job
-                    payload_vals = {'binding_ids': binding_ids}
+                    payload_vals = {'binding_ids': binding_ids, **push_plan.payload()}
                     self.env['marketplace.job'].sudo().create({
                         'name': f'Push stock for shop {shop.name}',
                         'job_type': 'push_stock',
+                        **push_plan.job_vals(),
                         'shop_id': shop_id,
                         'account_id': account.id,
                         'priority': 'medium',
@@ -240,18 +332,19 @@ class StockMove(models.Model):
                         end_idx = min(start_idx + batch_size, total_bindings)
                         batch_binding_ids = binding_ids[start_idx:end_idx]
                         
-                        # Stagger jobs: each batch starts 5 seconds after previous
-                        batch_next_run = current_time + timedelta(seconds=batch_idx * 5)
+                        # Stagger jobs by the spacing chosen in the push plan
+                        batch_next_run = current_time + timedelta(seconds=batch_idx * push_plan.spacing_seconds)
                         
                         batch_payload = {
                             'binding_ids': batch_binding_ids,
                             'batch_index': batch_idx,
                             'batch_total': batch_count,
-                            'batch_size': batch_size,
+                            **push_plan.payload(),
                         }
                         self.env['marketplace.job'].sudo().create({
                             'name': f'Push stock for shop {shop.name} (Batch {batch_idx + 1}/{batch_count})',
                             'job_type': 'push_stock',
+                            **push_plan.job_vals(),
                             'shop_id': shop_id,
                             'account_id': account.id,
                             'priority': 'medium',
@@ -308,8 +401,9 @@ class StockQuant(models.Model):
             if not account.sync_enabled:
                 continue
             
-            # Check batch size from account settings
-            batch_size = account.push_stock_batch_size or 0  # 0 = no batching
+            # Batch size / spacing / concurrency from the account's (adaptive) push plan
+            push_plan = AdaptivePushScheduler(account).plan()
+            batch_size = push_plan.batch_size  # 0 = no batching
             
             # Check for recent job (debounce within 10 minutes) first
             recent_job = self.env['marketplace.job'].search([
@@ -342,17 +436,18 @@ class StockQuant(models.Model):
                         end_idx = min(start_idx + batch_size, total_bindings)
                         batch_binding_ids = merged_binding_ids[start_idx:end_idx]
                         
-                        batch_next_run = current_time + timedelta(seconds=batch_idx * 5)
+                        batch_next_run = current_time + timedelta(seconds=batch_idx * push_plan.spacing_seconds)
                         
                         batch_payload = {
                             'binding_ids': batch_binding_ids,
                             'batch_index': batch_idx,
                             'batch_total': batch_count,
-                            'batch_size': batch_size,
+                            **push_plan.payload(),
                         }
                         self.env['marketplace.job'].sudo().create({
                             'name': f'Push stock for shop {shop.name} (Batch {batch_idx + 1}/{batch_count})',
                             'job_type': 'push_stock',
+                            **push_plan.job_vals(),
                             'shop_id': shop_id,
                             'account_id': account.id,
                             'priority': 'medium',
@@ -362,17 +457,19 @@ class StockQuant(models.Model):
                 else:
                     # Update existing job (bindings still within batch_size or batching disabled)
                     recent_job.write({
-                        'payload': json.dumps({'binding_ids': merged_binding_ids}, ensure_ascii=False),
+                        'payload': json.dumps({'binding_ids': merged_binding_ids, **push_plan.payload()}, ensure_ascii=False),
+                        **push_plan.job_vals(),
                         'next_run_at': current_time,
                     })
             else:
                 # No recent job - create new job(s)
                 if batch_size == 0 or len(binding_ids) <= batch_size:
                     # Create single job
-                    payload_vals = {'binding_ids': binding_ids}
+                    payload_vals = {'binding_ids': binding_ids, **push_plan.payload()}
                     self.env['marketplace.job'].sudo().create({
                         'name': f'Push stock for shop {shop.name}',
                         'job_type': 'push_stock',
+                        **push_plan.job_vals(),
                         'shop_id': shop_id,
                         'account_id': account.id,
                         'priority': 'medium',
@@ -392,18 +489,19 @@ class StockQuant(models.Model):
                         end_idx = min(start_idx + batch_size, total_bindings)
                         batch_binding_ids = binding_ids[start_idx:end_idx]
                         
-                        # Stagger jobs: each batch starts 5 seconds after previous
-                        batch_next_run = current_time + timedelta(seconds=batch_idx * 5)
+                        # Stagger jobs by the spacing chosen in the push plan
+                        batch_next_run = current_time + timedelta(seconds=batch_idx * push_plan.spacing_seconds)
                         
                         batch_payload = {
                             'binding_ids': batch_binding_ids,
                             'batch_index': batch_idx,
                             'batch_total': batch_count,
-                            'batch_size': batch_size,
+                            **push_plan.payload(),
                         }
                         self.env['marketplace.job'].sudo().create({
                             'name': f'Push stock for shop {shop.name} (Batch {batch_idx + 1}/{batch_count})',
                             'job_type': 'push_stock',
+                            **push_plan.job_vals(),
                             'shop_id': shop_id,
                             'account_id': account.id,
                             'priority': 'medium',
@@ -81,11 +81,18 @@ class MarketplaceSyncRule(models.Model):
                 raise ValidationError('Product is required for product scope')
 
     @api.model
-    def get_rule_for_binding(self, binding):
-        """Get applicable rule for a product binding"""
-        rules = self.search([
-            ('active', '=', True),
-        ], order='priority desc')
+    def get_rule_for_binding(self, binding, rules=None):
+        """Get applicable rule for a product binding
+        
+        Args:
+            binding: marketplace.product.binding record
+            rules: active rules ordered by priority, when the caller already
+                   loaded them for a batch of bindings
+        """
+        if rules is None:
+            rules = self.search([
+                ('active', '=', True),
+            ], order='priority desc')
         
         product = binding.product_id
         
@@ -1,19 +1,68 @@
 # -*- coding: utf-8 -*-
 
 from .adapters import MarketplaceAdapter
-from odoo import fields
-from datetime import datetime, timedelta
+from .job_logging import job_log
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import urllib.parse
+import json
+import time
 import hmac
 import hashlib
+import requests
 
 _logger = logging.getLogger(__name__)
 
+# TikTok order status codes (numeric in the Open API, names in webhooks/older payloads)
+TIKTOK_ORDER_STATES = {
+    '100': 'pending',      # UNPAID
+    '105': 'pending',      # ON_HOLD
+    '111': 'pending',      # AWAITING_SHIPMENT
+    '112': 'pending',      # AWAITING_COLLECTION
+    '114': 'pending',      # PARTIALLY_SHIPPING
+    '121': 'synced',       # IN_TRANSIT
+    '122': 'synced',       # DELIVERED
+    '130': 'synced',       # COMPLETED
+    '140': 'cancelled',    # CANCELLED
+    'UNPAID': 'pending',
+    'ON_HOLD': 'pending',
+    'AWAITING_SHIPMENT': 'pending',
+    'AWAITING_COLLECTION': 'pending',
+    'PARTIALLY_SHIPPING': 'pending',
+    'IN_TRANSIT': 'synced',
+    'DELIVERED': 'synced',
+    'COMPLETED': 'synced',
+    'CANCELLED': 'cancelled',
+    'RETURNED': 'returned',
+}
+
 
 class TikTokAdapter(MarketplaceAdapter):
-    """TikTok Shop marketplace adapter"""
-    
+    """TikTok Shop marketplace adapter
+
+    Requests are signed (HMAC-SHA256 over path, sorted query parameters and
+    body) and sent through one requests.Session per adapter, with retry and
+    Retry-After handling. Orders are listed by cursor and their details are
+    fetched in batches on a small thread pool while paging continues; the
+    result is the list of raw detailed payloads consumed by the same bulk
+    order pipeline as Shopee. Inventory is pushed in chunks with per-SKU
+    partial retry.
+    """
+
+    ORDER_SEARCH_PATH = '/order/orders/search'
+    ORDER_DETAIL_PATH = '/order/orders/detail/query'
+    INVENTORY_UPDATE_PATH = '/product/inventory/update'
+    # Max order ids per detail query
+    ORDER_DETAIL_BATCH_SIZE = 50
+    # Max SKUs per inventory update call
+    INVENTORY_MAX_SKUS = 50
+    # Too many requests / invalid or expired access token
+    THROTTLE_ERROR_CODES = frozenset({'36009004'})
+    AUTH_ERROR_CODES = frozenset({'105001', '105002'})
+    # Concurrent calls when the push scheduler sets no limit
+    DEFAULT_WORKERS = 3
+
     def _get_base_url(self):
         """Get TikTok API base URL"""
         base_url = self.env['ir.config_parameter'].sudo().get_param(
@@ -21,24 +70,122 @@ class TikTokAdapter(MarketplaceAdapter):
             'https://open-api.tiktokglobalshop.com'
         )
         return base_url
-    
+
+    # ------------------------------------------------------------------
+    # Transport
+    # ------------------------------------------------------------------
+
+    def _get_session(self):
+        """Get or create a requests session for connection reuse"""
+        if not hasattr(self, '_session'):
+            self._session = requests.Session()
+        return self._session
+
+    def _credentials(self):
+        """(app_key, app_secret), read once so worker threads never touch the ORM"""
+        if not hasattr(self, '_app_credentials'):
+            self._app_credentials = (self.account.client_id or '', self.account.client_secret or '')
+        return self._app_credentials
+
+    def _sign(self, path, params, body=''):
+        """TikTok Shop signature: HMAC-SHA256(secret, secret + path + sorted params + body + secret)"""
+        _app_key, app_secret = self._credentials()
+        sign_base = path + ''.join(
+            f'{key}{params[key]}'
+            for key in sorted(params)
+            if key not in ('sign', 'access_token')
+        ) + (body or '')
+        return hmac.new(
+            app_secret.encode('utf-8'),
+            f'{app_secret}{sign_base}{app_secret}'.encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+
+    def _make_request(self, method, endpoint, params=None, data=None, headers=None, include_access_token=True):
+        """Signed request to the TikTok Shop API (session reuse, retry, rate limiting)"""
+        method = (method or 'GET').upper()
+        app_key, _app_secret = self._credentials()
+        url = f"{self.base_url.rstrip('/')}{endpoint}"
+
+        query = {'app_key': app_key}
+        if params:
+            query.update({key: str(value) for key, value in params.items() if value is not None})
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')) if data is not None else ''
+
+        headers = dict(headers or {})
+        headers.setdefault('Content-Type', 'application/json')
+        if include_access_token:
+            token = self._get_access_token()
+            if token:
+                query['access_token'] = token
+                headers['x-tts-access-token'] = token
+
+        session = self._get_session()
+        with self._trace(method, endpoint) as span:
+            for attempt in range(self.max_retries):
+                span.retries = attempt
+                # Fresh timestamp and signature per attempt
+                query['timestamp'] = str(int(time.time()))
+                query['sign'] = self._sign(endpoint, query, body)
+                try:
+                    response = session.request(
+                        method,
+                        url,
+                        params=query,
+                        data=body.encode('utf-8') if body else None,
+                        headers=headers,
+                        timeout=self.timeout,
+                    )
+                    span.record_response(response)
+
+                    # Handle rate limiting
+                    if response.status_code == 429:
+                        retry_after = int(response.headers.get('Retry-After', 5))
+                        _logger.warning(f'TikTok rate limited, waiting {retry_after} seconds')
+                        time.sleep(retry_after)
+                        continue
+
+                    response.raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    if attempt == self.max_retries - 1:
+                        raise
+                    wait_time = 2 ** attempt
+                    _logger.warning(f'TikTok request failed, retrying in {wait_time}s: {e}')
+                    time.sleep(wait_time)
+                    continue
+
+                try:
+                    result = response.json()
+                except ValueError:
+                    raise ValueError(f'TikTok API returned non-JSON response: {response.text[:200]}')
+                code = result.get('code') if isinstance(result, dict) else None
+                if code not in (None, 0, '0'):
+                    raise ValueError(f"TikTok API error ({code}): {result.get('message') or 'Unknown error'}")
+                return result
+
+            raise Exception('Request failed after retries')
+
+    # ------------------------------------------------------------------
+    # OAuth
+    # ------------------------------------------------------------------
+
     def get_authorize_url(self):
         """Get TikTok OAuth authorization URL"""
         redirect_uri = self.env['ir.config_parameter'].sudo().get_param(
             'web.base.url'
         ) + '/marketplace/oauth/callback/tiktok'
-        
+
         params = {
             'app_key': self.account.client_id,
             'redirect_uri': redirect_uri,
             'state': 'marketplace_auth',
         }
-        
+
         auth_url = 'https://auth.tiktok-shops.com/oauth/authorize'
         auth_url += '?' + urllib.parse.urlencode(params)
-        
+
         return auth_url
-    
+
     def exchange_code(self, code):
         """Exchange authorization code for tokens"""
         data = {
@@ -47,19 +194,20 @@ class TikTokAdapter(MarketplaceAdapter):
             'auth_code': code,
             'grant_type': 'authorized_code',
         }
-        
+
         response = self._make_request(
             'POST',
             '/api/token/get',
             data=data,
+            include_access_token=False,
         )
-        
+
         return {
             'access_token': response.get('data', {}).get('access_token'),
             'refresh_token': response.get('data', {}).get('refresh_token'),
             'expires_in': response.get('data', {}).get('expires_in', 3600),
         }
-    
+
     def refresh_access_token(self):
         """Refresh TikTok access token"""
         data = {
@@ -68,162 +216,301 @@ class TikTokAdapter(MarketplaceAdapter):
             'refresh_token': self.account.refresh_token,
             'grant_type': 'refresh_token',
         }
-        
+
         response = self._make_request(
             'POST',
             '/api/token/refresh',
             data=data,
+            include_access_token=False,
         )
-        
+
         return {
             'access_token': response.get('data', {}).get('access_token'),
             'refresh_token': response.get('data', {}).get('refresh_token', self.account.refresh_token),
             'expires_in': response.get('data', {}).get('expires_in', 3600),
         }
-    
-    def fetch_orders(self, since, until=None):
-        """Fetch orders from TikTok"""
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+
+    def iter_order_pages(self, since, until=None, time_range_field='create_time', page_size=100):
+        """Yield pages of order search rows, following next_cursor
+
+        Args:
+            since: datetime or ISO string - start time
+            until: datetime or ISO string (optional) - end time, default now
+            time_range_field: 'create_time' or 'update_time'
+            page_size: rows per page (max 100)
+        """
         if not self.shop:
             raise ValueError('Shop is required for fetching orders')
-        
-        # Convert datetime if needed
+
         if isinstance(since, str):
             since = datetime.fromisoformat(since)
         if until is None:
             until = datetime.now()
         elif isinstance(until, str):
             until = datetime.fromisoformat(until)
-        
+
+        prefix = 'update_time' if time_range_field == 'update_time' else 'create_time'
         params = {
-            'create_time_from': int(since.timestamp()),
-            'create_time_to': int(until.timestamp()),
-            'page_size': 100,
-            'cursor': '',
+            f'{prefix}_from': int(since.timestamp()),
+            f'{prefix}_to': int(until.timestamp()),
+            'page_size': min(max(int(page_size or 100), 1), 100),
         }
-        
-        all_orders = []
+
         cursor = ''
-        
         while True:
             if cursor:
                 params['cursor'] = cursor
-            
-            response = self._make_request(
-                'GET',
-                '/order/orders/search',
-                params=params,
-            )
-            
-            orders = response.get('data', {}).get('order_list', [])
-            if not orders:
-                break
-            
-            all_orders.extend(orders)
-            
-            cursor = response.get('data', {}).get('next_cursor')
-            if not cursor:
-                break
-        
-        return all_orders
-    
+            response = self._make_request('GET', self.ORDER_SEARCH_PATH, params=params)
+            data = response.get('data') or {}
+            orders = data.get('order_list') or []
+            if orders:
+                job_log(_logger, logging.DEBUG, '🔍 TikTok order search: %s orders (cursor=%s)', len(orders), cursor)
+                yield orders
+            cursor = data.get('next_cursor')
+            if not orders or not cursor or data.get('more') is False:
+                return
+
+    def fetch_orders_list_with_details(self, since, until=None, time_range_field='create_time', page_size=100):
+        """Fetch detailed order payloads for a time window
+
+        Search rows that already carry their lines are used as they are; the
+        others are fetched ORDER_DETAIL_BATCH_SIZE ids per detail query, on up
+        to max_workers threads while the search keeps paging. Returns RAW
+        payloads for create_from_payloads_bulk (same contract as Shopee).
+        A failed search or detail query raises: a partial list would let the
+        pull job advance last_order_sync_at past orders it never saw.
+        """
+        # Credentials, session and token are resolved before worker threads use them
+        self._credentials()
+        self._get_session()
+
+        detailed_orders = []
+        workers = max(1, self.max_workers or self.DEFAULT_WORKERS)
+        with self._pinned_access_token(), ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            try:
+                for page in self.iter_order_pages(since, until, time_range_field, page_size):
+                    missing_ids = []
+                    for order in page:
+                        if self._has_order_lines(order):
+                            detailed_orders.append(order)
+                        elif order.get('order_id') or order.get('id'):
+                            missing_ids.append(str(order.get('order_id') or order.get('id')))
+                    for start in range(0, len(missing_ids), self.ORDER_DETAIL_BATCH_SIZE):
+                        batch = missing_ids[start:start + self.ORDER_DETAIL_BATCH_SIZE]
+                        futures.append(executor.submit(self._fetch_order_details, batch))
+            except Exception as e:
+                # Fail the pull so the job keeps the shop's previous sync time
+                _logger.error(f'❌ TikTok order search failed: {e}', exc_info=True)
+                for future in futures:
+                    future.cancel()
+                raise
+            # A failed detail query re-raises here and fails the pull as well
+            for future in futures:
+                detailed_orders.extend(future.result())
+
+        job_log(_logger, logging.INFO, 'TikTok orders fetched: %s (%s detail queries)', len(detailed_orders), len(futures))
+        return detailed_orders
+
+    def fetch_orders(self, since, until=None):
+        """Fetch orders from TikTok (detailed payloads)"""
+        return self.fetch_orders_list_with_details(since, until)
+
+    def _fetch_order_details(self, order_ids):
+        """Worker thread: one detail query for up to ORDER_DETAIL_BATCH_SIZE order ids"""
+        try:
+            response = self._make_request('POST', self.ORDER_DETAIL_PATH, data={'order_id_list': order_ids})
+        except Exception as e:
+            _logger.error(f'❌ TikTok order detail query failed for {len(order_ids)} orders: {e}')
+            raise
+        data = response.get('data') or {}
+        return data.get('order_list') or data.get('orders') or []
+
+    @staticmethod
+    def _has_order_lines(order):
+        return bool(order.get('item_list') or order.get('line_items'))
+
+    # ------------------------------------------------------------------
+    # Inventory
+    # ------------------------------------------------------------------
+
     def update_inventory(self, items):
-        """Update inventory on TikTok"""
+        """Push stock in chunks of INVENTORY_MAX_SKUS, retrying only failed SKUs
+
+        Chunks are sent concurrently (max_workers from the adaptive push
+        scheduler, DEFAULT_WORKERS otherwise). SKUs listed as failed are
+        resent once on their own; a chunk rejected as a whole for its SKUs is
+        bisected so one bad SKU does not fail its neighbours. Throttled chunks
+        are retried whole after a backoff; auth errors fail the chunk.
+
+        Args:
+            items: list of tuples (external_sku, quantity) or push_stock dicts
+
+        Returns:
+            dict {sku: {'success': bool, 'error': str}}
+        """
         if not self.shop:
             raise ValueError('Shop is required for updating inventory')
-        
-        # TikTok batch update
-        sku_list = []
-        for sku, qty in items:
-            sku_list.append({
-                'seller_sku': sku,
-                'available_stock': int(qty),
-            })
-        
-        data = {
-            'sku_list': sku_list,
-        }
-        
-        response = self._make_request(
-            'POST',
-            '/product/inventory/update',
-            data=data,
+
+        pairs = self._inventory_pairs(items)
+        if not pairs:
+            return {}
+
+        self._credentials()
+        self._get_session()
+        results, chunk_count, workers = self._push_inventory_chunks(
+            pairs, self.INVENTORY_MAX_SKUS, self.DEFAULT_WORKERS, self._push_inventory_chunk,
         )
-        
-        results = {}
-        for item in response.get('data', {}).get('failed_sku_list', []):
-            results[item.get('seller_sku')] = {
-                'success': False,
-                'error': item.get('fail_reason', ''),
-            }
-        
-        # Success items
-        for item in response.get('data', {}).get('success_sku_list', []):
-            results[item.get('seller_sku')] = {
-                'success': True,
-            }
-        
+
+        failed = sum(1 for result in results.values() if not result['success'])
+        job_log(
+            _logger, logging.INFO,
+            'TikTok stock push: %s SKUs in %s chunks (%s workers), %s failed',
+            len(pairs), chunk_count, workers, failed,
+        )
+        return results
+
+    def _push_inventory_chunk(self, chunk, retry_failed=True):
+        """Push one chunk of (sku, qty); returns {sku: result}"""
+        try:
+            response = self._call_with_throttle_backoff(self._make_request, 'POST', self.INVENTORY_UPDATE_PATH, data={
+                'sku_list': [
+                    {'seller_sku': sku, 'available_stock': qty}
+                    for sku, qty in chunk
+                ],
+            })
+        except ValueError as api_error:
+            if not self._is_item_error(api_error):
+                # Still throttled, auth or malformed response: do not split
+                return {sku: {'success': False, 'error': str(api_error)} for sku, _qty in chunk}
+            # TikTok rejected the whole call: bisect to isolate the bad SKU(s)
+            if len(chunk) > 1:
+                middle = len(chunk) // 2
+                results = self._push_inventory_chunk(chunk[:middle], retry_failed)
+                results.update(self._push_inventory_chunk(chunk[middle:], retry_failed))
+                return results
+            return {sku: {'success': False, 'error': str(api_error)} for sku, _qty in chunk}
+        except Exception as e:
+            return {sku: {'success': False, 'error': str(e)} for sku, _qty in chunk}
+
+        results = self._parse_inventory_results(chunk, response)
+        failed = [(sku, qty) for sku, qty in chunk if not results[sku]['success']]
+        if failed and retry_failed:
+            # Partial failure: resend only the failed SKUs, once
+            _logger.info('Retrying %s of %s TikTok SKUs that failed', len(failed), len(chunk))
+            results.update(self._push_inventory_chunk(failed, retry_failed=False))
+        return results
+
+    def _parse_inventory_results(self, chunk, response):
+        """Map an inventory update response to {sku: result} (unlisted SKUs succeeded)"""
+        results = {sku: {'success': True, 'error': ''} for sku, _qty in chunk}
+        data = (response or {}).get('data') or {}
+        for item in data.get('failed_sku_list', []):
+            sku = item.get('seller_sku')
+            if sku in results:
+                results[sku] = {
+                    'success': False,
+                    'error': item.get('fail_reason', ''),
+                }
+        for item in data.get('success_sku_list', []):
+            sku = item.get('seller_sku')
+            if sku in results:
+                results[sku] = {'success': True, 'error': ''}
         return results
-    
+
+    # ------------------------------------------------------------------
+    # Webhooks and payloads
+    # ------------------------------------------------------------------
+
     def verify_webhook(self, headers, body):
-        """Verify TikTok webhook signature"""
-        signature = headers.get('X-TikTok-Signature', '')
-        if not signature:
+        """Verify TikTok webhook signature
+
+        TikTok Shop signs app_key + raw body with the app secret (HMAC-SHA256,
+        hex) and sends it in the Authorization header. The older
+        X-TikTok-Signature header (HMAC of the body alone) is still accepted.
+        """
+        headers = {str(key).lower(): value for key, value in (headers or {}).items()}
+        app_key, secret = self._credentials()
+        if not secret:
             return False
-        
-        # TikTok uses HMAC-SHA256
-        secret = self.account.client_secret or ''
-        expected_signature = hmac.new(
-            secret.encode('utf-8'),
-            body.encode('utf-8') if isinstance(body, str) else body,
-            hashlib.sha256
-        ).hexdigest()
-        
-        return hmac.compare_digest(signature, expected_signature)
-    
+        body_bytes = body.encode('utf-8') if isinstance(body, str) else (body or b'')
+
+        signature = (headers.get('authorization') or '').strip()
+        if signature:
+            expected_signature = hmac.new(
+                secret.encode('utf-8'),
+                app_key.encode('utf-8') + body_bytes,
+                hashlib.sha256
+            ).hexdigest()
+            return hmac.compare_digest(signature.lower(), expected_signature)
+
+        legacy_signature = (headers.get('x-tiktok-signature') or '').strip()
+        if legacy_signature:
+            expected_signature = hmac.new(
+                secret.encode('utf-8'),
+                body_bytes,
+                hashlib.sha256
+            ).hexdigest()
+            return hmac.compare_digest(legacy_signature.lower(), expected_signature)
+
+        return False
+
     def parse_order_payload(self, payload):
-        """Parse TikTok order payload to standard format"""
-        order_id = payload.get('order_id', '')
-        order_status = payload.get('order_status', '')
-        
-        status_map = {
-            'UNPAID': 'pending',
-            'AWAITING_SHIPMENT': 'pending',
-            'AWAITING_COLLECTION': 'pending',
-            'IN_TRANSIT': 'synced',
-            'DELIVERED': 'synced',
-            'COMPLETED': 'synced',
-            'CANCELLED': 'cancelled',
-            'RETURNED': 'returned',
-        }
-        
-        state = status_map.get(order_status, 'pending')
-        
+        """Parse TikTok order payload (search row or order detail) to standard format"""
+        order_id = str(payload.get('order_id') or payload.get('id') or '')
+        order_status = str(payload.get('order_status') or payload.get('status') or '')
+        state = TIKTOK_ORDER_STATES.get(order_status.upper(), 'pending')
+
         # Parse customer info
-        recipient = payload.get('recipient', {})
+        recipient = payload.get('recipient_address') or payload.get('recipient') or {}
         customer_name = recipient.get('name', '')
-        customer_phone = recipient.get('phone_number', '')
-        address = recipient.get('full_address', {})
-        customer_address = f"{address.get('address_line1', '')} {address.get('address_line2', '')} {address.get('city', '')} {address.get('region', '')} {address.get('postal_code', '')}"
-        
-        # Parse order lines
+        customer_phone = recipient.get('phone') or recipient.get('phone_number') or ''
+        address = recipient.get('full_address', '')
+        if isinstance(address, dict):
+            address = ' '.join(filter(None, [
+                address.get('address_line1', ''),
+                address.get('address_line2', ''),
+                address.get('city', ''),
+                address.get('region', ''),
+                address.get('postal_code', ''),
+            ]))
+
+        # Parse order lines (item_list: one row per SKU; line_items: one row per unit)
         lines = []
-        for item in payload.get('item_list', []):
+        for item in payload.get('item_list') or payload.get('line_items') or []:
+            price = item.get('sku_sale_price') or item.get('sale_price')
+            if price in (None, '') and isinstance(item.get('price'), dict):
+                price = item['price'].get('original_price')
             lines.append({
                 'external_sku': item.get('seller_sku', ''),
                 'product_name': item.get('product_name', ''),
                 'quantity': float(item.get('quantity', 1)),
-                'price_unit': float(item.get('price', {}).get('original_price', 0)),
+                'price_unit': float(price or 0),
             })
-        
+
+        payment = payload.get('payment_info') or payload.get('payment') or {}
+        create_time = int(payload.get('create_time') or 0)
+        if create_time > 10 ** 11:
+            # Millisecond timestamps (older API versions)
+            create_time //= 1000
+
         return {
             'external_order_id': order_id,
             'name': f'TIK-{order_id}',
-            'order_date': datetime.fromtimestamp(payload.get('create_time', 0)),
+            'order_date': datetime.fromtimestamp(create_time, timezone.utc).replace(tzinfo=None),
             'customer_name': customer_name,
             'customer_phone': customer_phone,
-            'customer_address': customer_address.strip(),
-            'amount_total': float(payload.get('payment_info', {}).get('total_amount', 0)),
+            'customer_address': str(address or '').strip(),
+            'amount_total': float(payment.get('total_amount') or 0),
             'state': state,
             'lines': lines,
         }
 
+
+# Register adapter
+from . import adapters
+adapters.MarketplaceAdapters.register_adapter('tiktok', TikTokAdapter)
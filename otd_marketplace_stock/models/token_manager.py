@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, SUPERUSER_ID
+from datetime import timedelta
+import logging
+import threading
+import time
+
+import psycopg2
+
+_logger = logging.getLogger(__name__)
+
+# Channels whose access tokens expire and are refreshed with a refresh_token
+TOKEN_REFRESH_CHANNELS = ('shopee', 'lazada', 'tiktok')
+
+# Process-wide cache: (dbname, account_id) -> (access_token, expire_at, cached_at)
+_token_cache = {}
+_cache_lock = threading.Lock()
+# One in-process lock per account so threads of this worker refresh once
+_account_locks = {}
+# Accounts being refreshed by the current thread (adapters may call the API while refreshing)
+_local = threading.local()
+
+# Arbitrary namespace for pg_advisory_xact_lock(namespace, account_id)
+_ADVISORY_LOCK_NAMESPACE = 7321
+
+
+def invalidate_cached_token(dbname, account_ids):
+    """Drop cached tokens (e.g. after a reconnect wrote new tokens)"""
+    with _cache_lock:
+        for account_id in account_ids:
+            _token_cache.pop((dbname, account_id), None)
+
+
+def _account_lock(key):
+    with _cache_lock:
+        return _account_locks.setdefault(key, threading.Lock())
+
+
+class TokenManager:
+    """Access tokens for marketplace adapters
+
+    Tokens are refreshed ahead of expiry by cron_refresh_tokens, so jobs only
+    read them: get_token() answers from a process-wide cache (shared by all
+    threads of the worker, independent of each job's transaction snapshot)
+    and only refreshes inline when the background refresh was missed.
+
+    Refreshes are serialized per account: an in-process lock for threads and
+    a PostgreSQL advisory lock for other workers. They run on their own cursor
+    and commit immediately, so a rotated refresh_token survives a rollback of
+    the job that needed it.
+    """
+
+    # Background refresh window (cron)
+    REFRESH_AHEAD = timedelta(minutes=30)
+    # Below this remaining lifetime a job refreshes inline
+    INLINE_MARGIN = timedelta(minutes=5)
+    # Cached entries are re-validated against the database after this many seconds
+    CACHE_TTL_SECONDS = 300
+    LOCK_TIMEOUT_MS = 10000
+
+    def __init__(self, env):
+        self.env = env
+
+    def _key(self, account):
+        return (self.env.cr.dbname, account.id)
+
+    def get_token(self, account):
+        """Return a valid access token for account, refreshing only if needed"""
+        refreshing = getattr(_local, 'refreshing', set())
+        if account.id in refreshing or account.channel not in TOKEN_REFRESH_CHANNELS:
+            return account.access_token
+
+        key = self._key(account)
+        now = fields.Datetime.now()
+        entry = _token_cache.get(key)
+        if entry:
+            token, expire_at, cached_at = entry
+            if time.monotonic() - cached_at < self.CACHE_TTL_SECONDS and expire_at - now > self.INLINE_MARGIN:
+                return token
+
+        token = account.access_token
+        expire_at = account.access_token_expire_at
+        if not expire_at:
+            return token
+        if token and expire_at - now > self.INLINE_MARGIN:
+            with _cache_lock:
+                _token_cache[key] = (token, expire_at, time.monotonic())
+            return token
+
+        if not account.refresh_token:
+            return token
+        _logger.warning('Access token of account %s expires at %s: refreshing inline', account.id, expire_at)
+        try:
+            return self.refresh(account)
+        except Exception as e:
+            _logger.warning(f'Token refresh failed: {e}')
+            return token
+
+    def refresh(self, account, force=False, margin=None):
+        """Refresh account's token unless someone else already did
+
+        Args:
+            account: marketplace.account record
+            force: refresh even if the stored token is still valid
+            margin: remaining lifetime below which the token is refreshed
+                    (default: INLINE_MARGIN)
+
+        Returns:
+            the valid access token
+        """
+        margin = margin or self.INLINE_MARGIN
+        key = self._key(account)
+        with _account_lock(key):
+            with self.env.registry.cursor() as cr:
+                cr.execute('SET LOCAL lock_timeout = %s', (self.LOCK_TIMEOUT_MS,))
+                try:
+                    with cr.savepoint(flush=False):
+                        cr.execute('SELECT pg_advisory_xact_lock(%s, %s)', (_ADVISORY_LOCK_NAMESPACE, account.id))
+                except psycopg2.errors.LockNotAvailable:
+                    # Another worker is still refreshing this account: keep the current token
+                    _logger.warning('Token refresh of account %s is already running in another worker', account.id)
+                    return account.access_token
+                try:
+                    with cr.savepoint(flush=False):
+                        cr.execute('SELECT id FROM marketplace_account WHERE id = %s FOR UPDATE', (account.id,))
+                except psycopg2.errors.LockNotAvailable:
+                    # The caller's own transaction holds the account row: refresh in it (previous behaviour)
+                    _logger.info('Account %s row is locked by the current transaction, refreshing in place', account.id)
+                    token, expire_at = self._refresh_locked(account, force, margin)
+                else:
+                    env = api.Environment(cr, SUPERUSER_ID, {})
+                    token, expire_at = self._refresh_locked(env['marketplace.account'].browse(account.id), force, margin)
+
+            account.invalidate_recordset(['access_token', 'refresh_token', 'access_token_expire_at'])
+            with _cache_lock:
+                _token_cache[key] = (token, expire_at, time.monotonic())
+            return token
+
+    def _refresh_locked(self, account, force, margin):
+        """Refresh under the account lock; returns (access_token, expire_at)"""
+        now = fields.Datetime.now()
+        expire_at = account.access_token_expire_at
+        if not force and account.access_token and expire_at and expire_at - now > margin:
+            # Another worker refreshed while we were waiting for the lock
+            return account.access_token, expire_at
+
+        refreshing = getattr(_local, 'refreshing', None)
+        if refreshing is None:
+            refreshing = _local.refreshing = set()
+        refreshing.add(account.id)
+        try:
+            token_data = account._get_adapter().refresh_access_token()
+        finally:
+            refreshing.discard(account.id)
+
+        expire_at = fields.Datetime.now() + timedelta(seconds=token_data.get('expires_in', 3600))
+        account.write({
+            'access_token': token_data.get('access_token'),
+            'refresh_token': token_data.get('refresh_token', account.refresh_token),
+            'access_token_expire_at': expire_at,
+        })
+        _logger.info('🔑 Refreshed access token of %s account %s (expires %s)', account.channel, account.id, expire_at)
+        return token_data.get('access_token'), expire_at
@@ -35,6 +35,9 @@ class WooCommerceAdapter(MarketplaceAdapter):
     
     def _get_auth(self):
         """Get Basic Auth credentials for WooCommerce API"""
+        # Computed once per adapter so worker threads never read the ORM
+        if getattr(self, '_auth_header', None):
+            return self._auth_header
         # WooCommerce uses Consumer Key:Consumer Secret for Basic Auth
         # Note: For WooCommerce:
         # - Client ID field = Store URL (used for base URL)
@@ -70,7 +73,8 @@ class WooCommerceAdapter(MarketplaceAdapter):
         # WooCommerce REST API uses Basic Authentication with Consumer Key:Consumer Secret
         credentials = f"{consumer_key}:{consumer_secret}"
         encoded_credentials = base64.b64encode(credentials.encode('utf-8')).decode('utf-8')
-        return f'Basic {encoded_credentials}'
+        self._auth_header = f'Basic {encoded_credentials}'
+        return self._auth_header
     
     def _get_session(self):
         """Get or create a requests session for connection reuse"""
@@ -94,44 +98,47 @@ class WooCommerceAdapter(MarketplaceAdapter):
         # Use session for connection reuse (better performance)
         session = self._get_session()
         
-        for attempt in range(self.max_retries):
-            try:
-                if method.upper() == 'GET':
-                    response = session.get(url, params=params, headers=headers, timeout=self.timeout)
-                elif method.upper() == 'POST':
-                    response = session.post(url, json=data, headers=headers, timeout=self.timeout)
-                elif method.upper() == 'PUT':
-                    response = session.put(url, json=data, headers=headers, timeout=self.timeout)
-                else:
-                    response = session.request(method, url, params=params, json=data, headers=headers, timeout=self.timeout)
+        with self._trace(method, endpoint) as span:
+            for attempt in range(self.max_retries):
+                span.retries = attempt
+                try:
+                    if method.upper() == 'GET':
+                        response = session.get(url, params=params, headers=headers, timeout=self.timeout)
+                    elif method.upper() == 'POST':
+                        response = session.post(url, json=data, headers=headers, timeout=self.timeout)
+                    elif method.upper() == 'PUT':
+                        response = session.put(url, json=data, headers=headers, timeout=self.timeout)
+                    else:
+                        response = session.request(method, url, params=params, json=data, headers=headers, timeout=self.timeout)
+                    span.record_response(response)
                 
-                # Handle rate limiting
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 60))
-                    _logger.warning(f'Rate limited, waiting {retry_after} seconds')
-                    import time
-                    time.sleep(retry_after)
-                    continue
+                    # Handle rate limiting
+                    if response.status_code == 429:
+                        retry_after = int(response.headers.get('Retry-After', 60))
+                        _logger.warning(f'Rate limited, waiting {retry_after} seconds')
+                        import time
+                        time.sleep(retry_after)
+                        continue
                 
-                response.raise_for_status()
-                return response.json()
+                    response.raise_for_status()
+                    return response.json()
                 
-            except requests.exceptions.RequestException as e:
-                if attempt == self.max_retries - 1:
-                    _logger.error(f'WooCommerce API request failed: {e}')
-                    if hasattr(e, 'response') and e.response is not None:
-                        try:
-                            error_detail = e.response.json()
-                            _logger.error(f'Error response: {error_detail}')
-                        except:
-                            _logger.error(f'Error response text: {e.response.text}')
-                    raise
-                wait_time = 2 ** attempt
-                _logger.warning(f'Request failed, retrying in {wait_time}s: {e}')
-                import time
-                time.sleep(wait_time)
-        
-        raise Exception('Request failed after retries')
+                except requests.exceptions.RequestException as e:
+                    if attempt == self.max_retries - 1:
+                        _logger.error(f'WooCommerce API request failed: {e}')
+                        if hasattr(e, 'response') and e.response is not None:
+                            try:
+                                error_detail = e.response.json()
+                                _logger.error(f'Error response: {error_detail}')
+                            except:
+                                _logger.error(f'Error response text: {e.response.text}')
+                        raise
+                    wait_time = 2 ** attempt
+                    _logger.warning(f'Request failed, retrying in {wait_time}s: {e}')
+                    import time
+                    time.sleep(wait_time)
+        
+            raise Exception('Request failed after retries')
     
     def get_authorize_url(self):
         """WooCommerce doesn't use OAuth, uses API keys instead"""
@@ -207,6 +214,69 @@ class WooCommerceAdapter(MarketplaceAdapter):
         _logger.info(f'Fetched {len(all_orders)} orders from WooCommerce')
         return all_orders
     
+    def iter_product_pages(self, modified_after=None, per_page=100, max_workers=4):
+        """Yield pages of products, fetching up to max_workers pages concurrently
+        
+        Pages are requested in waves through the shared session and yielded in
+        order; iteration stops at the first short page. Products are listed by
+        id so a product changed during the sync cannot shift between pages.
+        
+        Args:
+            modified_after: datetime (UTC) - only products modified since then
+            per_page: page size (WooCommerce max is 100)
+            max_workers: pages requested concurrently
+        
+        Raises:
+            the first request error (pages already yielded stay valid)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        params = {
+            'per_page': per_page,
+            'orderby': 'id',
+            'order': 'asc',
+        }
+        if modified_after:
+            params['modified_after'] = modified_after.strftime('%Y-%m-%dT%H:%M:%S')
+            params['dates_are_gmt'] = 'true'
+        
+        # Create session and auth header before any worker thread uses them
+        self._get_session()
+        self._get_auth()
+        
+        max_workers = max(1, max_workers)
+        page = 1
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                wave = executor.map(
+                    lambda p: self._make_request('GET', 'products', params=dict(params, page=p)),
+                    range(page, page + max_workers),
+                )
+                for products in wave:
+                    if products:
+                        yield products
+                    if len(products or []) < per_page:
+                        return
+                page += max_workers
+    
+    def fetch_variations(self, product_id, per_page=100):
+        """Fetch all variations of a variable product (thread-safe once pages are primed)
+        
+        Returns:
+            list of variation payloads
+        """
+        variations = []
+        page = 1
+        while True:
+            batch = self._make_request('GET', f'products/{product_id}/variations', params={
+                'per_page': per_page,
+                'page': page,
+            }) or []
+            variations.extend(batch)
+            if len(batch) < per_page:
+                return variations
+            page += 1
+    
     def update_inventory(self, items):
         """Update inventory on WooCommerce (optimized with concurrent requests)
         
@@ -238,7 +308,12 @@ class WooCommerceAdapter(MarketplaceAdapter):
         else:
             use_concurrent = True
             max_workers = min(5, item_count // 10 + 2)  # Scale up to 5 workers max
-        
+
+        # Concurrency chosen by the adaptive push scheduler overrides the table above
+        if self.max_workers and item_count > 1:
+            max_workers = min(self.max_workers, item_count)
+            use_concurrent = max_workers > 1
+
         results = {}
         
         def update_single_item(item):
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .job_logging import job_log, job_count
+
+_logger = logging.getLogger(__name__)
+
+
+class WooCommerceCatalogSync:
+    """Streaming sync of WooCommerce products and variations into bindings
+
+    Product pages are fetched concurrently through the adapter's shared
+    session and processed as they arrive: simple products become binding rows
+    at once, variable products queue a variation fetch on a thread pool whose
+    results are drained between pages. Rows are flushed in chunks: SKUs are
+    resolved with one product query per chunk and bindings are upserted with a
+    single INSERT .. ON CONFLICT (shop_id, external_sku) that only touches rows
+    whose product, external id or active flag actually changed, so re-syncing
+    an unchanged store writes nothing.
+
+    Usage::
+
+        sync = WooCommerceCatalogSync(account, shop, adapter, job=job)
+        sync.run(modified_after=cursor)
+        sync.stats, sync.complete  # complete: every page and variation fetched
+    """
+
+    def __init__(self, account, shop, adapter, job=None, chunk_size=1000, workers=4):
+        self.env = account.env
+        self.account = account
+        self.company = account.company_id
+        self.shop = shop
+        self.adapter = adapter
+        self.job = job
+        self.chunk_size = max(1, chunk_size)
+        self.workers = max(1, workers)
+
+        self.binding_model = self.env['marketplace.product.binding'].sudo()
+        self.product_model = self.env['product.product'].sudo()
+
+        self.stats = {
+            'products': 0,
+            'variable_products': 0,
+            'created': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'variations_created': 0,
+            'variations_updated': 0,
+            'variations_unchanged': 0,
+            'skipped': 0,
+            'not_found': 0,
+            'variations_not_found': 0,
+        }
+        self.skipped_products = []
+        self.not_found_products = []
+        self.variations_not_found = []
+        self.errors = []
+        self.complete = False
+        self.processed = 0
+
+        self._pending = []  # (sku, external_product_id, parent_id, detail)
+        self._seen_skus = set()
+        self._variable_parents = {}  # wc_product_id -> name
+        self._synced_parents = set()
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+
+    def run(self, modified_after=None):
+        """Fetch, resolve and upsert the catalog (or products modified since modified_after)"""
+        listing_ok = True
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = set()
+            pages = self.adapter.iter_product_pages(modified_after=modified_after, max_workers=self.workers)
+            while True:
+                try:
+                    page = next(pages, None)
+                except Exception as e:
+                    # Keep what was fetched; the sync is reported incomplete
+                    listing_ok = False
+                    error_msg = f'Error fetching products: {e}'
+                    self.errors.append(error_msg)
+                    _logger.error(error_msg)
+                    break
+                if page is None:
+                    break
+                for product in page:
+                    self.stats['products'] += 1
+                    if product.get('type') == 'variable':
+                        self._variable_parents[str(product.get('id', ''))] = product.get('name', '')
+                        futures.add(executor.submit(self._fetch_variations, product))
+                    else:
+                        self._add_simple(product)
+                job_log(_logger, logging.DEBUG, 'Fetched %s products (%s variable pending)',
+                        self.stats['products'], len(futures))
+                futures = self._collect(futures, block=False)
+            self._collect(futures, block=True)
+        self._flush()
+
+        self.stats['variable_products'] = len(self._variable_parents)
+        for wc_product_id, name in self._variable_parents.items():
+            if wc_product_id not in self._synced_parents:
+                self.stats['skipped'] += 1
+                self.skipped_products.append({
+                    'product_id': wc_product_id,
+                    'name': name,
+                    'sku': '',
+                    'type': 'variable',
+                    'reason': 'Variable parent product (no SKU at parent level, and no variations synced)',
+                })
+        self.complete = listing_ok and not self.errors
+        return self.stats
+
+    def _fetch_variations(self, product):
+        """Worker thread: return (product, variations, error) without touching the ORM"""
+        try:
+            return product, self.adapter.fetch_variations(product.get('id')), None
+        except Exception as e:
+            return product, [], str(e)
+
+    def _collect(self, futures, block):
+        """Turn finished variation fetches into rows; returns the futures still running"""
+        if not futures:
+            return futures
+        done, not_done = wait(futures, timeout=None if block else 0)
+        for future in done:
+            product, variations, error = future.result()
+            wc_product_id = str(product.get('id', ''))
+            if error:
+                error_msg = f'Error fetching variations for product {wc_product_id}: {error}'
+                self.errors.append(error_msg)
+                _logger.error(error_msg)
+                continue
+            for variation in variations:
+                var_sku = (variation.get('sku') or '').strip()
+                if not var_sku:
+                    continue
+                var_id = str(variation.get('id', ''))
+                self._add_row(var_sku, f'{wc_product_id}:{var_id}', wc_product_id, {
+                    'parent_product_id': wc_product_id,
+                    'variation_id': var_id,
+                    'name': variation.get('name', ''),
+                    'sku': var_sku,
+                    'reason': 'SKU not found in Odoo',
+                })
+        return not_done
+
+    def _add_simple(self, product):
+        wc_product_id = str(product.get('id', ''))
+        wc_sku = (product.get('sku') or '').strip()
+        if not wc_sku:
+            self.stats['skipped'] += 1
+            self.skipped_products.append({
+                'product_id': wc_product_id,
+                'name': product.get('name', ''),
+                'sku': '',
+                'type': product.get('type', 'simple'),
+                'reason': 'No SKU',
+            })
+            return
+        self._add_row(wc_sku, wc_product_id, None, {
+            'product_id': wc_product_id,
+            'name': product.get('name', ''),
+            'sku': wc_sku,
+            'type': product.get('type', 'simple'),
+            'reason': 'SKU not found in Odoo',
+        })
+
+    def _add_row(self, sku, external_product_id, parent_id, detail):
+        # One binding per (shop, SKU): a SKU used twice in WooCommerce keeps its first product
+        if sku in self._seen_skus:
+            self.stats['skipped'] += 1
+            self.skipped_products.append({
+                'product_id': external_product_id,
+                'name': detail.get('name', ''),
+                'sku': sku,
+                'type': 'variation' if parent_id else detail.get('type', 'simple'),
+                'reason': 'Duplicate SKU in WooCommerce',
+            })
+            return
+        self._seen_skus.add(sku)
+        self._pending.append((sku, external_product_id, parent_id, detail))
+        if len(self._pending) >= self.chunk_size:
+            self._flush()
+
+    def _flush(self):
+        """Resolve and upsert the pending rows"""
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+        product_ids = self._resolve_products([row[0] for row in rows])
+
+        matched = []
+        for sku, external_product_id, parent_id, detail in rows:
+            product_id = product_ids.get(sku)
+            if not product_id:
+                if parent_id:
+                    self.stats['variations_not_found'] += 1
+                    self.variations_not_found.append(detail)
+                else:
+                    self.stats['not_found'] += 1
+                    self.not_found_products.append(detail)
+                continue
+            if parent_id:
+                self._synced_parents.add(parent_id)
+            matched.append((product_id, sku, external_product_id))
+
+        if matched:
+            self._upsert(matched)
+
+        self.processed += len(rows)
+        job_count('bindings_processed', len(rows))
+        if self.job:
+            self.job.write({'processed_items': self.processed})
+            self.env.cr.commit()
+
+    def _resolve_products(self, skus):
+        """Return {sku: product id}, company products taking precedence over shared ones"""
+        products = self.product_model.search_fetch([
+            ('default_code', 'in', skus),
+            ('company_id', 'in', [self.company.id, False]),
+        ], ['default_code', 'company_id'])
+        product_ids = {}
+        for product in products:
+            if product.company_id or product.default_code not in product_ids:
+                product_ids[product.default_code] = product.id
+        return product_ids
+
+    def _upsert(self, matched):
+        """INSERT .. ON CONFLICT (shop_id, external_sku) for matched (product_id, sku, external_id) rows"""
+        binding_model = self.binding_model
+        binding_model.flush_model()
+        self.env.cr.execute("""
+            INSERT INTO marketplace_product_binding AS b
+                (product_id, product_template_id, shop_id, account_id, external_sku,
+                 external_product_id, active, exclude_push,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT v.product_id, pp.product_tmpl_id, %(shop_id)s, %(account_id)s, v.external_sku,
+                   v.external_product_id, TRUE, FALSE,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(product_ids)s::int[], %(skus)s::varchar[], %(external_ids)s::varchar[])
+                   AS v(product_id, external_sku, external_product_id)
+              JOIN product_product pp ON pp.id = v.product_id
+            ON CONFLICT (shop_id, external_sku) DO UPDATE
+               SET product_id = EXCLUDED.product_id,
+                   product_template_id = EXCLUDED.product_template_id,
+                   external_product_id = EXCLUDED.external_product_id,
+                   active = TRUE,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+             WHERE (b.product_id, b.external_product_id, b.active)
+                   IS DISTINCT FROM (EXCLUDED.product_id, EXCLUDED.external_product_id, TRUE)
+            RETURNING b.id, b.external_product_id, (b.xmax = 0) AS inserted
+        """, {
+            'shop_id': self.shop.id,
+            'account_id': self.shop.account_id.id,
+            'uid': self.env.uid,
+            'product_ids': [row[0] for row in matched],
+            'skus': [row[1] for row in matched],
+            'external_ids': [row[2] for row in matched],
+        })
+        changed = self.env.cr.fetchall()
+        binding_model.invalidate_model()
+
+        for _binding_id, external_product_id, inserted in changed:
+            is_variation = ':' in (external_product_id or '')
+            if inserted:
+                self.stats['variations_created' if is_variation else 'created'] += 1
+            else:
+                self.stats['variations_updated' if is_variation else 'updated'] += 1
+        variations = sum(1 for row in matched if ':' in row[2])
+        changed_variations = sum(1 for row in changed if ':' in (row[1] or ''))
+        self.stats['variations_unchanged'] += variations - changed_variations
+        self.stats['unchanged'] += (len(matched) - variations) - (len(changed) - changed_variations)
+
+        if changed:
+            # Stored display_name is computed from product/shop/SKU: recompute it for touched rows only
+            bindings = binding_model.browse([row[0] for row in changed])
+            self.env.add_to_compute(binding_model._fields['display_name'], bindings)
+            bindings.flush_recordset(['display_name'])
+        job_log(_logger, logging.INFO, 'Upserted %s bindings (%s changed)', len(matched), len(changed))
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from .adapters import MarketplaceAdapter
+from .job_logging import job_log
 from odoo import fields
 from datetime import datetime, timedelta
 import logging
@@ -33,87 +34,90 @@ class ZortoutAdapter(MarketplaceAdapter):
         """Make API request to Zortout"""
         url = f"{self.base_url}{endpoint}"
         
-        _logger.warning(f'🌐 Zortout API Request: {method.upper()} {url}')
-        _logger.warning(f'   Params: {params}')
-        _logger.warning(f'   Data: {data}')
+        job_log(_logger, logging.DEBUG, '🌐 Zortout API Request: %s %s', method.upper(), url)
+        job_log(_logger, logging.DEBUG, '   Params: %s', params)
+        job_log(_logger, logging.DEBUG, '   Data: %s', data)
         
         if headers is None:
             headers = {}
         
         # Add Zortout authentication headers
         zortout_headers = self._get_headers()
-        _logger.warning(f'   Headers (storename): {zortout_headers.get("storename", "NOT SET")}')
-        _logger.warning(f'   Headers (apikey): {"SET" if zortout_headers.get("apikey") else "NOT SET"}')
-        _logger.warning(f'   Headers (apisecret): {"SET" if zortout_headers.get("apisecret") else "NOT SET"}')
+        job_log(_logger, logging.DEBUG, '   Headers (storename): %s', zortout_headers.get("storename", "NOT SET"))
+        job_log(_logger, logging.DEBUG, '   Headers (apikey): %s', "SET" if zortout_headers.get("apikey") else "NOT SET")
+        job_log(_logger, logging.DEBUG, '   Headers (apisecret): %s', "SET" if zortout_headers.get("apisecret") else "NOT SET")
         headers.update(zortout_headers)
         headers.setdefault('Content-Type', 'application/json')
         
-        for attempt in range(self.max_retries):
-            try:
-                _logger.warning(f'   Attempt {attempt + 1}/{self.max_retries}')
-                if method.upper() == 'GET':
-                    response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
-                else:
-                    response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
+        with self._trace(method, endpoint) as span:
+            for attempt in range(self.max_retries):
+                span.retries = attempt
+                try:
+                    job_log(_logger, logging.DEBUG, '   Attempt %s/%s', attempt + 1, self.max_retries)
+                    if method.upper() == 'GET':
+                        response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
+                    else:
+                        response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
+                    span.record_response(response)
                 
-                _logger.warning(f'   Response Status: {response.status_code}')
-                _logger.warning(f'   Response Headers: {dict(response.headers)}')
+                    job_log(_logger, logging.DEBUG, '   Response Status: %s', response.status_code)
+                    job_log(_logger, logging.DEBUG, '   Response Headers: %s', dict(response.headers))
                 
-                # Handle rate limiting
-                if response.status_code == 429:
-                    retry_after = int(response.headers.get('Retry-After', 60))
-                    _logger.warning(f'⚠️ Zortout rate limited, waiting {retry_after} seconds')
-                    time.sleep(retry_after)
-                    continue
+                    # Handle rate limiting
+                    if response.status_code == 429:
+                        retry_after = int(response.headers.get('Retry-After', 60))
+                        _logger.warning(f'⚠️ Zortout rate limited, waiting {retry_after} seconds')
+                        time.sleep(retry_after)
+                        continue
                 
-                response.raise_for_status()
+                    response.raise_for_status()
                 
-                # Try to parse JSON
-                try:
-                    result = response.json()
-                    _logger.warning(f'   Response JSON keys: {list(result.keys()) if isinstance(result, dict) else "Not a dict"}')
-                    _logger.warning(f'   Response JSON (first 500 chars): {str(result)[:500]}')
-                except Exception as json_error:
-                    _logger.error(f'   ❌ Failed to parse JSON: {json_error}')
-                    _logger.error(f'   Response text (first 1000 chars): {response.text[:1000]}')
-                    raise
+                    # Try to parse JSON
+                    try:
+                        result = response.json()
+                        job_log(_logger, logging.DEBUG, '   Response JSON keys: %s', list(result.keys()) if isinstance(result, dict) else "Not a dict")
+                        job_log(_logger, logging.DEBUG, '   Response JSON (first 500 chars): %s', str(result)[:500])
+                    except Exception as json_error:
+                        _logger.error(f'   ❌ Failed to parse JSON: {json_error}')
+                        _logger.error(f'   Response text (first 1000 chars): {response.text[:1000]}')
+                        raise
                 
-                # Zortout response format: { "resCode": "200", "resDesc": "...", "list": [...], "count": ... }
-                # Check both 'res' (old format) and 'resCode' (new format)
-                res_code = result.get('resCode') or result.get('res')
+                    # Zortout response format: { "resCode": "200", "resDesc": "...", "list": [...], "count": ... }
+                    # Check both 'res' (old format) and 'resCode' (new format)
+                    res_code = result.get('resCode') or result.get('res')
                 
-                # Ensure res_code is a string
-                if isinstance(res_code, dict):
-                    res_code = res_code.get('resCode') or res_code.get('res') or 'N/A'
-                elif res_code is None:
-                    res_code = 'N/A'
-                else:
-                    res_code = str(res_code)
+                    # Ensure res_code is a string
+                    if isinstance(res_code, dict):
+                        res_code = res_code.get('resCode') or res_code.get('res') or 'N/A'
+                    elif res_code is None:
+                        res_code = 'N/A'
+                    else:
+                        res_code = str(res_code)
                 
-                if res_code == '200' or (response.status_code == 200 and res_code == 'N/A'):
-                    _logger.warning(f'   ✅ API call successful (resCode: {res_code})')
-                    return result
-                else:
-                    error_msg = result.get('resDesc', 'Unknown error') or 'Unknown error'
-                    _logger.error(f'   ❌ Zortout API error: resCode={res_code}, resDesc={error_msg}')
-                    _logger.error(f'   Full response: {result}')
-                    raise Exception(f'Zortout API error (resCode: {res_code}): {error_msg}')
+                    if res_code == '200' or (response.status_code == 200 and res_code == 'N/A'):
+                        job_log(_logger, logging.DEBUG, '   ✅ API call successful (resCode: %s)', res_code)
+                        return result
+                    else:
+                        error_msg = result.get('resDesc', 'Unknown error') or 'Unknown error'
+                        _logger.error(f'   ❌ Zortout API error: resCode={res_code}, resDesc={error_msg}')
+                        _logger.error(f'   Full response: {result}')
+                        raise Exception(f'Zortout API error (resCode: {res_code}): {error_msg}')
                 
-            except requests.exceptions.RequestException as e:
-                if attempt == self.max_retries - 1:
-                    _logger.error(f'   ❌ Zortout API request failed: {e}', exc_info=True)
-                    if hasattr(e, 'response') and e.response is not None:
-                        try:
-                            error_detail = e.response.json()
-                            _logger.error(f'   Error response JSON: {error_detail}')
-                        except:
-                            _logger.error(f'   Error response text: {e.response.text[:1000]}')
-                    raise
-                wait_time = 2 ** attempt
-                _logger.warning(f'   ⚠️ Request failed, retrying in {wait_time}s: {e}')
-                time.sleep(wait_time)
-        
-        raise Exception('Zortout request failed after retries')
+                except requests.exceptions.RequestException as e:
+                    if attempt == self.max_retries - 1:
+                        _logger.error(f'   ❌ Zortout API request failed: {e}', exc_info=True)
+                        if hasattr(e, 'response') and e.response is not None:
+                            try:
+                                error_detail = e.response.json()
+                                _logger.error(f'   Error response JSON: {error_detail}')
+                            except:
+                                _logger.error(f'   Error response text: {e.response.text[:1000]}')
+                        raise
+                    wait_time = 2 ** attempt
+                    _logger.warning(f'   ⚠️ Request failed, retrying in {wait_time}s: {e}')
+                    time.sleep(wait_time)
+        
+            raise Exception('Zortout request failed after retries')
     
     # OAuth methods (not required for Zortout - API key based)
     def get_authorize_url(self):
@@ -169,7 +173,7 @@ class ZortoutAdapter(MarketplaceAdapter):
         if filters.get('activestatus'):
             params['activestatus'] = filters['activestatus']
         
-        _logger.warning(f'🔍 Zortout Fetch Products - Page: {page}, Limit: {limit}, Warehouse: {warehouse_code}, Params: {params}')
+        job_log(_logger, logging.DEBUG, '🔍 Zortout Fetch Products - Page: %s, Limit: %s, Warehouse: %s, Params: %s', page, limit, warehouse_code, params)
         
         try:
             response = self._make_request(
@@ -178,12 +182,12 @@ class ZortoutAdapter(MarketplaceAdapter):
                 params=params
             )
             
-            _logger.warning(f'📥 Zortout API Response keys: {list(response.keys()) if isinstance(response, dict) else "Not a dict"}')
+            job_log(_logger, logging.DEBUG, '📥 Zortout API Response keys: %s', list(response.keys()) if isinstance(response, dict) else "Not a dict")
             
             products = response.get('list', [])
             total_count = response.get('count', 0)
             
-            _logger.warning(f'✅ Zortout Fetch Products - Found {len(products)} products (Total: {total_count})')
+            job_log(_logger, logging.DEBUG, '✅ Zortout Fetch Products - Found %s products (Total: %s)', len(products), total_count)
             
             if len(products) == 0:
                 _logger.warning(f'⚠️ No products returned from API. Response: {response}')
@@ -200,24 +204,24 @@ class ZortoutAdapter(MarketplaceAdapter):
     
     def fetch_all_products(self, warehouse_code=None, **filters):
         """Fetch all products from Zortout with pagination"""
-        _logger.warning(f'🔍 Zortout Fetch All Products - Starting (Warehouse: {warehouse_code}, Filters: {filters})')
+        job_log(_logger, logging.INFO, '🔍 Zortout Fetch All Products - Starting (Warehouse: %s, Filters: %s)', warehouse_code, filters)
         all_products = []
         page = 1
         limit = 500
         
         while True:
-            _logger.warning(f'📄 Fetching page {page} (current total: {len(all_products)} products)')
+            job_log(_logger, logging.DEBUG, '📄 Fetching page %s (current total: %s products)', page, len(all_products))
             try:
                 result = self.fetch_products(page=page, limit=limit, warehouse_code=warehouse_code, **filters)
                 products = result.get('products', [])
                 total_count = result.get('count', 0)
-                _logger.warning(f'📦 Page {page}: Got {len(products)} products (Total count from API: {total_count})')
+                job_log(_logger, logging.DEBUG, '📦 Page %s: Got %s products (Total count from API: %s)', page, len(products), total_count)
                 
                 all_products.extend(products)
                 
                 # Check if there are more pages
                 if len(products) < limit:
-                    _logger.warning(f'✅ Reached last page (got {len(products)} products, limit is {limit})')
+                    job_log(_logger, logging.DEBUG, '✅ Reached last page (got %s products, limit is %s)', len(products), limit)
                     break
                 
                 page += 1
@@ -231,7 +235,7 @@ class ZortoutAdapter(MarketplaceAdapter):
                 # Don't silently return empty list on authentication errors
                 raise
         
-        _logger.warning(f'✅ Zortout Fetch All Products - Total: {len(all_products)} products')
+        job_log(_logger, logging.INFO, '✅ Zortout Fetch All Products - Total: %s products', len(all_products))
         return all_products
     
     def fetch_products_by_skus(self, sku_list, warehouse_code=None):
@@ -252,7 +256,7 @@ class ZortoutAdapter(MarketplaceAdapter):
                 if products:
                     collected_products.extend(products)
                 else:
-                    _logger.warning(f'⚠️ Zortout: SKU {sku} not found during targeted fetch')
+                    job_log(_logger, logging.WARNING, '⚠️ Zortout: SKU %s not found during targeted fetch', sku)
             except Exception as e:
                 _logger.error(f'❌ Zortout: Failed to fetch SKU {sku}: {e}', exc_info=True)
                 continue
@@ -0,0 +1,476 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from .job_logging import job_log, job_count
+
+_logger = logging.getLogger(__name__)
+
+# Zortout producttype -> (Odoo type, sale_ok, purchase_ok)
+ZORTOUT_PRODUCT_TYPES = {
+    0: ('consu', True, True),     # Goods / stockable (treated as consumable in Odoo 19)
+    1: ('service', True, False),  # Service
+    2: ('consu', True, True),     # Consumable
+}
+
+# Template fields compared before writing so unchanged products cost no UPDATE
+_TEMPLATE_COMPARE_FIELDS = [
+    'name', 'list_price', 'standard_price', 'sale_ok', 'purchase_ok', 'type',
+    'active', 'categ_id', 'description_sale',
+]
+
+
+def _to_float(value):
+    try:
+        if value in (None, '', False):
+            return 0.0
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _differs(old, new):
+    if isinstance(old, float) or isinstance(new, float):
+        return abs((old or 0.0) - (new or 0.0)) > 1e-6
+    return (old or False) != (new or False)
+
+
+class ZortoutCatalogImport:
+    """Set-based import of a Zortout product catalog
+
+    Instead of searching products, barcodes, UoMs, categories and bindings row
+    by row, the whole catalog is resolved against maps preloaded in a handful of
+    queries, every row is classified as create / update / skip in memory and
+    the ORM is called with grouped create()/write() per batch. Each batch runs
+    in a savepoint; when it fails the batch is replayed row by row so a single
+    bad product only costs its own row.
+
+    Usage::
+
+        importer = ZortoutCatalogImport(account, shop, stats, skipped, errors)
+        importer.run(products, checkpoint=lambda done: ...)
+        importer.product_ids  # {sku: product.product id}
+    """
+
+    def __init__(self, account, shop, stats, skipped_details, error_details,
+                 update_images_only=False, batch_size=200):
+        self.env = account.env
+        self.account = account
+        self.company = account.company_id
+        self.shop = shop
+        self.stats = stats
+        self.skipped_details = skipped_details
+        self.error_details = error_details
+        self.update_images_only = update_images_only
+        self.batch_size = max(1, batch_size)
+
+        self.product_model = self.env['product.product'].sudo().with_context(active_test=False)
+        self.template_model = self.env['product.template'].sudo().with_context(active_test=False)
+        self.binding_model = self.env['marketplace.product.binding'].sudo().with_context(active_test=False)
+
+        # Determine purchase UoM field name (Odoo 19 uses purchase_uom_id)
+        template_fields = self.template_model._fields
+        if 'purchase_uom_id' in template_fields:
+            self.purchase_uom_field = 'purchase_uom_id'
+        elif 'uom_po_id' in template_fields:
+            self.purchase_uom_field = 'uom_po_id'
+        else:
+            self.purchase_uom_field = None
+
+        default_uom = self.env.ref('uom.product_uom_unit', raise_if_not_found=False)
+        if not default_uom:
+            default_uom = self.env['uom.uom'].search([], limit=1)
+        self.default_uom_id = default_uom.id if default_uom else False
+        default_categ = self.env.ref('product.product_category_all', raise_if_not_found=False)
+        self.default_categ_id = default_categ.id if default_categ else False
+
+        # Filled by _preload()
+        self.products_by_sku = {}
+        self.product_by_barcode = {}
+        self.templates = {}
+        self.uom_rows = []
+        self.category_ids = {}
+        self.bindings_by_sku = {}
+        # {sku: product.product id} for every row resolved to an Odoo product
+        self.product_ids = {}
+
+    # ------------------------------------------------------------------
+    # Preloading
+    # ------------------------------------------------------------------
+
+    def _preload(self, rows):
+        skus = [row['sku'] for row in rows]
+        barcodes = list({row['barcode'] for row in rows if row['barcode']})
+
+        # SKU -> product, company-specific products win over shared ones
+        for product in self.product_model.search_read([
+            ('default_code', 'in', skus),
+            ('company_id', 'in', [self.company.id, False]),
+        ], ['default_code', 'company_id', 'barcode', 'product_tmpl_id']):
+            current = self.products_by_sku.get(product['default_code'])
+            if current and current['company_id'] and not product['company_id']:
+                continue
+            if current and bool(current['company_id']) == bool(product['company_id']):
+                continue
+            self.products_by_sku[product['default_code']] = product
+
+        if barcodes:
+            for product in self.product_model.search_read([('barcode', 'in', barcodes)], ['barcode', 'display_name']):
+                self.product_by_barcode.setdefault(product['barcode'], product)
+
+        if self.update_images_only:
+            return
+
+        template_ids = [product['product_tmpl_id'][0] for product in self.products_by_sku.values()]
+        compare_fields = list(_TEMPLATE_COMPARE_FIELDS)
+        if self.purchase_uom_field:
+            compare_fields.append(self.purchase_uom_field)
+        for template in self.template_model.search_read([('id', 'in', template_ids)], compare_fields):
+            self.templates[template['id']] = {
+                key: value[0] if isinstance(value, (list, tuple)) and value else value
+                for key, value in template.items()
+            }
+
+        # UoMs: small table, resolved in memory (exact name first, then contains)
+        self.uom_rows = [(uom['id'], uom['name'] or '') for uom in self.env['uom.uom'].search_read([], ['name'])]
+
+        # Categories: load existing by name, create the missing ones in one call
+        category_names = list({row['data'].get('category') for row in rows if row['data'].get('category')})
+        if category_names:
+            category_model = self.env['product.category']
+            for category in category_model.search_read([('name', 'in', category_names)], ['name']):
+                self.category_ids.setdefault(category['name'], category['id'])
+            missing = [name for name in category_names if name not in self.category_ids]
+            if missing:
+                for category in category_model.create([{'name': name} for name in missing]):
+                    self.category_ids[category.name] = category.id
+
+        for binding in self.binding_model.search_read([
+            ('shop_id', '=', self.shop.id),
+            ('external_sku', 'in', skus),
+        ], ['external_sku', 'external_product_id', 'active']):
+            self.bindings_by_sku.setdefault(binding['external_sku'], binding)
+
+    def _uom_id(self, unit_name):
+        if not unit_name:
+            return self.default_uom_id
+        for uom_id, name in self.uom_rows:
+            if name == unit_name:
+                return uom_id
+        needle = unit_name.lower()
+        for uom_id, name in self.uom_rows:
+            if needle in name.lower():
+                return uom_id
+        return self.default_uom_id
+
+    def _category_id(self, category_name):
+        if not category_name:
+            return self.default_categ_id
+        return self.category_ids.get(category_name, self.default_categ_id)
+
+    # ------------------------------------------------------------------
+    # Classification
+    # ------------------------------------------------------------------
+
+    def _skip(self, product_data, reason, sku=None):
+        self.stats['skipped_products'] += 1
+        detail = {
+            'product_id': product_data.get('id'),
+            'name': product_data.get('name'),
+            'reason': reason,
+        }
+        if sku:
+            detail['sku'] = sku
+        self.skipped_details.append(detail)
+
+    def _error(self, row, error):
+        self.stats['errors'] += 1
+        self.error_details.append({
+            'product_id': row['data'].get('id'),
+            'name': row['data'].get('name'),
+            'sku': row['sku'],
+            'error': str(error),
+        })
+        job_log(_logger, logging.ERROR, '❌ Failed to process Zortout product %s: %s', row['sku'], error)
+
+    def _collect_rows(self, products):
+        """Drop rows without SKU; the last row wins for SKUs repeated in the feed"""
+        rows_by_sku = {}
+        for product_data in products:
+            self.stats['processed_products'] += 1
+            sku = (product_data.get('sku') or '').strip()
+            if not sku:
+                self._skip(product_data, 'Missing SKU')
+                continue
+            previous = rows_by_sku.pop(sku, None)
+            if previous:
+                self._skip(previous['data'], 'Duplicate SKU in Zortout feed (later row used)', sku)
+            rows_by_sku[sku] = {
+                'sku': sku,
+                'data': product_data,
+                'barcode': (product_data.get('barcode') or '').strip(),
+            }
+        return list(rows_by_sku.values())
+
+    def _claim_barcode(self, row, product_id=None):
+        """Return the barcode to set, or False when another product already uses it"""
+        barcode = row['barcode']
+        if not barcode:
+            return False
+        owner = self.product_by_barcode.get(barcode)
+        if owner and (product_id is None or owner['id'] != product_id):
+            _logger.info(
+                'Skipping barcode %s for SKU %s because it is already used by %s',
+                barcode, row['sku'], owner['display_name'],
+            )
+            return False
+        self.product_by_barcode[barcode] = {'id': product_id, 'display_name': row['sku']}
+        return barcode
+
+    def _classify(self, row):
+        """Attach the create/update plan for one row"""
+        product_data = row['data']
+        sku = row['sku']
+        product = self.products_by_sku.get(sku)
+
+        if self.update_images_only:
+            if not product:
+                self._skip(product_data, 'Product not found in Odoo (images-only mode)', sku)
+                return None
+            self.product_ids[sku] = product['id']
+            return None
+
+        product_type_value, sale_ok, purchase_ok = ZORTOUT_PRODUCT_TYPES.get(
+            product_data.get('producttype'), ZORTOUT_PRODUCT_TYPES[0],
+        )
+        price = _to_float(product_data.get('sellprice'))
+        cost = _to_float(product_data.get('purchaseprice'))
+        category_id = self._category_id(product_data.get('category'))
+        uom_id = self._uom_id(product_data.get('unittext'))
+        product_active = bool(product_data.get('active', True))
+        name = product_data.get('name') or sku
+
+        if not product:
+            template_vals = {
+                'name': name,
+                'type': product_type_value,
+                'sale_ok': sale_ok,
+                'purchase_ok': purchase_ok,
+                'list_price': price,
+                'standard_price': cost,
+                'company_id': self.company.id,
+                'uom_id': uom_id,
+                'categ_id': category_id,
+                'description_sale': product_data.get('description') or False,
+                'active': product_active,
+                'default_code': sku,
+            }
+            if self.purchase_uom_field:
+                template_vals[self.purchase_uom_field] = uom_id
+            barcode = self._claim_barcode(row)
+            if barcode:
+                template_vals['barcode'] = barcode
+            row['template_vals'] = template_vals
+            return 'create'
+
+        self.product_ids[sku] = product['id']
+        row['product_id'] = product['id']
+        template_updates = {
+            'name': name,
+            'list_price': price,
+            'sale_ok': sale_ok,
+            'purchase_ok': purchase_ok,
+            'type': product_type_value,
+            'active': product_active,
+        }
+        if cost:
+            template_updates['standard_price'] = cost
+        if category_id:
+            template_updates['categ_id'] = category_id
+        if product_data.get('description'):
+            template_updates['description_sale'] = product_data.get('description')
+        if self.purchase_uom_field:
+            template_updates[self.purchase_uom_field] = uom_id
+
+        current = self.templates.get(product['product_tmpl_id'][0], {})
+        row['template_id'] = product['product_tmpl_id'][0]
+        row['template_vals'] = {
+            key: value for key, value in template_updates.items()
+            if key not in current or _differs(current[key], value)
+        }
+        barcode = False
+        if row['barcode'] and product['barcode'] != row['barcode']:
+            barcode = self._claim_barcode(row, product['id'])
+        row['product_vals'] = {'barcode': barcode} if barcode else {}
+        return 'update'
+
+    def _binding_plan(self, row, product_id):
+        external_product_id = row['data'].get('variationid') or row['data'].get('id')
+        binding_vals = {
+            'external_sku': row['sku'],
+            'external_product_id': str(external_product_id) if external_product_id else False,
+            'active': bool(row['data'].get('active', True)),
+        }
+        binding = self.bindings_by_sku.get(row['sku'])
+        if not binding:
+            binding_vals.update({
+                'product_id': product_id,
+                'shop_id': self.shop.id,
+            })
+            return 'create', binding_vals
+        changes = {
+            key: value for key, value in binding_vals.items()
+            if _differs(binding.get(key), value)
+        }
+        return ('update', changes) if changes else (None, None)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _isolated(self, rows, operation):
+        """Run operation(rows) in one savepoint; on failure replay row by row
+
+        Returns the rows that were applied.
+        """
+        try:
+            with self.env.cr.savepoint():
+                operation(rows)
+            return rows
+        except Exception as error:
+            if len(rows) == 1:
+                self._error(rows[0], error)
+                return []
+            job_log(
+                _logger, logging.WARNING,
+                '⚠️ Zortout import batch of %s rows failed (%s), retrying row by row', len(rows), error,
+            )
+        applied = []
+        for row in rows:
+            try:
+                with self.env.cr.savepoint():
+                    operation([row])
+                applied.append(row)
+            except Exception as error:
+                self._error(row, error)
+        return applied
+
+    def _grouped_write(self, rows, model, id_key, vals_key):
+        """Write identical vals with one write() per group"""
+        groups = {}
+        for row in rows:
+            vals = row[vals_key]
+            if vals:
+                groups.setdefault(tuple(sorted(vals.items())), []).append(row)
+        applied = []
+        for group_rows in groups.values():
+            def write_group(batch):
+                model.browse([row[id_key] for row in batch]).write(batch[0][vals_key])
+            applied.extend(self._isolated(group_rows, write_group))
+        return applied
+
+    def _create_products(self, rows):
+        def create_batch(batch):
+            templates = self.template_model.create([row['template_vals'] for row in batch])
+            variants = {}
+            for variant in self.product_model.search_read(
+                [('product_tmpl_id', 'in', templates.ids)], ['product_tmpl_id', 'default_code', 'barcode'],
+            ):
+                variants.setdefault(variant['product_tmpl_id'][0], variant)
+            for row, template in zip(batch, templates):
+                variant = variants[template.id]
+                # Related default_code/barcode only reach active single variants on create
+                fix_vals = {}
+                if variant['default_code'] != row['sku']:
+                    fix_vals['default_code'] = row['sku']
+                barcode = row['template_vals'].get('barcode')
+                if barcode and variant['barcode'] != barcode:
+                    fix_vals['barcode'] = barcode
+                if fix_vals:
+                    self.product_model.browse(variant['id']).write(fix_vals)
+                row['product_id'] = variant['id']
+
+        created = self._isolated(rows, create_batch)
+        for row in created:
+            self.product_ids[row['sku']] = row['product_id']
+            job_log(_logger, logging.DEBUG, '✅ Created product %s (SKU: %s) from Zortout', row['template_vals']['name'], row['sku'])
+        self.stats['created_products'] += len(created)
+        return created
+
+    def _update_products(self, rows):
+        failed = set()
+        for vals_key, model, id_key in (
+            ('template_vals', self.template_model, 'template_id'),
+            ('product_vals', self.product_model, 'product_id'),
+        ):
+            changed = [row for row in rows if row[vals_key] and row['sku'] not in failed]
+            applied = {row['sku'] for row in self._grouped_write(changed, model, id_key, vals_key)}
+            failed.update(row['sku'] for row in changed if row['sku'] not in applied)
+        updated = [row for row in rows if row['sku'] not in failed and (row['template_vals'] or row['product_vals'])]
+        self.stats['updated_products'] += len(updated)
+        self.stats['unchanged_products'] += sum(
+            1 for row in rows if not row['template_vals'] and not row['product_vals']
+        )
+        return [row for row in rows if row['sku'] not in failed]
+
+    def _sync_bindings(self, rows):
+        to_create = []
+        to_update = []
+        for row in rows:
+            action, vals = self._binding_plan(row, self.product_ids[row['sku']])
+            if action == 'create':
+                row['binding_vals'] = vals
+                to_create.append(row)
+            elif action == 'update':
+                row['binding_vals'] = vals
+                row['binding_id'] = self.bindings_by_sku[row['sku']]['id']
+                to_update.append(row)
+
+        def create_bindings(batch):
+            self.binding_model.create([row['binding_vals'] for row in batch])
+
+        if to_create:
+            self.stats['bindings_created'] += len(self._isolated(to_create, create_bindings))
+        self.stats['bindings_updated'] += len(
+            self._grouped_write(to_update, self.binding_model, 'binding_id', 'binding_vals')
+        )
+
+    def run(self, products, checkpoint=None):
+        """Import products (list of Zortout product dicts)
+
+        checkpoint(processed_rows) is called after every batch, e.g. to
+        update job progress and commit.
+        """
+        self.stats.setdefault('unchanged_products', 0)
+        rows = self._collect_rows(products)
+        self._preload(rows)
+
+        processed = len(products) - len(rows)
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            to_create = []
+            to_update = []
+            for row in batch:
+                try:
+                    action = self._classify(row)
+                except Exception as error:
+                    self._error(row, error)
+                    continue
+                if action == 'create':
+                    to_create.append(row)
+                elif action == 'update':
+                    to_update.append(row)
+
+            ready = []
+            if to_create:
+                ready.extend(self._create_products(to_create))
+            if to_update:
+                ready.extend(self._update_products(to_update))
+            if ready:
+                self._sync_bindings(ready)
+
+            processed += len(batch)
+            job_count('zortout_products_imported', len(ready))
+            if checkpoint:
+                checkpoint(processed)
+        return self.product_ids
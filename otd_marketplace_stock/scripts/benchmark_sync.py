@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark the marketplace sync stack against local stub marketplaces
+
+Drives the real adapters and job executors (_execute_pull_order,
+_execute_push_stock, _execute_sync_stock_from_zortout) against the HTTP
+stand-ins in marketplace_stub_server.py and reports throughput, SQL queries
+per item and HTTP requests per item.
+
+⚠️ Jobs commit their progress, so run this on a scratch copy of the database.
+All benchmark records are prefixed with "[BENCH]" and removed afterwards.
+
+Run in Odoo shell:
+
+    import sys; sys.path.insert(0, '/mnt/extra-addons/otd_marketplace_stock/scripts')
+    from benchmark_sync import run_benchmarks
+    run_benchmarks(env, orders=500, skus=500, latency_ms=20, rate_429=0.02)
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from odoo import fields
+
+from marketplace_stub_server import start_stub_server
+
+BENCH_PREFIX = '[BENCH]'
+ORDER_CHANNELS = ('shopee', 'lazada', 'woocommerce', 'tiktok')
+
+
+def _query_count(env):
+    """Number of SQL statements executed so far on this cursor"""
+    return getattr(env.cr, 'sql_log_count', 0)
+
+
+@contextmanager
+def _stub_base_url(env, channel, server):
+    """Point the channel's base URL config parameter at the stub server"""
+    params = env['ir.config_parameter'].sudo()
+    key = f'marketplace.{channel}.base_url'
+    previous = params.get_param(key)
+    if channel != 'woocommerce':
+        params.set_param(key, server.base_url)
+    try:
+        yield
+    finally:
+        if channel != 'woocommerce':
+            params.set_param(key, previous or False)
+
+
+def _create_bench_account(env, channel, server):
+    """Create a throwaway account + shop wired to the stub server"""
+    company = env.company
+    warehouse = env['stock.warehouse'].sudo().search([('company_id', '=', company.id)], limit=1)
+    account = env['marketplace.account'].sudo().create({
+        'name': f'{BENCH_PREFIX} {channel}',
+        'channel': channel,
+        'company_id': company.id,
+        'client_id': server.root_url if channel == 'woocommerce' else '100000',
+        'client_secret': 'bench-secret',
+        'woocommerce_consumer_key': 'ck_bench' if channel == 'woocommerce' else False,
+        'access_token': 'bench-access-token',
+        'refresh_token': 'bench-refresh-token',
+        'access_token_expire_at': fields.Datetime.now() + timedelta(days=1),
+        'stock_location_id': warehouse.lot_stock_id.id if warehouse else False,
+        'sync_enabled': False,
+    })
+    shop = env['marketplace.shop'].sudo().create({
+        'name': f'{BENCH_PREFIX} {channel} shop',
+        'external_shop_id': '200000',
+        'account_id': account.id,
+        'warehouse_id': warehouse.id if warehouse else False,
+    })
+    return account, shop
+
+
+def _create_bench_bindings(env, shop, config, count):
+    """Create products + bindings for the first `count` stub SKUs"""
+    product_model = env['product.product'].sudo()
+    skus = [config.sku(i) for i in range(count)]
+    existing = {p.default_code: p for p in product_model.search([('default_code', 'in', skus)])}
+    missing = [sku for sku in skus if sku not in existing]
+    if missing:
+        created = product_model.create([{
+            'name': f'{BENCH_PREFIX} {sku}',
+            'default_code': sku,
+            'type': 'consu',
+            'is_storable': True,
+        } for sku in missing])
+        existing.update({p.default_code: p for p in created})
+    return env['marketplace.product.binding'].sudo().create([{
+        'product_id': existing[sku].id,
+        'shop_id': shop.id,
+        'external_sku': sku,
+        'external_product_id': str(index + 1),
+    } for index, sku in enumerate(skus)])
+
+
+def _run_job(env, account, shop, job_type, payload, items, unit, server):
+    """Execute one job synchronously and measure it"""
+    job = env['marketplace.job'].sudo().create({
+        'name': f'{BENCH_PREFIX} {account.channel} {job_type}',
+        'job_type': job_type,
+        'account_id': account.id,
+        'shop_id': shop.id,
+        'payload': json.dumps(payload),
+        'max_retries': 0,
+    })
+    requests_before = server.stats.as_dict()
+    queries_before = _query_count(env)
+    started = time.perf_counter()
+    error = ''
+    try:
+        job._execute_with_retry()
+    except Exception as e:
+        error = str(e)[:200]
+    duration = time.perf_counter() - started
+    queries = _query_count(env) - queries_before
+    stats = server.stats.as_dict()
+    http_requests = stats['requests'] - requests_before['requests']
+    throttled = stats['throttled'] - requests_before['throttled']
+    job.invalidate_recordset()
+    return {
+        'channel': account.channel,
+        'job_type': job_type,
+        'state': job.state,
+        'items': items,
+        'unit': unit,
+        'seconds': duration,
+        'items_per_second': items / duration if duration > 0 else 0.0,
+        'queries': queries,
+        'queries_per_item': queries / items if items else 0.0,
+        'http_requests': http_requests,
+        'http_per_item': http_requests / items if items else 0.0,
+        'throttled': throttled,
+        'error': error or (job.last_error or '')[:200],
+    }
+
+
+def _cleanup(env):
+    """Remove everything the benchmark created"""
+    bench_orders = env['marketplace.order'].sudo().search([('shop_id.name', '=like', f'{BENCH_PREFIX}%')])
+    sale_orders = bench_orders.mapped('sale_order_id')
+    if sale_orders:
+        sale_orders._action_cancel()
+        sale_orders.unlink()
+    for model, field in (
+        ('marketplace.job', 'name'),
+        ('marketplace.product.binding', 'shop_id.name'),
+        ('marketplace.order', 'shop_id.name'),
+        ('marketplace.shop', 'name'),
+        ('marketplace.account', 'name'),
+    ):
+        env[model].sudo().with_context(active_test=False).search([(field, '=like', f'{BENCH_PREFIX}%')]).unlink()
+    # Products may have stock moves by now: archive instead of deleting
+    env['product.product'].sudo().search([('default_code', '=like', 'BENCH-%')]).write({'active': False})
+    env.cr.commit()
+
+
+def _print_report(results):
+    header = f"{'channel':<12} {'job':<26} {'state':<8} {'items':>7} {'sec':>8} {'items/s':>9} {'q/item':>8} {'http/item':>10} {'429s':>5}"
+    print('\n📊 Marketplace sync benchmark')
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        print(
+            f"{row['channel']:<12} {row['job_type']:<26} {row['state']:<8} {row['items']:>7} "
+            f"{row['seconds']:>8.2f} {row['items_per_second']:>9.1f} {row['queries_per_item']:>8.1f} "
+            f"{row['http_per_item']:>10.2f} {row['throttled']:>5}"
+        )
+        if row['error']:
+            print(f"   ❌ {row['error']}")
+
+
+def run_benchmarks(env, channels=None, orders=200, skus=200, latency_ms=0, rate_429=0.0, cleanup=True):
+    """Run pull/push/sync benchmarks for each channel and print a report
+
+    Args:
+        env: Odoo environment
+        channels: list of channels (default: all five)
+        orders: number of orders each stub serves for pull_order
+        skus: number of SKUs for push_stock / sync_stock_from_zortout
+        latency_ms: artificial latency added to every stub response
+        rate_429: probability (0-1) that a stub answers HTTP 429
+        cleanup: remove benchmark records afterwards
+
+    Returns:
+        list of result dicts (one per job run)
+    """
+    channels = channels or list(ORDER_CHANNELS) + ['zortout']
+    results = []
+    try:
+        for channel in channels:
+            server = start_stub_server(
+                channel, orders=orders, products=skus, latency_ms=latency_ms,
+                rate_429=rate_429, retry_after=0,
+            )
+            try:
+                with _stub_base_url(env, channel, server):
+                    account, shop = _create_bench_account(env, channel, server)
+                    env.cr.commit()
+                    if channel == 'zortout':
+                        results.append(_run_job(
+                            env, account, shop, 'sync_stock_from_zortout', {},
+                            skus, 'SKUs', server,
+                        ))
+                        continue
+                    results.append(_run_job(
+                        env, account, shop, 'pull_order',
+                        {'date_from': fields.Datetime.to_string(fields.Datetime.now() - timedelta(days=1))},
+                        orders, 'orders', server,
+                    ))
+                    bindings = _create_bench_bindings(env, shop, server.config, skus)
+                    env.cr.commit()
+                    results.append(_run_job(
+                        env, account, shop, 'push_stock', {'binding_ids': bindings.ids},
+                        skus, 'SKUs', server,
+                    ))
+            finally:
+                server.stop()
+    finally:
+        if cleanup:
+            _cleanup(env)
+    _print_report(results)
+    return results
+
+
+if __name__ == '__main__':
+    # Running under `odoo shell`, `env` is injected into globals
+    run_benchmarks(env)  # noqa: F821
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local HTTP stand-ins for the Shopee, Lazada, WooCommerce, Zortout and TikTok APIs
+
+Used by benchmark_sync.py to drive the real adapters without touching live
+marketplaces. Each stub generates N orders/products deterministically, can
+inject latency and HTTP 429 responses, and counts the requests it served.
+
+Standalone usage (e.g. to point a staging database at it):
+
+    python3 marketplace_stub_server.py --channel zortout --products 5000 --port 8765 --latency-ms 50
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+CHANNELS = ('shopee', 'lazada', 'woocommerce', 'zortout', 'tiktok')
+
+# Path prefix each adapter expects in its base URL
+BASE_PATHS = {
+    'shopee': '/api/v2',
+    'lazada': '/rest',
+    'woocommerce': '',  # adapter appends /wp-json/wc/v3/
+    'zortout': '/v4',
+    'tiktok': '',
+}
+
+
+class StubConfig:
+    """Data volume and fault injection settings for one stub server"""
+
+    def __init__(self, orders=100, products=100, lines_per_order=2, latency_ms=0,
+                 rate_429=0.0, retry_after=1, sku_prefix='BENCH-', seed=42):
+        self.orders = orders
+        self.products = products
+        self.lines_per_order = lines_per_order
+        self.latency_ms = latency_ms
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.sku_prefix = sku_prefix
+        self.seed = seed
+
+    def sku(self, index):
+        return f'{self.sku_prefix}{index:06d}'
+
+
+class StubStats:
+    """Thread-safe request counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.by_path = {}
+
+    def hit(self, path, throttled=False):
+        with self._lock:
+            self.requests += 1
+            self.by_path[path] = self.by_path.get(path, 0) + 1
+            if throttled:
+                self.throttled += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'by_path': dict(self.by_path),
+            }
+
+
+class StubMarketplaceHandler(BaseHTTPRequestHandler):
+    """Dispatch requests to the channel-specific response builders"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    # ------------------------------------------------------------------
+    # Plumbing
+    # ------------------------------------------------------------------
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        raw = self.rfile.read(length)
+        content_type = self.headers.get('Content-Type', '')
+        if 'application/x-www-form-urlencoded' in content_type:
+            return {k: v[0] for k, v in parse_qs(raw.decode('utf-8')).items()}
+        try:
+            return json.loads(raw.decode('utf-8') or '{}')
+        except ValueError:
+            return {}
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        server = self.server
+        config = server.config
+        parsed = urlparse(self.path)
+        path = parsed.path
+        base_path = BASE_PATHS[server.channel]
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        body = self._read_body() if method in ('POST', 'PUT') else {}
+
+        if config.latency_ms:
+            time.sleep(config.latency_ms / 1000.0)
+
+        if config.rate_429 and server.random.random() < config.rate_429:
+            server.stats.hit(path, throttled=True)
+            self._send_json(429, {'error': 'too_many_requests'}, {'Retry-After': str(config.retry_after)})
+            return
+
+        server.stats.hit(path)
+        builder = getattr(self, f'_{server.channel}_{method.lower()}', None)
+        status, payload = builder(path, params, body) if builder else (404, {'error': 'not_found'})
+        self._send_json(status, payload)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+    # ------------------------------------------------------------------
+    # Shared generators
+    # ------------------------------------------------------------------
+
+    def _order_lines(self, index):
+        config = self.server.config
+        return [
+            (config.sku((index * config.lines_per_order + n) % max(config.products, 1)), n + 1, 100.0 + n)
+            for n in range(config.lines_per_order)
+        ]
+
+    # ------------------------------------------------------------------
+    # Shopee
+    # ------------------------------------------------------------------
+
+    def _shopee_order(self, index):
+        return {
+            'order_sn': f'BENCHSP{index:08d}',
+            'order_status': 'READY_TO_SHIP',
+            'create_time': int(time.time()) - index,
+            'total_amount': 250.0,
+            'currency': 'THB',
+            'buyer_username': f'buyer{index}',
+            'recipient_address': {'name': f'Bench Buyer {index}', 'phone': '0800000000', 'full_address': 'Bangkok'},
+            'item_list': [{
+                'item_name': f'Bench product {sku}',
+                'model_sku': sku,
+                'model_quantity_purchased': qty,
+                'model_discounted_price': price,
+            } for sku, qty, price in self._order_lines(index)],
+        }
+
+    def _shopee_get(self, path, params, body):
+        config = self.server.config
+        if path == '/order/get_order_list':
+            page_size = int(params.get('page_size') or 100)
+            cursor = int(params.get('cursor') or 0)
+            end = min(cursor + page_size, config.orders)
+            return 200, {'response': {
+                'order_list': [{'order_sn': f'BENCHSP{i:08d}'} for i in range(cursor, end)],
+                'more': end < config.orders,
+                'next_cursor': str(end) if end < config.orders else '',
+            }}
+        if path == '/order/get_order_detail':
+            sns = [sn for sn in (params.get('order_sn_list') or '').split(',') if sn]
+            return 200, {'response': {'order_list': [self._shopee_order(int(sn[7:])) for sn in sns]}}
+        return 404, {'error': 'not_found'}
+
+    def _shopee_post(self, path, params, body):
+        if path == '/product/update_stock':
+            return 200, {'response': {'item_list': [
+                {'seller_sku': item.get('seller_sku'), 'success': True}
+                for item in body.get('item_list', [])
+            ]}}
+        return 404, {'error': 'not_found'}
+
+    # ------------------------------------------------------------------
+    # Lazada
+    # ------------------------------------------------------------------
+
+    def _lazada_get(self, path, params, body):
+        config = self.server.config
+        if path == '/orders/get':
+            offset = int(params.get('offset') or 0)
+            limit = int(params.get('limit') or 100)
+            end = min(offset + limit, config.orders)
+            return 200, {'code': '0', 'data': {'count': end - offset, 'orders': [{
+                'order_id': 700000000 + i,
+                'order_number': 700000000 + i,
+                'statuses': ['ready_to_ship'],
+                'price': '250.00',
+                'created_at': time.strftime('%Y-%m-%d %H:%M:%S +0700'),
+                'address_shipping': {'first_name': 'Bench', 'last_name': f'Buyer {i}', 'phone': '0800000000', 'city': 'Bangkok'},
+            } for i in range(offset, end)]}}
+        if path == '/order/items/get':
+            index = int(params.get('order_id') or 700000000) - 700000000
+            return 200, {'code': '0', 'data': [{
+                'sku': sku, 'name': f'Bench product {sku}', 'quantity': qty, 'item_price': price,
+            } for sku, qty, price in self._order_lines(index)]}
+        return 404, {'code': 'NotFound', 'message': path}
+
+    def _lazada_post(self, path, params, body):
+        if path in ('/product/stock/sellable/update', '/product/update_quantity'):
+            try:
+                items = json.loads(body.get('payload') or body.get('Skus') or '[]')
+            except ValueError:
+                items = []
+            return 200, {'code': '0', 'data': {'detail': [
+                {'seller_sku': item.get('seller_sku') or item.get('SellerSku'), 'success': True}
+                for item in items
+            ]}}
+        return 404, {'code': 'NotFound', 'message': path}
+
+    # ------------------------------------------------------------------
+    # WooCommerce
+    # ------------------------------------------------------------------
+
+    def _woocommerce_get(self, path, params, body):
+        config = self.server.config
+        path = path.replace('/wp-json/wc/v3', '')
+        if path == '/orders':
+            per_page = int(params.get('per_page') or 100)
+            page = int(params.get('page') or 1)
+            start = (page - 1) * per_page
+            end = min(start + per_page, config.orders)
+            return 200, [{
+                'id': 900000 + i,
+                'number': str(900000 + i),
+                'status': 'processing',
+                'date_created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'total': '250.00',
+                'currency': 'THB',
+                'billing': {'first_name': 'Bench', 'last_name': f'Buyer {i}', 'phone': '0800000000', 'address_1': 'Bangkok'},
+                'shipping': {'first_name': 'Bench', 'last_name': f'Buyer {i}', 'address_1': 'Bangkok'},
+                'line_items': [{
+                    'sku': sku, 'name': f'Bench product {sku}', 'quantity': qty, 'price': price,
+                } for sku, qty, price in self._order_lines(i)],
+            } for i in range(start, end)]
+        if path == '/products':
+            sku = params.get('sku')
+            if sku:
+                return 200, [{'id': int(sku.rsplit('-', 1)[-1] or 0) + 1, 'sku': sku, 'type': 'simple'}]
+            per_page = int(params.get('per_page') or 100)
+            page = int(params.get('page') or 1)
+            start = (page - 1) * per_page
+            end = min(start + per_page, config.products)
+            return 200, [{'id': i + 1, 'sku': config.sku(i), 'name': f'Bench product {i}', 'type': 'simple',
+                          'stock_quantity': i % 50, 'price': '100.00'} for i in range(start, end)]
+        return 404, {'code': 'rest_no_route'}
+
+    def _woocommerce_put(self, path, params, body):
+        path = path.replace('/wp-json/wc/v3', '')
+        if path.startswith('/products/'):
+            product_id = path.rstrip('/').rsplit('/', 1)[-1]
+            return 200, {'id': int(product_id), 'stock_quantity': body.get('stock_quantity')}
+        return 404, {'code': 'rest_no_route'}
+
+    def _woocommerce_post(self, path, params, body):
+        path = path.replace('/wp-json/wc/v3', '')
+        if path == '/products/batch':
+            return 200, {'update': [{'id': item.get('id'), 'stock_quantity': item.get('stock_quantity')}
+                                    for item in body.get('update', [])]}
+        return 404, {'code': 'rest_no_route'}
+
+    # ------------------------------------------------------------------
+    # Zortout
+    # ------------------------------------------------------------------
+
+    def _zortout_get(self, path, params, body):
+        config = self.server.config
+        if path == '/Product/GetProducts':
+            page = int(params.get('page') or 1)
+            limit = int(params.get('limit') or 500)
+            start = (page - 1) * limit
+            end = min(start + limit, config.products)
+            searched = params.get('searchsku') or params.get('sku')
+            if searched:
+                wanted = [s for s in searched.split(',') if s]
+                rows = [{'id': n, 'sku': s, 'name': f'Bench product {s}', 'stock': 10, 'availablestock': 10}
+                        for n, s in enumerate(wanted)]
+            else:
+                rows = [{'id': i + 1, 'sku': config.sku(i), 'name': f'Bench product {i}',
+                         'stock': i % 50, 'availablestock': i % 50} for i in range(start, end)]
+            return 200, {'resCode': '200', 'resDesc': '', 'list': rows, 'count': config.products}
+        if path == '/Warehouse/GetWarehouses':
+            return 200, {'resCode': '200', 'list': [{'id': 1, 'code': 'W0001', 'name': 'Bench'}], 'count': 1}
+        return 404, {'resCode': '404', 'resDesc': path}
+
+    def _zortout_post(self, path, params, body):
+        if path == '/Product/UpdateProductStockList':
+            return 200, {'resCode': '200', 'resDesc': 'Success'}
+        return 404, {'resCode': '404', 'resDesc': path}
+
+    # ------------------------------------------------------------------
+    # TikTok
+    # ------------------------------------------------------------------
+
+    def _tiktok_get(self, path, params, body):
+        config = self.server.config
+        if path == '/order/orders/search':
+            page_size = int(params.get('page_size') or 100)
+            cursor = int(params.get('cursor') or 0)
+            end = min(cursor + page_size, config.orders)
+            return 200, {'code': 0, 'data': {
+                'order_list': [{
+                    'order_id': f'BENCHTT{i:08d}',
+                    'order_status': 111,
+                    'create_time': int(time.time()) - i,
+                    'payment_info': {'total_amount': '250.00', 'currency': 'THB'},
+                    'recipient_address': {'name': f'Bench Buyer {i}', 'phone': '0800000000', 'full_address': 'Bangkok'},
+                    'item_list': [{
+                        'seller_sku': sku, 'product_name': f'Bench product {sku}', 'quantity': qty, 'sale_price': price,
+                    } for sku, qty, price in self._order_lines(i)],
+                } for i in range(cursor, end)],
+                'next_cursor': str(end) if end < config.orders else '',
+            }}
+        return 404, {'code': 404, 'message': path}
+
+    def _tiktok_post(self, path, params, body):
+        if path == '/order/orders/detail/query':
+            orders = []
+            for order_id in body.get('order_id_list', []):
+                index = int(str(order_id)[7:] or 0)
+                orders.append({
+                    'order_id': order_id,
+                    'order_status': 111,
+                    'create_time': int(time.time()) - index,
+                    'payment_info': {'total_amount': '250.00', 'currency': 'THB'},
+                    'recipient_address': {'name': f'Bench Buyer {index}', 'phone': '0800000000', 'full_address': 'Bangkok'},
+                    'item_list': [{
+                        'seller_sku': sku, 'product_name': f'Bench product {sku}', 'quantity': qty, 'sale_price': price,
+                    } for sku, qty, price in self._order_lines(index)],
+                })
+            return 200, {'code': 0, 'data': {'order_list': orders}}
+        if path == '/product/inventory/update':
+            return 200, {'code': 0, 'data': {
+                'success_sku_list': [{'seller_sku': item.get('seller_sku')} for item in body.get('sku_list', [])],
+                'failed_sku_list': [],
+            }}
+        return 404, {'code': 404, 'message': path}
+
+
+class StubMarketplaceServer(ThreadingHTTPServer):
+    """Threaded HTTP server bound to one channel"""
+
+    daemon_threads = True
+
+    def __init__(self, channel, config, host='127.0.0.1', port=0):
+        if channel not in CHANNELS:
+            raise ValueError(f'Unknown channel {channel}, expected one of {CHANNELS}')
+        super().__init__((host, port), StubMarketplaceHandler)
+        self.channel = channel
+        self.config = config
+        self.stats = StubStats()
+        self.random = random.Random(config.seed)
+        self._thread = None
+
+    @property
+    def root_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def base_url(self):
+        """URL to store in marketplace.<channel>.base_url / the WooCommerce store URL"""
+        return self.root_url + BASE_PATHS[self.channel]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name=f'stub-{self.channel}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def start_stub_server(channel, host='127.0.0.1', port=0, **config):
+    """Start a stub server in a background thread and return it"""
+    return StubMarketplaceServer(channel, StubConfig(**config), host=host, port=port).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--channel', choices=CHANNELS, required=True)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--orders', type=int, default=100)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--lines-per-order', type=int, default=2)
+    parser.add_argument('--latency-ms', type=int, default=0)
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Probability (0-1) of answering 429')
+    args = parser.parse_args()
+
+    server = StubMarketplaceServer(args.channel, StubConfig(
+        orders=args.orders,
+        products=args.products,
+        lines_per_order=args.lines_per_order,
+        latency_ms=args.latency_ms,
+        rate_429=args.rate_429,
+    ), host=args.host, port=args.port)
+    print(f'🧪 {args.channel} stub listening on {server.base_url} (Ctrl+C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats.as_dict(), indent=2))
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+from ..models.push_scheduler import AdaptivePushScheduler
+
+
+class TestAdaptivePushScheduler(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.account = cls.env['marketplace.account'].create({
+            'name': 'Push Scheduler Test',
+            'channel': 'woocommerce',
+            'company_id': cls.env.company.id,
+            'push_adaptive_enabled': True,
+            'push_batch_size_min': 10,
+            'push_batch_size_max': 100,
+            'push_max_workers': 5,
+        })
+
+    def _push_job(self, minutes_ago, **vals):
+        completed_at = fields.Datetime.now() - timedelta(minutes=minutes_ago)
+        return self.env['marketplace.job'].create(dict({
+            'name': 'Push Stock',
+            'job_type': 'push_stock',
+            'account_id': self.account.id,
+            'state': 'done',
+            'started_at': completed_at - timedelta(seconds=60),
+            'completed_at': completed_at,
+            'push_batch_size': 40,
+            'push_workers': 3,
+            'push_spacing_seconds': 10,
+            'api_request_count': 100,
+            'api_throttled_count': 0,
+            'api_latency_ms': 200.0,
+            'processed_items': 40,
+        }, **vals))
+
+    def _plan(self):
+        plan = AdaptivePushScheduler(self.account).plan()
+        return plan.batch_size, plan.workers, plan.spacing_seconds, plan.reason
+
+    def test_healthy_history_grows(self):
+        self._push_job(30)
+        batch, workers, spacing, reason = self._plan()
+        self.assertEqual((batch, workers, spacing), (50, 4, 5))
+        self.assertTrue(reason.startswith('grow'))
+
+    def test_dead_job_backs_off(self):
+        self._push_job(30)
+        # A job that raised keeps no API counters, only its state
+        self._push_job(
+            10, state='dead', api_request_count=0, api_latency_ms=0.0, processed_items=0,
+            last_error='Connection reset by peer',
+        )
+        batch, workers, spacing, reason = self._plan()
+        self.assertEqual((batch, workers, spacing), (20, 2, 20))
+        self.assertIn('recent failures', reason)
+
+    def test_failed_shop_push_backs_off(self):
+        self._push_job(10, push_failed_shop_count=1)
+        batch, workers, spacing, reason = self._plan()
+        self.assertEqual((batch, workers, spacing), (20, 2, 20))
+        self.assertIn('recent failures', reason)